@@ -11,12 +11,13 @@ from pydantic import BaseModel, Field, validator
 from sqlalchemy import case, func, or_
 
 from .auth_routes import verify_token
+from bot.core.performance_metrics import PerformanceAggregate
 from bot.database import DatabaseManager
+from bot.db import load_performance_metrics
 from bot.models import (
     AIInsight,
     MarketAlert,
     MarketData as MarketDataModel,
-    Trade,
     TradingSettings,
     TradingSignal,
 )
@@ -104,115 +105,30 @@ def extract_strategy_name(settings: TradingSettings) -> Tuple[str, str]:
     return str(name), str(strategy)
 
 
-def collect_user_trades(session, user_id: uuid.UUID, strategy_name: Optional[str]) -> List[Trade]:
-    query = session.query(Trade).filter(Trade.user_id == user_id)
-    if strategy_name:
-        query = query.filter(Trade.strategy_name == strategy_name)
-    return query.order_by(Trade.created_at.asc()).all()
-
-
-def calculate_performance_metrics(trades: List[Trade]) -> Tuple[Dict[str, float], Dict[str, float]]:
-    if not trades:
-        summary = {
-            "total_pnl": 0.0,
-            "pnl_percentage": 0.0,
-            "win_rate": 0.0,
-            "total_trades": 0,
-        }
-        details = {
-            "total_trades": 0,
-            "winning_trades": 0,
-            "losing_trades": 0,
-            "total_pnl": 0.0,
-            "total_pnl_percentage": 0.0,
-            "win_rate": 0.0,
-            "average_win": 0.0,
-            "average_loss": 0.0,
-            "profit_factor": 0.0,
-            "max_drawdown": 0.0,
-        }
-        return summary, details
-
-    buy_value = Decimal("0")
-    sell_value = Decimal("0")
-    winning_trades = 0
-    cumulative = Decimal("0")
-    peak = Decimal("0")
-    max_drawdown = Decimal("0")
-
-    ordered_trades = sorted(
-        trades,
-        key=lambda trade: trade.created_at or trade.updated_at or datetime.utcnow(),
-    )
-
-    for trade in ordered_trades:
-        amount = trade.amount or Decimal("0")
-        price = trade.price or Decimal("0")
-        value = amount * price
-        trade_type = (trade.trade_type or "").lower()
-
-        if trade_type == "buy":
-            buy_value += value
-            cumulative -= value
-        elif trade_type == "sell":
-            sell_value += value
-            winning_trades += 1
-            cumulative += value
-        else:
-            cumulative += value
-
-        if cumulative > peak:
-            peak = cumulative
-        drawdown = cumulative - peak
-        if drawdown < max_drawdown:
-            max_drawdown = drawdown
-
-    total_trades = len(trades)
-    losing_trades = total_trades - winning_trades
-    total_pnl = sell_value - buy_value
-    invested = buy_value if buy_value > 0 else Decimal("0")
-
-    pnl_percentage = (total_pnl / invested * Decimal("100")) if invested else Decimal("0")
-    win_rate = (
-        Decimal(winning_trades) / Decimal(total_trades) * Decimal("100")
-        if total_trades
-        else Decimal("0")
-    )
+def load_strategy_metrics(session, user_id: uuid.UUID, strategy_name: Optional[str]) -> PerformanceAggregate:
+    """Read running performance aggregates (history is folded in by scripts/backfill_performance_metrics.py)."""
+    return load_performance_metrics(session, user_id=str(user_id), strategy_name=strategy_name)
 
-    average_win = (
-        sell_value / Decimal(winning_trades)
-        if winning_trades
-        else Decimal("0")
-    )
-    average_loss = (
-        buy_value / Decimal(losing_trades)
-        if losing_trades
-        else Decimal("0")
-    )
-    profit_factor = (
-        sell_value / buy_value
-        if buy_value > 0
-        else Decimal("0")
-    )
 
+def calculate_performance_metrics(metrics: PerformanceAggregate) -> Tuple[Dict[str, float], Dict[str, float]]:
     summary = {
-        "total_pnl": float(total_pnl),
-        "pnl_percentage": float(pnl_percentage),
-        "win_rate": float(win_rate),
-        "total_trades": total_trades,
+        "total_pnl": metrics.pnl_sum,
+        "pnl_percentage": metrics.pnl_percentage,
+        "win_rate": metrics.win_rate,
+        "total_trades": metrics.trade_count,
     }
 
     details = {
-        "total_trades": total_trades,
-        "winning_trades": winning_trades,
-        "losing_trades": losing_trades,
-        "total_pnl": float(total_pnl),
-        "total_pnl_percentage": float(pnl_percentage),
-        "win_rate": float(win_rate),
-        "average_win": float(average_win),
-        "average_loss": float(average_loss),
-        "profit_factor": float(profit_factor),
-        "max_drawdown": float(max_drawdown),
+        "total_trades": metrics.trade_count,
+        "winning_trades": metrics.win_count,
+        "losing_trades": metrics.loss_count,
+        "total_pnl": metrics.pnl_sum,
+        "total_pnl_percentage": metrics.pnl_percentage,
+        "win_rate": metrics.win_rate,
+        "average_win": metrics.average_win,
+        "average_loss": metrics.average_loss,
+        "profit_factor": metrics.profit_factor,
+        "max_drawdown": metrics.max_drawdown,
     }
 
     return summary, details
@@ -230,7 +146,7 @@ def to_decimal(value: Optional[float]) -> Optional[Decimal]:
 def build_bot_payload(session, settings: TradingSettings) -> "TradingBot":
     name, strategy = extract_strategy_name(settings)
     summary_metrics, _ = calculate_performance_metrics(
-        collect_user_trades(session, settings.user_id, strategy)
+        load_strategy_metrics(session, settings.user_id, strategy)
     )
 
     risk_label = None
@@ -902,8 +818,9 @@ async def get_bot_performance(bot_id: str, token_data: dict = Depends(verify_tok
                 raise HTTPException(status_code=404, detail="Bot not found")
 
             name, strategy = extract_strategy_name(bot)
-            trades = collect_user_trades(db.session, user_uuid, strategy)
-            _, details = calculate_performance_metrics(trades)
+            _, details = calculate_performance_metrics(
+                load_strategy_metrics(db.session, user_uuid, strategy)
+            )
 
             logger.info(
                 "Bot performance retrieved",
@@ -1,12 +1,21 @@
 """Portfolio API backed by database state."""
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from bot.db import DatabaseManager, Fill, Order, PortfolioSnapshot, Position, TradingStats
+from bot.core.downsampling import lttb_indices
+from bot.core.performance_metrics import PerformanceAggregate, daily_pnl_sharpe
+from bot.db import (
+    DatabaseManager,
+    Fill,
+    Order,
+    PortfolioRollup,
+    PortfolioSnapshot,
+    Position,
+)
 from .auth_routes import verify_token
 
 portfolio_router = APIRouter(prefix="/api/portfolio", tags=["Portfolio"])
@@ -51,6 +60,29 @@ class ClosePositionRequest(BaseModel):
     exit_price: Optional[float] = None
 
 
+# period -> (window, rollup resolution); resolution keeps rows read per request bounded
+PERFORMANCE_PERIODS = {
+    "1d": (timedelta(days=1), "1m"),
+    "1w": (timedelta(weeks=1), "1h"),
+    "1m": (timedelta(days=30), "1h"),
+    "3m": (timedelta(days=90), "1d"),
+    "1y": (timedelta(days=365), "1d"),
+}
+DEFAULT_CHART_POINTS = 200
+MAX_CHART_POINTS = 1000
+
+
+def _trade_metrics(db: DatabaseManager, user_id: Optional[str], since: datetime) -> Tuple[float, float]:
+    """Sharpe ratio of daily realized P&L and win rate (%) since ``since``, from the performance store."""
+    if not user_id:
+        return 0.0, 0.0
+    days = db.get_daily_performance(user_id=user_id, since=since)
+    total = PerformanceAggregate()
+    for day in days:
+        total.merge(day)
+    return daily_pnl_sharpe([day.pnl_sum for day in days]), total.win_rate
+
+
 def _latest_snapshot(db: DatabaseManager, user_id: Optional[str]) -> Optional[PortfolioSnapshot]:
     query = db.session.query(PortfolioSnapshot)
     if user_id:
@@ -212,48 +244,26 @@ async def get_balance(token_data: dict = Depends(verify_token)) -> Dict[str, obj
 @portfolio_router.get("/performance")
 async def get_performance(
     period: str = "1d",
+    points: int = DEFAULT_CHART_POINTS,
     token_data: dict = Depends(verify_token),
 ) -> Dict[str, object]:
-    period_map = {
-        "1d": timedelta(days=1),
-        "1w": timedelta(weeks=1),
-        "1m": timedelta(days=30),
-        "3m": timedelta(days=90),
-        "1y": timedelta(days=365),
-    }
-    window = period_map.get(period, period_map["1d"])
+    window, resolution = PERFORMANCE_PERIODS.get(period, PERFORMANCE_PERIODS["1d"])
+    points = max(3, min(points, MAX_CHART_POINTS))
     user_id = token_data.get("sub")
 
     with DatabaseManager() as db:
         since = datetime.utcnow() - window
-        query = db.session.query(PortfolioSnapshot).filter(PortfolioSnapshot.timestamp >= since)
+        rollups: List[PortfolioRollup] = []
         if user_id:
-            query = query.filter(PortfolioSnapshot.user_id == user_id)
-        snapshots = query.order_by(PortfolioSnapshot.timestamp.asc()).all()
-
-        data_points: List[Dict[str, object]] = []
-        previous_value: Optional[float] = None
-        returns: List[float] = []
-
-        for snap in snapshots:
-            portfolio_value = snap.total_balance
-            base_value = portfolio_value - snap.unrealized_pnl
-            pnl = snap.unrealized_pnl
-            if previous_value:
-                returns.append((portfolio_value - previous_value) / previous_value)
-            previous_value = portfolio_value
-            data_points.append(
-                {
-                    "timestamp": snap.timestamp,
-                    "portfolio_value": round(portfolio_value, 2),
-                    "pnl": round(pnl, 2),
-                    "pnl_percentage": round((pnl / base_value * 100) if base_value else 0.0, 4),
-                }
+            # History predating the rollup table is folded in by scripts/backfill_portfolio_rollups.py
+            rollups = db.get_portfolio_rollups(
+                user_id=user_id, resolution=resolution, start_timestamp=since
             )
 
-        if not data_points:
+        if not rollups:
             return {
                 "period": period,
+                "resolution": resolution,
                 "data": [],
                 "metrics": {
                     "total_return": 0.0,
@@ -265,35 +275,56 @@ async def get_performance(
                 "timestamp": datetime.utcnow(),
             }
 
-        first_value = data_points[0]["portfolio_value"]
-        last_value = data_points[-1]["portfolio_value"]
+        # Metrics over the full bucket series (bounded by the resolution choice)
+        first_value = rollups[0].open_value
+        last_value = rollups[-1].close_value
         total_return = ((last_value - first_value) / first_value * 100) if first_value else 0.0
 
+        returns: List[float] = []
+        previous_value: Optional[float] = None
+        peak = first_value
+        max_drawdown = 0.0
+        for bucket in rollups:
+            if previous_value:
+                returns.append((bucket.close_value - previous_value) / previous_value)
+            previous_value = bucket.close_value
+            reference_peak = max(peak, bucket.open_value)
+            if reference_peak:
+                max_drawdown = min(max_drawdown, (bucket.low_value - reference_peak) / reference_peak * 100)
+            peak = max(peak, bucket.high_value)
+
         volatility = 0.0
         if returns:
             mean_return = sum(returns) / len(returns)
             variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
             volatility = (variance ** 0.5) * (252 ** 0.5) * 100
 
-        peak = data_points[0]["portfolio_value"]
-        max_drawdown = 0.0
-        for point in data_points:
-            value = point["portfolio_value"]
-            peak = max(peak, value)
-            drawdown = (value - peak) / peak * 100 if peak else 0.0
-            max_drawdown = min(max_drawdown, drawdown)
-
-        recent_stats = (
-            db.session.query(TradingStats)
-            .order_by(TradingStats.date.desc())
-            .first()
+        # Chart series downsampled to a fixed point budget
+        selected = lttb_indices(
+            [bucket.bucket_start.timestamp() for bucket in rollups],
+            [bucket.close_value for bucket in rollups],
+            points,
         )
+        data_points: List[Dict[str, object]] = []
+        for index in selected:
+            bucket = rollups[index]
+            portfolio_value = bucket.close_value
+            pnl = bucket.close_unrealized_pnl
+            base_value = portfolio_value - pnl
+            data_points.append(
+                {
+                    "timestamp": bucket.bucket_start,
+                    "portfolio_value": round(portfolio_value, 2),
+                    "pnl": round(pnl, 2),
+                    "pnl_percentage": round((pnl / base_value * 100) if base_value else 0.0, 4),
+                }
+            )
 
-        sharpe = recent_stats.sharpe_ratio if recent_stats and recent_stats.sharpe_ratio else 0.0
-        win_rate = recent_stats.win_rate if recent_stats else 0.0
+        sharpe, win_rate = _trade_metrics(db, user_id, since)
 
         return {
             "period": period,
+            "resolution": resolution,
             "data": data_points,
             "metrics": {
                 "total_return": round(total_return, 2),
@@ -390,13 +421,7 @@ async def get_risk_metrics(token_data: dict = Depends(verify_token)) -> Dict[str
                 beta = risk_meta.get("beta")
                 sortino = risk_meta.get("sortino_ratio")
 
-        recent_stats = (
-            db.session.query(TradingStats)
-            .order_by(TradingStats.date.desc())
-            .first()
-        )
-        sharpe = recent_stats.sharpe_ratio if recent_stats and recent_stats.sharpe_ratio else 0.0
-        win_rate = recent_stats.win_rate if recent_stats else 0.0
+        sharpe, win_rate = _trade_metrics(db, user_id, since)
 
         risk_level = "Medium"
         if max_drawdown < -20:
@@ -1,7 +1,9 @@
 """Advanced Market Analyzer - Integration of SOFA, ASAE, and NNMP."""
 
+from __future__ import annotations
+
 import asyncio
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
@@ -9,8 +11,12 @@ from dataclasses import dataclass
 import logging
 
 from .order_flow import SmartOrderFlowAnalyzer, WhaleOrder
-from .sentiment import AISentimentAnalyzer, SentimentSignal
-from .neural_prediction import NeuralMarketPredictor, PredictionResult
+
+# Sentiment (textblob, openai) and neural (torch, sklearn, ta) engines are
+# imported on first use, so importing the analyzer stays cheap
+if TYPE_CHECKING:
+    from .sentiment import AISentimentAnalyzer, SentimentSignal
+    from .neural_prediction import NeuralMarketPredictor, PredictionResult
 
 logger = logging.getLogger(__name__)
 
@@ -51,8 +57,8 @@ class AdvancedMarketAnalyzer:
         
         # Initialize sub-analyzers
         self.order_flow = SmartOrderFlowAnalyzer(config)
-        self.sentiment = AISentimentAnalyzer(config)
-        self.neural = NeuralMarketPredictor(config)
+        self._sentiment: Optional[AISentimentAnalyzer] = None
+        self._neural: Optional[NeuralMarketPredictor] = None
         
         # Signal combination weights
         self.weights = {
@@ -64,6 +70,22 @@ class AdvancedMarketAnalyzer:
         # Signal history
         self.signal_history: Dict[str, List[AdvancedSignal]] = {}
         self.performance_metrics: Dict[str, Dict] = {}
+    
+    @property
+    def sentiment(self) -> AISentimentAnalyzer:
+        """Sentiment engine, created (and its dependencies imported) on first use."""
+        if self._sentiment is None:
+            from .sentiment import AISentimentAnalyzer
+            self._sentiment = AISentimentAnalyzer(self.config)
+        return self._sentiment
+    
+    @property
+    def neural(self) -> NeuralMarketPredictor:
+        """Neural predictor, created (and torch imported) on first use."""
+        if self._neural is None:
+            from .neural_prediction import NeuralMarketPredictor
+            self._neural = NeuralMarketPredictor(self.config)
+        return self._neural
         
     async def analyze_market(self, symbol: str, market_data: Dict) -> AdvancedSignal:
         """
@@ -120,7 +142,7 @@ class AdvancedMarketAnalyzer:
     
     async def _analyze_order_flow(self, symbol: str, order_book: Dict) -> Optional[Dict]:
         """Analyze order flow."""
-        if not order_book:
+        if not order_book and self.order_flow.get_live_order_book(symbol) is None:
             return None
             
         try:
@@ -158,6 +158,207 @@ class PositionalEncoding(nn.Module):
         return x + self.pe[:x.size(0), :]
 
 
+def detect_candle_patterns(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                           close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized doji / hammer / shooting star detection.
+
+    Returns three int8 arrays (1 = pattern present) aligned to the inputs.
+    """
+    body = np.abs(close - open_)
+    range_hl = high - low
+    body_low = np.minimum(close, open_)
+    body_high = np.maximum(close, open_)
+    lower_shadow = body_low - low
+    upper_shadow = high - body_high
+
+    doji = (body <= range_hl * 0.1).astype(np.int8)
+    hammer = ((lower_shadow > body * 2) & (upper_shadow < body * 0.3)).astype(np.int8)
+    shooting_star = ((upper_shadow > body * 2) & (lower_shadow < body * 0.3)).astype(np.int8)
+    return doji, hammer, shooting_star
+
+
+@dataclass
+class _FeatureState:
+    """Per-key state of the FeatureStore."""
+    window: np.ndarray  # float32 (capacity, n_features), newest row last
+    filled: int
+    columns: List[str]
+    last_key: object
+    last_ohlcv: Tuple[float, ...]
+    # Running totals *before* the last stored candle, so a revised (still
+    # forming) candle can be recomputed without touching older history.
+    cum_pv: float
+    cum_volume: float
+    obv: float
+    prev_close: float
+
+
+class FeatureStore:
+    """
+    Per-symbol rolling feature window for inference.
+
+    Features are computed once per new candle: each update only evaluates the
+    indicator pipeline over ``warmup`` rows plus the new candles, then shifts
+    the results into a fixed float32 window of ``capacity`` rows. The last
+    stored candle is always recomputed so a still-forming bar stays current.
+    Cumulative features (VWAP, OBV) are carried forward from running totals so
+    they match a full-history computation.
+
+    The full history is only processed on the first call for a key, when more
+    than ``capacity`` candles arrive at once, or when the history is rewound.
+    """
+
+    CUMULATIVE_COLUMNS = ('vwap', 'obv')
+
+    def __init__(self, compute_frame, capacity: int = 100, warmup: int = 600):
+        self.compute_frame = compute_frame
+        self.capacity = capacity
+        self.warmup = warmup
+        self._states: Dict[str, _FeatureState] = {}
+        self.stats = {'cache_hits': 0, 'incremental_updates': 0, 'full_rebuilds': 0}
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop cached state for one key or for all keys."""
+        if key is None:
+            self._states.clear()
+        else:
+            self._states.pop(key, None)
+
+    def update(self, key: str, df: pd.DataFrame) -> np.ndarray:
+        """
+        Bring the window for ``key`` up to date with ``df`` and return it.
+
+        The returned float32 array holds up to ``capacity`` most recent feature
+        rows (oldest first). It is a view into the store; copy it if it must
+        outlive the next update.
+        """
+        if df.empty:
+            raise ValueError("Empty OHLCV frame")
+
+        keys = self._row_keys(df)
+        state = self._states.get(key)
+
+        if state is None:
+            return self._rebuild(key, df, keys)
+
+        pos = keys.searchsorted(state.last_key, side='left')
+        if pos >= len(keys) or keys[pos] != state.last_key:
+            return self._rebuild(key, df, keys)
+
+        n_new = len(keys) - pos - 1
+        if n_new == 0 and self._ohlcv_at(df, pos) == state.last_ohlcv:
+            self.stats['cache_hits'] += 1
+            return state.window[self.capacity - state.filled:]
+
+        if n_new + 1 > self.capacity or state.filled == 0:
+            return self._rebuild(key, df, keys)
+
+        # Recompute the previously-last candle (it may have been revised) plus
+        # the new ones, on a bounded tail only.
+        n_rows = n_new + 1
+        start = max(0, len(df) - n_rows - self.warmup)
+        tail = df.iloc[start:].copy()
+        frame = self.compute_frame(tail)
+        target_index = df.index[-n_rows:]
+        if len(frame) < n_rows or not frame.index[-n_rows:].equals(target_index):
+            return self._rebuild(key, df, keys)
+
+        new_rows = frame.iloc[-n_rows:]
+        if list(new_rows.columns) != state.columns:
+            return self._rebuild(key, df, keys)
+
+        values = new_rows.to_numpy(dtype=np.float64, copy=True)
+        rows_df = df.iloc[-n_rows:]
+        totals = self._apply_cumulative(values, state.columns, rows_df, state)
+
+        # Overwrite the revised candle, then shift the new ones in.
+        window = state.window
+        window[-1] = values[0]
+        if n_new:
+            window[:-n_new] = window[n_new:]
+            window[-n_new:] = values[1:]
+            state.filled = min(self.capacity, state.filled + n_new)
+
+        state.cum_pv, state.cum_volume, state.obv, state.prev_close = totals
+        state.last_key = keys[-1]
+        state.last_ohlcv = self._ohlcv_at(df, len(df) - 1)
+        self.stats['incremental_updates'] += 1
+        return window[-state.filled:]
+
+    def _rebuild(self, key: str, df: pd.DataFrame, keys: pd.Index) -> np.ndarray:
+        """Compute the window from the full history (first call / resync)."""
+        self.stats['full_rebuilds'] += 1
+        frame = self.compute_frame(df.copy())
+        columns = list(frame.columns)
+        window = np.zeros((self.capacity, len(columns)), dtype=np.float32)
+        recent = frame.iloc[-self.capacity:].to_numpy(dtype=np.float32)
+        filled = len(recent)
+        if filled:
+            window[-filled:] = recent
+
+        # Running totals up to (but excluding) the last candle
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        typical = (df['high'].to_numpy(dtype=np.float64) + df['low'].to_numpy(dtype=np.float64) +
+                   df['close'].to_numpy(dtype=np.float64)) / 3
+        close = df['close'].to_numpy(dtype=np.float64)
+        signed = np.where(close[1:] < close[:-1], -volume[1:], volume[1:])
+        obv_before_last = volume[0] + float(np.sum(signed[:-1])) if len(df) > 1 else 0.0
+
+        state = _FeatureState(
+            window=window,
+            filled=filled,
+            columns=columns,
+            last_key=keys[-1],
+            last_ohlcv=self._ohlcv_at(df, len(df) - 1),
+            cum_pv=float(np.sum(typical[:-1] * volume[:-1])),
+            cum_volume=float(np.sum(volume[:-1])),
+            obv=obv_before_last,
+            prev_close=float(close[-2]) if len(df) > 1 else float('nan'),
+        )
+        self._states[key] = state
+        return window[self.capacity - filled:]
+
+    def _apply_cumulative(self, values: np.ndarray, columns: List[str], rows: pd.DataFrame,
+                          state: _FeatureState) -> Tuple[float, float, float, float]:
+        """
+        Replace tail-relative VWAP/OBV with full-history values in ``values``.
+
+        Returns the running totals as of the row before the last one.
+        """
+        volume = rows['volume'].to_numpy(dtype=np.float64)
+        close = rows['close'].to_numpy(dtype=np.float64)
+        typical = (rows['high'].to_numpy(dtype=np.float64) + rows['low'].to_numpy(dtype=np.float64) +
+                   close) / 3
+
+        cum_pv = state.cum_pv + np.cumsum(typical * volume)
+        cum_volume = state.cum_volume + np.cumsum(volume)
+        prev_close = np.concatenate(([state.prev_close], close[:-1]))
+        signed = np.where(close < prev_close, -volume, volume)
+        obv = state.obv + np.cumsum(signed)
+
+        if 'vwap' in columns:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values[:, columns.index('vwap')] = cum_pv / cum_volume
+        if 'obv' in columns:
+            values[:, columns.index('obv')] = obv
+
+        if len(rows) > 1:
+            return float(cum_pv[-2]), float(cum_volume[-2]), float(obv[-2]), float(close[-2])
+        return state.cum_pv, state.cum_volume, state.obv, state.prev_close
+
+    @staticmethod
+    def _row_keys(df: pd.DataFrame) -> pd.Index:
+        if 'timestamp' in df.columns:
+            return pd.Index(df['timestamp'])
+        return df.index
+
+    @staticmethod
+    def _ohlcv_at(df: pd.DataFrame, pos: int) -> Tuple[float, ...]:
+        row = df.iloc[pos]
+        return tuple(float(row[col]) for col in ('open', 'high', 'low', 'close', 'volume'))
+
+
 class NeuralMarketPredictor:
     """
     Neural Network Market Prediction Engine.
@@ -193,6 +394,13 @@ class NeuralMarketPredictor:
         self.scaler = StandardScaler()
         self.feature_importance = {}
         
+        # Incremental inference features (one rolling window per symbol/timeframe)
+        self.feature_store = FeatureStore(
+            self.compute_feature_frame,
+            capacity=self.sequence_length,
+            warmup=self.config.get('feature_warmup', 600)
+        )
+        
         # Device
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         logger.info(f"Using device: {self.device}")
@@ -202,6 +410,10 @@ class NeuralMarketPredictor:
         Prepare features from OHLCV data.
         Calculates 200+ technical indicators.
         """
+        return self.compute_feature_frame(df).values
+
+    def compute_feature_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Feature matrix as a DataFrame aligned to the input index (NaN rows dropped)."""
         # Basic price features
         df['returns'] = df['close'].pct_change()
         df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
@@ -260,10 +472,16 @@ class NeuralMarketPredictor:
         df['ichimoku_a'] = ichimoku.ichimoku_a()
         df['ichimoku_b'] = ichimoku.ichimoku_b()
         
-        # Pattern recognition features
-        df['doji'] = self._detect_doji(df)
-        df['hammer'] = self._detect_hammer(df)
-        df['shooting_star'] = self._detect_shooting_star(df)
+        # Pattern recognition features (vectorized over the OHLC arrays)
+        doji, hammer, shooting_star = detect_candle_patterns(
+            df['open'].to_numpy(dtype=np.float64),
+            df['high'].to_numpy(dtype=np.float64),
+            df['low'].to_numpy(dtype=np.float64),
+            df['close'].to_numpy(dtype=np.float64),
+        )
+        df['doji'] = doji
+        df['hammer'] = hammer
+        df['shooting_star'] = shooting_star
         
         # Market microstructure
         df['bid_ask_spread'] = df['high'] - df['low']
@@ -280,29 +498,28 @@ class NeuralMarketPredictor:
         # Select features
         feature_columns = [col for col in df.columns if col not in ['open', 'high', 'low', 'close', 'volume', 'timestamp']]
         
-        return df[feature_columns].values
+        return df[feature_columns]
     
     def _detect_doji(self, df: pd.DataFrame) -> pd.Series:
         """Detect doji candlestick pattern."""
-        body = abs(df['close'] - df['open'])
-        range_hl = df['high'] - df['low']
-        return (body <= range_hl * 0.1).astype(int)
+        doji, _, _ = detect_candle_patterns(
+            df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()
+        )
+        return pd.Series(doji, index=df.index)
     
     def _detect_hammer(self, df: pd.DataFrame) -> pd.Series:
         """Detect hammer candlestick pattern."""
-        body = abs(df['close'] - df['open'])
-        lower_shadow = df[['close', 'open']].min(axis=1) - df['low']
-        upper_shadow = df['high'] - df[['close', 'open']].max(axis=1)
-        
-        return ((lower_shadow > body * 2) & (upper_shadow < body * 0.3)).astype(int)
+        _, hammer, _ = detect_candle_patterns(
+            df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()
+        )
+        return pd.Series(hammer, index=df.index)
     
     def _detect_shooting_star(self, df: pd.DataFrame) -> pd.Series:
         """Detect shooting star pattern."""
-        body = abs(df['close'] - df['open'])
-        lower_shadow = df[['close', 'open']].min(axis=1) - df['low']
-        upper_shadow = df['high'] - df[['close', 'open']].max(axis=1)
-        
-        return ((upper_shadow > body * 2) & (lower_shadow < body * 0.3)).astype(int)
+        _, _, shooting_star = detect_candle_patterns(
+            df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()
+        )
+        return pd.Series(shooting_star, index=df.index)
     
     def create_sequences(self, features: np.ndarray, targets: np.ndarray, 
                         seq_length: int) -> Tuple[np.ndarray, np.ndarray]:
@@ -408,17 +625,14 @@ class NeuralMarketPredictor:
             PredictionResult with price prediction and confidence
         """
         try:
-            # Prepare features
-            features = self.prepare_features(data)
-            if len(features) < self.sequence_length:
+            # Rolling feature window (only new candles are computed)
+            window = self.feature_store.update(f"{symbol}:{timeframe}", data)
+            if len(window) < self.sequence_length:
                 raise ValueError("Insufficient data for prediction")
             
             # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Get last sequence
-            sequence = features_scaled[-self.sequence_length:]
-            sequence_tensor = torch.FloatTensor(sequence).unsqueeze(0).to(self.device)
+            sequence = self.scaler.transform(window).astype(np.float32)
+            sequence_tensor = torch.from_numpy(sequence).unsqueeze(0).to(self.device)
             
             # Make predictions
             self.lstm_model.eval()
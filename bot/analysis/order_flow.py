@@ -1,14 +1,23 @@
 """Smart Order Flow Analysis (SOFA) - Whale Detection and Order Flow Analysis."""
 
 import asyncio
-from typing import Dict, List, Optional, Tuple
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from dataclasses import dataclass
 import logging
 
+from bot.realtime.order_book import L2OrderBook
+
 logger = logging.getLogger(__name__)
 
+_EMPTY = np.empty(0, dtype=np.float64)
+
+# Order value bins -> base impact score
+_IMPACT_VALUE_BINS = np.array([100000.0, 500000.0, 1000000.0, 5000000.0])
+_IMPACT_BASE_SCORES = np.array([20.0, 40.0, 60.0, 80.0, 100.0])
+
 
 @dataclass
 class WhaleOrder:
@@ -38,10 +47,27 @@ class OrderFlowMetrics:
     momentum_score: float  # -100 to +100
 
 
+def _levels_to_arrays(levels: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """[[price, size, ...], ...] -> (prices, sizes) float arrays."""
+    if levels is None or not len(levels):
+        return _EMPTY, _EMPTY
+    try:
+        array = np.asarray(levels, dtype=np.float64)
+    except ValueError:
+        # Ragged levels (some exchanges append counts/ids)
+        array = np.asarray([level[:2] for level in levels], dtype=np.float64)
+    return array[:, 0], array[:, 1]
+
+
 class SmartOrderFlowAnalyzer:
     """
     Smart Order Flow Analysis (SOFA) Engine.
     Detects whale activity, hidden orders, and market maker behavior.
+    
+    Works on price/size arrays (bids descending, asks ascending); CCXT-style
+    dicts are converted once per call and ``L2OrderBook`` sides are used
+    as-is. Detected whales are kept in a ring buffer bounded both in size
+    (``max_whale_alerts``) and age (``whale_alert_ttl`` seconds).
     """
     
     def __init__(self, config: Dict = None):
@@ -57,160 +83,181 @@ class SmartOrderFlowAnalyzer:
         
         # Detection parameters
         self.min_whale_confidence = 0.7
-        self.order_book_depth = 50
+        self.order_book_depth = self.config.get('order_book_depth', 50)
         self.time_window = 300  # 5 minutes
+        self.wall_multiplier = 5.0  # Level size vs. median size of its side
+        self.impact_notionals = np.asarray(
+            self.config.get('impact_notionals', [10000.0, 50000.0, 250000.0]), dtype=np.float64
+        )
         
         # Storage
         self.order_history: Dict[str, List[Dict]] = {}
-        self.whale_alerts: List[WhaleOrder] = []
+        self.whale_alert_ttl = self.config.get('whale_alert_ttl', 3600)
+        self.whale_alerts: Deque[WhaleOrder] = deque(maxlen=self.config.get('max_whale_alerts', 1000))
         self.market_maker_patterns: Dict[str, Dict] = {}
         
-    async def analyze_order_book(self, symbol: str, order_book: Dict) -> Dict:
+        # Live L2 books (e.g. WebSocketManager.get_l2_book) used when no book is passed
+        self.order_book_source = None
+        self.order_book_max_age = 5.0
+        
+    def set_order_book_source(self, source, max_age: float = 5.0):
+        """Analyze the WebSocket-maintained book instead of a fetched one."""
+        self.order_book_source = source
+        self.order_book_max_age = max_age
+        
+    def get_live_order_book(self, symbol: str) -> Optional[L2OrderBook]:
+        if self.order_book_source is None:
+            return None
+        return self.order_book_source.get_l2_book(symbol, max_age=self.order_book_max_age)
+        
+    async def analyze_order_book(self, symbol: str, order_book: Optional[Dict] = None) -> Dict:
         """
         Analyze order book for whale activity and imbalances.
         
+        ``order_book`` may be a CCXT-style dict or an ``L2OrderBook``; when
+        omitted the live book from ``order_book_source`` is used.
+        
         Returns:
             Analysis results with whale detection and flow metrics
         """
         try:
-            # Extract bids and asks
-            bids = order_book.get('bids', [])
-            asks = order_book.get('asks', [])
-            
-            # Detect whale orders
-            whale_orders = self._detect_whale_orders(symbol, bids, asks)
-            
-            # Calculate order flow metrics
-            flow_metrics = self._calculate_flow_metrics(bids, asks)
-            
-            # Detect hidden/iceberg orders
-            hidden_orders = self._detect_hidden_orders(symbol, order_book)
-            
-            # Analyze market maker activity
-            mm_activity = self._analyze_market_maker_activity(symbol, order_book)
-            
-            # Calculate price impact prediction
-            price_impact = self._predict_price_impact(whale_orders, flow_metrics)
-            
-            # Generate trading signals
-            signals = self._generate_signals(
-                whale_orders, flow_metrics, hidden_orders, mm_activity
-            )
-            
-            return {
-                "whale_orders": whale_orders,
-                "flow_metrics": flow_metrics,
-                "hidden_orders": hidden_orders,
-                "market_maker_activity": mm_activity,
-                "price_impact": price_impact,
-                "signals": signals,
-                "timestamp": datetime.now()
-            }
+            if not order_book:
+                order_book = self.get_live_order_book(symbol)
+                if order_book is None:
+                    return {}
+            if isinstance(order_book, L2OrderBook):
+                arrays = (order_book.bids.prices, order_book.bids.sizes,
+                          order_book.asks.prices, order_book.asks.sizes)
+            else:
+                arrays = (*_levels_to_arrays(order_book.get('bids', [])),
+                          *_levels_to_arrays(order_book.get('asks', [])))
+            return self.analyze_arrays(symbol, *arrays)
             
         except Exception as e:
             logger.error(f"Error analyzing order book for {symbol}: {e}")
             return {}
     
-    def _detect_whale_orders(self, symbol: str, bids: List, asks: List) -> List[WhaleOrder]:
+    def analyze_arrays(self, symbol: str, bid_prices: np.ndarray, bid_sizes: np.ndarray,
+                       ask_prices: np.ndarray, ask_sizes: np.ndarray) -> Dict:
+        """
+        Analyze one book given as arrays (bids best-first descending, asks ascending).
+        
+        Synchronous and allocation-light so many symbols can be analyzed
+        per second on one core.
+        """
+        # Detect whale orders
+        whale_orders = self._detect_whale_orders(symbol, bid_prices, bid_sizes, ask_prices, ask_sizes)
+        self._record_alerts(whale_orders)
+        
+        # Calculate order flow metrics
+        flow_metrics = self._calculate_flow_metrics(bid_prices, bid_sizes, ask_prices, ask_sizes)
+        
+        # Detect hidden/iceberg orders
+        hidden_orders = self._detect_hidden_orders(symbol, bid_prices, bid_sizes)
+        
+        # Analyze market maker activity
+        mm_activity = self._analyze_market_maker_activity(symbol, bid_prices, ask_prices)
+        
+        # Liquidity walls and cost of sweeping the book
+        walls = self._detect_walls(bid_prices, bid_sizes, "buy") + self._detect_walls(ask_prices, ask_sizes, "sell")
+        book_impact = self._calculate_book_impact(bid_prices, bid_sizes, ask_prices, ask_sizes)
+        
+        # Calculate price impact prediction
+        price_impact = self._predict_price_impact(whale_orders, flow_metrics)
+        
+        # Generate trading signals
+        signals = self._generate_signals(
+            whale_orders, flow_metrics, hidden_orders, mm_activity
+        )
+        
+        return {
+            "whale_orders": whale_orders,
+            "flow_metrics": flow_metrics,
+            "hidden_orders": hidden_orders,
+            "market_maker_activity": mm_activity,
+            "walls": walls,
+            "book_impact": book_impact,
+            "price_impact": price_impact,
+            "signals": signals,
+            "timestamp": datetime.now()
+        }
+    
+    def _detect_whale_orders(self, symbol: str, bid_prices: np.ndarray, bid_sizes: np.ndarray,
+                             ask_prices: np.ndarray, ask_sizes: np.ndarray) -> List[WhaleOrder]:
         """Detect whale orders in the order book."""
         whale_orders = []
         threshold = self.whale_thresholds.get(symbol, self.whale_thresholds["default"])
-        
-        # Analyze bids
-        for bid in bids[:self.order_book_depth]:
-            price, size = float(bid[0]), float(bid[1])
-            value = price * size
-            
-            if self._is_whale_order(symbol, size, value, threshold):
-                whale = WhaleOrder(
-                    symbol=symbol,
-                    side="buy",
-                    size=size,
-                    price=price,
-                    timestamp=datetime.now(),
-                    impact_score=self._calculate_impact_score(value, "buy"),
-                    confidence=self._calculate_whale_confidence(size, value, bids),
-                    exchange="current",
-                    order_type="limit"
-                )
-                whale_orders.append(whale)
-        
-        # Analyze asks
-        for ask in asks[:self.order_book_depth]:
-            price, size = float(ask[0]), float(ask[1])
-            value = price * size
+        by_size = "BTC" in symbol or "ETH" in symbol
+        depth = self.order_book_depth
+        now = datetime.now()
+        
+        for side, prices, sizes in (("buy", bid_prices, bid_sizes), ("sell", ask_prices, ask_sizes)):
+            prices, sizes = prices[:depth], sizes[:depth]
+            if not len(sizes):
+                continue
+            values = prices * sizes
+            (indices,) = np.nonzero((sizes if by_size else values) >= threshold)
+            if not len(indices):
+                continue
             
-            if self._is_whale_order(symbol, size, value, threshold):
-                whale = WhaleOrder(
+            # Only matching levels become objects
+            confidence = self._calculate_whale_confidence(sizes[indices], sizes[:20].mean())
+            impact = self._calculate_impact_score(values[indices], side)
+            for price, size, impact_score, whale_confidence in zip(
+                prices[indices].tolist(), sizes[indices].tolist(), impact.tolist(), confidence.tolist()
+            ):
+                whale_orders.append(WhaleOrder(
                     symbol=symbol,
-                    side="sell",
+                    side=side,
                     size=size,
                     price=price,
-                    timestamp=datetime.now(),
-                    impact_score=self._calculate_impact_score(value, "sell"),
-                    confidence=self._calculate_whale_confidence(size, value, asks),
+                    timestamp=now,
+                    impact_score=impact_score,
+                    confidence=whale_confidence,
                     exchange="current",
                     order_type="limit"
-                )
-                whale_orders.append(whale)
+                ))
         
         return whale_orders
     
-    def _is_whale_order(self, symbol: str, size: float, value: float, threshold: float) -> bool:
-        """Check if order qualifies as whale order."""
-        if "BTC" in symbol:
-            return size >= threshold
-        elif "ETH" in symbol:
-            return size >= threshold
-        else:
-            return value >= threshold
-    
-    def _calculate_impact_score(self, value: float, side: str) -> float:
-        """Calculate potential market impact score (0-100)."""
+    def _calculate_impact_score(self, values: np.ndarray, side: str) -> np.ndarray:
+        """Calculate potential market impact score (0-100) per order value."""
         # Base impact on order value
-        if value < 100000:
-            base_score = 20
-        elif value < 500000:
-            base_score = 40
-        elif value < 1000000:
-            base_score = 60
-        elif value < 5000000:
-            base_score = 80
-        else:
-            base_score = 100
-            
+        base_score = _IMPACT_BASE_SCORES[np.searchsorted(_IMPACT_VALUE_BINS, values, side="right")]
+        
         # Adjust for side (sells typically have more impact)
         if side == "sell":
-            base_score *= 1.2
+            base_score = base_score * 1.2
             
-        return min(100, base_score)
+        return np.minimum(100.0, base_score)
     
-    def _calculate_whale_confidence(self, size: float, value: float, orders: List) -> float:
-        """Calculate confidence that this is a real whale order."""
+    def _calculate_whale_confidence(self, sizes: np.ndarray, avg_size: float) -> np.ndarray:
+        """Calculate confidence that these are real whale orders."""
         # Factors: size relative to other orders, round numbers, positioning
         
         # Check if size is significantly larger than average
-        avg_size = np.mean([float(order[1]) for order in orders[:20]])
-        size_factor = min(1.0, size / (avg_size * 10))
+        size_factor = np.minimum(1.0, sizes / (avg_size * 10)) if avg_size > 0 else np.ones_like(sizes)
         
         # Check for round numbers (often real whales)
-        round_factor = 1.0 if size % 10 == 0 or size % 100 == 0 else 0.8
+        round_factor = np.where(sizes % 10 == 0, 1.0, 0.8)
         
         # Check positioning (real whales often not at exact market)
         position_factor = 0.9  # Can be refined based on distance from market
         
-        confidence = (size_factor * 0.5 + round_factor * 0.3 + position_factor * 0.2)
-        return confidence
+        return size_factor * 0.5 + round_factor * 0.3 + position_factor * 0.2
     
-    def _calculate_flow_metrics(self, bids: List, asks: List) -> OrderFlowMetrics:
+    def _calculate_flow_metrics(self, bid_prices: np.ndarray, bid_sizes: np.ndarray,
+                                ask_prices: np.ndarray, ask_sizes: np.ndarray) -> OrderFlowMetrics:
         """Calculate order flow metrics."""
+        depth = self.order_book_depth
+        
         # Calculate volumes
-        buy_volume = sum(float(bid[0]) * float(bid[1]) for bid in bids[:self.order_book_depth])
-        sell_volume = sum(float(ask[0]) * float(ask[1]) for ask in asks[:self.order_book_depth])
+        buy_volume = float(np.dot(bid_prices[:depth], bid_sizes[:depth]))
+        sell_volume = float(np.dot(ask_prices[:depth], ask_sizes[:depth]))
         
         # Count orders
-        buy_count = len(bids[:self.order_book_depth])
-        sell_count = len(asks[:self.order_book_depth])
+        buy_count = min(depth, len(bid_sizes))
+        sell_count = min(depth, len(ask_sizes))
         
         # Average sizes
         avg_buy_size = buy_volume / buy_count if buy_count > 0 else 0
@@ -221,9 +268,10 @@ class SmartOrderFlowAnalyzer:
         imbalance_ratio = buy_volume / sell_volume if sell_volume > 0 else 2.0
         
         # Large order ratio (orders > 5x average)
-        large_buy_orders = sum(1 for bid in bids if float(bid[1]) > avg_buy_size * 5)
-        large_sell_orders = sum(1 for ask in asks if float(ask[1]) > avg_sell_size * 5)
-        large_order_ratio = (large_buy_orders + large_sell_orders) / (buy_count + sell_count)
+        large_buy_orders = int(np.count_nonzero(bid_sizes > avg_buy_size * 5))
+        large_sell_orders = int(np.count_nonzero(ask_sizes > avg_sell_size * 5))
+        total_count = buy_count + sell_count
+        large_order_ratio = (large_buy_orders + large_sell_orders) / total_count if total_count else 0.0
         
         # Momentum score
         momentum_score = ((buy_volume - sell_volume) / total_volume * 100) if total_volume > 0 else 0
@@ -240,10 +288,8 @@ class SmartOrderFlowAnalyzer:
             momentum_score=momentum_score
         )
     
-    def _detect_hidden_orders(self, symbol: str, order_book: Dict) -> List[Dict]:
+    def _detect_hidden_orders(self, symbol: str, bid_prices: np.ndarray, bid_sizes: np.ndarray) -> List[Dict]:
         """Detect potential hidden/iceberg orders."""
-        hidden_orders = []
-        
         # Look for patterns indicating hidden orders:
         # 1. Consistent refills at same price level
         # 2. Orders that seem to absorb market orders without moving
@@ -252,33 +298,29 @@ class SmartOrderFlowAnalyzer:
         # This is a simplified detection - real implementation would track
         # order book changes over time
         
-        bids = order_book.get('bids', [])
-        asks = order_book.get('asks', [])
-        
         # Check for suspiciously consistent order sizes (potential icebergs)
-        for i in range(min(10, len(bids)-1)):
-            if abs(float(bids[i][1]) - float(bids[i+1][1])) < 0.01:
-                hidden_orders.append({
-                    "type": "potential_iceberg",
-                    "side": "buy",
-                    "price": float(bids[i][0]),
-                    "visible_size": float(bids[i][1]),
-                    "confidence": 0.6
-                })
-        
-        return hidden_orders
+        sizes = bid_sizes[:11]
+        (indices,) = np.nonzero(np.abs(np.diff(sizes)) < 0.01)
+        return [
+            {
+                "type": "potential_iceberg",
+                "side": "buy",
+                "price": price,
+                "visible_size": size,
+                "confidence": 0.6
+            }
+            for price, size in zip(bid_prices[indices].tolist(), sizes[indices].tolist())
+        ]
     
-    def _analyze_market_maker_activity(self, symbol: str, order_book: Dict) -> Dict:
+    def _analyze_market_maker_activity(self, symbol: str, bid_prices: np.ndarray,
+                                       ask_prices: np.ndarray) -> Dict:
         """Analyze market maker activity patterns."""
-        bids = order_book.get('bids', [])
-        asks = order_book.get('asks', [])
-        
-        if not bids or not asks:
+        if not len(bid_prices) or not len(ask_prices):
             return {}
         
         # Calculate spread
-        best_bid = float(bids[0][0])
-        best_ask = float(asks[0][0])
+        best_bid = float(bid_prices[0])
+        best_ask = float(ask_prices[0])
         spread = best_ask - best_bid
         spread_percentage = (spread / best_bid) * 100
         
@@ -288,20 +330,12 @@ class SmartOrderFlowAnalyzer:
         # 3. Quick order replacements
         
         # Check for regular price intervals (market maker grids)
-        bid_intervals = []
-        ask_intervals = []
-        
-        for i in range(min(5, len(bids)-1)):
-            interval = float(bids[i][0]) - float(bids[i+1][0])
-            bid_intervals.append(interval)
-            
-        for i in range(min(5, len(asks)-1)):
-            interval = float(asks[i+1][0]) - float(asks[i][0])
-            ask_intervals.append(interval)
+        bid_intervals = -np.diff(bid_prices[:6])
+        ask_intervals = np.diff(ask_prices[:6])
         
         # Regular intervals suggest market maker
-        bid_regularity = np.std(bid_intervals) if bid_intervals else float('inf')
-        ask_regularity = np.std(ask_intervals) if ask_intervals else float('inf')
+        bid_regularity = float(bid_intervals.std()) if len(bid_intervals) else float('inf')
+        ask_regularity = float(ask_intervals.std()) if len(ask_intervals) else float('inf')
         
         is_market_maker_active = (
             spread_percentage < 0.1 and  # Tight spread
@@ -318,6 +352,48 @@ class SmartOrderFlowAnalyzer:
             "confidence": 0.8 if is_market_maker_active else 0.2
         }
     
+    def _detect_walls(self, prices: np.ndarray, sizes: np.ndarray, side: str) -> List[Dict]:
+        """Levels much larger than the typical level on their side (support/resistance walls)."""
+        prices, sizes = prices[:self.order_book_depth], sizes[:self.order_book_depth]
+        if len(sizes) < 3:
+            return []
+        middle = len(sizes) // 2
+        partitioned = np.partition(sizes, (middle - 1, middle))
+        median = partitioned[middle] if len(sizes) % 2 else (partitioned[middle - 1] + partitioned[middle]) / 2
+        (indices,) = np.nonzero(sizes >= median * self.wall_multiplier)
+        best = prices[0]
+        distance_pct = np.abs(prices[indices] - best) / best * 100
+        return [
+            {
+                "side": side,
+                "price": price,
+                "size": size,
+                "notional": price * size,
+                "distance_pct": distance,
+            }
+            for price, size, distance in zip(prices[indices].tolist(), sizes[indices].tolist(), distance_pct.tolist())
+        ]
+    
+    def _calculate_book_impact(self, bid_prices: np.ndarray, bid_sizes: np.ndarray,
+                               ask_prices: np.ndarray, ask_sizes: np.ndarray) -> Dict:
+        """
+        Price move (%) from the touch needed to sweep each of ``impact_notionals``.
+        
+        NaN where the visible book is too thin for that notional.
+        """
+        impact = {"notionals": self.impact_notionals.tolist()}
+        for side, prices, sizes in (("buy", ask_prices, ask_sizes), ("sell", bid_prices, bid_sizes)):
+            if not len(prices):
+                impact[side] = [float('nan')] * len(self.impact_notionals)
+                continue
+            cumulative = np.cumsum(prices * sizes)
+            indices = np.searchsorted(cumulative, self.impact_notionals, side="left")
+            inside = indices < len(prices)
+            reached = prices[np.minimum(indices, len(prices) - 1)]
+            moves = np.abs(reached - prices[0]) / prices[0] * 100
+            impact[side] = np.where(inside, moves, np.nan).tolist()
+        return impact
+    
     def _predict_price_impact(self, whale_orders: List[WhaleOrder], 
                             flow_metrics: OrderFlowMetrics) -> Dict:
         """Predict price impact of detected whale orders."""
@@ -438,13 +514,21 @@ class SmartOrderFlowAnalyzer:
             "whale_trades": large_trades
         }
     
+    def _record_alerts(self, whale_orders: List[WhaleOrder]):
+        """Append to the ring buffer and expire alerts older than the TTL."""
+        self.whale_alerts.extend(whale_orders)
+        self.clear_old_alerts(seconds=self.whale_alert_ttl)
+    
     def get_whale_alerts(self, symbol: Optional[str] = None) -> List[WhaleOrder]:
         """Get recent whale alerts."""
+        self.clear_old_alerts(seconds=self.whale_alert_ttl)
         if symbol:
             return [w for w in self.whale_alerts if w.symbol == symbol]
-        return self.whale_alerts
+        return list(self.whale_alerts)
     
-    def clear_old_alerts(self, minutes: int = 60):
-        """Clear whale alerts older than specified minutes."""
-        cutoff_time = datetime.now() - timedelta(minutes=minutes)
-        self.whale_alerts = [w for w in self.whale_alerts if w.timestamp > cutoff_time]
+    def clear_old_alerts(self, minutes: int = 60, seconds: Optional[float] = None):
+        """Clear whale alerts older than specified minutes (or seconds)."""
+        cutoff_time = datetime.now() - timedelta(seconds=seconds if seconds is not None else minutes * 60)
+        # Alerts are appended in time order, so expired ones are at the left
+        while self.whale_alerts and self.whale_alerts[0].timestamp <= cutoff_time:
+            self.whale_alerts.popleft()
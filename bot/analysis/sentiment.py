@@ -8,10 +8,11 @@ import numpy as np
 from dataclasses import dataclass
 import re
 import json
+import hashlib
 import logging
-from textblob import TextBlob
-import openai
-from collections import deque
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +44,225 @@ class SocialMetrics:
     fud_index: float   # 0-100
 
 
+def score_text(text: str, bullish_keywords: Tuple[str, ...],
+               bearish_keywords: Tuple[str, ...]) -> float:
+    """Score one text using TextBlob and keyword matching (-100 to 100)."""
+    # Clean text
+    text = text.lower()
+    
+    # TextBlob sentiment (imported here: scoring runs in worker processes and
+    # TextBlob/NLTK are slow to import for processes that never score)
+    from textblob import TextBlob
+    blob = TextBlob(text)
+    base_sentiment = blob.sentiment.polarity  # -1 to 1
+    
+    # Keyword analysis
+    bullish_count = sum(1 for keyword in bullish_keywords if keyword in text)
+    bearish_count = sum(1 for keyword in bearish_keywords if keyword in text)
+    
+    keyword_sentiment = (bullish_count - bearish_count) * 0.1
+    
+    # Combine sentiments
+    combined_sentiment = (base_sentiment + keyword_sentiment) * 50  # Scale to -100 to 100
+    
+    return max(-100, min(100, combined_sentiment))
+
+
+def score_text_batch(texts: List[str], bullish_keywords: Tuple[str, ...],
+                     bearish_keywords: Tuple[str, ...]) -> List[float]:
+    """Worker entry point: score a batch of texts in one process round trip."""
+    return [score_text(text, bullish_keywords, bearish_keywords) for text in texts]
+
+
+class SentimentScorer:
+    """
+    Shared text scoring service with a content-hash LRU cache.
+
+    Texts are deduplicated by hash, so a headline mentioned for several symbols
+    or seen again on the next refresh is scored once. Cache misses are scored
+    in batches in a process pool to keep TextBlob off the event loop; scoring
+    already in flight is shared between concurrent callers.
+    """
+    
+    def __init__(self, bullish_keywords: List[str], bearish_keywords: List[str],
+                 cache_size: int = 50000, batch_size: int = 64, max_workers: int = 2):
+        self.bullish_keywords = tuple(bullish_keywords)
+        self.bearish_keywords = tuple(bearish_keywords)
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {'hits': 0, 'misses': 0, 'batches': 0}
+        _SCORERS.add(self)
+    
+    @staticmethod
+    def text_key(text: str) -> str:
+        """Content hash used for deduplication."""
+        normalized = ' '.join(text.lower().split())
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def score_cached(self, text: str) -> float:
+        """Synchronous scoring through the cache (for non-async callers)."""
+        key = self.text_key(text)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        self.stats['misses'] += 1
+        score = score_text(text, self.bullish_keywords, self.bearish_keywords)
+        self._put(key, score)
+        return score
+    
+    async def score_many(self, texts: List[str]) -> List[float]:
+        """Score texts, computing only those not already cached or in flight."""
+        keys = [self.text_key(text) for text in texts]
+        
+        # Each text is counted once: a hit here, or a miss when its batch is scored
+        resolved: Dict[str, float] = {}
+        to_score: Dict[str, str] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for key, text in zip(keys, texts):
+            if key in resolved or key in to_score or key in waiting:
+                continue
+            cached = self._get(key)
+            if cached is not None:
+                resolved[key] = cached
+                continue
+            if key in self._pending:
+                waiting[key] = self._pending[key]
+            else:
+                to_score[key] = text
+        
+        if to_score:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in to_score}
+            self._pending.update(futures)
+            waiting.update(futures)
+            try:
+                await self._score_missing(list(to_score.items()))
+            finally:
+                for key, future in futures.items():
+                    self._pending.pop(key, None)
+                    if not future.done():
+                        score = self._cache.get(key)
+                        if score is None:
+                            future.set_exception(RuntimeError("sentiment scoring failed"))
+                        else:
+                            future.set_result(score)
+        
+        if waiting:
+            for key, result in zip(waiting, await asyncio.gather(*waiting.values(), return_exceptions=True)):
+                if not isinstance(result, BaseException):
+                    resolved[key] = result
+        
+        scores = []
+        for key, text in zip(keys, texts):
+            score = resolved.get(key)
+            if score is None:
+                # Scoring failed - fall back inline
+                self.stats['misses'] += 1
+                score = score_text(text, self.bullish_keywords, self.bearish_keywords)
+                self._put(key, score)
+                resolved[key] = score
+            scores.append(score)
+        return scores
+    
+    async def _score_missing(self, items: List[Tuple[str, str]]):
+        loop = asyncio.get_running_loop()
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        executor = self._get_executor()
+        
+        async def run_batch(batch: List[Tuple[str, str]]):
+            texts = [text for _, text in batch]
+            try:
+                scores = await loop.run_in_executor(
+                    executor, score_text_batch, texts, self.bullish_keywords, self.bearish_keywords
+                )
+            except Exception as e:
+                logger.warning(f"Sentiment worker failed, scoring inline: {e}")
+                scores = score_text_batch(texts, self.bullish_keywords, self.bearish_keywords)
+            self.stats['batches'] += 1
+            self.stats['misses'] += len(batch)
+            for (key, _), score in zip(batch, scores):
+                self._put(key, score)
+                future = self._pending.get(key)
+                if future is not None and not future.done():
+                    future.set_result(score)
+        
+        await asyncio.gather(*(run_batch(batch) for batch in batches))
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._executor is None and self.max_workers > 0:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            except (OSError, NotImplementedError) as e:
+                # Sandboxed environments may not allow subprocesses;
+                # None makes run_in_executor use the default thread pool.
+                logger.warning(f"Process pool unavailable for sentiment scoring: {e}")
+                self.max_workers = 0
+        return self._executor
+    
+    def _get(self, key: str) -> Optional[float]:
+        score = self._cache.get(key)
+        if score is not None:
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+        return score
+    
+    def _put(self, key: str, score: float):
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def close(self):
+        """Shut down the worker pool (recreated if the scorer is used again)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Live scorers, so a stopping bot can release their worker pools
+_SCORERS: "weakref.WeakSet[SentimentScorer]" = weakref.WeakSet()
+
+
+def close_sentiment_scorers():
+    """Shut down the worker pools of all scorers in this process."""
+    for scorer in list(_SCORERS):
+        scorer.close()
+
+
+class SentimentHistory:
+    """Fixed-size ring buffer of (timestamp, sentiment, mentions) for one symbol."""
+    
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._sentiments = np.zeros(capacity, dtype=np.float64)
+        self._mentions = np.zeros(capacity, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, timestamp: datetime, sentiment: float, mentions: int):
+        self._timestamps[self._head] = timestamp.timestamp()
+        self._sentiments[self._head] = sentiment
+        self._mentions[self._head] = mentions
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+    
+    def since(self, cutoff: datetime) -> Tuple[np.ndarray, np.ndarray]:
+        """Sentiments and mentions newer than ``cutoff``, oldest first."""
+        order = (np.arange(self._size) + self._head - self._size) % self.capacity
+        mask = self._timestamps[order] > cutoff.timestamp()
+        selected = order[mask]
+        return self._sentiments[selected], self._mentions[selected]
+
+
 class AISentimentAnalyzer:
     """
     AI-powered Sentiment Analysis Engine.
@@ -75,8 +295,18 @@ class AISentimentAnalyzer:
             'overvalued', 'bubble', 'correction', 'capitulation', 'fud'
         ]
         
+        # Text scoring (shared cache + worker pool)
+        self.scorer = SentimentScorer(
+            self.bullish_keywords,
+            self.bearish_keywords,
+            cache_size=self.config.get('sentiment_cache_size', 50000),
+            batch_size=self.config.get('sentiment_batch_size', 64),
+            max_workers=self.config.get('sentiment_workers', 2)
+        )
+        
         # Storage
-        self.sentiment_history: Dict[str, deque] = {}
+        self.history_size = self.config.get('sentiment_history_size', 1000)
+        self.sentiment_history: Dict[str, SentimentHistory] = {}
         self.alerts_history: List[SentimentSignal] = []
         self.influencer_list = self._load_influencers()
         
@@ -199,11 +429,9 @@ class AISentimentAnalyzer:
             influencer_sentiments = []
             total_engagement = 0
             
-            for tweet in tweets:
-                # Basic sentiment analysis
-                text = tweet.get('text', '')
-                sentiment = self._analyze_text_sentiment(text)
-                
+            tweet_scores = await self.scorer.score_many([tweet.get('text', '') for tweet in tweets])
+            
+            for tweet, sentiment in zip(tweets, tweet_scores):
                 # Check if from influencer
                 author_id = tweet.get('author_id', '')
                 is_influencer = author_id in self.influencer_list
@@ -251,8 +479,8 @@ class AISentimentAnalyzer:
             # Subreddits to monitor
             subreddits = ['cryptocurrency', 'cryptomarkets', 'wallstreetbets', 'satoshistreetbets']
             
-            sentiments = []
-            post_count = 0
+            texts = []
+            post_scores = []
             
             for subreddit in subreddits:
                 url = f"https://www.reddit.com/r/{subreddit}/search.json"
@@ -277,14 +505,16 @@ class AISentimentAnalyzer:
                             selftext = post_data.get('selftext', '')
                             score = post_data.get('score', 0)
                             
-                            # Analyze sentiment
-                            text = f"{title} {selftext}"
-                            sentiment = self._analyze_text_sentiment(text)
-                            
-                            # Weight by score
-                            weighted_sentiment = sentiment * (1 + np.log1p(abs(score)) / 5)
-                            sentiments.append(weighted_sentiment)
-                            post_count += 1
+                            texts.append(f"{title} {selftext}")
+                            post_scores.append(score)
+            
+            # Analyze sentiment (batched, cached)
+            sentiments = []
+            for sentiment, score in zip(await self.scorer.score_many(texts), post_scores):
+                # Weight by score
+                weighted_sentiment = sentiment * (1 + np.log1p(abs(score)) / 5)
+                sentiments.append(weighted_sentiment)
+            post_count = len(sentiments)
             
             avg_sentiment = np.mean(sentiments) if sentiments else 0
             
@@ -321,14 +551,11 @@ class AISentimentAnalyzer:
                     data = await response.json()
                     articles = data.get('articles', [])
             
-            sentiments = []
-            for article in articles:
-                title = article.get('title', '')
-                description = article.get('description', '')
-                
-                text = f"{title} {description}"
-                sentiment = self._analyze_text_sentiment(text)
-                sentiments.append(sentiment)
+            texts = [
+                f"{article.get('title', '')} {article.get('description', '')}"
+                for article in articles
+            ]
+            sentiments = await self.scorer.score_many(texts)
             
             avg_sentiment = np.mean(sentiments) if sentiments else 0
             
@@ -377,23 +604,7 @@ class AISentimentAnalyzer:
     
     def _analyze_text_sentiment(self, text: str) -> float:
         """Analyze sentiment of text using TextBlob and keyword matching."""
-        # Clean text
-        text = text.lower()
-        
-        # TextBlob sentiment
-        blob = TextBlob(text)
-        base_sentiment = blob.sentiment.polarity  # -1 to 1
-        
-        # Keyword analysis
-        bullish_count = sum(1 for keyword in self.bullish_keywords if keyword in text)
-        bearish_count = sum(1 for keyword in self.bearish_keywords if keyword in text)
-        
-        keyword_sentiment = (bullish_count - bearish_count) * 0.1
-        
-        # Combine sentiments
-        combined_sentiment = (base_sentiment + keyword_sentiment) * 50  # Scale to -100 to 100
-        
-        return max(-100, min(100, combined_sentiment))
+        return self.scorer.score_cached(text)
     
     def _aggregate_sentiment(self, sources: Dict) -> Dict:
         """Aggregate sentiment from all sources."""
@@ -568,6 +779,7 @@ class AISentimentAnalyzer:
             """
             
             # Use OpenAI API
+            import openai
             response = await openai.ChatCompletion.acreate(
                 model="gpt-5",
                 messages=[
@@ -608,16 +820,26 @@ class AISentimentAnalyzer:
         top_keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
         return [word for word, _ in top_keywords]
     
+    def close(self):
+        """Release the scoring worker pool."""
+        self.scorer.close()
+    
     def store_sentiment_history(self, symbol: str, sentiment_data: Dict):
         """Store sentiment history for trend analysis."""
         if symbol not in self.sentiment_history:
-            self.sentiment_history[symbol] = deque(maxlen=1000)
+            self.sentiment_history[symbol] = SentimentHistory(self.history_size)
+        
+        social_metrics = sentiment_data.get('social_metrics', {})
+        if isinstance(social_metrics, SocialMetrics):
+            mentions = social_metrics.mentions_count
+        else:
+            mentions = social_metrics.get('mentions_count', 0)
             
-        self.sentiment_history[symbol].append({
-            'timestamp': datetime.now(),
-            'sentiment': sentiment_data.get('overall_sentiment', {}).get('score', 0),
-            'mentions': sentiment_data.get('social_metrics', {}).get('mentions_count', 0)
-        })
+        self.sentiment_history[symbol].append(
+            datetime.now(),
+            sentiment_data.get('overall_sentiment', {}).get('score', 0),
+            mentions
+        )
     
     def get_sentiment_trend(self, symbol: str, hours: int = 24) -> Dict:
         """Get sentiment trend over specified hours."""
@@ -625,16 +847,10 @@ class AISentimentAnalyzer:
             return {}
             
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        recent_data = [
-            d for d in self.sentiment_history[symbol]
-            if d['timestamp'] > cutoff_time
-        ]
+        sentiments, mentions = self.sentiment_history[symbol].since(cutoff_time)
         
-        if not recent_data:
+        if len(sentiments) == 0:
             return {}
-            
-        sentiments = [d['sentiment'] for d in recent_data]
-        mentions = [d['mentions'] for d in recent_data]
         
         return {
             "trend_direction": "up" if sentiments[-1] > sentiments[0] else "down",
@@ -642,5 +858,5 @@ class AISentimentAnalyzer:
             "avg_sentiment": np.mean(sentiments),
             "sentiment_volatility": np.std(sentiments),
             "mention_trend": "increasing" if mentions[-1] > mentions[0] else "decreasing",
-            "data_points": len(recent_data)
+            "data_points": len(sentiments)
         }
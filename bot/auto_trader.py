@@ -14,8 +14,9 @@ import asyncio
 import os
 import signal
 import sys
+import time
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 from pathlib import Path
 
 # Load environment variables FIRST before any other imports
@@ -34,10 +35,12 @@ from ccxt import AuthenticationError
 
 from bot.analysis.technical_analysis import TechnicalAnalyzer
 from bot.services.risk_manager import UserRiskSettings  # NEW: Import UserRiskSettings
+from bot.services.signal_fanout import price_levels
 
 # NEW v2.0: Import enhanced services for logic gap fixes
 try:
     from bot.services.market_intelligence import get_market_intelligence, MarketRegime
+    from bot.services.market_context import get_market_context
     from bot.services.rate_limiter import get_rate_limiter, RateLimitConfig
     from bot.services.signal_deduplicator import get_signal_deduplicator
     ENHANCED_SERVICES_AVAILABLE = True
@@ -80,7 +83,7 @@ class AutomatedTradingBot:
     def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None, 
                  exchange_name: Optional[str] = None, user_id: Optional[str] = None,
                  test_mode: bool = False, broker = None, exchange_adapter = None,
-                 futures: bool = False, margin: bool = False):
+                 futures: bool = False, margin: bool = False, bootstrap=None):
         load_dotenv()
         self.config = load_config()
         self.running = False
@@ -92,6 +95,9 @@ class AutomatedTradingBot:
         self.injected_exchange = exchange_adapter
         self.futures = futures
         self.margin = margin  # NEW: Margin trading mode
+        # Keys, settings and shared markets pre-loaded by FleetBootstrap
+        # (multi-user launcher); None = load everything from the database
+        self.bootstrap = bootstrap
         
         # Trading settings
         self.exchange_name = exchange_name or os.getenv("EXCHANGE_NAME", "binance")
@@ -122,6 +128,7 @@ class AutomatedTradingBot:
         
         # NEW v2.0: Enhanced services for logic gap fixes
         self.market_intelligence = None  # Liquidity check, sentiment, volatility-adjusted SL/TP
+        self.market_context = None       # Background refresh of sentiment, kill switch, calendar
         self.rate_limiter = None         # Prevent excessive trading
         self.signal_deduplicator = None  # Better signal deduplication (prefer newest)
         
@@ -141,6 +148,35 @@ class AutomatedTradingBot:
         self.component_rate_limiter = None  # Per-component rate limiting
         self.retry_handler = None           # Retry logic for critical operations
         
+        # Warm restart: local snapshot of positions, markets, caches and
+        # rate-limit windows (bot.core.state_snapshot)
+        self.state_snapshot = None          # Snapshot read at startup (None = cold start)
+        self._snapshot_store = None
+        # Market metadata is the same for every bot on an exchange: it has its own
+        # file, rewritten only when the loaded markets change
+        self.markets_snapshot = None
+        self._markets_snapshot_store = None
+        self._markets_snapshot_key = None   # Markets last handed to the store
+        self._snapshot_task = None
+        self._reconcile_task = None
+        self.snapshot_interval = float(os.getenv("STATE_SNAPSHOT_INTERVAL", "60"))  # 0 = disabled
+        
+        # Signal-driven cycles: a new trading_signals row wakes the bot instead
+        # of waiting out the adaptive interval (bot.realtime.signal_feed)
+        self.signal_feed = None
+        self._signal_wakeup = asyncio.Event()
+        self._last_signal_notice = None
+        self._last_cycle_started = 0.0
+        self.signal_wake_min_gap = float(os.getenv("SIGNAL_WAKE_MIN_GAP", "10"))  # Seconds between signal-driven cycles
+        # Global signals are executed for all bots at once (bot.services.signal_fanout);
+        # cycle_lock keeps a fan-out order and this bot's own cycle from interleaving
+        self.signal_fanout = None
+        self.cycle_lock = asyncio.Lock()
+        # Scanner mode: one fetch_tickers() per interval for the whole exchange,
+        # strategies screen it (bot.services.market_scanner)
+        self.market_scanner = None
+        self.candle_store = None
+        
     async def initialize(self):
         """Initialize all components"""
         logger.info("Initializing Automated Trading Bot...")
@@ -156,6 +192,8 @@ class AutomatedTradingBot:
             await self._load_api_keys_from_db()
             logger.info(f"After loading: api_key={'SET' if self.api_key else 'NOT SET'}, exchange={self.exchange_name}")
         
+        self._load_state_snapshot()
+        
         # Initialize exchange connection
         if self.injected_exchange:
             self.exchange = self.injected_exchange
@@ -173,7 +211,22 @@ class AutomatedTradingBot:
                 futures=self.futures,
                 margin=self.margin  # NEW: Pass margin mode
             )
-        
+            self._use_shared_markets(self.exchange)
+            if self.bootstrap is None or self.bootstrap.markets is None:
+                self._restore_snapshot_section("markets", lambda markets: self.exchange.use_shared_markets(
+                    markets["markets"], markets.get("currencies"), markets.get("time_difference")
+                ), snapshot=self.markets_snapshot)
+            if self.user_id:
+                # Persistent per-user ledger: entry prices survive restarts and
+                # sync resumes from the stored cursor
+                from bot.exchange_adapters.trade_ledger import TradeLedger
+                self.exchange.attach_trade_ledger(TradeLedger(
+                    self.exchange.exchange,
+                    user_id=self.user_id,
+                    exchange_name=f"{self.exchange_name}-testnet" if self.testnet else self.exchange_name,
+                    persist=True
+                ))
+
         # Initialize Position Monitor for background SL/TP monitoring
         # with NEW features: Auto SL/TP, Partial TP, Time Exit
         if self.exchange:
@@ -186,7 +239,17 @@ class AutomatedTradingBot:
                 user_tp_percent = None
                 
                 # Try to get actual user settings from database
-                if self.db_manager and self.user_id:
+                if self.bootstrap is not None:
+                    if self.bootstrap.trading_settings:
+                        # (risk_level, max_position_size, max_daily_loss, stop_loss_percentage, take_profit_percentage)
+                        stop_loss_percentage, take_profit_percentage = self.bootstrap.trading_settings[3:5]
+                        if stop_loss_percentage:
+                            user_sl_percent = float(stop_loss_percentage)
+                            logger.info(f"📋 Using user's custom SL: {user_sl_percent}%")
+                        if take_profit_percentage:
+                            user_tp_percent = float(take_profit_percentage)
+                            logger.info(f"📋 Using user's custom TP: {user_tp_percent}%")
+                elif self.db_manager and self.user_id:
                     try:
                         with self.db_manager as db:
                             trading_settings = db.get_trading_settings(self.user_id)
@@ -210,6 +273,24 @@ class AutomatedTradingBot:
                 
                 logger.info(f"📊 Position Monitor SL/TP: SL={user_settings['sl_percent']:.1f}% | TP={user_settings['tp_percent']:.1f}%")
                 
+                # Optional private WebSocket stream: fills update monitored positions
+                # immediately and REST reconciliation becomes a slow safety net
+                user_stream = None
+                if os.getenv("USER_DATA_STREAM", "false").lower() == "true" and hasattr(self.exchange, 'is_own_fill'):
+                    from bot.realtime.user_data_stream import UserDataStream
+                    user_stream = UserDataStream.from_adapter(self.exchange, testnet=self.testnet)
+                
+                # Optional exchange-native SL/TP: exits fire on the exchange even if
+                # the monitor loop lags; the monitor keeps them in step with trailing
+                protective_orders = None
+                if os.getenv("EXCHANGE_PROTECTIVE_ORDERS", "false").lower() == "true" and hasattr(self.exchange, 'place_stop_order'):
+                    from bot.services.protective_orders import ProtectiveOrderManager
+                    protective_orders = ProtectiveOrderManager(
+                        self.exchange,
+                        min_step_pct=float(os.getenv("PROTECTIVE_ORDER_MIN_STEP_PCT", ProtectiveOrderManager.MIN_STEP_PCT)),
+                        min_interval=float(os.getenv("PROTECTIVE_ORDER_MIN_INTERVAL", ProtectiveOrderManager.MIN_INTERVAL))
+                    )
+                
                 self.position_monitor = PositionMonitorService(
                     exchange_adapter=self.exchange,
                     check_interval=5.0,  # Check every 5 seconds
@@ -223,13 +304,23 @@ class AutomatedTradingBot:
                     enable_time_exit=True,     # NEW: Time-based exit enabled
                     enable_auto_sl_tp=True,    # NEW: Auto-set SL/TP for unprotected positions
                     user_settings=user_settings,
-                    default_user_id=self.user_id  # v4.3: Pass user_id for sync operations
+                    default_user_id=self.user_id,  # v4.3: Pass user_id for sync operations
+                    user_stream=user_stream,
+                    protective_orders=protective_orders
                 )
                 
                 # CRITICAL FIX: Set db_manager for reevaluation and liquidation logging
                 if self.db_manager:
                     self.position_monitor.set_db_manager(self.db_manager)
                 
+                # Warm restart: monitor snapshot positions from the first check
+                restored = self._restore_snapshot_section(
+                    "position_monitor",
+                    lambda state: self.position_monitor.restore_snapshot(
+                        state, taken_at=datetime.fromtimestamp(self.state_snapshot.created_at)
+                    )
+                ) or 0
+                
                 await self.position_monitor.start()
                 logger.info(
                     f"✅ Position Monitor started (5s interval) | "
@@ -237,18 +328,24 @@ class AutomatedTradingBot:
                 )
                 
                 # Sync existing positions from database and exchange
-                # This ensures positions from previous sessions are monitored
-                try:
-                    db_synced = await self.position_monitor.sync_from_database(self.db_manager)
-                    ex_synced = await self.position_monitor.sync_from_exchange(self.db_manager)
-                    if db_synced > 0 or ex_synced > 0:
-                        logger.info(f"✅ Restored position monitoring: {db_synced} from DB, {ex_synced} from exchange")
-                except Exception as sync_err:
-                    logger.warning(f"Position sync failed (will monitor new positions only): {sync_err}")
+                # This ensures positions from previous sessions are monitored.
+                # After a warm restart SL/TP protection is already active, so the
+                # reconciliation runs in the background instead of delaying startup.
+                if restored:
+                    self._reconcile_task = asyncio.create_task(self._reconcile_monitored_positions())
+                else:
+                    await self._reconcile_monitored_positions()
                     
             except Exception as e:
                 logger.warning(f"Position Monitor initialization failed: {e}")
         
+        # Local multi-timeframe candles shared by ATR, correlation and multi-TF checks
+        # (bot.realtime.candles): fetched once per timeframe, then kept current by the ticker stream
+        if os.getenv("CANDLE_STORE_ENABLED", "true").lower() == "true" and hasattr(self.exchange, 'candle_store'):
+            from bot.realtime.candles import get_candle_store
+            self.candle_store = get_candle_store(self._exchange_key())
+            self.exchange.candle_store = self.candle_store
+        
         # Try to initialize WebSocket for real-time data (optional enhancement)
         try:
             from bot.realtime.websocket_manager import WebSocketManager
@@ -260,6 +357,10 @@ class AutomatedTradingBot:
             )
             if await self.ws_manager.connect():
                 await self.ws_manager.subscribe_tickers(self.trade_symbols)
+                # Maintained L2 books: liquidity/slippage checks read them instead of REST
+                await self.ws_manager.subscribe_order_books(self.trade_symbols, depth=50)
+                if self.candle_store is not None:
+                    self.ws_manager.on_ticker(self.candle_store.on_market_tick)
                 logger.info("✅ WebSocket real-time data connected")
             else:
                 logger.warning("WebSocket connection failed, using REST polling fallback")
@@ -364,6 +465,7 @@ class AutomatedTradingBot:
                 default_leverage=10.0,  # Default 10x leverage - will be auto-adjusted if not available
                 user_settings=user_risk_settings  # NEW: User-specific settings
             )
+            self._restore_snapshot_section("atr_cache", self.risk_manager_service.restore_atr_cache)
             
             # Log with user settings info
             if user_risk_settings:
@@ -398,8 +500,20 @@ class AutomatedTradingBot:
             try:
                 # Market Intelligence - Liquidity check, sentiment, volatility SL/TP
                 self.market_intelligence = get_market_intelligence(self.exchange)
+                if self.ws_manager:
+                    self.market_intelligence.set_order_book_source(self.ws_manager)
                 logger.info("✅ Market Intelligence initialized (liquidity check, sentiment, dynamic SL/TP)")
                 
+                # Shared market context: sentiment, kill switch and economic calendar
+                # refreshed in the background; cycles read the last good values
+                self.market_context = get_market_context(self.market_intelligence)
+                await self.market_context.start()
+                
+                # Optional: flatten leveraged positions of all bots when the kill switch is raised
+                if os.getenv("KILL_SWITCH_FLATTEN", "false").lower() == "true":
+                    from bot.services.emergency_exit import get_emergency_exit_executor
+                    self.market_context.add_kill_switch_listener(get_emergency_exit_executor().on_kill_switch)
+                
                 # Rate Limiter - Prevent excessive trading
                 rate_config = RateLimitConfig(
                     max_signals_per_cycle=3,      # Max 3 signals per bot cycle
@@ -411,6 +525,10 @@ class AutomatedTradingBot:
                     pause_after_consecutive_losses=3  # Pause after 3 losses in a row
                 )
                 self.rate_limiter = get_rate_limiter(rate_config)
+                if self.user_id:
+                    self._restore_snapshot_section(
+                        "rate_limiter", lambda state: self.rate_limiter.restore_user_state(self.user_id, state)
+                    )
                 logger.info(
                     f"✅ Rate Limiter initialized: {rate_config.max_signals_per_cycle}/cycle, "
                     f"{rate_config.max_trades_per_hour}/hour, {rate_config.max_trades_per_day}/day"
@@ -460,6 +578,7 @@ class AutomatedTradingBot:
                     max_correlation_exposure=0.5,  # Max 50% in correlated assets
                     correlation_threshold=0.7      # Assets with >0.7 correlation
                 )
+                self._restore_snapshot_section("correlations", self.correlation_manager.restore_correlation_cache)
                 logger.info("✅ Correlation Manager initialized (exposure limiting)")
                 
                 # Market Regime Sizer - Dynamic position sizing
@@ -499,8 +618,9 @@ class AutomatedTradingBot:
                 # Removed incorrect db_session parameter
                 self.dca_manager = DCAManager(
                     exchange_adapter=self.exchange,
-                    user_id=self.user_id
+                    user_id=self.user_id,
                     # config=None uses DCAConfig.default()
+                    config=self.bootstrap.dca_config if self.bootstrap is not None else None
                 )
                 
                 # Load user's DCA settings
@@ -576,6 +696,28 @@ class AutomatedTradingBot:
         
         # Set symbols on trading engine
         self.trading_engine.set_symbols(self.trade_symbols)
+        
+        # Scanner mode: market data and strategy candidates from the whole exchange
+        if os.getenv("MARKET_SCANNER_ENABLED", "false").lower() == "true" and self.exchange is not None:
+            try:
+                from bot.services.market_scanner import get_market_scanner
+                scanner_key = self._exchange_key()
+                self.market_scanner = get_market_scanner(
+                    scanner_key, getattr(self.exchange, 'exchange', self.exchange),
+                    interval=float(os.getenv("MARKET_SCANNER_INTERVAL", "30"))
+                )
+                await self.market_scanner.start()
+                self.trading_engine.set_market_scanner(
+                    self.market_scanner,
+                    quote=os.getenv("MARKET_SCANNER_QUOTE", "USDT"),
+                    min_quote_volume=float(os.getenv("MARKET_SCANNER_MIN_VOLUME", "1000000")),
+                    max_candidates=int(os.getenv("MARKET_SCANNER_MAX_CANDIDATES", "20"))
+                )
+                self.exchange.market_scanner = self.market_scanner
+                logger.info(f"✅ Market scanner enabled ({scanner_key})")
+            except Exception as e:
+                logger.warning(f"Market scanner initialization failed: {e}")
+                self.market_scanner = None
             
         # Activate trading engine
         self.trading_engine.active = True
@@ -598,63 +740,73 @@ class AutomatedTradingBot:
                 f"Kelly: {'✅' if status['kelly_enabled'] else '❌'}"
             )
         
+        # Periodic warm-restart snapshot (a final one is written on shutdown)
+        if self._snapshot_store and self.snapshot_interval > 0:
+            self._snapshot_task = asyncio.create_task(self._state_snapshot_loop())
+        
     async def get_market_data(self) -> Dict:
         """
         Fetch live market data.
         Uses WebSocket cache if available, falls back to REST API.
         """
-        from bot.strategies import MarketData
         market_data = {}
         
         for symbol in self.trade_symbols:
             try:
-                # PRIORITY 1: Use WebSocket data if available (fastest, <100ms)
-                if self.ws_manager and self.ws_manager.is_connected():
-                    tick = self.ws_manager.get_ticker(symbol)
-                    if tick:
-                        market_data[symbol] = MarketData(
-                            symbol=symbol,
-                            current_price=tick.last_price,
-                            high_24h=tick.high_24h,
-                            low_24h=tick.low_24h,
-                            volume_24h=tick.volume_24h,
-                            change_24h_percent=tick.change_24h_percent,
-                            timestamp=tick.timestamp
-                        )
-                        continue
-                
-                # PRIORITY 2: REST API fallback
-                if hasattr(self.exchange, 'get_ticker_stats'):
-                    stats = await self.exchange.get_ticker_stats(symbol)
-                    if not stats:
-                        continue
-                        
-                    market_data[symbol] = MarketData(
-                        symbol=symbol,
-                        current_price=stats['last'],
-                        high_24h=stats['high'],
-                        low_24h=stats['low'],
-                        volume_24h=stats['volume'],
-                        change_24h_percent=stats['change_percent'],
-                        timestamp=datetime.now()
-                    )
-                else:
-                    # Fallback: use CCXT fetch_ticker
-                    ticker = await self.exchange.exchange.fetch_ticker(symbol)
-                    market_data[symbol] = MarketData(
-                        symbol=symbol,
-                        current_price=ticker['last'],
-                        high_24h=ticker.get('high', ticker['last'] * 1.02),
-                        low_24h=ticker.get('low', ticker['last'] * 0.98),
-                        volume_24h=ticker.get('quoteVolume', 0),
-                        change_24h_percent=ticker.get('percentage', 0),
-                        timestamp=datetime.now()
-                    )
+                data = await self.fetch_symbol_market_data(symbol)
+                if data is not None:
+                    market_data[symbol] = data
             except Exception as e:
                 logger.error(f"Failed to fetch market data for {symbol}: {e}")
                 
         return market_data
     
+    async def fetch_symbol_market_data(self, symbol: str):
+        """Market data for one symbol: WebSocket ticker if fresh, REST otherwise."""
+        from bot.strategies import MarketData
+        
+        # PRIORITY 1: Use WebSocket data if available (fastest, <100ms)
+        if self.ws_manager and self.ws_manager.is_connected():
+            tick = self.ws_manager.get_ticker(symbol)
+            if tick:
+                return MarketData(
+                    symbol=symbol,
+                    current_price=tick.last_price,
+                    high_24h=tick.high_24h,
+                    low_24h=tick.low_24h,
+                    volume_24h=tick.volume_24h,
+                    change_24h_percent=tick.change_24h_percent,
+                    timestamp=tick.timestamp
+                )
+        
+        # PRIORITY 2: REST API fallback
+        if hasattr(self.exchange, 'get_ticker_stats'):
+            stats = await self.exchange.get_ticker_stats(symbol)
+            if not stats:
+                return None
+                
+            return MarketData(
+                symbol=symbol,
+                current_price=stats['last'],
+                high_24h=stats['high'],
+                low_24h=stats['low'],
+                volume_24h=stats['volume'],
+                change_24h_percent=stats['change_percent'],
+                timestamp=datetime.now()
+            )
+        
+        # Fallback: use CCXT fetch_ticker
+        ticker = await self.exchange.exchange.fetch_ticker(symbol)
+        return MarketData(
+            symbol=symbol,
+            current_price=ticker['last'],
+            high_24h=ticker.get('high', ticker['last'] * 1.02),
+            low_24h=ticker.get('low', ticker['last'] * 0.98),
+            volume_24h=ticker.get('quoteVolume', 0),
+            change_24h_percent=ticker.get('percentage', 0),
+            timestamp=datetime.now()
+        )
+    
     async def check_risk_limits(self) -> bool:
         """
         Check if we're within risk limits.
@@ -673,10 +825,16 @@ class AutomatedTradingBot:
                 current_equity = getattr(account_info, 'total', 10000)
             
             # Ensure we have a valid equity value
-            if not current_equity or current_equity <= 0:
+            equity_known = bool(current_equity) and current_equity > 0
+            if not equity_known:
                 logger.warning("Could not determine account equity, using default")
                 current_equity = 10000  # Default for risk calculations
             
+            # Base for daily returns; closes the previous day in the rolling stats.
+            # Only a real balance - the default would skew every later return.
+            if equity_known and self.risk_manager_service and self.user_id:
+                self.risk_manager_service.record_equity(self.user_id, current_equity)
+            
             # Check circuit breakers (wrapped in try-except to handle division errors)
             try:
                 breakers = self.risk_manager.check_circuit_breakers(current_equity)
@@ -1088,6 +1246,12 @@ class AutomatedTradingBot:
             
             if actionable_signals:
                 db_signals = actionable_signals
+                # Global signals the fan-out already executed for this user
+                if self.signal_deduplicator and self.user_id:
+                    db_signals = [
+                        sig for sig in db_signals
+                        if not self.signal_deduplicator.was_executed(self.user_id, sig.get('signal_id'))
+                    ]
                 # Extract symbols from database signals
                 signal_symbols = list(set([sig['symbol'] for sig in db_signals]))
                 logger.info(f"✅ Found {len(db_signals)} signals for {len(signal_symbols)} symbols: {signal_symbols}")
@@ -1846,6 +2010,76 @@ class AutomatedTradingBot:
         except Exception as e:
             logger.error(f"Trading cycle error: {e}", exc_info=True)
     
+    async def execute_shared_signal(self, signal: Dict, market_data) -> Tuple[Optional[Any], str]:
+        """
+        Per-user half of a fanned-out global signal (bot.services.signal_fanout).
+        
+        ``signal`` arrives validated and priced for ``market_data.symbol`` by
+        the fan-out; this applies the user's risk gates and AI portfolio
+        evaluation, then sizes and places the order through the trading engine.
+        
+        Returns:
+            (executed engine Signal or None, reason)
+        """
+        symbol = market_data.symbol
+        
+        if CORE_MODULES_AVAILABLE and self.daily_loss_tracker and self.user_id:
+            if not self.daily_loss_tracker.can_open_new_trade(self.user_id):
+                return None, "daily loss limit reached"
+        if not await self.check_risk_limits():
+            return None, "risk limits exceeded"
+        
+        # User's own TP/SL settings where the fan-out had no volatility profile
+        signal = {**signal}
+        if signal.get('stop_loss') is None or signal.get('take_profit') is None:
+            user_tp_sl = self.get_user_tp_sl_settings()
+            stop_loss, take_profit = price_levels(
+                signal['action'].upper(), market_data.current_price,
+                user_tp_sl['stop_loss_pct'], user_tp_sl['take_profit_pct']
+            )
+            if signal.get('stop_loss') is None:
+                signal['stop_loss'] = stop_loss
+            if signal.get('take_profit') is None:
+                signal['take_profit'] = take_profit
+        
+        # AI portfolio evaluation against this user's portfolio
+        try:
+            from bot.services.ai_portfolio_evaluator import get_ai_portfolio_evaluator
+            
+            evaluator = get_ai_portfolio_evaluator()
+            portfolio_state = await evaluator.get_portfolio_state(
+                user_id=self.user_id,
+                exchange_adapter=self.exchange,
+                user_settings=self.get_user_settings()
+            )
+            evaluation = await evaluator.evaluate_signal_for_user(signal=signal, portfolio_state=portfolio_state)
+            if not evaluation.should_execute:
+                return None, f"rejected by AI portfolio evaluation: {evaluation.reasons}"
+            signal['confidence'] = signal.get('confidence', 0.5) * evaluation.position_size_multiplier
+            signal['ai_portfolio_eval'] = {
+                'multiplier': evaluation.position_size_multiplier,
+                'risk': evaluation.risk_assessment,
+                'reasons': evaluation.reasons,
+                'warnings': evaluation.warnings
+            }
+        except Exception as e:
+            logger.warning(f"AI Portfolio evaluation failed (executing shared signal): {e}")
+        
+        # Sizing, portfolio/margin/liquidity checks and the order itself. A
+        # strategy of its own: left in ai_strategy.latest_signals the shared
+        # signal would be replayed by the next regular cycle.
+        shared_strategy = AIStrategy([symbol], self.config, can_short=self.ai_strategy.can_short)
+        shared_strategy.risk_manager = self.ai_strategy.risk_manager
+        shared_strategy.user_settings = self.ai_strategy.user_settings
+        shared_strategy.update_signals([signal])
+        executed = await self.trading_engine.run_cycle(
+            external_market_data={symbol: market_data},
+            strategies=[shared_strategy]
+        )
+        if not executed:
+            return None, "not executed by trading engine"
+        return executed[0], "executed"
+    
     async def _calculate_adaptive_interval(self) -> int:
         """
         Calculate adaptive trading interval based on market conditions.
@@ -1860,9 +2094,13 @@ class AutomatedTradingBot:
         base_interval = 300  # 5 minutes default
         
         try:
-            # Check if we have open positions
-            positions = await self.exchange.get_positions() if self.exchange else []
-            has_positions = len(positions) > 0
+            # Check if we have open positions (the position monitor already tracks
+            # them; only ask the exchange when it is not running)
+            if self.position_monitor:
+                position_count = self.position_monitor.get_monitored_count()
+            else:
+                position_count = len(await self.exchange.get_positions()) if self.exchange else 0
+            has_positions = position_count > 0
             
             # Check volatility (if risk_manager available)
             is_high_volatility = False
@@ -1881,7 +2119,7 @@ class AutomatedTradingBot:
                 reason = "high volatility"
             elif has_positions:
                 interval = 180  # 3 minutes with open positions
-                reason = f"{len(positions)} open positions"
+                reason = f"{position_count} open positions"
             else:
                 interval = 600  # 10 minutes when idle
                 reason = "no positions, normal conditions"
@@ -1929,15 +2167,29 @@ class AutomatedTradingBot:
         # Log upcoming economic events at startup
         await self._log_upcoming_economic_events()
         
+        # New signals wake the loop; the adaptive interval remains for housekeeping
+        if os.getenv("SIGNAL_FEED_ENABLED", "true").lower() == "true":
+            from bot.realtime.signal_feed import get_signal_feed
+            self.signal_feed = get_signal_feed()
+            self.signal_feed.subscribe(self.user_id, self._on_signal_notice)
+            await self.signal_feed.start()
+            
+            if self.user_id and os.getenv("SIGNAL_FANOUT_ENABLED", "true").lower() == "true":
+                from bot.services.signal_fanout import get_signal_fanout
+                self.signal_fanout = get_signal_fanout()
+                self.signal_fanout.register_bot(self, feed=self.signal_feed)
+        
         while self.running:
             try:
-                await self.trading_cycle()
+                self._last_cycle_started = time.monotonic()
+                async with self.cycle_lock:
+                    await self.trading_cycle()
                 
                 # Calculate adaptive interval for next cycle
                 adaptive_interval = await self._calculate_adaptive_interval()
                 
-                logger.info(f"💤 Next cycle in {adaptive_interval}s...")
-                await asyncio.sleep(adaptive_interval)
+                logger.info(f"💤 Next cycle in {adaptive_interval}s (or on new signal)...")
+                await self._sleep_until_signal(adaptive_interval)
                 
             except asyncio.CancelledError:
                 break
@@ -1949,6 +2201,40 @@ class AutomatedTradingBot:
                 logger.error(f"Unexpected error in main loop: {e}", exc_info=True)
                 await asyncio.sleep(60)  # Wait before retry
     
+    def _on_signal_notice(self, notice):
+        """SignalFeed callback: wake the main loop for a new actionable signal."""
+        if notice.is_global and self.signal_fanout is not None:
+            return  # Executed for all users by the fan-out
+        self._last_signal_notice = notice
+        self._signal_wakeup.set()
+    
+    async def _sleep_until_signal(self, timeout: float) -> bool:
+        """
+        Sleep up to ``timeout`` seconds, returning early when a signal arrives.
+        
+        Returns:
+            True if woken by a signal
+        """
+        try:
+            await asyncio.wait_for(self._signal_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        
+        # Coalesce a burst of signals (one analysis run writes several rows)
+        # and keep signal-driven cycles at least signal_wake_min_gap apart
+        since_last = time.monotonic() - self._last_cycle_started
+        await asyncio.sleep(max(1.0, self.signal_wake_min_gap - since_last))
+        self._signal_wakeup.clear()
+        
+        notice = self._last_signal_notice
+        if notice is not None:
+            delay = notice.delay_seconds
+            logger.info(
+                f"⚡ New {notice.signal_type.upper()} signal {notice.symbol} from {notice.source}"
+                f"{f' ({delay:.1f}s after insert)' if delay is not None else ''} - running cycle now"
+            )
+        return True
+    
     async def _on_sl_triggered(self, position, price: float):
         """Callback when stop loss is triggered by Position Monitor."""
         logger.warning(f"🛑 SL triggered for {position.symbol} @ {price}")
@@ -1973,6 +2259,10 @@ class AutomatedTradingBot:
         if CORE_MODULES_AVAILABLE and self.correlation_manager:
             self.correlation_manager.remove_position(position.symbol)
         
+        # Rolling Kelly/Sharpe/VaR statistics
+        if self.risk_manager_service and self.user_id:
+            self.risk_manager_service.record_trade_close(self.user_id, position.symbol, pnl)
+        
         # Save to database - GAP-2 FIX: Include SL/TP/leverage/entry/exit
         if self.db_manager:
             try:
@@ -1992,7 +2282,8 @@ class AutomatedTradingBot:
                         take_profit=position.take_profit,
                         entry_price=position.entry_price,
                         exit_price=price,
-                        leverage=getattr(position, 'leverage', 1.0)
+                        leverage=getattr(position, 'leverage', 1.0),
+                        strategy_name=getattr(position, 'strategy', None)
                     )
             except Exception as e:
                 logger.error(f"Failed to save SL trigger to DB: {e}")
@@ -2021,6 +2312,10 @@ class AutomatedTradingBot:
         if CORE_MODULES_AVAILABLE and self.correlation_manager:
             self.correlation_manager.remove_position(position.symbol)
         
+        # Rolling Kelly/Sharpe/VaR statistics
+        if self.risk_manager_service and self.user_id:
+            self.risk_manager_service.record_trade_close(self.user_id, position.symbol, pnl)
+        
         # Save to database - GAP-2 FIX: Include SL/TP/leverage/entry/exit
         if self.db_manager:
             try:
@@ -2040,7 +2335,8 @@ class AutomatedTradingBot:
                         take_profit=position.take_profit,
                         entry_price=position.entry_price,
                         exit_price=price,
-                        leverage=getattr(position, 'leverage', 1.0)
+                        leverage=getattr(position, 'leverage', 1.0),
+                        strategy_name=getattr(position, 'strategy', None)
                     )
             except Exception as e:
                 logger.error(f"Failed to save TP trigger to DB: {e}")
@@ -2056,6 +2352,10 @@ class AutomatedTradingBot:
         else:
             pnl = (position.entry_price - price) * quantity
         
+        # Rolling Kelly/Sharpe/VaR statistics
+        if self.risk_manager_service and self.user_id:
+            self.risk_manager_service.record_trade_close(self.user_id, position.symbol, pnl)
+        
         # Save to database - GAP-2 FIX: Include SL/TP/leverage/entry/exit
         if self.db_manager:
             try:
@@ -2075,7 +2375,8 @@ class AutomatedTradingBot:
                         take_profit=position.take_profit,
                         entry_price=position.entry_price,
                         exit_price=price,
-                        leverage=getattr(position, 'leverage', 1.0)
+                        leverage=getattr(position, 'leverage', 1.0),
+                        strategy_name=getattr(position, 'strategy', None)
                     )
             except Exception as e:
                 logger.error(f"Failed to save Partial TP trigger to DB: {e}")
@@ -2096,6 +2397,10 @@ class AutomatedTradingBot:
             f"P&L: {pnl_percent:+.2f}%"
         )
         
+        # Rolling Kelly/Sharpe/VaR statistics
+        if self.risk_manager_service and self.user_id:
+            self.risk_manager_service.record_trade_close(self.user_id, position.symbol, pnl)
+        
         # Save to database - GAP-2 FIX: Include SL/TP/leverage/entry/exit
         if self.db_manager:
             try:
@@ -2115,7 +2420,8 @@ class AutomatedTradingBot:
                         take_profit=position.take_profit,
                         entry_price=position.entry_price,
                         exit_price=price,
-                        leverage=getattr(position, 'leverage', 1.0)
+                        leverage=getattr(position, 'leverage', 1.0),
+                        strategy_name=getattr(position, 'strategy', None)
                     )
             except Exception as e:
                 logger.error(f"Failed to save Time Exit to DB: {e}")
@@ -2130,85 +2436,215 @@ class AutomatedTradingBot:
             return
         
         try:
-            from sqlalchemy import create_engine, text
-            from bot.security import SecurityManager
-            
-            DATABASE_URL = os.getenv("SUPABASE_DB_URL") or os.getenv("DATABASE_URL")
-            logger.debug(f"🔍 DATABASE_URL: {DATABASE_URL[:40] if DATABASE_URL else 'NOT SET'}...")
-            
-            if not DATABASE_URL:
-                logger.error("No DATABASE_URL configured for loading API keys")
-                return
-            
-            if "sslmode" not in DATABASE_URL and "sqlite" not in DATABASE_URL:
-                DATABASE_URL += "?sslmode=require"
-            
-            engine = create_engine(DATABASE_URL)
-            
-            # FIX 2025-12-14: Load ENCRYPTION_KEY from environment
-            encryption_key = os.getenv("ENCRYPTION_KEY")
-            security_manager = SecurityManager(encryption_key)
-            
-            logger.info(f"🔍 Querying api_keys for user_id={self.user_id}")
-            
-            with engine.connect() as conn:
+            if self.bootstrap is not None:
+                # Already loaded and decrypted in bulk by FleetBootstrap
+                if not self.bootstrap.has_keys:
+                    logger.error(
+                        f"No API keys found in database for user {self.user_id}"
+                        f"{f' ({self.bootstrap.error})' if self.bootstrap.error else ''}"
+                    )
+                    return
+                api_key, api_secret = self.bootstrap.api_key, self.bootstrap.api_secret
+                exchange_name, is_testnet = self.bootstrap.exchange, self.bootstrap.testnet
+            else:
+                from sqlalchemy import text
+                from bot.db import DatabaseManager
+                from bot.security import SecurityManager
+                
+                # FIX 2025-12-14: Load ENCRYPTION_KEY from environment
+                encryption_key = os.getenv("ENCRYPTION_KEY")
+                security_manager = SecurityManager(encryption_key)
+                
+                logger.info(f"🔍 Querying api_keys for user_id={self.user_id}")
+                
                 # FIX 2025-12-14: Only filter by exchange if explicitly provided via CLI (--exchange)
                 # Don't use default EXCHANGE_NAME from .env as filter when loading from DB
                 cli_exchange_filter = self.exchange_name if self.exchange_name and os.getenv("EXCHANGE_NAME") != self.exchange_name else None
                 
-                if cli_exchange_filter:
-                    logger.info(f"   Using CLI exchange filter: {cli_exchange_filter}")
-                    query = text("""
-                        SELECT encrypted_api_key, encrypted_api_secret, exchange, is_testnet 
-                        FROM api_keys 
-                        WHERE user_id = :user_id AND exchange = :exchange AND is_active = true
-                        ORDER BY created_at ASC
-                        LIMIT 1
-                    """)
-                    result = conn.execute(query, {"user_id": self.user_id, "exchange": cli_exchange_filter}).fetchone()
-                else:
-                    logger.info(f"   No exchange filter, querying first active key for user")
-                    query = text("""
-                        SELECT encrypted_api_key, encrypted_api_secret, exchange, is_testnet 
-                        FROM api_keys 
-                        WHERE user_id = :user_id AND is_active = true
-                        ORDER BY created_at ASC
-                        LIMIT 1
-                    """)
-                    result = conn.execute(query, {"user_id": self.user_id}).fetchone()
+                # Shared engine/pool from bot.db instead of a new engine per bot
+                with DatabaseManager.session_scope() as session:
+                    if cli_exchange_filter:
+                        logger.info(f"   Using CLI exchange filter: {cli_exchange_filter}")
+                        query = text("""
+                            SELECT encrypted_api_key, encrypted_api_secret, exchange, is_testnet 
+                            FROM api_keys 
+                            WHERE user_id = :user_id AND exchange = :exchange AND is_active = true
+                            ORDER BY created_at ASC
+                            LIMIT 1
+                        """)
+                        result = session.execute(query, {"user_id": self.user_id, "exchange": cli_exchange_filter}).fetchone()
+                    else:
+                        logger.info(f"   No exchange filter, querying first active key for user")
+                        query = text("""
+                            SELECT encrypted_api_key, encrypted_api_secret, exchange, is_testnet 
+                            FROM api_keys 
+                            WHERE user_id = :user_id AND is_active = true
+                            ORDER BY created_at ASC
+                            LIMIT 1
+                        """)
+                        result = session.execute(query, {"user_id": self.user_id}).fetchone()
                 
                 logger.info(f"   Query result: {'FOUND' if result else 'NOT FOUND'}")
                 
-                if result:
-                    self.api_key = security_manager.decrypt(result.encrypted_api_key)
-                    self.api_secret = security_manager.decrypt(result.encrypted_api_secret)
-                    self.exchange_name = result.exchange
-                    self.testnet = result.is_testnet if result.is_testnet is not None else False
-                    
-                    # Set futures/margin mode based on exchange and CLI args
-                    if self.exchange_name in ['kraken']:
-                        self.futures = True  # Kraken uses futures for margin
-                    elif self.exchange_name == 'binance':
-                        # Binance: Respect --margin flag from CLI, otherwise use SPOT
-                        self.futures = False  # No futures for Binance
-                        if self.margin:
-                            logger.info(f"📊 Binance: Using MARGIN mode (--margin flag enabled)")
-                        else:
-                            logger.info(f"📊 Binance: Using SPOT mode (futures disabled)")
-                    
-                    logger.info(f"✅ Loaded API keys for user {self.user_id[:8]}... | Exchange: {self.exchange_name} | Testnet: {self.testnet}")
-                    
-                    # ========================================
-                    # NEW v2.5: Validate API keys after loading
-                    # ========================================
-                    await self._validate_api_keys()
-                    
-                else:
+                if not result:
                     logger.error(f"No API keys found in database for user {self.user_id}")
+                    return
+                
+                api_key = security_manager.decrypt(result.encrypted_api_key)
+                api_secret = security_manager.decrypt(result.encrypted_api_secret)
+                exchange_name = result.exchange
+                is_testnet = result.is_testnet if result.is_testnet is not None else False
+            
+            self.api_key = api_key
+            self.api_secret = api_secret
+            self.exchange_name = exchange_name
+            self.testnet = is_testnet
+            
+            # Set futures/margin mode based on exchange and CLI args
+            if self.exchange_name in ['kraken']:
+                self.futures = True  # Kraken uses futures for margin
+            elif self.exchange_name == 'binance':
+                # Binance: Respect --margin flag from CLI, otherwise use SPOT
+                self.futures = False  # No futures for Binance
+                if self.margin:
+                    logger.info(f"📊 Binance: Using MARGIN mode (--margin flag enabled)")
+                else:
+                    logger.info(f"📊 Binance: Using SPOT mode (futures disabled)")
+            
+            logger.info(f"✅ Loaded API keys for user {self.user_id[:8]}... | Exchange: {self.exchange_name} | Testnet: {self.testnet}")
+            
+            # ========================================
+            # NEW v2.5: Validate API keys after loading
+            # ========================================
+            await self._validate_api_keys()
                     
         except Exception as e:
             logger.error(f"Failed to load API keys from database: {e}")
     
+    def _exchange_key(self) -> str:
+        """Key for process-wide per-exchange services (scanner, candles): same venue, same market data."""
+        return f"{self.exchange_name}{':futures' if self.futures else ''}{':testnet' if self.testnet else ''}"
+    
+    def _use_shared_markets(self, adapter) -> None:
+        """Give ``adapter`` the fleet's pre-loaded markets (skips its load_markets)."""
+        shared = self.bootstrap.markets if self.bootstrap is not None else None
+        if shared is None or not hasattr(adapter, 'use_shared_markets'):
+            return
+        try:
+            adapter.use_shared_markets(shared.markets, shared.currencies, shared.time_difference)
+        except Exception as e:
+            logger.debug(f"Could not use shared markets, adapter will load its own: {e}")
+    
+    # ========================================
+    # WARM-RESTART STATE SNAPSHOT
+    # ========================================
+    
+    def _load_state_snapshot(self) -> None:
+        """Read this bot's local state snapshot (if recent and intact) before components start."""
+        if self.test_mode or os.getenv("STATE_SNAPSHOT_ENABLED", "true").lower() != "true":
+            return
+        from bot.core.state_snapshot import StateSnapshotStore
+        
+        mode = "futures" if self.futures else "margin" if self.margin else "spot"
+        network = "testnet" if self.testnet else "live"
+        snapshot_dir = Path(os.getenv("STATE_SNAPSHOT_DIR", str(Path.home() / ".ase_bot" / "state")))
+        self._snapshot_store = StateSnapshotStore(
+            snapshot_dir / f"bot_{self.user_id or 'default'}_{self.exchange_name}_{mode}_{network}.snap"
+        )
+        self._markets_snapshot_store = StateSnapshotStore(
+            snapshot_dir / f"markets_{self.exchange_name}_{mode}_{network}.snap"
+        )
+        max_age = float(os.getenv("STATE_SNAPSHOT_MAX_AGE", "3600"))
+        self.state_snapshot = self._snapshot_store.read(max_age=max_age)
+        if self.state_snapshot is not None:
+            logger.info(
+                f"🧊 Warm restart from state snapshot ({self.state_snapshot.age_seconds:.0f}s old, "
+                f"sections: {', '.join(sorted(self.state_snapshot.sections))})"
+            )
+        # Written when markets change, so its age is the age of the metadata
+        markets_max_age = float(os.getenv("STATE_SNAPSHOT_MARKETS_MAX_AGE", "86400"))
+        self.markets_snapshot = self._markets_snapshot_store.read(max_age=markets_max_age)
+    
+    def _restore_snapshot_section(self, name: str, apply, snapshot=None):
+        """Pass snapshot section ``name`` to ``apply``; a bad section only means a cold start for it."""
+        snapshot = snapshot if snapshot is not None else self.state_snapshot
+        section = snapshot.get(name) if snapshot is not None else None
+        if not section:
+            return None
+        try:
+            return apply(section)
+        except Exception as e:
+            logger.warning(f"🧊 Could not restore '{name}' from state snapshot: {e}")
+            return None
+    
+    def _collect_snapshot_sections(self) -> Dict:
+        """This bot's in-memory state worth keeping across a restart, by section (markets excluded)."""
+        sections = {}
+        if self.position_monitor:
+            sections["position_monitor"] = self.position_monitor.export_snapshot()
+        if self.risk_manager_service:
+            sections["atr_cache"] = self.risk_manager_service.export_atr_cache()
+        if self.correlation_manager:
+            sections["correlations"] = self.correlation_manager.export_correlation_cache()
+        if self.rate_limiter and self.user_id:
+            sections["rate_limiter"] = self.rate_limiter.export_user_state(self.user_id)
+        return {name: section for name, section in sections.items() if section}
+    
+    async def write_state_snapshot(self) -> None:
+        """Write the warm-restart snapshot (collected here, serialized off the event loop)."""
+        if not self._snapshot_store:
+            return
+        try:
+            sections = self._collect_snapshot_sections()
+            size = await asyncio.to_thread(self._snapshot_store.write, sections)
+            logger.debug(f"🧊 State snapshot written ({size / 1024:.0f} KB, {len(sections)} sections)")
+        except Exception as e:
+            logger.warning(f"🧊 State snapshot write failed: {e}")
+        await self._write_markets_snapshot()
+    
+    async def _write_markets_snapshot(self) -> None:
+        """
+        Write market metadata when this bot holds markets it has not handed over yet.
+        
+        A new markets dict (load_markets, shared fleet markets) is serialized once;
+        the store skips the write when another bot already wrote the same payload.
+        """
+        if not self._markets_snapshot_store or not hasattr(self.exchange, 'export_markets'):
+            return
+        markets = self.exchange.export_markets()
+        if not markets:
+            return
+        key = (id(markets["markets"]), len(markets["markets"]), markets.get("time_difference"))
+        if key == self._markets_snapshot_key:
+            return
+        try:
+            size = await asyncio.to_thread(
+                self._markets_snapshot_store.write, {"markets": markets}, None, True
+            )
+            self._markets_snapshot_key = key
+            if size:
+                logger.debug(f"🧊 Markets snapshot written ({size / 1024:.0f} KB)")
+        except Exception as e:
+            logger.warning(f"🧊 Markets snapshot write failed: {e}")
+    
+    async def _state_snapshot_loop(self):
+        """Refresh the snapshot every ``snapshot_interval`` seconds."""
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.write_state_snapshot()
+    
+    async def _reconcile_monitored_positions(self):
+        """Sync monitored positions with the database and the exchange."""
+        try:
+            db_synced = await self.position_monitor.sync_from_database(self.db_manager)
+            ex_synced = await self.position_monitor.sync_from_exchange(self.db_manager)
+            if db_synced > 0 or ex_synced > 0:
+                logger.info(f"✅ Restored position monitoring: {db_synced} from DB, {ex_synced} from exchange")
+        except asyncio.CancelledError:
+            raise
+        except Exception as sync_err:
+            logger.warning(f"Position sync failed (will monitor new positions only): {sync_err}")
+    
     async def _validate_api_keys(self):
         """
         NEW v2.5: Validate API keys by testing connection to exchange.
@@ -2233,6 +2669,7 @@ class AutomatedTradingBot:
                 futures=self.futures,
                 margin=self.margin
             )
+            self._use_shared_markets(test_adapter)
             
             try:
                 # Try to fetch balance - this will fail if keys are invalid
@@ -2339,49 +2776,53 @@ class AutomatedTradingBot:
             from bot.db import DatabaseManager
             from sqlalchemy import text
             
-            with DatabaseManager.session_scope() as session:
-                # Query trading_settings table directly via raw SQL for flexibility
-                result = session.execute(
-                    text("""
-                        SELECT 
-                            risk_level,
-                            max_position_size,
-                            max_daily_loss,
-                            stop_loss_percentage,
-                            take_profit_percentage
-                        FROM trading_settings 
-                        WHERE user_id = :user_id
-                        LIMIT 1
-                    """),
-                    {"user_id": self.user_id}
-                ).fetchone()
-                
-                if result:
-                    # Create TradingSettings-like object from result
-                    class SettingsProxy:
-                        def __init__(self, row):
-                            self.risk_level = row[0] or 3
-                            self.max_position_size = float(row[1] or 1000)
-                            self.max_daily_loss = float(row[2] or 100)
-                            self.stop_loss_percentage = float(row[3] or 5.0)
-                            self.take_profit_percentage = float(row[4] or 3.0)  # Default TP=3%
-                    
-                    settings_proxy = SettingsProxy(result)
-                    user_settings = UserRiskSettings.from_trading_settings(settings_proxy, self.user_id)
-                    
-                    logger.info(
-                        f"📋 Loaded user risk settings for {self.user_id[:8]}... | "
-                        f"Risk Level: {user_settings.risk_level}/5 | "
-                        f"Risk Per Trade: {user_settings.risk_per_trade_percent}% | "
-                        f"Max Position: ${user_settings.max_position_size:.0f} | "
-                        f"SL: {user_settings.stop_loss_percentage}% | TP: {user_settings.take_profit_percentage}%"
-                    )
-                    
-                    return user_settings
-                else:
-                    logger.info(f"No trading settings found for user {self.user_id[:8]}..., using defaults")
-                    return None
+            if self.bootstrap is not None:
+                # Bulk-loaded by FleetBootstrap (same columns as the query below)
+                result = self.bootstrap.trading_settings
+            else:
+                with DatabaseManager.session_scope() as session:
+                    # Query trading_settings table directly via raw SQL for flexibility
+                    result = session.execute(
+                        text("""
+                            SELECT 
+                                risk_level,
+                                max_position_size,
+                                max_daily_loss,
+                                stop_loss_percentage,
+                                take_profit_percentage
+                            FROM trading_settings 
+                            WHERE user_id = :user_id
+                            LIMIT 1
+                        """),
+                        {"user_id": self.user_id}
+                    ).fetchone()
+                
+            if result:
+                # Create TradingSettings-like object from result
+                class SettingsProxy:
+                    def __init__(self, row):
+                        self.risk_level = row[0] or 3
+                        self.max_position_size = float(row[1] or 1000)
+                        self.max_daily_loss = float(row[2] or 100)
+                        self.stop_loss_percentage = float(row[3] or 5.0)
+                        self.take_profit_percentage = float(row[4] or 3.0)  # Default TP=3%
+                
+                settings_proxy = SettingsProxy(result)
+                user_settings = UserRiskSettings.from_trading_settings(settings_proxy, self.user_id)
                 
+                logger.info(
+                    f"📋 Loaded user risk settings for {self.user_id[:8]}... | "
+                    f"Risk Level: {user_settings.risk_level}/5 | "
+                    f"Risk Per Trade: {user_settings.risk_per_trade_percent}% | "
+                    f"Max Position: ${user_settings.max_position_size:.0f} | "
+                    f"SL: {user_settings.stop_loss_percentage}% | TP: {user_settings.take_profit_percentage}%"
+                )
+                
+                return user_settings
+            else:
+                logger.info(f"No trading settings found for user {self.user_id[:8]}..., using defaults")
+                return None
+            
         except Exception as e:
             logger.warning(f"Failed to load user risk settings: {e}")
             return None
@@ -2399,11 +2840,39 @@ class AutomatedTradingBot:
         logger.info("Shutting down bot...")
         self.running = False
         
+        # Warm-restart snapshot while the position monitor still holds its state
+        for task in (self._snapshot_task, self._reconcile_task):
+            if task and not task.done():
+                task.cancel()
+        if os.getenv("CLOSE_ON_SHUTDOWN", "false").lower() == "true":
+            if self._snapshot_store:
+                self._snapshot_store.remove()  # Positions are closed below
+        else:
+            await self.write_state_snapshot()
+        
         # Stop position monitor
         if self.position_monitor:
             await self.position_monitor.stop()
             logger.info("Position monitor stopped")
         
+        # Leave the signal feed (stops when the last bot leaves)
+        if self.signal_fanout:
+            self.signal_fanout.unregister_bot(self)
+        if self.signal_feed:
+            self.signal_feed.unsubscribe(self._on_signal_notice)
+            await self.signal_feed.stop()
+        
+        # Release the shared market context and scanner (stop when the last bot leaves)
+        if self.market_context:
+            await self.market_context.stop()
+        if self.market_scanner:
+            await self.market_scanner.stop()
+        
+        # Sentiment scoring worker processes (only if sentiment was ever loaded)
+        sentiment = sys.modules.get('bot.analysis.sentiment')
+        if sentiment is not None:
+            sentiment.close_sentiment_scorers()
+        
         # Disconnect WebSocket
         if self.ws_manager:
             await self.ws_manager.disconnect()
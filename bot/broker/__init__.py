@@ -3,12 +3,28 @@
 from .base import BaseBroker
 from .paper import PaperBroker, Position, OrderFill
 from .enhanced_paper import EnhancedPaperBroker
-try:
-    from .live_broker import LiveBroker
-    from .primexbt import PrimeXBTBroker
-except ImportError:
-    LiveBroker = None
-    PrimeXBTBroker = None
+
+# Live brokers pull in ccxt and the exchange adapter stack; they are imported
+# on first access (PEP 562) so paper trading, strategies and the API do not
+# pay for them. None when their dependencies are missing, as before.
+_LAZY_BROKERS = {
+    'LiveBroker': '.live_broker',
+    'PrimeXBTBroker': '.primexbt',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_BROKERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        from importlib import import_module
+        value = getattr(import_module(module_name, __name__), name)
+    except ImportError:
+        value = None
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'BaseBroker',
@@ -19,5 +35,3 @@ __all__ = [
     'LiveBroker',
     'PrimeXBTBroker'
 ]
-
-
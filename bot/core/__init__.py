@@ -6,17 +6,26 @@ Contains:
 - Symbol normalization
 - Transaction management with retry logic
 - Position locking (mutex)
-- Rate limiting (per-component)
+- Rate limiting (per-component, shared sliding-window/token-bucket primitives)
 - Daily loss tracking
 - Correlation management
 - Spread-aware P&L calculations
 - Market regime position sizing
+- Time-series downsampling (LTTB)
+- Running trade-performance aggregates
+- Warm-restart state snapshots
 """
 
 from .symbol_normalizer import SymbolNormalizer, normalize_symbol, to_exchange_format
 from .transaction_manager import TransactionManager, atomic_trade_operation
 from .position_lock import PositionLockManager, position_lock
 from .rate_limiter_v2 import ComponentRateLimiter, RateLimitExceeded
+from .rate_limit import (
+    TokenBucket,
+    SlidingWindowLimiter,
+    LocalRateLimitBackend,
+    RedisRateLimitBackend
+)
 from .daily_loss_tracker import DailyLossTracker
 from .correlation_manager import CorrelationManager
 from .spread_calculator import (
@@ -47,6 +56,11 @@ from .db_timeout import (
     DEFAULT_DB_TIMEOUT,
     DEFAULT_DB_TIMEOUT_SHORT
 )
+from .downsampling import lttb, lttb_indices
+from .performance_metrics import PerformanceAggregate, daily_pnl_sharpe
+from .cost_basis import CostBasis
+from .rolling_stats import RollingTradingStats, RunningMoments
+from .state_snapshot import StateSnapshot, StateSnapshotStore
 
 __all__ = [
     # Symbol Normalizer
@@ -65,6 +79,10 @@ __all__ = [
     # Rate Limiting
     'ComponentRateLimiter',
     'RateLimitExceeded',
+    'TokenBucket',
+    'SlidingWindowLimiter',
+    'LocalRateLimitBackend',
+    'RedisRateLimitBackend',
     
     # Daily Loss Tracking
     'DailyLossTracker',
@@ -102,4 +120,23 @@ __all__ = [
     'shutdown_timeout_executor',
     'DEFAULT_DB_TIMEOUT',
     'DEFAULT_DB_TIMEOUT_SHORT',
+    
+    # Downsampling
+    'lttb',
+    'lttb_indices',
+    
+    # Performance Metrics
+    'PerformanceAggregate',
+    'daily_pnl_sharpe',
+    
+    # Cost Basis
+    'CostBasis',
+    
+    # Rolling Trading Statistics
+    'RollingTradingStats',
+    'RunningMoments',
+    
+    # Warm-Restart State Snapshot
+    'StateSnapshot',
+    'StateSnapshotStore',
 ]
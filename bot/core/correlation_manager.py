@@ -338,6 +338,26 @@ class CorrelationManager:
         """Get list of currently tracked positions."""
         return list(self._tracked_positions.values())
     
+    def export_correlation_cache(self) -> List[list]:
+        """Unexpired dynamic correlations as ``[asset1, asset2, value, iso_time]`` (for snapshots)."""
+        now = datetime.now()
+        return [
+            [pair[0], pair[1], value, self._correlation_cache_time[pair].isoformat()]
+            for pair, value in self._dynamic_correlations.items()
+            if pair in self._correlation_cache_time and now - self._correlation_cache_time[pair] < self._cache_ttl
+        ]
+    
+    def restore_correlation_cache(self, entries: List[list]) -> int:
+        """Load correlations from ``export_correlation_cache``; the hourly TTL still applies."""
+        restored = 0
+        for asset1, asset2, value, at in entries:
+            at = datetime.fromisoformat(at)
+            if datetime.now() - at < self._cache_ttl:
+                self._dynamic_correlations[(asset1, asset2)] = float(value)
+                self._correlation_cache_time[(asset1, asset2)] = at
+                restored += 1
+        return restored
+    
     async def calculate_dynamic_correlation(
         self,
         asset1: str,
@@ -381,8 +401,23 @@ class CorrelationManager:
             hours_per_candle = {'1h': 1, '4h': 4, '1d': 24}.get(timeframe, 1)
             limit = int((period_days * 24) / hours_per_candle)
             
-            ohlcv1 = await self._exchange.exchange.fetch_ohlcv(symbol1, timeframe, limit=limit)
-            ohlcv2 = await self._exchange.exchange.fetch_ohlcv(symbol2, timeframe, limit=limit)
+            # Background download - yields the exchange budget to orders/closes
+            from bot.exchange_adapters.request_scheduler import RequestPriority, request_priority
+            with request_priority(RequestPriority.ANALYTICS):
+                candle_store = getattr(self._exchange, 'candle_store', None)
+                if candle_store is not None:
+                    # Local candles, kept current by the live feed (bot.realtime.candles)
+                    ohlcv1 = await candle_store.ohlcv(
+                        symbol1, timeframe, limit,
+                        lambda: self._exchange.exchange.fetch_ohlcv(symbol1, timeframe, limit=limit)
+                    )
+                    ohlcv2 = await candle_store.ohlcv(
+                        symbol2, timeframe, limit,
+                        lambda: self._exchange.exchange.fetch_ohlcv(symbol2, timeframe, limit=limit)
+                    )
+                else:
+                    ohlcv1 = await self._exchange.exchange.fetch_ohlcv(symbol1, timeframe, limit=limit)
+                    ohlcv2 = await self._exchange.exchange.fetch_ohlcv(symbol2, timeframe, limit=limit)
             
             if not ohlcv1 or not ohlcv2:
                 logger.debug(f"No OHLCV data for {asset1}/{asset2}")
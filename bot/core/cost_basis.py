@@ -0,0 +1,153 @@
+"""
+Incremental cost basis for spot holdings.
+
+Each fill updates a FIFO queue of open lots and a running average cost,
+so the entry price of the current holding is always available without
+replaying trade history. Sells consume the oldest lots first and realize
+P&L against them; the average cost is unchanged by sells.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+# Lots smaller than this (in base units) are treated as fully consumed
+_DUST = 1e-12
+
+# Fee currencies folded into lot cost at par with the quote
+_QUOTE_FEE_CURRENCIES = frozenset({'USDT', 'USDC', 'USD', 'BUSD', 'DAI', 'FDUSD', 'EUR'})
+
+
+@dataclass
+class CostBasis:
+    """
+    Open lots and average cost of one asset.
+
+    ``lots`` holds ``[quantity, unit_cost]`` pairs, oldest first; unit cost
+    includes buy fees paid in the quote currency. ``quantity`` and
+    ``cost`` are the totals of the open lots.
+    """
+    quantity: float = 0.0
+    cost: float = 0.0
+    average_cost: float = 0.0
+    realized_pnl: float = 0.0
+    lots: Deque[List[float]] = field(default_factory=deque)
+
+    @property
+    def fifo_price(self) -> Optional[float]:
+        """Entry price of the remaining FIFO lots, or None when flat."""
+        if self.quantity <= _DUST:
+            return None
+        return self.cost / self.quantity
+
+    @property
+    def average_price(self) -> Optional[float]:
+        return self.average_cost if self.quantity > _DUST else None
+
+    def buy(self, amount: float, price: float, fee: float = 0.0) -> None:
+        """Add a lot. ``fee`` is in quote currency and raises the lot's cost."""
+        amount = float(amount)
+        if amount <= _DUST:
+            return
+        lot_cost = amount * float(price) + float(fee or 0.0)
+        self.average_cost = (self.average_cost * self.quantity + lot_cost) / (self.quantity + amount)
+        self.lots.append([amount, lot_cost / amount])
+        self.quantity += amount
+        self.cost += lot_cost
+
+    def sell(self, amount: float, price: float, fee: float = 0.0) -> float:
+        """
+        Consume lots FIFO and return the realized P&L of this sale.
+
+        Selling more than the ledger holds (history older than the ledger,
+        deposits) only realizes P&L on the known lots.
+        """
+        remaining = float(amount)
+        price = float(price)
+        matched = 0.0
+        matched_cost = 0.0
+        while remaining > _DUST and self.lots:
+            lot = self.lots[0]
+            take = min(lot[0], remaining)
+            matched += take
+            matched_cost += take * lot[1]
+            lot[0] -= take
+            remaining -= take
+            if lot[0] <= _DUST:
+                self.lots.popleft()
+
+        self._consumed(matched, matched_cost)
+
+        if matched <= _DUST:
+            return 0.0
+        fee_share = float(fee or 0.0) * matched / float(amount)
+        pnl = matched * price - matched_cost - fee_share
+        self.realized_pnl += pnl
+        return pnl
+
+    def reduce(self, amount: float) -> None:
+        """Remove base units without a sale (fee charged in the base asset)."""
+        remaining = float(amount)
+        removed = 0.0
+        removed_cost = 0.0
+        while remaining > _DUST and self.lots:
+            lot = self.lots[-1]
+            take = min(lot[0], remaining)
+            removed += take
+            removed_cost += take * lot[1]
+            lot[0] -= take
+            remaining -= take
+            if lot[0] <= _DUST:
+                self.lots.pop()
+        self._consumed(removed, removed_cost)
+
+    def _consumed(self, quantity: float, cost: float) -> None:
+        self.quantity -= quantity
+        self.cost -= cost
+        if self.quantity <= _DUST or not self.lots:
+            self.lots.clear()
+            self.quantity = self.cost = self.average_cost = 0.0
+
+    def apply_trade(self, side: str, amount: float, price: float, fee_cost: float = 0.0,
+                    fee_currency: Optional[str] = None, base: Optional[str] = None) -> float:
+        """
+        Apply one fill. Fees in the base asset reduce the holding, other
+        fees are assumed to be in the quote currency; fees charged in a
+        third currency (e.g. BNB discounts) are ignored. Returns realized P&L.
+        """
+        fee_cost = float(fee_cost or 0.0)
+        fee_in_base = base is not None and fee_currency == base
+        in_quote = fee_currency is None or fee_currency in _QUOTE_FEE_CURRENCIES
+        quote_fee = fee_cost if in_quote and not fee_in_base else 0.0
+
+        if side == 'buy':
+            self.buy(amount, price, quote_fee)
+            if fee_in_base:
+                self.reduce(fee_cost)
+            return 0.0
+        pnl = self.sell(amount, price, quote_fee)
+        if fee_in_base:
+            self.reduce(fee_cost)
+        return pnl
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "quantity": self.quantity,
+            "cost": self.cost,
+            "average_cost": self.average_cost,
+            "realized_pnl": self.realized_pnl,
+            "lots": [list(lot) for lot in self.lots],
+        }
+
+    @classmethod
+    def from_row(cls, row: Any) -> "CostBasis":
+        """Build from a mapping or an ORM row with the ``to_dict`` fields."""
+        get = row.get if isinstance(row, dict) else (lambda key: getattr(row, key, None))
+        return cls(
+            quantity=float(get("quantity") or 0.0),
+            cost=float(get("cost") or 0.0),
+            average_cost=float(get("average_cost") or 0.0),
+            realized_pnl=float(get("realized_pnl") or 0.0),
+            lots=deque([float(qty), float(price)] for qty, price in (get("lots") or [])),
+        )
+
@@ -0,0 +1,67 @@
+"""
+Time-series downsampling for charts.
+
+Largest-Triangle-Three-Buckets (LTTB) keeps the visual shape of a series
+(peaks, troughs, trend changes) while reducing it to a fixed point budget,
+so chart payloads cost the same regardless of the requested period.
+"""
+
+from typing import List, Sequence
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Return the indices of the points LTTB keeps.
+
+    Args:
+        xs: Monotonic x values (e.g. epoch seconds)
+        ys: Values aligned to ``xs``
+        threshold: Number of points to keep (first and last are always kept)
+
+    Returns:
+        Sorted list of indices into the input series
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        # Pick the point in this bucket forming the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best_index = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best_index = j
+
+        selected.append(best_index)
+        a = best_index
+
+    selected.append(n - 1)
+    return selected
+
+
+def lttb(points: Sequence[tuple], threshold: int) -> List[tuple]:
+    """Downsample ``(x, y, ...)`` tuples; extra tuple fields are carried along."""
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return [points[i] for i in lttb_indices(xs, ys, threshold)]
@@ -0,0 +1,181 @@
+"""
+Running trade-performance aggregates.
+
+Each closed trade folds into a fixed set of counters (count, wins, sums,
+sum of squares, equity peak/trough, max drawdown, best/worst), so reading
+win rate, P&L, volatility or drawdown never requires replaying the trade
+history. Aggregates of consecutive periods can be merged, which lets a
+rolling window be answered from a handful of daily buckets.
+"""
+
+import math
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Aware UTC datetime; naive values are taken as UTC (timestamptz columns come back aware)."""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def daily_pnl_sharpe(daily_pnls: Sequence[float], periods_per_year: int = 252) -> float:
+    """
+    Annualized Sharpe ratio of daily realized P&L (zero risk-free rate).
+
+    Scale-free, so no account balance is needed; days without closed trades
+    are not counted.
+    """
+    if len(daily_pnls) < 2:
+        return 0.0
+    mean = sum(daily_pnls) / len(daily_pnls)
+    variance = sum((pnl - mean) ** 2 for pnl in daily_pnls) / (len(daily_pnls) - 1)
+    std = math.sqrt(variance)
+    return mean / std * math.sqrt(periods_per_year) if std else 0.0
+
+
+@dataclass
+class PerformanceAggregate:
+    """
+    Running statistics over a sequence of realized trade P&Ls.
+
+    Equity fields are relative to the start of the aggregated period:
+    ``equity`` is the net P&L, ``peak_equity``/``trough_equity`` the highest
+    and lowest cumulative P&L reached (both include the 0 starting point),
+    and ``max_drawdown`` the deepest fall from a running peak (<= 0).
+    """
+    trade_count: int = 0
+    win_count: int = 0
+    loss_count: int = 0
+    pnl_sum: float = 0.0
+    pnl_sum_sq: float = 0.0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    volume: float = 0.0
+    best_trade: Optional[float] = None
+    worst_trade: Optional[float] = None
+    equity: float = 0.0
+    peak_equity: float = 0.0
+    trough_equity: float = 0.0
+    max_drawdown: float = 0.0
+    first_trade_at: Optional[datetime] = None
+    last_trade_at: Optional[datetime] = None
+
+    def add(self, pnl: float, volume: float = 0.0, at: Optional[datetime] = None) -> None:
+        """Fold one closed trade into the aggregate (trades must arrive in close order)."""
+        pnl = float(pnl)
+        self.trade_count += 1
+        if pnl > 0:
+            self.win_count += 1
+            self.gross_profit += pnl
+        elif pnl < 0:
+            self.loss_count += 1
+            self.gross_loss += pnl
+        self.pnl_sum += pnl
+        self.pnl_sum_sq += pnl * pnl
+        self.volume += abs(float(volume or 0.0))
+        self.best_trade = pnl if self.best_trade is None else max(self.best_trade, pnl)
+        self.worst_trade = pnl if self.worst_trade is None else min(self.worst_trade, pnl)
+
+        self.equity += pnl
+        self.peak_equity = max(self.peak_equity, self.equity)
+        self.trough_equity = min(self.trough_equity, self.equity)
+        self.max_drawdown = min(self.max_drawdown, self.equity - self.peak_equity)
+        if at is not None:
+            at = _as_utc(at)
+            if self.first_trade_at is None or at < self.first_trade_at:
+                self.first_trade_at = at
+            if self.last_trade_at is None or at > self.last_trade_at:
+                self.last_trade_at = at
+
+    def merge(self, later: "PerformanceAggregate") -> "PerformanceAggregate":
+        """
+        Append an aggregate covering a period that follows this one.
+
+        Drawdown composes exactly: inside ``later`` the running peak is the
+        larger of our peak and our equity plus its own peak, so the deepest
+        point is either its internal drawdown or its trough measured from
+        our peak.
+        """
+        if later.trade_count == 0:
+            return self
+        base = self.equity
+        self.max_drawdown = min(
+            self.max_drawdown,
+            later.max_drawdown,
+            base + later.trough_equity - self.peak_equity,
+        )
+        self.peak_equity = max(self.peak_equity, base + later.peak_equity)
+        self.trough_equity = min(self.trough_equity, base + later.trough_equity)
+        self.equity = base + later.equity
+
+        self.trade_count += later.trade_count
+        self.win_count += later.win_count
+        self.loss_count += later.loss_count
+        self.pnl_sum += later.pnl_sum
+        self.pnl_sum_sq += later.pnl_sum_sq
+        self.gross_profit += later.gross_profit
+        self.gross_loss += later.gross_loss
+        self.volume += later.volume
+        for name, pick in (
+            ("best_trade", max), ("worst_trade", min), ("first_trade_at", min), ("last_trade_at", max)
+        ):
+            ours, theirs = getattr(self, name), getattr(later, name)
+            if name.endswith("_at"):
+                ours, theirs = _as_utc(ours), _as_utc(theirs)
+            if theirs is not None:
+                setattr(self, name, theirs if ours is None else pick(ours, theirs))
+        return self
+
+    # -- Derived metrics ----------------------------------------------------
+    @property
+    def win_rate(self) -> float:
+        return self.win_count / self.trade_count * 100 if self.trade_count else 0.0
+
+    @property
+    def mean_pnl(self) -> float:
+        return self.pnl_sum / self.trade_count if self.trade_count else 0.0
+
+    @property
+    def pnl_std(self) -> float:
+        """Sample standard deviation of per-trade P&L."""
+        if self.trade_count < 2:
+            return 0.0
+        variance = (self.pnl_sum_sq - self.pnl_sum * self.pnl_sum / self.trade_count) / (self.trade_count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def average_win(self) -> float:
+        return self.gross_profit / self.win_count if self.win_count else 0.0
+
+    @property
+    def average_loss(self) -> float:
+        return self.gross_loss / self.loss_count if self.loss_count else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        return self.gross_profit / -self.gross_loss if self.gross_loss < 0 else 0.0
+
+    @property
+    def pnl_percentage(self) -> float:
+        """Net P&L relative to traded notional."""
+        return self.pnl_sum / self.volume * 100 if self.volume else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_row(cls, row: Any) -> "PerformanceAggregate":
+        """Build from any object or mapping exposing the aggregate's field names."""
+        get = row.get if isinstance(row, dict) else (lambda name: getattr(row, name, None))
+        values = {}
+        for f in fields(cls):
+            value = get(f.name)
+            if value is None and f.default is not None:
+                value = f.default
+            if isinstance(value, datetime):
+                value = _as_utc(value)
+            values[f.name] = value
+        return cls(**values)
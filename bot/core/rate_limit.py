@@ -0,0 +1,323 @@
+"""
+Shared rate-limit primitives.
+
+- ``TokenBucket``: smooth burst control, O(1) state per key.
+- ``SlidingWindowCounter``: fixed-memory sliding window. Keeps the count of
+  the current and previous fixed window and weights the previous one by
+  how much of it still overlaps the sliding window, so checking and
+  recording are O(1) regardless of request volume.
+- ``SlidingWindowLimiter``: several windows (e.g. minute/hour/day) per key
+  on top of a backend. ``LocalRateLimitBackend`` keeps counters in an LRU
+  map bounded by ``max_keys`` and evicts keys idle for ``idle_ttl``;
+  ``RedisRateLimitBackend`` stores the same counters in Redis so limits
+  hold across worker processes.
+
+Windows are aligned to epoch multiples of their length, which lets every
+process (and Redis) agree on window boundaries.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket: ``capacity`` burst, refilled at ``rate`` tokens per second."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float, now: Optional[float] = None):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self, now: Optional[float] = None) -> float:
+        self._refill(time.monotonic() if now is None else now)
+        return self.tokens
+
+    def try_acquire(self, tokens: float = 1.0, now: Optional[float] = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
+
+    def consume(self, tokens: float = 1.0, now: Optional[float] = None):
+        """Take tokens unconditionally; the bucket may go negative (debt)."""
+        self._refill(time.monotonic() if now is None else now)
+        self.tokens -= tokens
+
+    def retry_after(self, tokens: float = 1.0, now: Optional[float] = None) -> float:
+        missing = tokens - self.available(now)
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else math.inf
+
+
+def _window_start(now: float, window: float) -> float:
+    return now - now % window
+
+
+def _weighted_count(previous: float, current: float, start: float, window: float, now: float) -> float:
+    overlap = 1.0 - (now - start) / window
+    return previous * max(overlap, 0.0) + current
+
+
+# Absorbs float error when comparing weighted counts against integer limits
+_EPSILON = 1e-9
+
+
+def _window_retry_after(previous: float, current: float, start: float, window: float,
+                        target: float, now: float) -> float:
+    """Seconds until the weighted count decays to ``target`` with no new requests."""
+    if _weighted_count(previous, current, start, window, now) <= target + _EPSILON:
+        return 0.0
+    if target <= 0:
+        return math.inf
+    if current <= target:
+        # The previous window's share decays within the current window
+        at = start + window * (1.0 - (target - current) / previous)
+    else:
+        # Wait for the current window to become "previous" and decay
+        at = start + window + window * (1.0 - target / current)
+    return max(0.0, at - now)
+
+
+class SlidingWindowCounter:
+    """Fixed-memory sliding-window counter (current + previous fixed window)."""
+
+    __slots__ = ("window", "start", "current", "previous")
+
+    def __init__(self, window: float, now: float):
+        self.window = window
+        self.start = _window_start(now, window)
+        self.current = 0
+        self.previous = 0
+
+    def _roll(self, now: float):
+        start = _window_start(now, self.window)
+        if start != self.start:
+            self.previous = self.current if start - self.start == self.window else 0
+            self.current = 0
+            self.start = start
+
+    def state(self, now: float) -> Tuple[float, float, float]:
+        """(previous, current, window_start) after rolling to ``now``."""
+        self._roll(now)
+        return self.previous, self.current, self.start
+
+    def add(self, now: float, amount: int = 1):
+        self._roll(now)
+        self.current += amount
+
+    def count(self, now: float) -> float:
+        self._roll(now)
+        return _weighted_count(self.previous, self.current, self.start, self.window, now)
+
+
+class LocalRateLimitBackend:
+    """In-process counters in an LRU map with idle-key eviction."""
+
+    def __init__(self, max_keys: int = 10000, idle_ttl: Optional[float] = None):
+        self.max_keys = max_keys
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[Any, list]" = OrderedDict()  # key -> [last_seen, counters]
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _counters(self, key: Any, windows: Sequence[float], now: float, create: bool) -> Optional[List[SlidingWindowCounter]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[0] = now
+            self._entries.move_to_end(key)
+            return entry[1]
+        self._evict_idle(now)
+        if not create:
+            return None
+        counters = [SlidingWindowCounter(window, now) for window in windows]
+        self._entries[key] = [now, counters]
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+        return counters
+
+    def _evict_idle(self, now: float):
+        if self.idle_ttl is None:
+            return
+        # Least recently used first, so stop at the first key still active
+        while self._entries:
+            key, (last_seen, _) = next(iter(self._entries.items()))
+            if now - last_seen < self.idle_ttl:
+                break
+            del self._entries[key]
+            self.evicted += 1
+
+    def states(self, key: Any, windows: Sequence[float], now: float) -> List[Tuple[float, float, float]]:
+        counters = self._counters(key, windows, now, create=False)
+        if counters is None:
+            return [(0, 0, _window_start(now, window)) for window in windows]
+        return [counter.state(now) for counter in counters]
+
+    def add(self, key: Any, windows: Sequence[float], now: float, amount: int = 1):
+        for counter in self._counters(key, windows, now, create=True):
+            counter.add(now, amount)
+
+    def reset(self, key: Any = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def export_state(self, keys: Optional[Sequence[Any]] = None) -> Dict[str, list]:
+        """Counters as ``{str(key): [[window, start, current, previous], ...]}`` (for snapshots)."""
+        return {
+            str(key): [[c.window, c.start, c.current, c.previous] for c in counters]
+            for key, (_, counters) in self._entries.items()
+            if keys is None or key in keys
+        }
+
+    def restore_state(self, state: Dict[str, list], now: Optional[float] = None):
+        """Load counters from ``export_state``; stale windows roll over on first use."""
+        now = time.time() if now is None else now
+        for key, rows in state.items():
+            counters = []
+            for window, start, current, previous in rows:
+                counter = SlidingWindowCounter(window, start)
+                counter.current, counter.previous = current, previous
+                counters.append(counter)
+            self._entries[key] = [now, counters]
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+
+class RedisRateLimitBackend:
+    """
+    Counters shared through Redis (``redis.Redis``-compatible sync client).
+
+    Each (key, window) uses one integer per fixed window, expiring after two
+    windows, so idle keys disappear on their own. One MGET per check and one
+    pipelined INCRBY/EXPIRE per record.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: Any, window: float, start: float) -> str:
+        return f"{self.prefix}:{key}:{int(window)}:{int(start)}"
+
+    def states(self, key: Any, windows: Sequence[float], now: float) -> List[Tuple[float, float, float]]:
+        starts = [_window_start(now, window) for window in windows]
+        names = []
+        for window, start in zip(windows, starts):
+            names += [self._key(key, window, start - window), self._key(key, window, start)]
+        values = self.client.mget(names)
+        return [
+            (int(values[2 * i] or 0), int(values[2 * i + 1] or 0), start)
+            for i, start in enumerate(starts)
+        ]
+
+    def add(self, key: Any, windows: Sequence[float], now: float, amount: int = 1):
+        pipe = self.client.pipeline()
+        for window in windows:
+            name = self._key(key, window, _window_start(now, window))
+            pipe.incrby(name, amount)
+            pipe.expire(name, int(window * 2) + 1)
+        pipe.execute()
+
+    def reset(self, key: Any = None):
+        pattern = f"{self.prefix}:{'*' if key is None else key}:*"
+        for name in self.client.scan_iter(match=pattern):
+            self.client.delete(name)
+
+
+class SlidingWindowLimiter:
+    """
+    Multi-window sliding limiter keyed by user, IP, component...
+
+    Args:
+        windows: ``(name, limit, seconds)`` tuples, checked in order
+        backend: Shared backend (e.g. ``RedisRateLimitBackend``); local if None
+        max_keys / idle_ttl: Bounds for the local backend (and the fallback
+            used when the shared backend errors)
+    """
+
+    def __init__(self, windows: Sequence[Tuple[str, int, float]], backend: Any = None,
+                 max_keys: int = 10000, idle_ttl: Optional[float] = None):
+        self.windows = [(name, limit, float(seconds)) for name, limit, seconds in windows]
+        self._lengths = [seconds for _, _, seconds in self.windows]
+        self.local = LocalRateLimitBackend(max_keys=max_keys, idle_ttl=idle_ttl)
+        self.backend = backend or self.local
+        self._backend_failed_at = 0.0
+
+    def _call(self, method: str, *args):
+        backend = self.backend
+        if backend is not self.local and time.monotonic() - self._backend_failed_at > 30.0:
+            try:
+                return getattr(backend, method)(*args)
+            except Exception as e:
+                # Keep limiting per process rather than failing open or closed
+                self._backend_failed_at = time.monotonic()
+                logger.warning(f"Shared rate-limit backend unavailable, using local counters: {e}")
+        return getattr(self.local, method)(*args)
+
+    def _states(self, key: Any, now: float) -> List[Tuple[float, float, float]]:
+        return self._call("states", key, self._lengths, now)
+
+    def counts(self, key: Any, now: Optional[float] = None) -> Dict[str, float]:
+        now = time.time() if now is None else now
+        return {
+            name: _weighted_count(previous, current, start, seconds, now)
+            for (name, _, seconds), (previous, current, start) in zip(self.windows, self._states(key, now))
+        }
+
+    def check(self, key: Any, amount: int = 1, now: Optional[float] = None) -> Optional[str]:
+        """Name of the first window that ``amount`` more requests would exceed, or None."""
+        now = time.time() if now is None else now
+        for (name, limit, seconds), (previous, current, start) in zip(self.windows, self._states(key, now)):
+            if _weighted_count(previous, current, start, seconds, now) + amount > limit + _EPSILON:
+                return name
+        return None
+
+    def record(self, key: Any, amount: int = 1, now: Optional[float] = None):
+        self._call("add", key, self._lengths, time.time() if now is None else now, amount)
+
+    def hit(self, key: Any, amount: int = 1, now: Optional[float] = None) -> Optional[str]:
+        """Check and, if allowed, record. Returns the exceeded window name or None."""
+        now = time.time() if now is None else now
+        exceeded = self.check(key, amount, now)
+        if exceeded is None:
+            self.record(key, amount, now)
+        return exceeded
+
+    def remaining(self, key: Any, now: Optional[float] = None) -> Dict[str, int]:
+        counts = self.counts(key, now)
+        return {name: max(0, int(limit - math.ceil(counts[name] - _EPSILON))) for name, limit, _ in self.windows}
+
+    def retry_after(self, key: Any, name: Optional[str] = None, now: Optional[float] = None) -> float:
+        """Seconds until ``name`` (or every window) admits one more request."""
+        now = time.time() if now is None else now
+        wait = 0.0
+        for (window_name, limit, seconds), (previous, current, start) in zip(self.windows, self._states(key, now)):
+            if name is None or window_name == name:
+                wait = max(wait, _window_retry_after(previous, current, start, seconds, limit - 1, now))
+        return wait
+
+    def reset(self, key: Any = None):
+        self._call("reset", key)
+        if self.backend is not self.local:
+            self.local.reset(key)
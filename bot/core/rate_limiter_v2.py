@@ -10,13 +10,14 @@ Different components have different rate limits:
 
 import asyncio
 import logging
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 from enum import Enum
 from functools import wraps
 import time
 
+from bot.core.rate_limit import SlidingWindowLimiter, TokenBucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -99,32 +100,15 @@ class RateLimitExceeded(Exception):
         )
 
 
-@dataclass
-class RequestLog:
-    """Log of requests for rate limiting."""
-    timestamps: List[float] = field(default_factory=list)
-    
-    def add(self, timestamp: float = None):
-        self.timestamps.append(timestamp or time.time())
-    
-    def count_since(self, since: float) -> int:
-        """Count requests since timestamp."""
-        return sum(1 for ts in self.timestamps if ts >= since)
-    
-    def cleanup(self, before: float):
-        """Remove entries older than timestamp."""
-        self.timestamps = [ts for ts in self.timestamps if ts >= before]
-
-
 class ComponentRateLimiter:
     """
     Per-component rate limiter with sliding window algorithm.
     
     Features:
     1. Separate limits per component
-    2. Minute/hour/day windows
-    3. Burst protection
-    4. Automatic cleanup of old entries
+    2. Minute/hour/day windows (fixed-memory sliding counters, O(1) checks)
+    3. Burst protection (token bucket)
+    4. Optional shared backend so limits hold across worker processes
     5. Async-safe
     
     Usage:
@@ -141,20 +125,48 @@ class ComponentRateLimiter:
             ...
     """
     
-    def __init__(self, configs: Dict[Component, RateLimitConfig] = None):
+    def __init__(self, configs: Dict[Component, RateLimitConfig] = None, backend: Any = None):
+        """
+        Args:
+            configs: Per-component limits (defaults to DEFAULT_RATE_LIMITS)
+            backend: Optional shared counter backend, e.g.
+                ``RedisRateLimitBackend(redis_client, prefix="components")``
+        """
         self.configs = configs or DEFAULT_RATE_LIMITS
-        self._request_logs: Dict[Component, RequestLog] = {
-            c: RequestLog() for c in Component
-        }
+        self.backend = backend
+        self._windows: Dict[Component, SlidingWindowLimiter] = {}
+        self._bursts: Dict[Component, TokenBucket] = {}
         self._cooldown_until: Dict[Component, float] = {}
         self._lock = asyncio.Lock()
-        self._last_cleanup = time.time()
-        self._cleanup_interval = 300  # 5 minutes
     
     def _get_config(self, component: Component) -> RateLimitConfig:
         """Get rate limit config for component."""
         return self.configs.get(component, RateLimitConfig())
     
+    def _get_windows(self, component: Component) -> SlidingWindowLimiter:
+        limiter = self._windows.get(component)
+        if limiter is None:
+            config = self._get_config(component)
+            limiter = SlidingWindowLimiter(
+                [
+                    ('minute', config.max_requests_per_minute, 60),
+                    ('hour', config.max_requests_per_hour, 3600),
+                    ('day', config.max_requests_per_day, 86400),
+                ],
+                backend=self.backend,
+                max_keys=1,
+            )
+            self._windows[component] = limiter
+        return limiter
+    
+    def _get_burst(self, component: Component) -> TokenBucket:
+        bucket = self._bursts.get(component)
+        if bucket is None:
+            limit = self._get_config(component).burst_limit
+            bucket = TokenBucket(capacity=limit, rate=limit)
+            self._bursts[component] = bucket
+        return bucket
+    
     def can_proceed(self, component: Component, user_id: str = None) -> bool:
         """
         Check if a request can proceed for the given component.
@@ -176,26 +188,21 @@ class ComponentRateLimiter:
                 del self._cooldown_until[component]
         
         config = self._get_config(component)
-        log = self._request_logs[component]
         
-        # Check burst limit (last 1 second)
-        if log.count_since(now - 1) >= config.burst_limit:
+        # Check burst limit (~1 second of tokens)
+        if self._get_burst(component).available() < 1:
             logger.warning(f"🚫 Burst limit hit for {component.value}")
             return False
         
-        # Check minute limit
-        if log.count_since(now - 60) >= config.max_requests_per_minute:
+        exceeded = self._get_windows(component).check(component.value, now=now)
+        if exceeded == 'minute':
             logger.warning(f"🚫 Minute limit hit for {component.value}")
             return False
-        
-        # Check hour limit
-        if log.count_since(now - 3600) >= config.max_requests_per_hour:
+        if exceeded == 'hour':
             logger.warning(f"🚫 Hour limit hit for {component.value}")
             self._set_cooldown(component, config.cooldown_after_limit)
             return False
-        
-        # Check day limit
-        if log.count_since(now - 86400) >= config.max_requests_per_day:
+        if exceeded == 'day':
             logger.warning(f"🚫 Day limit hit for {component.value}")
             self._set_cooldown(component, config.cooldown_after_limit * 2)
             return False
@@ -204,42 +211,33 @@ class ComponentRateLimiter:
     
     def record_request(self, component: Component, user_id: str = None):
         """Record a request for the component."""
-        self._request_logs[component].add()
-        
-        # Periodic cleanup
-        if time.time() - self._last_cleanup > self._cleanup_interval:
-            self._cleanup()
+        self._get_burst(component).try_acquire()
+        self._get_windows(component).record(component.value)
     
     def _set_cooldown(self, component: Component, duration: float):
         """Set cooldown for component."""
         self._cooldown_until[component] = time.time() + duration
         logger.warning(f"⏳ Cooldown set for {component.value}: {duration}s")
     
-    def _cleanup(self):
-        """Clean up old request logs."""
-        cutoff = time.time() - 86400  # Keep last 24h
-        for log in self._request_logs.values():
-            log.cleanup(cutoff)
-        self._last_cleanup = time.time()
-    
     def get_remaining(self, component: Component) -> Dict[str, int]:
         """Get remaining requests for each window."""
-        now = time.time()
-        config = self._get_config(component)
-        log = self._request_logs[component]
+        remaining = self._get_windows(component).remaining(component.value)
         
         return {
-            'per_minute': max(0, config.max_requests_per_minute - log.count_since(now - 60)),
-            'per_hour': max(0, config.max_requests_per_hour - log.count_since(now - 3600)),
-            'per_day': max(0, config.max_requests_per_day - log.count_since(now - 86400)),
-            'burst': max(0, config.burst_limit - log.count_since(now - 1))
+            'per_minute': remaining['minute'],
+            'per_hour': remaining['hour'],
+            'per_day': remaining['day'],
+            'burst': int(self._get_burst(component).available())
         }
     
     def get_retry_after(self, component: Component) -> float:
         """Get seconds until component can make requests again."""
         if component in self._cooldown_until:
             return max(0, self._cooldown_until[component] - time.time())
-        return 0
+        return max(
+            self._get_burst(component).retry_after(),
+            self._get_windows(component).retry_after(component.value)
+        )
     
     def rate_limited(self, component: Component, raise_on_limit: bool = True):
         """
@@ -279,14 +277,12 @@ class ComponentRateLimiter:
     
     def reset(self, component: Component = None):
         """Reset rate limits for component or all."""
-        if component:
-            self._request_logs[component] = RequestLog()
-            if component in self._cooldown_until:
-                del self._cooldown_until[component]
-        else:
-            for c in Component:
-                self._request_logs[c] = RequestLog()
-            self._cooldown_until.clear()
+        components = [component] if component else list(Component)
+        for c in components:
+            if c in self._windows:
+                self._windows[c].reset(c.value)
+            self._bursts.pop(c, None)
+            self._cooldown_until.pop(c, None)
 
 
 # Global singleton
@@ -0,0 +1,192 @@
+"""
+Incrementally maintained trading statistics for position sizing.
+
+Every closed trade and every closed trading day is folded into a handful of
+running numbers: Welford mean/variance (numerically stable), win/loss counts
+and sums, the last ``KELLY_WINDOW_TRADES`` P&Ls per symbol and one return per
+recent trading day. Kelly, Sharpe and VaR then read these directly instead of
+querying and re-aggregating history on every sizing decision.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Version of the serialized form; older payloads are rebuilt from the trades
+PAYLOAD_VERSION = 2
+
+# Kelly sizing looks at a symbol's most recent closed trades only
+KELLY_WINDOW_TRADES = 100
+
+# Daily returns kept for lookback windows (VaR/Sharpe), in calendar days
+MAX_LOOKBACK_DAYS = 366
+
+
+@dataclass
+class RunningMoments:
+    """Welford running mean and (population) variance."""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+
+@dataclass
+class TradeOutcomes:
+    """P&L moments and win/loss tallies of closed trades."""
+    pnl: RunningMoments = field(default_factory=RunningMoments)
+    wins: int = 0
+    losses: int = 0
+    win_sum: float = 0.0
+    loss_sum: float = 0.0
+
+    def add(self, pnl: float) -> None:
+        self.pnl.add(pnl)
+        if pnl > 0:
+            self.wins += 1
+            self.win_sum += pnl
+        elif pnl < 0:
+            self.losses += 1
+            self.loss_sum += pnl
+
+    @property
+    def decided(self) -> int:
+        """Trades that were a win or a loss (break-even trades excluded)."""
+        return self.wins + self.losses
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.decided if self.decided else 0.5
+
+    @property
+    def avg_win(self) -> float:
+        return self.win_sum / self.wins if self.wins else 0.0
+
+    @property
+    def avg_loss(self) -> float:
+        return self.loss_sum / self.losses if self.losses else 0.0
+
+    def to_list(self) -> List[float]:
+        return [self.pnl.count, self.pnl.mean, self.pnl.m2, self.wins, self.losses, self.win_sum, self.loss_sum]
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> "TradeOutcomes":
+        count, mean, m2, wins, losses, win_sum, loss_sum = values
+        return cls(RunningMoments(int(count), mean, m2), int(wins), int(losses), win_sum, loss_sum)
+
+
+class RollingTradingStats:
+    """
+    Per-user trading statistics, updated on trade close and day close.
+
+    Trades accumulate into the current UTC day; when a trade or equity
+    update arrives on a later day, the finished day's P&L is turned into a
+    return on the account equity recorded before it. Only days with closed
+    trades count as trading days, and a day is skipped while no equity is
+    known (there is nothing to take a return on).
+    """
+
+    def __init__(self):
+        self.trades = TradeOutcomes()
+        self.symbol_pnls: Dict[str, Deque[float]] = {}
+        self.daily = RunningMoments()
+        self.recent_days: Deque[Tuple[int, float, int]] = deque()  # (date ordinal, return, trades)
+        self.day: Optional[int] = None  # date ordinal of the open day
+        self.day_pnl = 0.0
+        self.day_trades = 0
+        self.reference_equity: Optional[float] = None
+        self.last_trade_at: Optional[datetime] = None
+
+    def _roll(self, at: datetime) -> None:
+        today = at.date().toordinal()
+        if self.day is not None and today > self.day:
+            self.close_day()
+        if self.day is None or today > self.day:
+            self.day = today
+
+    def add_trade(self, symbol: Optional[str], pnl: float, at: Optional[datetime] = None) -> None:
+        at = at or datetime.utcnow()
+        self._roll(at)
+        pnl = float(pnl)
+        self.trades.add(pnl)
+        if symbol:
+            self.symbol_pnls.setdefault(symbol, deque(maxlen=KELLY_WINDOW_TRADES)).append(pnl)
+        self.day_pnl += pnl
+        self.day_trades += 1
+        self.last_trade_at = at
+
+    def record_equity(self, equity: float, at: Optional[datetime] = None) -> None:
+        """Latest account equity; becomes the base of the next day's return."""
+        self._roll(at or datetime.utcnow())
+        if equity and equity > 0:
+            self.reference_equity = float(equity)
+
+    def close_day(self) -> None:
+        """Fold the open day's P&L into the daily return statistics."""
+        if self.day_trades and self.reference_equity:
+            daily_return = self.day_pnl / self.reference_equity
+            self.daily.add(daily_return)
+            self.recent_days.append((self.day, daily_return, self.day_trades))
+            while self.recent_days and self.recent_days[0][0] < self.day - MAX_LOOKBACK_DAYS:
+                self.recent_days.popleft()
+        self.day_pnl = 0.0
+        self.day_trades = 0
+
+    def daily_returns(self, lookback_days: int, as_of: Optional[date] = None) -> List[Tuple[float, int]]:
+        """(return, trades) of the closed trading days in the last ``lookback_days`` days."""
+        cutoff = (as_of or datetime.utcnow().date()).toordinal() - lookback_days
+        return [(daily_return, trades) for day, daily_return, trades in self.recent_days if day >= cutoff]
+
+    def symbol_outcomes(self, symbol: str) -> TradeOutcomes:
+        """Outcomes of the symbol's last ``KELLY_WINDOW_TRADES`` closed trades."""
+        outcomes = TradeOutcomes()
+        for pnl in self.symbol_pnls.get(symbol, ()):
+            outcomes.add(pnl)
+        return outcomes
+
+    @property
+    def open_day(self) -> Optional[date]:
+        return date.fromordinal(self.day) if self.day is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "v": PAYLOAD_VERSION,
+            "t": self.trades.to_list(),
+            "s": {symbol: list(pnls) for symbol, pnls in self.symbol_pnls.items()},
+            "d": [self.daily.count, self.daily.mean, self.daily.m2],
+            "r": [list(day) for day in self.recent_days],
+            "o": [self.day, self.day_pnl, self.day_trades, self.reference_equity],
+            "l": self.last_trade_at.isoformat() if self.last_trade_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "RollingTradingStats":
+        if payload.get("v") != PAYLOAD_VERSION:
+            raise ValueError(f"rolling stats payload version {payload.get('v')} != {PAYLOAD_VERSION}")
+        stats = cls()
+        stats.trades = TradeOutcomes.from_list(payload["t"])
+        stats.symbol_pnls = {
+            symbol: deque(pnls, maxlen=KELLY_WINDOW_TRADES) for symbol, pnls in payload["s"].items()
+        }
+        count, mean, m2 = payload["d"]
+        stats.daily = RunningMoments(int(count), mean, m2)
+        stats.recent_days = deque((int(day), daily_return, int(trades)) for day, daily_return, trades in payload["r"])
+        stats.day, stats.day_pnl, stats.day_trades, stats.reference_equity = payload["o"]
+        stats.day_trades = int(stats.day_trades)
+        stats.last_trade_at = datetime.fromisoformat(payload["l"]) if payload.get("l") else None
+        return stats
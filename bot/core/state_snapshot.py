@@ -0,0 +1,140 @@
+"""
+Versioned local snapshot of a bot process's in-memory state.
+
+A snapshot is one file: a fixed binary header (magic, format version,
+creation time, payload length, CRC32) followed by a JSON payload of named
+sections (monitored positions, market metadata, caches, rate-limit
+windows...). It is written atomically (temp file + fsync + rename), so a
+crash mid-write leaves the previous snapshot intact, and read back through
+``mmap`` so a restart restores state without touching the network.
+
+Sections are plain JSON-compatible values produced and consumed by the
+components that own them; this module only guarantees that what is read
+back is exactly one complete, uncorrupted write of a known format version.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"ASESNAP\x00"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# magic, format version, created (ms since epoch), payload length, crc32
+_HEADER = struct.Struct("<8sIQQI")
+
+
+@dataclass
+class StateSnapshot:
+    """Sections of one snapshot and when it was taken."""
+    created_at: float  # epoch seconds
+    sections: Dict[str, Any]
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.created_at)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.sections.get(name, default)
+
+
+class StateSnapshotStore:
+    """Read and atomically write snapshot files at ``path``."""
+
+    # CRC32 of the last payload this process wrote to each path
+    _written_crcs: Dict[Path, int] = {}
+    # One writer per path at a time; stores for the same path share the lock
+    _path_locks: Dict[Path, threading.Lock] = {}
+    _path_locks_guard = threading.Lock()
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with self._path_locks_guard:
+            self._lock = self._path_locks.setdefault(self.path, threading.Lock())
+
+    def write(self, sections: Dict[str, Any], created_at: Optional[float] = None,
+              only_if_changed: bool = False) -> int:
+        """
+        Write ``sections`` as the new snapshot. Returns the file size in bytes.
+
+        With ``only_if_changed``, nothing is written (and 0 is returned) when
+        the payload matches the last one this process wrote to ``path``.
+        """
+        created_at = time.time() if created_at is None else created_at
+        payload = json.dumps(sections, separators=(",", ":"), default=str).encode("utf-8")
+        crc = zlib.crc32(payload) & 0xFFFFFFFF
+        header = _HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, int(created_at * 1000), len(payload), crc,
+        )
+        with self._lock:
+            if only_if_changed and self._written_crcs.get(self.path) == crc and self.path.exists():
+                return 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temp name: other threads and processes write next to us
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(header)
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_name, self.path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except FileNotFoundError:
+                    pass
+                raise
+            self._written_crcs[self.path] = crc
+        return _HEADER.size + len(payload)
+
+    def read(self, max_age: Optional[float] = None) -> Optional[StateSnapshot]:
+        """
+        Load the snapshot, or None when it is missing, older than ``max_age``
+        seconds, of another format version, truncated or corrupt.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < _HEADER.size:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    magic, version, created_ms, length, crc = _HEADER.unpack_from(mapped, 0)
+                    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+                        logger.warning(f"Ignoring state snapshot {self.path}: unknown format (v{version})")
+                        return None
+                    if _HEADER.size + length != size:
+                        logger.warning(f"Ignoring truncated state snapshot {self.path}")
+                        return None
+                    payload = mapped[_HEADER.size:]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Could not read state snapshot {self.path}: {e}")
+            return None
+
+        if zlib.crc32(payload) & 0xFFFFFFFF != crc:
+            logger.warning(f"Ignoring corrupt state snapshot {self.path} (checksum mismatch)")
+            return None
+        snapshot = StateSnapshot(created_at=created_ms / 1000.0, sections=json.loads(payload))
+        if max_age is not None and snapshot.age_seconds > max_age:
+            logger.info(f"State snapshot {self.path} is {snapshot.age_seconds:.0f}s old, ignoring")
+            return None
+        return snapshot
+
+    def remove(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -2,24 +2,31 @@
 
 from __future__ import annotations
 
+import logging
 import os
 from contextlib import AbstractContextManager
 from dataclasses import asdict, dataclass
-from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import uuid
 
+from bot.core.cost_basis import CostBasis
+from bot.core.performance_metrics import PerformanceAggregate
+from bot.core.rolling_stats import PAYLOAD_VERSION as ROLLING_STATS_VERSION, RollingTradingStats
+
 # Load environment variables early to ensure DATABASE_URL is available
 from dotenv import load_dotenv
 load_dotenv()
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -32,6 +39,8 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, relationship, sessionmaker
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_DATABASE_URL = "sqlite:///trading.db"
 
 Base = declarative_base()
@@ -310,6 +319,188 @@ class PortfolioSnapshot(Base):  # type: ignore[misc]
     metadata_payload = Column("metadata", JSON, nullable=True)
 
 
+# Rollup resolutions maintained for portfolio snapshots (name -> bucket seconds)
+PORTFOLIO_ROLLUP_RESOLUTIONS: Dict[str, int] = {"1m": 60, "1h": 3600, "1d": 86400}
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    """Aware UTC datetime; naive values (SQLite, datetime.utcnow) are taken as UTC."""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _bucket_start(timestamp: datetime, seconds: int) -> datetime:
+    """Floor a timestamp to the start of its rollup bucket."""
+    if seconds >= 86400:
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if seconds >= 3600:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(second=0, microsecond=0)
+
+
+class PortfolioRollup(Base):  # type: ignore[misc]
+    """Per-user OHLC of portfolio value per time bucket, maintained on snapshot insert."""
+    __tablename__ = "portfolio_rollups"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    resolution = Column(String, nullable=False)  # 1m / 1h / 1d
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    open_value = Column(Float, nullable=False)
+    high_value = Column(Float, nullable=False)
+    low_value = Column(Float, nullable=False)
+    close_value = Column(Float, nullable=False)
+    close_unrealized_pnl = Column(Float, nullable=False, default=0.0)
+    sample_count = Column(Integer, nullable=False, default=0)
+    first_timestamp = Column(DateTime(timezone=True), nullable=False)
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "resolution", "bucket_start", name="uq_portfolio_rollup_bucket"),
+        Index("idx_portfolio_rollup_lookup", "user_id", "resolution", "bucket_start"),
+    )
+
+
+# Performance aggregates kept per trade-close (name -> bucket seconds; "all" = lifetime)
+PERFORMANCE_METRIC_RESOLUTIONS: Dict[str, Optional[int]] = {"all": None, "1d": 86400}
+_PERFORMANCE_ALL_BUCKET = datetime(1970, 1, 1)
+ALL_STRATEGIES = ""
+
+
+class TradePerformanceMetrics(Base):  # type: ignore[misc]
+    """
+    Running per-user/strategy trade statistics, updated when a trade closes.
+
+    ``strategy_name`` is "" for the all-strategies aggregate. The "all"
+    resolution holds one lifetime row per scope; "1d" rows are daily buckets
+    that merge into rolling windows (see PerformanceAggregate.merge).
+    """
+    __tablename__ = "trade_performance_metrics"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    strategy_name = Column(String, nullable=False, default=ALL_STRATEGIES)
+    resolution = Column(String, nullable=False)  # all / 1d
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    trade_count = Column(Integer, nullable=False, default=0)
+    win_count = Column(Integer, nullable=False, default=0)
+    loss_count = Column(Integer, nullable=False, default=0)
+    pnl_sum = Column(Float, nullable=False, default=0.0)
+    pnl_sum_sq = Column(Float, nullable=False, default=0.0)
+    gross_profit = Column(Float, nullable=False, default=0.0)
+    gross_loss = Column(Float, nullable=False, default=0.0)
+    volume = Column(Float, nullable=False, default=0.0)
+    best_trade = Column(Float, nullable=True)
+    worst_trade = Column(Float, nullable=True)
+    equity = Column(Float, nullable=False, default=0.0)
+    peak_equity = Column(Float, nullable=False, default=0.0)
+    trough_equity = Column(Float, nullable=False, default=0.0)
+    max_drawdown = Column(Float, nullable=False, default=0.0)
+    first_trade_at = Column(DateTime(timezone=True), nullable=True)
+    last_trade_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "strategy_name", "resolution", "bucket_start", name="uq_trade_performance_bucket"
+        ),
+        Index("idx_trade_performance_lookup", "user_id", "strategy_name", "resolution", "bucket_start"),
+    )
+
+
+def _performance_bucket(resolution: str, timestamp: datetime) -> datetime:
+    seconds = PERFORMANCE_METRIC_RESOLUTIONS[resolution]
+    return _PERFORMANCE_ALL_BUCKET if seconds is None else _bucket_start(timestamp, seconds)
+
+
+def _trade_volume(amount: Optional[float], price: Optional[float], entry_price: Optional[float]) -> float:
+    return abs(float(amount or 0.0) * float(entry_price or price or 0.0))
+
+
+class LedgerTrade(Base):  # type: ignore[misc]
+    """
+    Exchange fill synced into the per-user trade ledger.
+
+    Rows are appended by the incremental sync in
+    bot.exchange_adapters.trade_ledger and never updated.
+    """
+    __tablename__ = "trade_ledger"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    exchange = Column(String, nullable=False)
+    symbol = Column(String, nullable=False)
+    trade_id = Column(String, nullable=False)
+    order_id = Column(String, nullable=True)
+    side = Column(String, nullable=False)
+    amount = Column(Float, nullable=False)
+    price = Column(Float, nullable=False)
+    fee_cost = Column(Float, nullable=False, default=0.0)
+    fee_currency = Column(String, nullable=True)
+    exchange_ts = Column(BigInteger, nullable=False)  # execution time, ms since epoch
+    executed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "exchange", "symbol", "trade_id", name="uq_trade_ledger_trade"),
+        Index("idx_trade_ledger_symbol_time", "user_id", "exchange", "symbol", "exchange_ts"),
+    )
+
+
+class TradeLedgerCursor(Base):  # type: ignore[misc]
+    """
+    Sync position of the trade ledger per symbol.
+
+    ``since_ms`` is the newest execution time synced; ``boundary_ids`` are
+    the trade ids at exactly that millisecond, which the next ``since``
+    query returns again and must be skipped.
+    """
+    __tablename__ = "trade_ledger_cursors"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    exchange = Column(String, nullable=False)
+    symbol = Column(String, nullable=False)
+    since_ms = Column(BigInteger, nullable=False)
+    boundary_ids = Column(JSON, nullable=False, default=list)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "exchange", "symbol", name="uq_trade_ledger_cursor"),
+    )
+
+
+class CostBasisPosition(Base):  # type: ignore[misc]
+    """Open FIFO lots and average cost per user/exchange/asset (see CostBasis)."""
+    __tablename__ = "cost_basis_positions"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    exchange = Column(String, nullable=False)
+    asset = Column(String, nullable=False)
+    quantity = Column(Float, nullable=False, default=0.0)
+    cost = Column(Float, nullable=False, default=0.0)
+    average_cost = Column(Float, nullable=False, default=0.0)
+    realized_pnl = Column(Float, nullable=False, default=0.0)
+    lots = Column(JSON, nullable=False, default=list)  # [[quantity, unit_cost], ...] oldest first
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "exchange", "asset", name="uq_cost_basis_asset"),
+    )
+
+
+class RollingTradingStatsState(Base):  # type: ignore[misc]
+    """Serialized RollingTradingStats per user (Kelly/Sharpe/VaR inputs)."""
+    __tablename__ = "rolling_trading_stats"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False, unique=True)
+    trade_count = Column(Integer, nullable=False, default=0)
+    payload = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, onupdate=_utcnow)
+
+
 class TradingMetricsCache(Base):  # type: ignore[misc]
     __tablename__ = "trading_metrics_cache"
 
@@ -571,6 +762,352 @@ _engine = create_engine(
 SessionLocal = sessionmaker(bind=_engine, expire_on_commit=False, class_=Session)
 
 
+def _performance_scopes(strategy_name: Optional[str]) -> List[str]:
+    scopes = [ALL_STRATEGIES]
+    if strategy_name:
+        scopes.append(strategy_name)
+    return scopes
+
+
+def apply_trade_to_performance(session: Session, trade: Trade) -> None:
+    """Fold a closed trade (one with ``pnl`` set) into its performance aggregates."""
+    if trade.pnl is None or not trade.user_id:
+        return
+    closed_at = trade.created_at or _utcnow()
+    volume = _trade_volume(trade.amount, trade.price, trade.entry_price)
+    for strategy in _performance_scopes(trade.strategy_name):
+        for resolution in PERFORMANCE_METRIC_RESOLUTIONS:
+            bucket = _performance_bucket(resolution, closed_at)
+            row = (
+                session.query(TradePerformanceMetrics)
+                .filter(
+                    TradePerformanceMetrics.user_id == trade.user_id,
+                    TradePerformanceMetrics.strategy_name == strategy,
+                    TradePerformanceMetrics.resolution == resolution,
+                    TradePerformanceMetrics.bucket_start == bucket,
+                )
+                .with_for_update()
+                .one_or_none()
+            )
+            if row is None:
+                row = TradePerformanceMetrics(
+                    user_id=trade.user_id,
+                    strategy_name=strategy,
+                    resolution=resolution,
+                    bucket_start=bucket,
+                )
+                session.add(row)
+            aggregate = PerformanceAggregate.from_row(row)
+            aggregate.add(trade.pnl, volume=volume, at=closed_at)
+            for key, value in aggregate.to_dict().items():
+                setattr(row, key, value)
+    session.flush()
+
+
+def load_performance_metrics(
+    session: Session,
+    *,
+    user_id: str,
+    strategy_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+) -> PerformanceAggregate:
+    """
+    Read aggregated performance for a user (optionally one strategy).
+
+    Without ``since`` this is a single-row lookup of the lifetime aggregate;
+    with ``since`` the daily buckets from that day on are merged.
+    """
+    query = session.query(TradePerformanceMetrics).filter(
+        TradePerformanceMetrics.user_id == user_id,
+        TradePerformanceMetrics.strategy_name == (strategy_name or ALL_STRATEGIES),
+    )
+    if since is None:
+        row = query.filter(TradePerformanceMetrics.resolution == "all").one_or_none()
+        return PerformanceAggregate.from_row(row) if row is not None else PerformanceAggregate()
+
+    aggregate = PerformanceAggregate()
+    for day in load_daily_performance(session, user_id=user_id, strategy_name=strategy_name, since=since):
+        aggregate.merge(day)
+    return aggregate
+
+
+def load_daily_performance(
+    session: Session,
+    *,
+    user_id: str,
+    since: datetime,
+    strategy_name: Optional[str] = None,
+) -> List[PerformanceAggregate]:
+    """Daily performance buckets from the day of ``since`` on, oldest first (days with closed trades only)."""
+    rows = (
+        session.query(TradePerformanceMetrics)
+        .filter(
+            TradePerformanceMetrics.user_id == user_id,
+            TradePerformanceMetrics.strategy_name == (strategy_name or ALL_STRATEGIES),
+            TradePerformanceMetrics.resolution == "1d",
+            TradePerformanceMetrics.bucket_start >= _performance_bucket("1d", since),
+        )
+        .order_by(TradePerformanceMetrics.bucket_start.asc())
+        .all()
+    )
+    return [PerformanceAggregate.from_row(row) for row in rows]
+
+
+def performance_metrics_need_backfill(session: Session, *, user_id: str) -> bool:
+    """True if the user has closed trades older than anything folded into the aggregates."""
+    first_trade_at = (
+        session.query(TradePerformanceMetrics.first_trade_at)
+        .filter(
+            TradePerformanceMetrics.user_id == user_id,
+            TradePerformanceMetrics.strategy_name == ALL_STRATEGIES,
+            TradePerformanceMetrics.resolution == "all",
+        )
+        .scalar()
+    )
+    query = session.query(Trade.id).filter(Trade.user_id == user_id, Trade.pnl.isnot(None))
+    if first_trade_at is not None:
+        query = query.filter(Trade.created_at < first_trade_at)
+    return query.first() is not None
+
+
+def backfill_performance_metrics(session: Session, *, user_id: str, batch_size: int = 5000) -> int:
+    """
+    Rebuild a user's performance aggregates from closed trades.
+
+    Existing aggregates for the user are replaced. Returns the number of
+    trades processed.
+    """
+    session.query(TradePerformanceMetrics).filter(
+        TradePerformanceMetrics.user_id == user_id
+    ).delete(synchronize_session=False)
+
+    aggregates: Dict[tuple, PerformanceAggregate] = {}
+    processed = 0
+    last_key: Optional[tuple] = None
+    while True:
+        query = session.query(
+            Trade.id,
+            Trade.created_at,
+            Trade.pnl,
+            Trade.amount,
+            Trade.price,
+            Trade.entry_price,
+            Trade.strategy_name,
+        ).filter(Trade.user_id == user_id, Trade.pnl.isnot(None))
+        if last_key is not None:
+            query = query.filter(
+                (Trade.created_at > last_key[0])
+                | ((Trade.created_at == last_key[0]) & (Trade.id > last_key[1]))
+            )
+        trades = query.order_by(Trade.created_at.asc(), Trade.id.asc()).limit(batch_size).all()
+        if not trades:
+            break
+        for trade in trades:
+            last_key = (trade.created_at, trade.id)
+            processed += 1
+            volume = _trade_volume(trade.amount, trade.price, trade.entry_price)
+            for strategy in _performance_scopes(trade.strategy_name):
+                for resolution in PERFORMANCE_METRIC_RESOLUTIONS:
+                    key = (strategy, resolution, _performance_bucket(resolution, trade.created_at))
+                    aggregates.setdefault(key, PerformanceAggregate()).add(
+                        trade.pnl, volume=volume, at=trade.created_at
+                    )
+
+    session.bulk_insert_mappings(
+        TradePerformanceMetrics,
+        [
+            {
+                "user_id": user_id,
+                "strategy_name": strategy,
+                "resolution": resolution,
+                "bucket_start": bucket,
+                **aggregate.to_dict(),
+            }
+            for (strategy, resolution, bucket), aggregate in aggregates.items()
+        ],
+    )
+    session.flush()
+    return processed
+
+
+def load_trade_ledger(
+    session: Session, *, user_id: str, exchange: str
+) -> Tuple[Dict[str, Tuple[int, List[str]]], Dict[str, CostBasis]]:
+    """Sync cursors (symbol -> (since_ms, boundary_ids)) and cost bases (asset -> CostBasis)."""
+    cursors = {
+        row.symbol: (int(row.since_ms), list(row.boundary_ids or []))
+        for row in session.query(TradeLedgerCursor).filter(
+            TradeLedgerCursor.user_id == user_id, TradeLedgerCursor.exchange == exchange
+        )
+    }
+    bases = {
+        row.asset: CostBasis.from_row(row)
+        for row in session.query(CostBasisPosition).filter(
+            CostBasisPosition.user_id == user_id, CostBasisPosition.exchange == exchange
+        )
+    }
+    return cursors, bases
+
+
+def save_trade_ledger_sync(
+    session: Session,
+    *,
+    user_id: str,
+    exchange: str,
+    trades: Sequence[Dict[str, Any]],
+    cursors: Dict[str, Tuple[int, List[str]]],
+    bases: Dict[str, CostBasis],
+) -> None:
+    """
+    Persist one sync step: new ledger rows, advanced cursors and the cost
+    bases they changed, in the caller's transaction.
+
+    ``trades`` are mappings of LedgerTrade columns (without user/exchange);
+    rows already in the ledger are skipped.
+    """
+    if trades:
+        existing = {
+            (symbol, trade_id)
+            for symbol, trade_id in session.query(LedgerTrade.symbol, LedgerTrade.trade_id).filter(
+                LedgerTrade.user_id == user_id,
+                LedgerTrade.exchange == exchange,
+                LedgerTrade.symbol.in_({trade["symbol"] for trade in trades}),
+                LedgerTrade.trade_id.in_([trade["trade_id"] for trade in trades]),
+            )
+        }
+        session.bulk_insert_mappings(
+            LedgerTrade,
+            [
+                {"user_id": user_id, "exchange": exchange, **trade}
+                for trade in trades
+                if (trade["symbol"], trade["trade_id"]) not in existing
+            ],
+        )
+
+    for symbol, (since_ms, boundary_ids) in cursors.items():
+        row = (
+            session.query(TradeLedgerCursor)
+            .filter(
+                TradeLedgerCursor.user_id == user_id,
+                TradeLedgerCursor.exchange == exchange,
+                TradeLedgerCursor.symbol == symbol,
+            )
+            .one_or_none()
+        )
+        if row is None:
+            row = TradeLedgerCursor(user_id=user_id, exchange=exchange, symbol=symbol)
+            session.add(row)
+        row.since_ms = since_ms
+        row.boundary_ids = list(boundary_ids)
+
+    for asset, basis in bases.items():
+        row = (
+            session.query(CostBasisPosition)
+            .filter(
+                CostBasisPosition.user_id == user_id,
+                CostBasisPosition.exchange == exchange,
+                CostBasisPosition.asset == asset,
+            )
+            .one_or_none()
+        )
+        if row is None:
+            row = CostBasisPosition(user_id=user_id, exchange=exchange, asset=asset)
+            session.add(row)
+        for key, value in basis.to_dict().items():
+            setattr(row, key, value)
+    session.flush()
+
+
+def load_rolling_trading_stats(session: Session, *, user_id: str) -> Optional[RollingTradingStats]:
+    """Stored rolling statistics of a user, or None if never saved (or saved in an older format)."""
+    payload = (
+        session.query(RollingTradingStatsState.payload)
+        .filter(RollingTradingStatsState.user_id == user_id)
+        .scalar()
+    )
+    if not payload or payload.get("v") != ROLLING_STATS_VERSION:
+        return None
+    return RollingTradingStats.from_dict(payload)
+
+
+def save_rolling_trading_stats(session: Session, *, user_id: str, stats: RollingTradingStats) -> None:
+    row = (
+        session.query(RollingTradingStatsState)
+        .filter(RollingTradingStatsState.user_id == user_id)
+        .one_or_none()
+    )
+    if row is None:
+        row = RollingTradingStatsState(user_id=user_id)
+        session.add(row)
+    row.trade_count = stats.trades.pnl.count
+    row.payload = stats.to_dict()
+    session.flush()
+
+
+def _daily_closing_balances(session: Session, *, user_id: str) -> List[Tuple[int, float]]:
+    """(date ordinal, closing portfolio value) per day from the 1d rollups, oldest first."""
+    try:
+        with session.begin_nested():
+            rows = (
+                session.query(PortfolioRollup.bucket_start, PortfolioRollup.close_value)
+                .filter(PortfolioRollup.user_id == user_id, PortfolioRollup.resolution == "1d")
+                .order_by(PortfolioRollup.bucket_start.asc())
+                .all()
+            )
+    except Exception as e:
+        logger.warning(f"Could not read portfolio rollups for {user_id}: {e}")
+        return []
+    return [(bucket.date().toordinal(), float(value)) for bucket, value in rows if value and value > 0]
+
+
+def build_rolling_trading_stats(
+    session: Session,
+    *,
+    user_id: str,
+    batch_size: int = 5000,
+    equity: Optional[float] = None,
+) -> RollingTradingStats:
+    """
+    Replay a user's closed trades (oldest first) into fresh rolling statistics.
+
+    Each day's P&L is taken as a return on the portfolio value at the close
+    of the previous day with a rollup; before the first one, on the first
+    known value. ``equity`` (the current account balance) is used when the
+    user has no portfolio history.
+    """
+    stats = RollingTradingStats()
+    balances = _daily_closing_balances(session, user_id=user_id)
+    if not balances and equity and equity > 0:
+        balances = [(0, float(equity))]
+    index = 0
+    if balances:
+        stats.reference_equity = balances[0][1]
+    last_key: Optional[tuple] = None
+    while True:
+        query = session.query(Trade.id, Trade.created_at, Trade.symbol, Trade.pnl).filter(
+            Trade.user_id == user_id, Trade.pnl.isnot(None)
+        )
+        if last_key is not None:
+            query = query.filter(
+                (Trade.created_at > last_key[0])
+                | ((Trade.created_at == last_key[0]) & (Trade.id > last_key[1]))
+            )
+        trades = query.order_by(Trade.created_at.asc(), Trade.id.asc()).limit(batch_size).all()
+        if not trades:
+            break
+        for trade in trades:
+            last_key = (trade.created_at, trade.id)
+            day = trade.created_at.date().toordinal()
+            if day != stats.day:
+                # Start-of-day equity: the latest close before this day
+                while index + 1 < len(balances) and balances[index + 1][0] < day:
+                    index += 1
+                if balances and balances[index][0] < day:
+                    stats.record_equity(balances[index][1], at=trade.created_at)
+            stats.add_trade(trade.symbol, float(trade.pnl), at=trade.created_at)
+    return stats
+
+
 def get_session() -> Session:
     """
     Get a new database session.
@@ -922,9 +1459,11 @@ class DatabaseManager(AbstractContextManager["DatabaseManager"]):
         avg_loss: float,
         max_drawdown: float,
         sharpe_ratio: Optional[float] = None,
+        user_id: Optional[str] = None,
     ) -> TradingStats:
         assert self.session is not None
         stats = TradingStats(
+            user_id=user_id,
             date=date,
             starting_balance=starting_balance,
             ending_balance=ending_balance,
@@ -1091,8 +1630,158 @@ class DatabaseManager(AbstractContextManager["DatabaseManager"]):
         )
         self.session.add(snapshot)
         self.session.flush()
+        # A rollup failure (e.g. table not migrated yet) must not lose the snapshot
+        self._apply_in_savepoint("portfolio rollup", self._apply_snapshot_to_rollups, snapshot)
         return snapshot
 
+    def _apply_snapshot_to_rollups(self, snapshot: PortfolioSnapshot) -> None:
+        """Fold one snapshot into the user's 1m/1h/1d rollup buckets."""
+        assert self.session is not None
+        if not snapshot.user_id:
+            return
+        # Postgres returns aware timestamps, SQLite and _utcnow naive ones: compare as aware UTC
+        timestamp = _as_utc(snapshot.timestamp or _utcnow())
+        value = snapshot.total_balance
+        for resolution, seconds in PORTFOLIO_ROLLUP_RESOLUTIONS.items():
+            bucket = _bucket_start(timestamp, seconds)
+            rollup = (
+                self.session.query(PortfolioRollup)
+                .filter(
+                    PortfolioRollup.user_id == snapshot.user_id,
+                    PortfolioRollup.resolution == resolution,
+                    PortfolioRollup.bucket_start == bucket,
+                )
+                .one_or_none()
+            )
+            if rollup is None:
+                self.session.add(
+                    PortfolioRollup(
+                        user_id=snapshot.user_id,
+                        resolution=resolution,
+                        bucket_start=bucket,
+                        open_value=value,
+                        high_value=value,
+                        low_value=value,
+                        close_value=value,
+                        close_unrealized_pnl=snapshot.unrealized_pnl,
+                        sample_count=1,
+                        first_timestamp=timestamp,
+                        last_timestamp=timestamp,
+                    )
+                )
+                continue
+            # Snapshots may arrive out of order: open/close follow timestamps
+            if timestamp >= _as_utc(rollup.last_timestamp):
+                rollup.close_value = value
+                rollup.close_unrealized_pnl = snapshot.unrealized_pnl
+                rollup.last_timestamp = timestamp
+            if timestamp < _as_utc(rollup.first_timestamp):
+                rollup.open_value = value
+                rollup.first_timestamp = timestamp
+            rollup.high_value = max(rollup.high_value, value)
+            rollup.low_value = min(rollup.low_value, value)
+            rollup.sample_count += 1
+        self.session.flush()
+
+    def get_portfolio_rollups(
+        self,
+        *,
+        user_id: str,
+        resolution: str,
+        start_timestamp: datetime,
+    ) -> List[PortfolioRollup]:
+        assert self.session is not None
+        bucket = _bucket_start(start_timestamp, PORTFOLIO_ROLLUP_RESOLUTIONS[resolution])
+        return (
+            self.session.query(PortfolioRollup)
+            .filter(
+                PortfolioRollup.user_id == user_id,
+                PortfolioRollup.resolution == resolution,
+                PortfolioRollup.bucket_start >= bucket,
+            )
+            .order_by(PortfolioRollup.bucket_start.asc())
+            .all()
+        )
+
+    def portfolio_rollups_need_backfill(self, *, user_id: str) -> bool:
+        """True if the user has snapshots older than anything folded into rollups."""
+        assert self.session is not None
+        earliest = (
+            self.session.query(func.min(PortfolioRollup.first_timestamp))
+            .filter(PortfolioRollup.user_id == user_id, PortfolioRollup.resolution == "1d")
+            .scalar()
+        )
+        query = self.session.query(PortfolioSnapshot.id).filter(PortfolioSnapshot.user_id == user_id)
+        if earliest is not None:
+            query = query.filter(PortfolioSnapshot.timestamp < earliest)
+        return query.first() is not None
+
+    def backfill_portfolio_rollups(self, *, user_id: str, batch_size: int = 5000) -> int:
+        """
+        Rebuild a user's rollups from the raw snapshot history.
+
+        Existing rollups for the user are replaced. Returns the number of
+        snapshots processed.
+        """
+        assert self.session is not None
+        self.session.query(PortfolioRollup).filter(
+            PortfolioRollup.user_id == user_id
+        ).delete(synchronize_session=False)
+
+        buckets: Dict[tuple, Dict[str, Any]] = {}
+        processed = 0
+        last_id = 0
+        while True:
+            snapshots = (
+                self.session.query(
+                    PortfolioSnapshot.id,
+                    PortfolioSnapshot.timestamp,
+                    PortfolioSnapshot.total_balance,
+                    PortfolioSnapshot.unrealized_pnl,
+                )
+                .filter(PortfolioSnapshot.user_id == user_id, PortfolioSnapshot.id > last_id)
+                .order_by(PortfolioSnapshot.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not snapshots:
+                break
+            for snap in snapshots:
+                last_id = snap.id
+                processed += 1
+                timestamp = _as_utc(snap.timestamp)
+                value = snap.total_balance
+                for resolution, seconds in PORTFOLIO_ROLLUP_RESOLUTIONS.items():
+                    key = (resolution, _bucket_start(timestamp, seconds))
+                    agg = buckets.get(key)
+                    if agg is None:
+                        buckets[key] = {
+                            "open_value": value, "high_value": value, "low_value": value,
+                            "close_value": value, "close_unrealized_pnl": snap.unrealized_pnl,
+                            "sample_count": 1, "first_timestamp": timestamp, "last_timestamp": timestamp,
+                        }
+                        continue
+                    if timestamp >= agg["last_timestamp"]:
+                        agg["close_value"] = value
+                        agg["close_unrealized_pnl"] = snap.unrealized_pnl
+                        agg["last_timestamp"] = timestamp
+                    if timestamp < agg["first_timestamp"]:
+                        agg["open_value"] = value
+                        agg["first_timestamp"] = timestamp
+                    agg["high_value"] = max(agg["high_value"], value)
+                    agg["low_value"] = min(agg["low_value"], value)
+                    agg["sample_count"] += 1
+
+        self.session.bulk_insert_mappings(
+            PortfolioRollup,
+            [
+                {"user_id": user_id, "resolution": resolution, "bucket_start": bucket, **agg}
+                for (resolution, bucket), agg in buckets.items()
+            ],
+        )
+        self.session.flush()
+        return processed
+
     def get_portfolio_history(
         self,
         *,
@@ -1281,11 +1970,16 @@ class DatabaseManager(AbstractContextManager["DatabaseManager"]):
         leverage: Optional[float] = None,
         entry_price: Optional[float] = None,
         exit_price: Optional[float] = None,
+        strategy_name: Optional[str] = None,
     ) -> Trade:
         """Save an executed trade to the database.
         
         L2 FIX v3.0: Now accepts stop_loss, take_profit, leverage, entry_price, exit_price
         for complete trade tracking and analytics.
+
+        Trades saved with ``pnl`` are closes and update the running
+        performance aggregates in a savepoint: a failed update is logged and
+        rolled back without losing the trade.
         """
         assert self.session is not None
         trade = Trade(
@@ -1305,11 +1999,68 @@ class DatabaseManager(AbstractContextManager["DatabaseManager"]):
             leverage=leverage,
             entry_price=entry_price,
             exit_price=exit_price,
+            strategy_name=strategy_name,
         )
         self.session.add(trade)
         self.session.flush()
+        if pnl is not None:
+            self._apply_in_savepoint("performance metrics", apply_trade_to_performance, self.session, trade)
         return trade
 
+    def _apply_in_savepoint(self, what: str, apply, *args) -> bool:
+        """Run a derived-data update in a savepoint; on failure only the update is rolled back."""
+        assert self.session is not None
+        try:
+            with self.session.begin_nested():
+                apply(*args)
+            return True
+        except Exception as e:
+            logger.warning(f"Skipped {what} update: {e}")
+            return False
+
+    # -- Trade performance aggregates ---------------------------------------
+    def get_performance_metrics(
+        self,
+        *,
+        user_id: str,
+        strategy_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> PerformanceAggregate:
+        assert self.session is not None
+        return load_performance_metrics(
+            self.session, user_id=user_id, strategy_name=strategy_name, since=since
+        )
+
+    def get_daily_performance(
+        self,
+        *,
+        user_id: str,
+        since: datetime,
+        strategy_name: Optional[str] = None,
+    ) -> List[PerformanceAggregate]:
+        assert self.session is not None
+        return load_daily_performance(
+            self.session, user_id=user_id, since=since, strategy_name=strategy_name
+        )
+
+    def performance_metrics_need_backfill(self, *, user_id: str) -> bool:
+        assert self.session is not None
+        return performance_metrics_need_backfill(self.session, user_id=user_id)
+
+    def backfill_performance_metrics(self, *, user_id: str, batch_size: int = 5000) -> int:
+        assert self.session is not None
+        return backfill_performance_metrics(self.session, user_id=user_id, batch_size=batch_size)
+
+    def list_portfolio_user_ids(self) -> List[str]:
+        assert self.session is not None
+        rows = self.session.query(PortfolioSnapshot.user_id).distinct().all()
+        return [row[0] for row in rows if row[0]]
+
+    def list_trade_user_ids(self) -> List[str]:
+        assert self.session is not None
+        rows = self.session.query(Trade.user_id).filter(Trade.pnl.isnot(None)).distinct().all()
+        return [row[0] for row in rows if row[0]]
+
     def get_trades(
         self,
         *,
@@ -1384,5 +2135,23 @@ __all__ = [
     "TradingBot",
     "AIAnalysis",
     "PortfolioSnapshot",
+    "PortfolioRollup",
+    "PORTFOLIO_ROLLUP_RESOLUTIONS",
+    "TradePerformanceMetrics",
+    "PERFORMANCE_METRIC_RESOLUTIONS",
+    "ALL_STRATEGIES",
+    "apply_trade_to_performance",
+    "load_performance_metrics",
+    "performance_metrics_need_backfill",
+    "backfill_performance_metrics",
+    "LedgerTrade",
+    "TradeLedgerCursor",
+    "CostBasisPosition",
+    "load_trade_ledger",
+    "save_trade_ledger_sync",
+    "RollingTradingStatsState",
+    "load_rolling_trading_stats",
+    "save_rolling_trading_stats",
+    "build_rolling_trading_stats",
     "TradingMetricsCache",
 ]
@@ -5,11 +5,20 @@ Użyj tego zamiast PrimeXBT jeśli nie mają API.
 
 import ccxt
 import logging
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Set, Tuple
 import asyncio
 import ccxt.async_support as ccxt_async
 from pydantic import BaseModel
 
+from bot.exchange_adapters.request_scheduler import (
+    RequestShed,
+    ScheduledExchange,
+    SchedulerConfig,
+    get_request_scheduler,
+)
+from bot.exchange_adapters.trade_ledger import TradeLedger
+
 logger = logging.getLogger(__name__)
 
 # Retry configuration
@@ -51,7 +60,7 @@ class CCXTAdapter:
         'kraken': ccxt_async.kraken,
         'okx': ccxt_async.okx,
         'kucoin': ccxt_async.kucoin,
-        'gateio': ccxt_async.gateio,
+        'gateio': getattr(ccxt_async, 'gateio', None) or ccxt_async.gate,  # Renamed 'gate' in newer ccxt
         'mexc': ccxt_async.mexc,
         'bitget': ccxt_async.bitget,
     }
@@ -105,10 +114,32 @@ class CCXTAdapter:
             elif exchange_name == 'bybit':
                 config['options'] = {'testnet': True}
                 
-        self.exchange = exchange_class(config)
+        # All REST calls go through the per-account priority scheduler, so a
+        # protective close never queues behind analytics downloads
+        raw_exchange = exchange_class(config)
+        self.scheduler = get_request_scheduler(
+            f"{exchange_name}-testnet" if testnet else exchange_name, api_key, raw_exchange,
+            config=SchedulerConfig(penalty_seconds=RATE_LIMIT_WAIT)
+        )
+        self.exchange = ScheduledExchange(raw_exchange, self.scheduler)
         self.futures = futures
         self.margin = margin  # NEW: Track margin mode
-        self._rate_limited_until = None  # Track rate limit cooldown
+        
+        # Orders sent by this adapter (market, limit and resting SL/TP/OCO), so
+        # user-data stream consumers can tell the bot's own fills (state already
+        # updated by the caller) from external ones. In-flight counts cover fills
+        # streamed before the REST response returns the order id.
+        self._own_order_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._inflight_orders: Dict[Tuple[str, str], int] = {}
+        
+        # Entry prices for spot/margin holdings come from an incrementally
+        # synced trade ledger (in-memory until attach_trade_ledger)
+        self.trade_ledger = TradeLedger(self.exchange, exchange_name=exchange_name)
+        
+        # Shared whole-exchange ticker scanner (bot.services.market_scanner), if attached
+        self.market_scanner = None
+        # Shared local candles (bot.realtime.candles): OHLCV served without REST while live
+        self.candle_store = None
         
         # Symbol validation cache
         self._valid_symbols: Set[str] = set()
@@ -127,6 +158,37 @@ class CCXTAdapter:
                 except Exception as e:
                     logger.warning(f"Failed to load markets: {e}")
     
+    def use_shared_markets(self, markets: Dict[str, Any], currencies: Optional[Dict[str, Any]] = None,
+                           time_difference: Optional[int] = None) -> None:
+        """
+        Use market metadata loaded once for many adapters (fleet startup)
+        instead of downloading it with load_markets.
+        """
+        # set_markets is local; call it on the raw CCXT instance so the
+        # scheduler proxy does not treat it as a request
+        raw_exchange = getattr(self.exchange, '_exchange', self.exchange)
+        raw_exchange.set_markets(markets, currencies)
+        if time_difference is not None:
+            # load_markets would have measured this (adjustForTimeDifference)
+            raw_exchange.options['timeDifference'] = time_difference
+        self._valid_symbols = set(raw_exchange.symbols)
+        self._symbols_loaded = True
+
+    def export_markets(self) -> Optional[Dict[str, Any]]:
+        """Loaded market metadata in ``use_shared_markets`` form, or None if not loaded yet."""
+        raw_exchange = getattr(self.exchange, '_exchange', self.exchange)
+        if not getattr(raw_exchange, 'markets', None):
+            return None
+        return {
+            "markets": raw_exchange.markets,
+            "currencies": getattr(raw_exchange, 'currencies', None),
+            "time_difference": raw_exchange.options.get('timeDifference'),
+        }
+
+    def attach_trade_ledger(self, ledger: TradeLedger) -> None:
+        """Use ``ledger`` (e.g. a persistent per-user one) for entry prices."""
+        self.trade_ledger = ledger
+    
     async def validate_symbol(self, symbol: str) -> Tuple[bool, Optional[str]]:
         """
         Validate if a symbol is tradeable on this exchange.
@@ -202,26 +264,19 @@ class CCXTAdapter:
         
         for attempt in range(MAX_RETRIES):
             try:
-                # Check if we're in rate limit cooldown
-                if self._rate_limited_until:
-                    import time
-                    now = time.time()
-                    if now < self._rate_limited_until:
-                        wait_time = self._rate_limited_until - now
-                        logger.warning(f"Rate limited, waiting {wait_time:.1f}s...")
-                        await asyncio.sleep(wait_time)
-                    self._rate_limited_until = None
-                
                 return await func(*args, **kwargs)
                 
+            except RequestShed:
+                # Dropped by the scheduler to protect the budget - don't retry
+                raise
+                
             except ccxt.RateLimitExceeded as e:
-                # Handle rate limiting with longer cooldown
-                import time
-                self._rate_limited_until = time.time() + RATE_LIMIT_WAIT
-                logger.warning(f"Rate limit exceeded, cooling down for {RATE_LIMIT_WAIT}s: {e}")
+                # The scheduler pauses non-emergency traffic for RATE_LIMIT_WAIT;
+                # the retry queues there instead of sleeping here
+                logger.warning(f"Rate limit exceeded (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
                 
                 if attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(RATE_LIMIT_WAIT)
+                    await asyncio.sleep(RETRY_DELAY * (2 ** attempt))
                     last_exception = e
                 else:
                     raise
@@ -727,61 +782,31 @@ class CCXTAdapter:
     
     async def _calculate_entry_price(self, asset: str, current_qty: float) -> float:
         """
-        Calculate weighted average entry price from recent buy trades.
+        Entry price of the current holding from the trade ledger.
         Alias for _calculate_entry_price_from_trades for backwards compatibility.
         """
         return await self._calculate_entry_price_from_trades(asset, current_qty)
     
     async def _calculate_entry_price_from_trades(self, asset: str, current_qty: float) -> float:
         """
-        Calculate weighted average entry price from recent buy trades.
-        Uses FIFO method to approximate entry price for current holdings.
+        Entry price of the current holding from the trade ledger's FIFO cost basis.
+        
+        The ledger only fetches fills newer than its per-symbol cursor, at most
+        once per sync interval per asset, so this is normally a dict lookup.
         """
         try:
-            # Try different quote currencies
-            quotes = ['USDC', 'USDT', 'USD']
-            trades = []
+            entry_price = await self.trade_ledger.get_entry_price(asset)
+            if entry_price:
+                return entry_price
             
-            for quote in quotes:
-                symbol = f"{asset}/{quote}"
+            logger.warning(f"No trades found for {asset}, using current market price as entry")
+            # Fallback: use current price
+            for symbol in self.trade_ledger.symbols_for(asset):
                 try:
-                    trades = await self.exchange.fetch_my_trades(symbol, limit=50)
-                    if trades:
-                        break
+                    ticker = await self.exchange.fetch_ticker(symbol)
+                    return ticker['last']
                 except:
                     continue
-            
-            if not trades:
-                logger.warning(f"No trades found for {asset}, using current market price as entry")
-                # Fallback: use current price
-                for quote in quotes:
-                    try:
-                        ticker = await self.exchange.fetch_ticker(f"{asset}/{quote}")
-                        return ticker['last']
-                    except:
-                        continue
-                return 0.0
-            
-            # Calculate weighted average from recent buys
-            total_cost = 0.0
-            total_qty = 0.0
-            remaining_qty = current_qty
-            
-            # Sort by datetime descending (newest first - LIFO for calculation)
-            sorted_trades = sorted(trades, key=lambda t: t['datetime'], reverse=True)
-            
-            for trade in sorted_trades:
-                if trade['side'] == 'buy' and remaining_qty > 0:
-                    trade_qty = min(trade['amount'], remaining_qty)
-                    total_cost += trade_qty * trade['price']
-                    total_qty += trade_qty
-                    remaining_qty -= trade_qty
-            
-            if total_qty > 0:
-                avg_price = total_cost / total_qty
-                logger.debug(f"Calculated entry price for {asset}: {avg_price:.4f} from {len(trades)} trades")
-                return avg_price
-            
             return 0.0
             
         except Exception as e:
@@ -889,8 +914,13 @@ class CCXTAdapter:
         take_profit: Optional[float] = None,
         leverage: Optional[int] = None,
         reduce_only: bool = False,
+        client_order_id: Optional[str] = None,
     ) -> Order:
-        """Place an order with optional SL/TP and auto-adjusted leverage."""
+        """Place an order with optional SL/TP and auto-adjusted leverage.
+
+        ``client_order_id`` tags the order so a retry can look it up
+        (``get_order_by_client_id``) instead of sending it twice.
+        """
         
         try:
             # P1 FIX: Validate symbol before placing order
@@ -1006,13 +1036,18 @@ class CCXTAdapter:
                     # SPOT mode - ignore reduce_only, not supported
                     logger.debug(f"📊 Ignoring reduce_only for {self.exchange.id} SPOT mode (not supported)")
 
+            if client_order_id:
+                params['clientOrderId'] = client_order_id
+            
             print(f"DEBUG: place_order for {self.exchange.id} params: {params}")
             if order_type.lower() == 'market':
-                order_raw = await self.exchange.create_market_order(symbol, side, quantity, None, params)
+                order_raw = await self._create_market_order(symbol, side, quantity, None, params)
             else:  # limit
                 if not price:
                     raise ValueError("Price required for limit orders")
-                order_raw = await self.exchange.create_limit_order(symbol, side, quantity, price, params)
+                order_raw = await self._create_own_order(
+                    self.exchange.create_limit_order, symbol, side, quantity, price, params
+                )
             
             # Log SL/TP info
             if stop_loss or take_profit:
@@ -1028,6 +1063,38 @@ class CCXTAdapter:
             print(f"Error placing order: {e}")
             raise
 
+    async def _create_market_order(self, symbol: str, side: str, *args) -> Dict[str, Any]:
+        """Send a market order and remember it as the bot's own."""
+        order_raw = await self._create_own_order(self.exchange.create_market_order, symbol, side, *args)
+        self.trade_ledger.mark_stale(symbol.split('/')[0])
+        return order_raw
+
+    async def _create_own_order(self, create, symbol: str, side: str, *args) -> Dict[str, Any]:
+        """``create(symbol, side, *args)`` for an order that may fill at once; remember it as the bot's own."""
+        key = (symbol, side)
+        self._inflight_orders[key] = self._inflight_orders.get(key, 0) + 1
+        try:
+            order_raw = await create(symbol, side, *args)
+        finally:
+            self._inflight_orders[key] -= 1
+            if not self._inflight_orders[key]:
+                del self._inflight_orders[key]
+        self._remember_own_orders(self._order_ids(order_raw))
+        return order_raw
+
+    def _remember_own_orders(self, order_ids: List[str]) -> List[str]:
+        for order_id in order_ids:
+            self._own_order_ids[order_id] = None
+        while len(self._own_order_ids) > 1000:
+            self._own_order_ids.popitem(last=False)
+        return order_ids
+
+    def is_own_fill(self, symbol: str, side: str, order_id: Optional[str]) -> bool:
+        """True if a streamed fill belongs to an order this adapter sent."""
+        if order_id is not None and str(order_id) in self._own_order_ids:
+            return True
+        return (symbol, side) in self._inflight_orders
+
     async def cancel_order(self, order_id: str, symbol: str) -> bool:
         """Cancel an open order."""
         try:
@@ -1040,6 +1107,28 @@ class CCXTAdapter:
             print(f"Error canceling order: {e}")
             return False
 
+    async def get_order(self, order_id: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """Current state of an order (ccxt order dict), or None if it cannot be read."""
+        try:
+            return await self.exchange.fetch_order(order_id, symbol)
+        except Exception as e:
+            logger.warning(f"Could not fetch order {order_id} ({symbol}): {e}")
+            return None
+
+    async def get_order_by_client_id(self, client_order_id: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Order sent with ``client_order_id`` (ccxt order dict), or None if the
+        exchange never received it. Other errors propagate: the order may
+        still exist, so the caller must not resend.
+        """
+        params = {'clientOrderId': client_order_id}
+        if self.exchange.id == 'binance' and self.margin and not self.futures:
+            params['marginMode'] = 'cross'
+        try:
+            return await self.exchange.fetch_order(None, symbol, params)
+        except ccxt.OrderNotFound:
+            return None
+    
     async def close_position(self, symbol: str) -> bool:
         """
         Close position for symbol.
@@ -1073,7 +1162,7 @@ class CCXTAdapter:
                     # Other exchanges in SPOT mode - also no reduceOnly
                     logger.info(f"📊 Closing SPOT position: {symbol} | {side.upper()} {pos.quantity}")
                 
-                await self.exchange.create_market_order(
+                await self._create_market_order(
                     symbol,
                     side,
                     pos.quantity,
@@ -1084,7 +1173,161 @@ class CCXTAdapter:
         except (ccxt.NetworkError, ccxt.ExchangeError) as e:
             logger.error(f"Error closing position for {symbol}: {e}")
             return False
+
+    @property
+    def supports_oco(self) -> bool:
+        """Spot SL and TP share one balance, so both legs must rest as one OCO list."""
+        if self.futures or self.margin:
+            return False
+        # ccxt has no unified OCO method for Binance; its order-list endpoint is implicit
+        return hasattr(self.exchange, 'create_oco_order') or (
+            self.exchange.id == 'binance' and hasattr(self.exchange, 'private_post_orderlist_oco')
+        )
+
+    def _protective_params(self) -> Dict[str, Any]:
+        params: Dict[str, Any] = {}
+        if self.exchange.id == 'binance' and self.margin and not self.futures:
+            params['type'] = 'margin'
+            params['marginMode'] = 'cross'
+        if (self.futures or self.margin) and self.exchange.id != 'kraken':
+            params['reduceOnly'] = True
+        return params
+
+    @staticmethod
+    def _order_ids(order_raw: Any) -> List[str]:
+        """Order ids of a created order (all legs for an OCO list)."""
+        if not order_raw:
+            return []
+        legs = order_raw.get('orders') if isinstance(order_raw, dict) else None
+        if legs:
+            return [str(leg.get('id') or leg.get('orderId')) for leg in legs]
+        return [str(order_raw['id'])] if order_raw.get('id') else []
+
+    async def place_stop_order(self, symbol: str, position_side: str, quantity: float, stop_price: float) -> Optional[str]:
+        """
+        Rest a stop-loss exit for a position on the exchange.
+
+        Futures/margin use a reduce-only stop-market order; Binance spot a
+        STOP_LOSS_LIMIT with the limit 0.5% past the trigger.
+
+        Returns:
+            The exchange order id.
+        """
+        exit_side = 'sell' if position_side == 'long' else 'buy'
+        params = self._protective_params()
+        if self.exchange.id == 'binance' and not self.futures:
+            stop_limit_price = stop_price * (0.995 if exit_side == 'sell' else 1.005)
+            params.update({'stopPrice': stop_price, 'timeInForce': 'GTC'})
+            order_raw = await self.exchange.create_order(
+                symbol, 'STOP_LOSS_LIMIT', exit_side, quantity, stop_limit_price, params
+            )
+        else:
+            params['stopLossPrice'] = stop_price
+            order_raw = await self.exchange.create_order(symbol, 'market', exit_side, quantity, None, params)
+        ids = self._remember_own_orders(self._order_ids(order_raw))
+        return ids[0] if ids else None
+
+    async def place_take_profit_order(self, symbol: str, position_side: str, quantity: float, take_profit: float) -> Optional[str]:
+        """Rest a take-profit exit: reduce-only take-profit-market on futures/margin, a GTC limit on spot."""
+        exit_side = 'sell' if position_side == 'long' else 'buy'
+        params = self._protective_params()
+        if self.futures or self.margin:
+            params['takeProfitPrice'] = take_profit
+            order_raw = await self.exchange.create_order(symbol, 'market', exit_side, quantity, None, params)
+        else:
+            params['timeInForce'] = 'GTC'
+            order_raw = await self.exchange.create_order(symbol, 'limit', exit_side, quantity, take_profit, params)
+        ids = self._remember_own_orders(self._order_ids(order_raw))
+        return ids[0] if ids else None
+
+    async def place_oco_exit(self, symbol: str, position_side: str, quantity: float,
+                             stop_loss: float, take_profit: float) -> List[str]:
+        """
+        Rest SL and TP as one OCO list (spot): when one leg fills the exchange
+        cancels the other.
+
+        Returns:
+            Order ids of both legs; cancelling either cancels the list.
+        """
+        exit_side = 'sell' if position_side == 'long' else 'buy'
+        stop_limit_price = stop_loss * (0.995 if exit_side == 'sell' else 1.005)
+        if not hasattr(self.exchange, 'create_oco_order'):
+            return await self._place_binance_oco(symbol, exit_side, quantity, stop_loss, stop_limit_price, take_profit)
+        order_raw = await self.exchange.create_oco_order(
+            symbol=symbol,
+            side=exit_side,
+            quantity=quantity,
+            price=take_profit,
+            stopPrice=stop_loss,
+            stopLimitPrice=stop_limit_price,
+        )
+        return self._remember_own_orders(self._order_ids(order_raw))
+
+    async def _place_binance_oco(self, symbol: str, exit_side: str, quantity: float, stop_loss: float,
+                                 stop_limit_price: float, take_profit: float) -> List[str]:
+        """
+        POST /api/v3/orderList/oco: a LIMIT_MAKER take profit and a
+        STOP_LOSS_LIMIT stop, on the side of the price each one guards.
+        
+        Returns:
+            Stop id first, take-profit id second.
+        """
+        exchange = self.exchange
+        stop_leg = {
+            'Type': 'STOP_LOSS_LIMIT',
+            'StopPrice': exchange.price_to_precision(symbol, stop_loss),
+            'Price': exchange.price_to_precision(symbol, stop_limit_price),
+            'TimeInForce': 'GTC',
+        }
+        tp_leg = {'Type': 'LIMIT_MAKER', 'Price': exchange.price_to_precision(symbol, take_profit)}
+        # Selling out of a long: TP above the price, stop below; buying back a short: mirrored
+        above, below = (tp_leg, stop_leg) if exit_side == 'sell' else (stop_leg, tp_leg)
+        request = {
+            'symbol': exchange.market_id(symbol),
+            'side': exit_side.upper(),
+            'quantity': exchange.amount_to_precision(symbol, quantity),
+        }
+        request.update({f'above{k}': v for k, v in above.items()})
+        request.update({f'below{k}': v for k, v in below.items()})
+        response = await exchange.private_post_orderlist_oco(request)
+        # orderReports carry each leg's type; legs are not in a fixed order
+        reports = sorted(response.get('orderReports') or [], key=lambda r: 'STOP' not in str(r.get('type', '')))
+        return self._remember_own_orders([str(r['orderId']) for r in reports])
     
+    async def amend_stop_order(self, symbol: str, order_id: str, position_side: str,
+                               quantity: float, stop_price: float) -> Optional[str]:
+        """
+        Move a resting stop to ``stop_price``.
+
+        Edits in place where the exchange supports it (one private call, the
+        order keeps its place); otherwise replaces it. On futures/margin the new
+        reduce-only stop is placed before the old one is cancelled, so the
+        position is never unprotected; on spot the old stop holds the balance
+        and has to go first.
+
+        Returns:
+            Id of the stop now resting (same id when edited in place).
+        """
+        exit_side = 'sell' if position_side == 'long' else 'buy'
+        if self.exchange.has.get('editOrder') and (self.futures or self.margin):
+            try:
+                params = self._protective_params()
+                params['stopLossPrice'] = stop_price
+                order_raw = await self.exchange.edit_order(
+                    order_id, symbol, 'market', exit_side, quantity, None, params
+                )
+                ids = self._remember_own_orders(self._order_ids(order_raw))
+                return ids[0] if ids else order_id
+            except (ccxt.NotSupported, ccxt.InvalidOrder, ccxt.BadRequest) as e:
+                logger.debug(f"Stop edit not accepted for {symbol} ({e}) - replacing instead")
+
+        if self.futures or self.margin:
+            new_id = await self.place_stop_order(symbol, position_side, quantity, stop_price)
+            await self.cancel_order(order_id, symbol)
+            return new_id
+        await self.cancel_order(order_id, symbol)
+        return await self.place_stop_order(symbol, position_side, quantity, stop_price)
+
     async def get_market_price(self, symbol: str) -> float:
         """Get current market price."""
         ticker = await self.exchange.fetch_ticker(symbol)
@@ -1128,6 +1371,9 @@ class CCXTAdapter:
 
     async def get_top_volume_symbols(self, limit: int = 20) -> List[str]:
         """Get top volume USDT pairs."""
+        if self.market_scanner is not None and self.market_scanner.is_fresh():
+            # Ranked once per scan from the columnar universe, no request
+            return list(self.market_scanner.universe.top_volume(limit, 'USDT'))
         try:
             print(f"DEBUG: Loading markets for {self.exchange.id}...")
             await self.exchange.load_markets()
@@ -1344,6 +1590,10 @@ class CCXTAdapter:
     async def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> List[List[float]]:
         """Fetch historical OHLCV data."""
         try:
+            if self.candle_store is not None:
+                return await self.candle_store.ohlcv(
+                    symbol, timeframe, limit, lambda: self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                )
             ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
             return ohlcv
         except Exception as e:
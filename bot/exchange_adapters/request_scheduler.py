@@ -0,0 +1,425 @@
+"""
+Priority-aware request scheduler per exchange account.
+
+Every REST call to an exchange spends request weight from a budget the
+exchange enforces per account/IP. Without coordination a stop-loss market
+close can wait behind an ATR or correlation OHLCV download once the budget
+runs out. The scheduler sits in front of the CCXT instance and admits calls
+by priority class:
+
+    EMERGENCY      protective closes - never queued, may overdraw the budget
+    ORDER          order placement / cancellation
+    POSITION_SYNC  positions, balances, open orders, fills
+    MARKET_DATA    tickers, order books, candles for live decisions
+    ANALYTICS      background OHLCV for risk/correlation/indicators
+
+Lower classes must leave a reserve of the budget untouched (deferral), and
+ANALYTICS is shed outright (``RequestShed``) when the queue backs up, the
+exchange has rate-limited us, or it waited longer than ``max_wait``.
+
+Callers pick a class with ``request_priority()`` / ``with_request_priority``;
+otherwise it is derived from the CCXT method name.
+
+Usage:
+    scheduler = get_request_scheduler('binance', api_key, exchange)
+    exchange = ScheduledExchange(exchange, scheduler)
+
+    with request_priority(RequestPriority.ANALYTICS):
+        candles = await exchange.fetch_ohlcv('BTC/USDT', '4h', limit=200)
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import wraps
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import ccxt
+
+from bot.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Priority classes, most urgent first."""
+    EMERGENCY = 0
+    ORDER = 1
+    POSITION_SYNC = 2
+    MARKET_DATA = 3
+    ANALYTICS = 4
+
+
+class RequestShed(ccxt.RateLimitExceeded):
+    """
+    Low-priority request dropped to protect the exchange budget.
+
+    Subclasses ccxt.RateLimitExceeded so existing ``except ccxt.NetworkError``
+    fallbacks treat it like any other rate-limit failure.
+    """
+
+
+_current_priority: contextvars.ContextVar[Optional[RequestPriority]] = contextvars.ContextVar(
+    "exchange_request_priority", default=None
+)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority):
+    """Run exchange calls made inside the block (same task) at ``priority``."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def with_request_priority(priority: RequestPriority):
+    """Decorator form of ``request_priority`` for async functions."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with request_priority(priority):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Default class per CCXT method (callers can override via request_priority)
+METHOD_PRIORITIES: Dict[str, RequestPriority] = {
+    'create_order': RequestPriority.ORDER,
+    'create_market_order': RequestPriority.ORDER,
+    'create_limit_order': RequestPriority.ORDER,
+    'create_market_buy_order': RequestPriority.ORDER,
+    'create_market_sell_order': RequestPriority.ORDER,
+    'edit_order': RequestPriority.ORDER,
+    'create_oco_order': RequestPriority.ORDER,
+    'private_post_orderlist_oco': RequestPriority.ORDER,  # Binance spot OCO (no unified method)
+    'cancel_order': RequestPriority.ORDER,
+    'cancel_all_orders': RequestPriority.ORDER,
+    'set_leverage': RequestPriority.ORDER,
+    'set_margin_mode': RequestPriority.ORDER,
+    'fetch_positions': RequestPriority.POSITION_SYNC,
+    'fetch_balance': RequestPriority.POSITION_SYNC,
+    'fetch_order': RequestPriority.POSITION_SYNC,
+    'fetch_orders': RequestPriority.POSITION_SYNC,
+    'fetch_open_orders': RequestPriority.POSITION_SYNC,
+    'fetch_closed_orders': RequestPriority.POSITION_SYNC,
+    'fetch_my_trades': RequestPriority.POSITION_SYNC,
+    'fetch_ohlcv': RequestPriority.MARKET_DATA,
+    'fetch_ticker': RequestPriority.MARKET_DATA,
+    'fetch_tickers': RequestPriority.MARKET_DATA,
+    'fetch_order_book': RequestPriority.MARKET_DATA,
+    'load_markets': RequestPriority.MARKET_DATA,
+    'fetch_leverage_tiers': RequestPriority.ANALYTICS,
+}
+
+# Approximate request weight per method, in ccxt rate-limit cost units - the
+# unit of the budget (60000 / exchange.rateLimit per minute). Calibrated on
+# Binance spot, where one unit is 5 raw request weight (1200 units = 6000 weight).
+METHOD_WEIGHTS: Dict[str, float] = {
+    'fetch_balance': 4,
+    'fetch_positions': 1,
+    'fetch_open_orders': 1.2,
+    'fetch_orders': 4,
+    'fetch_closed_orders': 4,
+    'fetch_my_trades': 4,
+    'fetch_tickers': 16,
+    'fetch_ohlcv': 0.4,
+    'fetch_order_book': 1,
+    'fetch_leverage_tiers': 1,
+    'load_markets': 8,
+    'cancel_all_orders': 1,
+}
+
+REQUEST_METHOD_PREFIXES = ('fetch_', 'create_', 'cancel_', 'edit_', 'set_', 'load_markets', 'private_post_orderlist_oco')
+
+# Response headers reporting weight already used in the current minute (raw
+# Binance weight, converted to cost units when read)
+USED_WEIGHT_HEADERS = ('x-mbx-used-weight-1m', 'x-mbx-used-weight')
+RAW_WEIGHT_PER_COST_UNIT = 5.0
+
+
+@dataclass
+class SchedulerConfig:
+    """Budget and shedding policy for one exchange account."""
+    weight_per_minute: Optional[float] = None  # None: derive from exchange.rateLimit
+    # Fraction of the budget each class must leave untouched before it is admitted
+    reserve: Dict[RequestPriority, float] = field(default_factory=lambda: {
+        RequestPriority.EMERGENCY: 0.0,
+        RequestPriority.ORDER: 0.0,
+        RequestPriority.POSITION_SYNC: 0.10,
+        RequestPriority.MARKET_DATA: 0.20,
+        RequestPriority.ANALYTICS: 0.40,
+    })
+    shed_priority: RequestPriority = RequestPriority.ANALYTICS  # this class and below may be shed
+    shed_queue_depth: int = 20     # shed when this many requests are already waiting
+    max_wait: float = 30.0         # seconds a sheddable request may wait before it is shed
+    penalty_seconds: float = 60.0  # pause after the exchange returns a rate-limit error
+    wait_samples: int = 500
+
+
+class ExchangeRequestScheduler:
+    """Admits exchange calls by priority against a request-weight budget."""
+
+    def __init__(self, name: str, weight_per_minute: float, config: Optional[SchedulerConfig] = None):
+        self.name = name
+        self.config = config or SchedulerConfig()
+        self.weight_per_minute = float(weight_per_minute)
+        self._bucket = TokenBucket(capacity=self.weight_per_minute, rate=self.weight_per_minute / 60.0)
+        self._queue: List[Tuple[int, int, float, asyncio.Future]] = []  # (priority, seq, weight, future)
+        self._seq = itertools.count()
+        self._queued: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._paused_until = 0.0
+
+        self._dispatched: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+        self._shed: Dict[RequestPriority, int] = {p: 0 for p in RequestPriority}
+        self._waits: Dict[RequestPriority, Deque[float]] = {
+            p: deque(maxlen=self.config.wait_samples) for p in RequestPriority
+        }
+        self._rate_limit_hits = 0
+
+    # ------------------------------------------------------------------ admission
+
+    def _reserve(self, priority: RequestPriority) -> float:
+        return self.config.reserve.get(priority, 0.0) * self.weight_per_minute
+
+    def _admissible(self, priority: RequestPriority, weight: float, now: float) -> float:
+        """0 if the request may go now, else seconds to wait."""
+        if priority == RequestPriority.EMERGENCY:
+            return 0.0
+        if now < self._paused_until:
+            return self._paused_until - now
+        return self._bucket.retry_after(weight + self._reserve(priority))
+
+    def _should_shed(self, priority: RequestPriority) -> bool:
+        if priority < self.config.shed_priority:
+            return False
+        return (
+            time.monotonic() < self._paused_until
+            or len(self._queue) >= self.config.shed_queue_depth
+        )
+
+    def _record_shed(self, priority: RequestPriority, reason: str):
+        self._shed[priority] += 1
+        logger.debug(f"Shed {priority.name} request on {self.name}: {reason}")
+        raise RequestShed(f"{self.name}: {priority.name} request shed ({reason})")
+
+    async def acquire(self, priority: RequestPriority, weight: float = 1.0):
+        """Wait until a request of ``priority`` and ``weight`` may be sent."""
+        start = time.monotonic()
+        higher_waiting = any(self._queued[p] for p in RequestPriority if p <= priority)
+        if not higher_waiting and self._admissible(priority, weight, start) == 0.0:
+            self._bucket.consume(weight)
+            self._admitted(priority, 0.0)
+            return
+
+        if self._should_shed(priority):
+            self._record_shed(priority, "under pressure")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (int(priority), next(self._seq), weight, future))
+        self._queued[priority] += 1
+        self._ensure_dispatcher()
+
+        timeout = self.config.max_wait if priority >= self.config.shed_priority else None
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                self._record_shed(priority, f"waited over {self.config.max_wait:.0f}s")
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        self._admitted(priority, time.monotonic() - start)
+
+    def _admitted(self, priority: RequestPriority, waited: float):
+        self._dispatched[priority] += 1
+        self._waits[priority].append(waited)
+
+    def _ensure_dispatcher(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self):
+        while self._queue:
+            priority, _, weight, future = self._queue[0]
+            if future.done():  # caller gave up
+                heapq.heappop(self._queue)
+                self._queued[RequestPriority(priority)] -= 1
+                continue
+
+            wait = self._admissible(RequestPriority(priority), weight, time.monotonic())
+            if wait > 0:
+                # Sleep until budget refills or a more urgent request arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            self._queued[RequestPriority(priority)] -= 1
+            self._bucket.consume(weight)
+            future.set_result(None)
+
+    # ------------------------------------------------------------------ feedback
+
+    def penalize(self, seconds: Optional[float] = None):
+        """Pause non-emergency traffic after the exchange rate-limited us."""
+        seconds = self.config.penalty_seconds if seconds is None else seconds
+        self._rate_limit_hits += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._bucket.consume(max(self._bucket.available(), 0.0))
+        logger.warning(f"⏳ {self.name}: exchange rate limit hit, pausing non-emergency requests for {seconds:.0f}s")
+
+    def sync_used_weight(self, used: float):
+        """Align the local budget with the weight the exchange reports as used (in cost units)."""
+        remaining = self.weight_per_minute - used
+        if remaining < self._bucket.available():
+            self._bucket.consume(self._bucket.available() - remaining)
+
+    async def submit(self, func, *args, priority: RequestPriority = RequestPriority.MARKET_DATA,
+                     weight: float = 1.0, **kwargs):
+        """Run ``await func(*args, **kwargs)`` once admitted."""
+        await self.acquire(priority, weight)
+        try:
+            return await func(*args, **kwargs)
+        except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+            if not isinstance(e, RequestShed):
+                self.penalize()
+            raise
+
+    # ------------------------------------------------------------------ metrics
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, admissions, sheds and wait times per priority class."""
+        classes = {}
+        for p in RequestPriority:
+            waits = sorted(self._waits[p])
+            classes[p.name.lower()] = {
+                'queued': self._queued[p],
+                'dispatched': self._dispatched[p],
+                'shed': self._shed[p],
+                'avg_wait_ms': round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                'p95_wait_ms': round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+                'max_wait_ms': round(waits[-1] * 1000, 1) if waits else 0.0,
+            }
+        return {
+            'name': self.name,
+            'weight_per_minute': self.weight_per_minute,
+            'available_weight': round(self._bucket.available(), 1),
+            'queue_depth': len(self._queue),
+            'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 1),
+            'rate_limit_hits': self._rate_limit_hits,
+            'classes': classes,
+        }
+
+
+class ScheduledExchange:
+    """
+    Proxy around a CCXT exchange that routes request methods through a scheduler.
+
+    Attribute access (markets, symbols, id...) and non-request methods pass
+    straight through, so it is a drop-in replacement for the CCXT instance.
+    """
+
+    def __init__(self, exchange: Any, scheduler: ExchangeRequestScheduler):
+        object.__setattr__(self, '_exchange', exchange)
+        object.__setattr__(self, '_scheduler', scheduler)
+        object.__setattr__(self, '_wrapped', {})
+
+    @property
+    def scheduler(self) -> ExchangeRequestScheduler:
+        return self._scheduler
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._exchange, name)
+        if not name.startswith(REQUEST_METHOD_PREFIXES) or not callable(attr):
+            return attr
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = self._wrap(name)
+            self._wrapped[name] = wrapped
+        return wrapped
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._exchange, name, value)
+
+    def _wrap(self, name: str):
+        default_priority = METHOD_PRIORITIES.get(name, RequestPriority.MARKET_DATA)
+        base_weight = METHOD_WEIGHTS.get(name, 1.0)
+        scheduler = self._scheduler
+        exchange = self._exchange
+
+        async def call(*args, **kwargs):
+            priority = _current_priority.get()
+            if priority is None:
+                priority = default_priority
+            try:
+                return await scheduler.submit(
+                    getattr(exchange, name), *args, priority=priority, weight=base_weight, **kwargs
+                )
+            finally:
+                used = _used_weight(exchange)
+                if used is not None:
+                    scheduler.sync_used_weight(used)
+
+        call.__name__ = name
+        return call
+
+
+def _used_weight(exchange: Any) -> Optional[float]:
+    """Weight used this minute per the last response headers, in cost units."""
+    headers = getattr(exchange, 'last_response_headers', None)
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() in USED_WEIGHT_HEADERS:
+            try:
+                return float(value) / RAW_WEIGHT_PER_COST_UNIT
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+# One scheduler per (exchange, API key): budgets are per account, shared by
+# every adapter/bot instance that trades it.
+_schedulers: Dict[Tuple[str, str], ExchangeRequestScheduler] = {}
+
+
+def get_request_scheduler(exchange_name: str, api_key: Optional[str] = None, exchange: Any = None,
+                          config: Optional[SchedulerConfig] = None) -> ExchangeRequestScheduler:
+    """Get or create the scheduler for an exchange account."""
+    account = hashlib.sha256((api_key or '').encode()).hexdigest()[:12]
+    key = (exchange_name, account)
+    scheduler = _schedulers.get(key)
+    if scheduler is None:
+        config = config or SchedulerConfig()
+        budget = config.weight_per_minute
+        if budget is None:
+            rate_limit_ms = getattr(exchange, 'rateLimit', None) or 100
+            budget = 60000.0 / rate_limit_ms
+        scheduler = ExchangeRequestScheduler(f"{exchange_name}:{account[:6]}", budget, config)
+        _schedulers[key] = scheduler
+    return scheduler
+
+
+def get_all_scheduler_metrics() -> List[Dict[str, Any]]:
+    """Metrics for every active exchange scheduler."""
+    return [scheduler.get_metrics() for scheduler in _schedulers.values()]
@@ -0,0 +1,296 @@
+"""
+Per-account trade ledger with incremental sync and a cost-basis index.
+
+Fills are pulled with ``fetch_my_trades`` from a per-symbol cursor so each
+sync only downloads trades newer than the last one seen, paging forward from
+the start of the history on the first sync (Binance by trade id, ``fromId``;
+other exchanges by ``since``). Every new fill is folded into a FIFO/average
+``CostBasis`` per base asset. Entry prices for
+position valuation are then a dictionary lookup instead of a trade-history
+download per asset on every call.
+
+With ``persist=True`` the ledger rows, cursors and cost bases are stored in
+the database (tables from migration 004) so a restart resumes from the
+cursor instead of the exchange's limited recent-trades window.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from bot.core.cost_basis import CostBasis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUOTES = ('USDC', 'USDT', 'USD')
+
+
+class _Cursor:
+    """Newest synced execution time and the trade ids at exactly that ms."""
+
+    __slots__ = ("since_ms", "boundary_ids")
+
+    def __init__(self, since_ms: int, boundary_ids: Iterable[str] = ()):
+        self.since_ms = since_ms
+        self.boundary_ids: Set[str] = set(boundary_ids)
+
+    def is_new(self, timestamp: int, trade_id: str) -> bool:
+        if timestamp > self.since_ms:
+            return True
+        return timestamp == self.since_ms and trade_id not in self.boundary_ids
+
+    def next_id(self) -> Optional[int]:
+        """Trade id after the newest one synced, for exchanges with sequential ids."""
+        ids = [int(trade_id) for trade_id in self.boundary_ids if trade_id.isdigit()]
+        return max(ids) + 1 if ids else None
+
+    def advance(self, timestamp: int, trade_id: str):
+        if timestamp > self.since_ms:
+            self.since_ms = timestamp
+            self.boundary_ids = {trade_id}
+        elif timestamp == self.since_ms:
+            self.boundary_ids.add(trade_id)
+
+
+def _trade_key(trade: Dict[str, Any]) -> str:
+    """Exchange trade id, or a synthetic one for exchanges that omit it."""
+    if trade.get('id') is not None:
+        return str(trade['id'])
+    return f"{trade.get('timestamp')}:{trade.get('order')}:{trade.get('side')}:{trade.get('amount')}:{trade.get('price')}"
+
+
+class TradeLedger:
+    """
+    Trade ledger of one exchange account.
+
+    Args:
+        exchange: CCXT exchange (or ScheduledExchange proxy) to sync from
+        user_id: Owner of the ledger; required with ``persist``
+        exchange_name: Ledger scope in the database (defaults to exchange.id)
+        persist: Store ledger, cursors and cost bases in the database
+        min_sync_interval: Seconds an asset's entry price may be served
+            without re-checking the exchange for new fills (``mark_stale``
+            forces the next read to sync, e.g. on a streamed fill)
+    """
+
+    PAGE_LIMIT = 1000
+    MAX_PAGES = 20
+
+    def __init__(
+        self,
+        exchange: Any,
+        user_id: Optional[str] = None,
+        exchange_name: Optional[str] = None,
+        persist: bool = False,
+        min_sync_interval: float = 300.0,
+        quotes: Sequence[str] = DEFAULT_QUOTES,
+    ):
+        if persist and not user_id:
+            raise ValueError("user_id is required for a persistent trade ledger")
+        self.exchange = exchange
+        self.user_id = user_id
+        self.exchange_name = exchange_name or getattr(exchange, 'id', 'unknown')
+        self.persist = persist
+        self.min_sync_interval = min_sync_interval
+        self.quotes = tuple(quotes)
+
+        self._bases: Dict[str, CostBasis] = {}
+        self._cursors: Dict[str, _Cursor] = {}
+        self._synced_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._loaded = not persist
+        self._load_lock = asyncio.Lock()
+
+        self.stats = {'syncs': 0, 'requests': 0, 'trades': 0, 'cache_hits': 0}
+
+    # ------------------------------------------------------------------ reads
+
+    def get_basis(self, asset: str) -> Optional[CostBasis]:
+        return self._bases.get(asset)
+
+    def entry_price(self, asset: str, method: str = 'fifo') -> Optional[float]:
+        """Entry price of the current holding (``fifo`` or ``average``), None if unknown."""
+        basis = self._bases.get(asset)
+        if basis is None:
+            return None
+        return basis.fifo_price if method == 'fifo' else basis.average_price
+
+    async def get_entry_price(self, asset: str, method: str = 'fifo') -> Optional[float]:
+        """Entry price after an incremental sync, if the asset's cache is stale."""
+        await self.sync_asset(asset)
+        return self.entry_price(asset, method)
+
+    def mark_stale(self, asset: str):
+        """Make the next read of ``asset`` sync new fills from the exchange."""
+        self._synced_at.pop(asset, None)
+
+    # ------------------------------------------------------------------ sync
+
+    async def load(self):
+        """Load cursors and cost bases from the database (persistent ledgers)."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            from bot.db import DatabaseManager, load_trade_ledger
+
+            def _load():
+                with DatabaseManager.session_scope() as session:
+                    return load_trade_ledger(session, user_id=self.user_id, exchange=self.exchange_name)
+
+            try:
+                cursors, bases = await asyncio.to_thread(_load)
+                self._cursors = {symbol: _Cursor(*cursor) for symbol, cursor in cursors.items()}
+                self._bases.update(bases)
+                logger.info(f"📒 Trade ledger loaded: {len(self._cursors)} symbols, {len(bases)} cost bases")
+            except Exception as e:
+                # Syncing from the exchange still works; history starts over
+                logger.warning(f"Could not load trade ledger from database: {e}")
+            self._loaded = True
+
+    async def sync_asset(self, asset: str, force: bool = False) -> int:
+        """
+        Fetch fills newer than the cursor for every ``asset/quote`` market and
+        fold them into the asset's cost basis. Returns the number of new fills.
+        """
+        synced_at = self._synced_at.get(asset)
+        if not force and synced_at is not None and time.monotonic() - synced_at < self.min_sync_interval:
+            self.stats['cache_hits'] += 1
+            return 0
+
+        lock = self._locks.setdefault(asset, asyncio.Lock())
+        async with lock:
+            # Another caller may have synced while we waited for the lock
+            if not force and self._synced_at.get(asset, synced_at) != synced_at:
+                return 0
+            await self.load()
+
+            new_trades: List[Tuple[int, str, Dict[str, Any]]] = []
+            for symbol in self.symbols_for(asset):
+                new_trades.extend(await self._fetch_new(symbol))
+            new_trades.sort(key=lambda item: item[0])
+
+            basis = self._bases.setdefault(asset, CostBasis())
+            for _, _, trade in new_trades:
+                self._apply(asset, basis, trade)
+
+            if new_trades and self.persist:
+                await self._save(asset, new_trades)
+            self._synced_at[asset] = time.monotonic()
+            self.stats['syncs'] += 1
+            self.stats['trades'] += len(new_trades)
+            if new_trades:
+                logger.debug(f"📒 {asset}: {len(new_trades)} new fills, entry={basis.fifo_price}")
+            return len(new_trades)
+
+    def symbols_for(self, asset: str) -> List[str]:
+        candidates = [f"{asset}/{quote}" for quote in self.quotes]
+        markets = getattr(self.exchange, 'markets', None)
+        if markets:
+            candidates = [symbol for symbol in candidates if symbol in markets]
+        return candidates
+
+    async def _fetch_new(self, symbol: str) -> List[Tuple[int, str, Dict[str, Any]]]:
+        cursor = self._cursors.get(symbol)
+        # Binance pages myTrades by id; its startTime windows are capped at 24h
+        by_id = getattr(self.exchange, 'id', None) == 'binance'
+        new: List[Tuple[int, str, Dict[str, Any]]] = []
+        for _ in range(self.MAX_PAGES):
+            from_id = (cursor.next_id() if cursor else 0) if by_id else None
+            if from_id is not None:
+                since, params = None, {'fromId': from_id}
+            else:
+                # No cursor yet: start from the beginning, not the newest page
+                since, params = (cursor.since_ms if cursor else 0), {}
+            try:
+                self.stats['requests'] += 1
+                page = await self.exchange.fetch_my_trades(symbol, since=since, limit=self.PAGE_LIMIT, params=params)
+            except Exception as e:
+                logger.debug(f"fetch_my_trades({symbol}) failed: {e}")
+                break
+            fresh = 0
+            for trade in sorted(page or [], key=lambda t: t.get('timestamp') or 0):
+                timestamp = int(trade.get('timestamp') or 0)
+                trade_id = _trade_key(trade)
+                if cursor is None:
+                    cursor = self._cursors[symbol] = _Cursor(timestamp - 1)
+                if not cursor.is_new(timestamp, trade_id):
+                    continue
+                cursor.advance(timestamp, trade_id)
+                new.append((timestamp, trade_id, trade))
+                fresh += 1
+            # Page forward until a short page
+            if not page or len(page) < self.PAGE_LIMIT:
+                break
+            if not fresh:
+                # A full page of trades at the cursor's millisecond: since= cannot move past it
+                logger.warning(f"📒 {symbol}: trade sync stuck at {cursor.since_ms}, {len(page)} trades in one ms")
+                break
+        return new
+
+    def _apply(self, asset: str, basis: CostBasis, trade: Dict[str, Any]):
+        fee = trade.get('fee') or {}
+        basis.apply_trade(
+            side=trade.get('side'),
+            amount=float(trade.get('amount') or 0),
+            price=float(trade.get('price') or 0),
+            fee_cost=float(fee.get('cost') or 0),
+            fee_currency=fee.get('currency'),
+            base=asset,
+        )
+
+    async def _save(self, asset: str, new_trades: List[Tuple[int, str, Dict[str, Any]]]):
+        from bot.db import DatabaseManager, save_trade_ledger_sync
+
+        rows = []
+        symbols = set()
+        for timestamp, trade_id, trade in new_trades:
+            fee = trade.get('fee') or {}
+            symbols.add(trade['symbol'])
+            rows.append({
+                'symbol': trade['symbol'],
+                'trade_id': trade_id,
+                'order_id': str(trade['order']) if trade.get('order') is not None else None,
+                'side': trade.get('side'),
+                'amount': float(trade.get('amount') or 0),
+                'price': float(trade.get('price') or 0),
+                'fee_cost': float(fee.get('cost') or 0),
+                'fee_currency': fee.get('currency'),
+                'exchange_ts': timestamp,
+                'executed_at': datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc),
+            })
+        cursors = {
+            symbol: (self._cursors[symbol].since_ms, sorted(self._cursors[symbol].boundary_ids))
+            for symbol in symbols
+        }
+        bases = {asset: self._bases[asset]}
+
+        def _write():
+            with DatabaseManager.session_scope() as session:
+                save_trade_ledger_sync(
+                    session,
+                    user_id=self.user_id,
+                    exchange=self.exchange_name,
+                    trades=rows,
+                    cursors=cursors,
+                    bases=bases,
+                )
+
+        try:
+            await asyncio.to_thread(_write)
+        except Exception as e:
+            # The stored cursor and cost basis stay consistent with each
+            # other; after a restart these fills are simply synced again
+            logger.warning(f"Could not persist trade ledger for {asset}: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'exchange': self.exchange_name,
+            'persist': self.persist,
+            'symbols': len(self._cursors),
+            'assets': len(self._bases),
+            **self.stats,
+        }
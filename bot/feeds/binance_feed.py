@@ -13,6 +13,7 @@ import websockets
 from asyncio_throttle import Throttler
 
 from bot.broker.enhanced_paper import EnhancedPaperBroker
+from bot.realtime.candles import CandleStore, timeframe_ms
 
 
 class BinanceFeed:
@@ -35,6 +36,9 @@ class BinanceFeed:
         # Rate limiting
         self.throttler = Throttler(rate_limit=10, period=1.0)  # 10 requests per second
         
+        # Higher-timeframe klines resampled locally from the 1m kline stream
+        self.candles = CandleStore(base_timeframe="1m")
+        
         self.logger = logging.getLogger(__name__)
     
     def add_callback(self, event_type: str, callback: Callable):
@@ -220,6 +224,12 @@ class BinanceFeed:
             "timestamp": datetime.utcnow()
         }
         
+        if kline_data["interval"] == self.candles.base_timeframe:
+            self.candles.on_base_bar(kline_data["symbol"], [
+                kline_data["open_time"], kline_data["open"], kline_data["high"],
+                kline_data["low"], kline_data["close"], kline_data["volume"]
+            ])
+        
         # Call callbacks
         for callback in self.callbacks["kline"]:
             try:
@@ -266,7 +276,23 @@ class BinanceFeed:
     
     async def get_historical_klines(self, symbol: str, interval: str = "1m", 
                                    limit: int = 100) -> List[dict]:
-        """Get historical kline data"""
+        """Get historical kline data (local candles while the kline stream is live, REST otherwise)"""
+        local = self.candles.get_ohlcv(symbol.upper(), interval, limit)
+        if local is not None:
+            period_ms = timeframe_ms(interval)
+            return [
+                {
+                    "open_time": row[0],
+                    "open": row[1],
+                    "high": row[2],
+                    "low": row[3],
+                    "close": row[4],
+                    "volume": row[5],
+                    "close_time": row[0] + period_ms - 1,
+                }
+                for row in local
+            ]
+        
         try:
             async with aiohttp.ClientSession() as session:
                 url = f"{self.rest_url}/klines"
@@ -280,6 +306,8 @@ class BinanceFeed:
                     if response.status == 200:
                         klines = await response.json()
                         
+                        self.candles.seed(symbol.upper(), interval, [kline[:6] for kline in klines])
+                        
                         processed_klines = []
                         for kline in klines:
                             processed_klines.append({
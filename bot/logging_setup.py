@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import atexit
+import json
 import logging
 import os
+import queue
 import re
-from typing import Optional
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Set, TextIO, Tuple
 
+from rich.console import Console
 from rich.logging import RichHandler
 
 
@@ -33,15 +42,266 @@ class RedactSecretsFilter(logging.Filter):
         return True
 
 
+class RateLimitFilter(logging.Filter):
+    """
+    Per-logger rate limiting plus call-site sampling.
+
+    Runs on the producer side, so it only does dict lookups and arithmetic.
+    WARNING and above always pass. Below that:
+
+    - each logger gets a token bucket of ``rate`` records/s with ``burst``
+      capacity;
+    - each call site (file, line) passes its first ``sample_burst`` records
+      per ``sample_window`` seconds and then one in ``sample_every``.
+
+    The number of dropped records is attached to the next record that passes
+    for the same call site as ``record.suppressed``.
+    """
+
+    def __init__(self, rate: float = 50.0, burst: int = 100, sample_window: float = 60.0,
+                 sample_burst: int = 20, sample_every: int = 10, max_keys: int = 10000):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_window = sample_window
+        self.sample_burst = sample_burst
+        self.sample_every = max(1, sample_every)
+        self.max_keys = max_keys
+        self._buckets: Dict[str, list] = {}
+        self._sites: Dict[Tuple[str, int], list] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:  # type: ignore[override]
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+
+        # Call-site sampling: [window_start, seen, suppressed]
+        site_key = (record.pathname, record.lineno)
+        site = self._sites.get(site_key)
+        if site is None or now - site[0] >= self.sample_window:
+            suppressed = site[2] if site is not None else 0
+            if len(self._sites) >= self.max_keys:
+                self._sites.clear()
+            site = [now, 0, suppressed]
+            self._sites[site_key] = site
+        site[1] += 1
+        if site[1] > self.sample_burst and (site[1] - self.sample_burst) % self.sample_every:
+            site[2] += 1
+            self.dropped += 1
+            return False
+
+        # Token bucket per logger: [tokens, last_refill]
+        bucket_key = record.name
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.clear()
+            bucket = [float(self.burst), now]
+            self._buckets[bucket_key] = bucket
+        else:
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] < 1.0:
+            site[2] += 1
+            self.dropped += 1
+            return False
+        bucket[0] -= 1.0
+
+        if site[2]:
+            record.suppressed = site[2]
+            site[2] = 0
+        return True
+
+
+class SuppressedNoteFilter(logging.Filter):
+    """Listener-side: append the count of records sampled away before this one."""
+
+    def filter(self, record: logging.LogRecord) -> bool:  # type: ignore[override]
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            record.msg = f"{record.msg} (+{suppressed} similar suppressed)"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message and extras."""
+
+    _RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self._RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = record.stack_info
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands the raw record to the listener thread.
+
+    The stdlib ``prepare`` formats the message in the calling thread; here the
+    record is enqueued as-is so formatting, redaction and I/O all happen in
+    the listener. Log arguments are therefore rendered when the listener gets
+    to them, not when the call was made. A full queue drops the record
+    instead of blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_MANAGED_LOGGERS: Set[str] = set()
+_LOCK = threading.RLock()
+_CONFIG: Dict[str, object] = {}
+_QUEUE_HANDLER: Optional[LazyQueueHandler] = None
+_LISTENER: Optional[QueueListener] = None
+
+
+def _output_handler(fmt: str, stream: Optional[TextIO]) -> logging.Handler:
+    if fmt == "json":
+        handler: logging.Handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(JsonFormatter())
+    elif fmt == "text":
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        console = Console(file=stream) if stream is not None else None
+        handler = RichHandler(console=console, rich_tracebacks=True, markup=True)
+    handler.addFilter(RedactSecretsFilter())
+    return handler
+
+
+def _resolve_config() -> Dict[str, object]:
+    if not _CONFIG:
+        _CONFIG.update(
+            mode=os.getenv("LOG_MODE", "sync").lower(),
+            fmt=os.getenv("LOG_FORMAT", "rich").lower(),
+            stream=None,
+            rate=float(os.getenv("LOG_RATE_LIMIT", "50")),
+            burst=int(os.getenv("LOG_RATE_BURST", "100")),
+            sample_burst=int(os.getenv("LOG_SAMPLE_BURST", "20")),
+            sample_every=int(os.getenv("LOG_SAMPLE_EVERY", "10")),
+            queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        )
+    return _CONFIG
+
+
+def _get_queue_handler() -> LazyQueueHandler:
+    """Start the shared listener thread on first use (async mode)."""
+    global _QUEUE_HANDLER, _LISTENER
+    with _LOCK:
+        if _QUEUE_HANDLER is not None:
+            return _QUEUE_HANDLER
+        config = _resolve_config()
+        log_queue: queue.Queue = queue.Queue(maxsize=int(config["queue_size"]))
+        handler = LazyQueueHandler(log_queue)
+        handler.addFilter(RateLimitFilter(
+            rate=float(config["rate"]),
+            burst=int(config["burst"]),
+            sample_burst=int(config["sample_burst"]),
+            sample_every=int(config["sample_every"]),
+        ))
+        output = _output_handler(str(config["fmt"]), config["stream"])  # type: ignore[arg-type]
+        output.addFilter(SuppressedNoteFilter())
+        _LISTENER = QueueListener(log_queue, output, respect_handler_level=True)
+        _LISTENER.start()
+        _QUEUE_HANDLER = handler
+        atexit.register(stop_logging)
+        return _QUEUE_HANDLER
+
+
+def _attach_handler(logger: logging.Logger) -> None:
+    config = _resolve_config()
+    if config["mode"] == "async":
+        handler: logging.Handler = _get_queue_handler()
+    else:
+        handler = _output_handler(str(config["fmt"]), config["stream"])  # type: ignore[arg-type]
+    logger.addHandler(handler)
+
+
+def configure_logging(mode: Optional[str] = None, fmt: Optional[str] = None,
+                      stream: Optional[TextIO] = None, **options) -> None:
+    """
+    Select the logging pipeline explicitly instead of via environment.
+
+    ``mode`` is "sync" (handler runs in the caller) or "async" (records go
+    through a queue to a background listener thread). ``fmt`` is "rich",
+    "text" or "json". Unspecified options fall back to the LOG_* environment
+    variables. Loggers already created by ``get_logger`` are switched over.
+    """
+    with _LOCK:
+        stop_logging()
+        _CONFIG.clear()
+        config = _resolve_config()
+        if mode is not None:
+            config["mode"] = mode.lower()
+        if fmt is not None:
+            config["fmt"] = fmt.lower()
+        config["stream"] = stream
+        config.update(options)
+
+        for name in _MANAGED_LOGGERS:
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            _attach_handler(logger)
+
+
+def stop_logging() -> None:
+    """
+    Flush and stop the background listener (no-op in sync mode).
+
+    Loggers using the queue are switched to synchronous handlers first, so
+    records logged afterwards (e.g. by other atexit hooks) are still written.
+    """
+    global _QUEUE_HANDLER, _LISTENER
+    with _LOCK:
+        queue_handler, _QUEUE_HANDLER = _QUEUE_HANDLER, None
+        listener, _LISTENER = _LISTENER, None
+        if queue_handler is not None:
+            config = _resolve_config()
+            config["mode"] = "sync"
+            for name in _MANAGED_LOGGERS:
+                logger = logging.getLogger(name)
+                if queue_handler in logger.handlers:
+                    logger.removeHandler(queue_handler)
+                    logger.addHandler(_output_handler(str(config["fmt"]), config["stream"]))  # type: ignore[arg-type]
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.flush()
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     logger = logging.getLogger(name if name else __name__)
     if not logger.handlers:
-        handler = RichHandler(rich_tracebacks=True, markup=True)
-        handler.addFilter(RedactSecretsFilter())
-        logger.addHandler(handler)
+        _attach_handler(logger)
+        _MANAGED_LOGGERS.add(logger.name)
         level = os.getenv("LOG_LEVEL", "INFO").upper()
         logger.setLevel(getattr(logging, level, logging.INFO))
         logger.propagate = False
     return logger
-
-
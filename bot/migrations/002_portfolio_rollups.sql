@@ -0,0 +1,61 @@
+-- =============================================================================
+-- MIGRATION: Portfolio performance rollups
+-- Date: 2026-10-18
+-- Description: Per-user 1m/1h/1d OHLC of portfolio value, maintained by
+--              DatabaseManager.record_portfolio_snapshot, read by
+--              GET /api/portfolio/performance.
+-- =============================================================================
+
+-- NOTE: Run this migration in Supabase SQL Editor.
+-- Then fold in the existing snapshot history once:
+--   python scripts/backfill_portfolio_rollups.py
+
+-- ======================= STEP 1: CREATE TABLE ===============================
+
+CREATE TABLE IF NOT EXISTS portfolio_rollups (
+    id SERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    resolution TEXT NOT NULL CHECK (resolution IN ('1m', '1h', '1d')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+
+    -- Portfolio value OHLC within the bucket
+    open_value DOUBLE PRECISION NOT NULL,
+    high_value DOUBLE PRECISION NOT NULL,
+    low_value DOUBLE PRECISION NOT NULL,
+    close_value DOUBLE PRECISION NOT NULL,
+    close_unrealized_pnl DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    sample_count INTEGER NOT NULL DEFAULT 0,
+    first_timestamp TIMESTAMPTZ NOT NULL,
+    last_timestamp TIMESTAMPTZ NOT NULL,
+
+    CONSTRAINT uq_portfolio_rollup_bucket UNIQUE (user_id, resolution, bucket_start)
+);
+
+-- ======================= STEP 2: INDEXES ====================================
+
+CREATE INDEX IF NOT EXISTS idx_portfolio_rollup_lookup
+ON portfolio_rollups(user_id, resolution, bucket_start);
+
+-- =============================================================================
+-- ROW LEVEL SECURITY (RLS)
+-- =============================================================================
+
+ALTER TABLE portfolio_rollups ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own portfolio rollups"
+ON portfolio_rollups FOR SELECT
+USING (auth.uid()::text = user_id);
+
+CREATE POLICY "Service role full access"
+ON portfolio_rollups FOR ALL
+USING (auth.role() = 'service_role');
+
+-- =============================================================================
+-- COMMENTS
+-- =============================================================================
+
+COMMENT ON TABLE portfolio_rollups IS 'Per-user portfolio value OHLC per 1m/1h/1d bucket';
+COMMENT ON COLUMN portfolio_rollups.bucket_start IS 'Bucket start (UTC), floored to the resolution';
+COMMENT ON COLUMN portfolio_rollups.first_timestamp IS 'Earliest snapshot folded into the bucket (defines open)';
+COMMENT ON COLUMN portfolio_rollups.last_timestamp IS 'Latest snapshot folded into the bucket (defines close)';
@@ -0,0 +1,78 @@
+-- =============================================================================
+-- MIGRATION: Trade performance metrics store
+-- Date: 2026-10-18
+-- Description: Running per-user/strategy trade statistics, updated by
+--              DatabaseManager.save_trade whenever a trade is saved with P&L.
+--              Read by /api/ai/bots/* and monitor_group monthly P&L.
+-- =============================================================================
+
+-- NOTE: Run this migration in Supabase SQL Editor.
+-- Then fold in the existing closed-trade history once:
+--   python scripts/backfill_performance_metrics.py
+
+-- ======================= STEP 1: CREATE TABLE ===============================
+
+CREATE TABLE IF NOT EXISTS trade_performance_metrics (
+    id SERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    strategy_name TEXT NOT NULL DEFAULT '',
+    resolution TEXT NOT NULL CHECK (resolution IN ('all', '1d')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+
+    -- Counters and sums
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    win_count INTEGER NOT NULL DEFAULT 0,
+    loss_count INTEGER NOT NULL DEFAULT 0,
+    pnl_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    pnl_sum_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gross_profit DOUBLE PRECISION NOT NULL DEFAULT 0,
+    gross_loss DOUBLE PRECISION NOT NULL DEFAULT 0,
+    volume DOUBLE PRECISION NOT NULL DEFAULT 0,
+    best_trade DOUBLE PRECISION,
+    worst_trade DOUBLE PRECISION,
+
+    -- Cumulative P&L path within the bucket (relative to bucket start)
+    equity DOUBLE PRECISION NOT NULL DEFAULT 0,
+    peak_equity DOUBLE PRECISION NOT NULL DEFAULT 0,
+    trough_equity DOUBLE PRECISION NOT NULL DEFAULT 0,
+    max_drawdown DOUBLE PRECISION NOT NULL DEFAULT 0,
+
+    first_trade_at TIMESTAMPTZ,
+    last_trade_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT uq_trade_performance_bucket UNIQUE (user_id, strategy_name, resolution, bucket_start)
+);
+
+-- ======================= STEP 2: INDEXES ====================================
+
+CREATE INDEX IF NOT EXISTS idx_trade_performance_lookup
+ON trade_performance_metrics(user_id, strategy_name, resolution, bucket_start);
+
+-- Backfill and backfill-needed checks scan closed trades per user by time
+CREATE INDEX IF NOT EXISTS idx_trades_user_closed
+ON trades(user_id, created_at)
+WHERE pnl IS NOT NULL;
+
+-- =============================================================================
+-- ROW LEVEL SECURITY (RLS)
+-- =============================================================================
+
+ALTER TABLE trade_performance_metrics ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own performance metrics"
+ON trade_performance_metrics FOR SELECT
+USING (auth.uid()::text = user_id);
+
+CREATE POLICY "Service role full access"
+ON trade_performance_metrics FOR ALL
+USING (auth.role() = 'service_role');
+
+-- =============================================================================
+-- COMMENTS
+-- =============================================================================
+
+COMMENT ON TABLE trade_performance_metrics IS 'Running trade statistics per user/strategy (lifetime and daily buckets)';
+COMMENT ON COLUMN trade_performance_metrics.strategy_name IS 'Empty string = all strategies';
+COMMENT ON COLUMN trade_performance_metrics.bucket_start IS '1970-01-01 for the lifetime row, UTC day start for 1d rows';
+COMMENT ON COLUMN trade_performance_metrics.max_drawdown IS 'Deepest fall of cumulative P&L from its running peak (<= 0)';
@@ -0,0 +1,103 @@
+-- =============================================================================
+-- MIGRATION: Trade ledger and cost basis
+-- Date: 2026-10-18
+-- Description: Per-user ledger of exchange fills, synced incrementally with
+--              a `since` cursor per symbol, and the FIFO/average cost basis
+--              per asset that spot/margin position valuation reads entry
+--              prices from (bot/exchange_adapters/trade_ledger.py).
+-- =============================================================================
+
+-- NOTE: Run this migration in Supabase SQL Editor.
+-- The ledger fills itself on the first valuation of each asset; history older
+-- than the exchange's recent-trades window is not recovered.
+
+-- ======================= STEP 1: CREATE TABLES ==============================
+
+CREATE TABLE IF NOT EXISTS trade_ledger (
+    id SERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    trade_id TEXT NOT NULL,
+    order_id TEXT,
+    side TEXT NOT NULL CHECK (side IN ('buy', 'sell')),
+    amount DOUBLE PRECISION NOT NULL,
+    price DOUBLE PRECISION NOT NULL,
+    fee_cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+    fee_currency TEXT,
+    exchange_ts BIGINT NOT NULL,
+    executed_at TIMESTAMPTZ NOT NULL,
+
+    CONSTRAINT uq_trade_ledger_trade UNIQUE (user_id, exchange, symbol, trade_id)
+);
+
+CREATE TABLE IF NOT EXISTS trade_ledger_cursors (
+    id SERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    since_ms BIGINT NOT NULL,
+    boundary_ids JSONB NOT NULL DEFAULT '[]'::jsonb,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT uq_trade_ledger_cursor UNIQUE (user_id, exchange, symbol)
+);
+
+CREATE TABLE IF NOT EXISTS cost_basis_positions (
+    id SERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    exchange TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    quantity DOUBLE PRECISION NOT NULL DEFAULT 0,
+    cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+    average_cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+    realized_pnl DOUBLE PRECISION NOT NULL DEFAULT 0,
+    lots JSONB NOT NULL DEFAULT '[]'::jsonb,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT uq_cost_basis_asset UNIQUE (user_id, exchange, asset)
+);
+
+-- ======================= STEP 2: INDEXES ====================================
+
+CREATE INDEX IF NOT EXISTS idx_trade_ledger_symbol_time
+ON trade_ledger(user_id, exchange, symbol, exchange_ts);
+
+-- =============================================================================
+-- ROW LEVEL SECURITY (RLS)
+-- =============================================================================
+
+ALTER TABLE trade_ledger ENABLE ROW LEVEL SECURITY;
+ALTER TABLE trade_ledger_cursors ENABLE ROW LEVEL SECURITY;
+ALTER TABLE cost_basis_positions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own trade ledger"
+ON trade_ledger FOR SELECT
+USING (auth.uid()::text = user_id);
+
+CREATE POLICY "Users can view own cost basis"
+ON cost_basis_positions FOR SELECT
+USING (auth.uid()::text = user_id);
+
+CREATE POLICY "Service role full access"
+ON trade_ledger FOR ALL
+USING (auth.role() = 'service_role');
+
+CREATE POLICY "Service role full access"
+ON trade_ledger_cursors FOR ALL
+USING (auth.role() = 'service_role');
+
+CREATE POLICY "Service role full access"
+ON cost_basis_positions FOR ALL
+USING (auth.role() = 'service_role');
+
+-- =============================================================================
+-- COMMENTS
+-- =============================================================================
+
+COMMENT ON TABLE trade_ledger IS 'Exchange fills per user, appended by incremental sync';
+COMMENT ON TABLE trade_ledger_cursors IS 'Incremental sync position per user/exchange/symbol';
+COMMENT ON COLUMN trade_ledger_cursors.since_ms IS 'Newest synced execution time (ms); next fetch uses since=since_ms';
+COMMENT ON COLUMN trade_ledger_cursors.boundary_ids IS 'Trade ids at exactly since_ms, skipped when returned again';
+COMMENT ON TABLE cost_basis_positions IS 'Open FIFO lots and average cost per user/exchange/asset';
+COMMENT ON COLUMN cost_basis_positions.lots IS '[[quantity, unit_cost], ...] oldest first; unit cost includes quote fees';
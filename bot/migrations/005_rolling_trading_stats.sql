@@ -0,0 +1,43 @@
+-- =============================================================================
+-- MIGRATION: Rolling trading statistics
+-- Date: 2026-10-18
+-- Description: Per-user snapshot of the running statistics behind Kelly,
+--              Sharpe and VaR sizing (Welford trade moments, the last 100
+--              outcomes per symbol, daily returns of the last year against
+--              the account equity). Written by RiskManagerService on trade
+--              close and day close.
+-- =============================================================================
+
+-- NOTE: Run this migration in Supabase SQL Editor.
+-- A missing snapshot is rebuilt from the user's closed trades on first use.
+
+-- ======================= STEP 1: CREATE TABLE ===============================
+
+CREATE TABLE IF NOT EXISTS rolling_trading_stats (
+    id SERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL UNIQUE,
+    trade_count INTEGER NOT NULL DEFAULT 0,
+    payload JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- =============================================================================
+-- ROW LEVEL SECURITY (RLS)
+-- =============================================================================
+
+ALTER TABLE rolling_trading_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own rolling stats"
+ON rolling_trading_stats FOR SELECT
+USING (auth.uid()::text = user_id);
+
+CREATE POLICY "Service role full access"
+ON rolling_trading_stats FOR ALL
+USING (auth.role() = 'service_role');
+
+-- =============================================================================
+-- COMMENTS
+-- =============================================================================
+
+COMMENT ON TABLE rolling_trading_stats IS 'Running Kelly/Sharpe/VaR inputs per user (RollingTradingStats.to_dict)';
+COMMENT ON COLUMN rolling_trading_stats.payload IS 'Compact lists: t=all trades, s=per symbol, d=daily Welford, e=daily EW, o=open day';
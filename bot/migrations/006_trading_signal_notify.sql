@@ -0,0 +1,46 @@
+-- =============================================================================
+-- MIGRATION: Trading signal notifications
+-- Date: 2026-10-18
+-- Description: NOTIFY on every trading_signals insert so running bots are
+--              woken immediately (SignalFeed, LISTEN trading_signals)
+--              instead of finding the signal at their next cycle.
+-- =============================================================================
+
+-- NOTE: Run this migration in Supabase SQL Editor.
+-- Without it SignalFeed polls trading_signals.created_at every few seconds
+-- instead. Behind a transaction-mode pooler notifications are not delivered;
+-- SignalFeed's 30s safety poll still picks the signals up.
+
+-- ======================= STEP 1: TRIGGER FUNCTION ===========================
+
+CREATE OR REPLACE FUNCTION notify_trading_signal()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'trading_signals',
+        json_build_object(
+            'id', NEW.id,
+            'user_id', NEW.user_id,
+            'symbol', NEW.symbol,
+            'signal_type', NEW.signal_type,
+            'source', NEW.source,
+            'created_at', NEW.created_at
+        )::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ======================= STEP 2: TRIGGER ====================================
+
+DROP TRIGGER IF EXISTS trading_signals_notify ON trading_signals;
+
+CREATE TRIGGER trading_signals_notify
+AFTER INSERT ON trading_signals
+FOR EACH ROW EXECUTE FUNCTION notify_trading_signal();
+
+-- =============================================================================
+-- COMMENTS
+-- =============================================================================
+
+COMMENT ON FUNCTION notify_trading_signal() IS 'Sends new trading_signals rows on channel trading_signals (SignalFeed)';
@@ -1,4 +1,35 @@
 """Real-time data streaming package."""
-from bot.realtime.websocket_manager import WebSocketManager, PositionMonitor, MarketTick, OrderBookUpdate
+from bot.realtime.order_book import L2OrderBook, FillEstimate
+from bot.realtime.candles import CandleStore, get_candle_store
 
-__all__ = ['WebSocketManager', 'PositionMonitor', 'MarketTick', 'OrderBookUpdate']
+# The WebSocket manager and user-data stream import ccxt.pro (several hundred
+# ms); load them on first access (PEP 562) so consumers of the order book
+# alone, such as the order-flow analyzer, stay cheap to import.
+_LAZY_EXPORTS = {
+    'WebSocketManager': 'bot.realtime.websocket_manager',
+    'PositionMonitor': 'bot.realtime.websocket_manager',
+    'MarketTick': 'bot.realtime.websocket_manager',
+    'OrderBookUpdate': 'bot.realtime.websocket_manager',
+    'UserDataStream': 'bot.realtime.user_data_stream',
+    'FillEvent': 'bot.realtime.user_data_stream',
+    'SignalFeed': 'bot.realtime.signal_feed',
+    'SignalNotice': 'bot.realtime.signal_feed',
+    'get_signal_feed': 'bot.realtime.signal_feed',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    'WebSocketManager', 'PositionMonitor', 'MarketTick', 'OrderBookUpdate', 'L2OrderBook', 'FillEstimate',
+    'UserDataStream', 'FillEvent', 'SignalFeed', 'SignalNotice', 'get_signal_feed',
+    'CandleStore', 'get_candle_store',
+]
@@ -0,0 +1,302 @@
+"""
+Local candles - higher timeframes resampled from one stream per symbol.
+
+Multi-timeframe consumers (multi-TF confirmation, ATR/volatility profile,
+dynamic correlation, kline history) each fetched their own OHLCV over REST
+for every decision. ``CandleStore`` keeps 1m/5m/15m/1h/4h/1d bars per symbol
+in contiguous NumPy arrays and serves them all:
+
+- history is seeded once per timeframe (from the first REST fetch, or
+  resampled from base-timeframe bars when they cover the period);
+- live ticks, trades or base-timeframe klines update the open bar of every
+  timeframe in place and roll bars over on bucket boundaries, so indicators
+  see the current partial bar instead of the one from the last fetch;
+- a series is served locally while its symbol keeps receiving updates;
+  without a live feed it is refetched after ``max_age`` seconds, which makes
+  the store a short-lived OHLCV cache;
+- a series whose live updates skipped a bar, or stopped for longer than one
+  base bar (e.g. a WebSocket reconnect), is refetched once before it is
+  served again, so bars missed during the outage are backfilled.
+
+Rows are returned in ccxt format (``[timestamp_ms, open, high, low, close,
+volume]``), so consumers keep their existing indicator code.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '12h': 43200, '1d': 86400,
+}
+
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def timeframe_ms(timeframe: str) -> int:
+    return TIMEFRAME_SECONDS[timeframe] * 1000
+
+
+def resample_ohlcv(bars: np.ndarray, timeframe: str, drop_partial_first: bool = True) -> np.ndarray:
+    """
+    Aggregate ``(n, 6)`` OHLCV bars into a higher timeframe (UTC-aligned buckets).
+
+    The first bucket is dropped when the input starts mid-bucket, since its
+    open/high/low would only cover part of the period.
+    """
+    if not len(bars):
+        return np.empty((0, 6))
+    period = timeframe_ms(timeframe)
+    buckets = bars[:, TS] - bars[:, TS] % period
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(bars)] - 1
+    result = np.column_stack((
+        buckets[starts],
+        bars[starts, OPEN],
+        np.maximum.reduceat(bars[:, HIGH], starts),
+        np.minimum.reduceat(bars[:, LOW], starts),
+        bars[ends, CLOSE],
+        np.add.reduceat(bars[:, VOLUME], starts),
+    ))
+    if drop_partial_first and bars[0, TS] != buckets[0]:
+        result = result[1:]
+    return result
+
+
+class CandleSeries:
+    """Bars of one symbol and timeframe; the last row is the open bar."""
+
+    def __init__(self, timeframe: str, max_bars: int = 1000, capacity: int = 64):
+        self.timeframe = timeframe
+        self.period = timeframe_ms(timeframe)
+        self.max_bars = max_bars
+        self.n = 0
+        self._bars = np.empty((min(capacity, max_bars * 2), 6))
+        self.updated_at: Optional[float] = None  # time.monotonic() of the last seed/update
+        self.gap = False  # Live updates missed bars since the last seed
+
+    @property
+    def bars(self) -> np.ndarray:
+        return self._bars[:self.n]
+
+    def _reserve(self, size: int):
+        capacity = len(self._bars)
+        if size <= capacity:
+            return
+        grown = np.empty((min(max(size, capacity * 2), self.max_bars * 2), 6))
+        grown[:self.n] = self._bars[:self.n]
+        self._bars = grown
+
+    def _append(self, row: Sequence[float]):
+        if self.n == self.max_bars * 2:
+            # Drop the oldest half at once instead of shifting on every bar
+            keep = self.max_bars
+            self._bars[:keep] = self._bars[self.n - keep:self.n]
+            self.n = keep
+        self._reserve(self.n + 1)
+        self._bars[self.n] = row
+        self.n += 1
+
+    def update(self, ts: float, open_: float, high: float, low: float, close: float, volume: float = 0.0):
+        """Fold a tick (open = high = low = close) or a partial bar into its bucket."""
+        bucket = ts - ts % self.period
+        last = self._bars[self.n - 1] if self.n else None
+        if last is not None and bucket == last[TS]:
+            last[HIGH] = max(last[HIGH], high)
+            last[LOW] = min(last[LOW], low)
+            last[CLOSE] = close
+            last[VOLUME] += volume
+        elif last is None or bucket > last[TS]:
+            if last is not None and bucket > last[TS] + self.period:
+                self.gap = True
+            self._append((bucket, open_, high, low, close, volume))
+        else:
+            # Late update for an already rolled-over bar: extremes and volume only
+            index = int(np.searchsorted(self.bars[:, TS], bucket))
+            if index < self.n and self._bars[index, TS] == bucket:
+                row = self._bars[index]
+                row[HIGH] = max(row[HIGH], high)
+                row[LOW] = min(row[LOW], low)
+                row[VOLUME] += volume
+        self.updated_at = time.monotonic()
+
+    def seed(self, bars: np.ndarray):
+        """Replace history up to the last seeded bar, keeping newer live bars."""
+        if not len(bars):
+            return
+        bars = bars[-self.max_bars:]
+        newer = self.bars[self.bars[:, TS] > bars[-1, TS]] if self.n else np.empty((0, 6))
+        merged = np.concatenate((bars, newer))[-self.max_bars:]
+        self._reserve(len(merged))
+        self._bars[:len(merged)] = merged
+        self.n = len(merged)
+        self.updated_at = time.monotonic()
+        # Still a hole if the fetched history stops short of the live bars
+        self.gap = bool(len(newer)) and newer[0, TS] > bars[-1, TS] + self.period
+
+    def to_ohlcv(self, limit: int) -> List[List[float]]:
+        rows = self.bars[-limit:].tolist()
+        for row in rows:
+            row[TS] = int(row[TS])
+        return rows
+
+
+class CandleStore:
+    """Per-symbol multi-timeframe candles for one exchange."""
+
+    TIMEFRAMES = ('1m', '5m', '15m', '1h', '4h', '1d')
+    MAX_AGE = 60.0
+
+    def __init__(self, base_timeframe: str = '1m', timeframes: Sequence[str] = TIMEFRAMES,
+                 max_bars: int = 1000, max_age: float = MAX_AGE):
+        self.base_timeframe = base_timeframe
+        self.timeframes = tuple(timeframes)
+        self.max_bars = max_bars
+        self.max_age = max_age
+        self._series: Dict[str, Dict[str, CandleSeries]] = {}
+        self._base_bars: Dict[str, Tuple[float, float]] = {}  # symbol -> (open time, volume) of the live base bar
+        self._last_live: Dict[str, float] = {}  # symbol -> time.monotonic() of the last live update
+        self._pending: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.stats = {"hits": 0, "fetches": 0, "ticks": 0, "gaps": 0}
+
+    def _symbol_series(self, symbol: str) -> Dict[str, CandleSeries]:
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = {tf: CandleSeries(tf, self.max_bars) for tf in self.timeframes}
+        return series
+
+    # ------------------------------------------------------------------
+    # Live updates
+    # ------------------------------------------------------------------
+
+    def _live_series(self, symbol: str) -> Dict[str, CandleSeries]:
+        """Series of ``symbol``, marked as gapped when its feed was silent for over a base bar."""
+        series = self._symbol_series(symbol)
+        now = time.monotonic()
+        last = self._last_live.get(symbol)
+        self._last_live[symbol] = now
+        if last is not None and now - last > TIMEFRAME_SECONDS[self.base_timeframe]:
+            # The open bars miss what traded meanwhile, closed bars may be missing entirely
+            for timeframe_series in series.values():
+                timeframe_series.gap = True
+            self.stats["gaps"] += 1
+            logger.info(f"Candle feed for {symbol} was silent {now - last:.0f}s, refetching before use")
+        return series
+
+    def on_tick(self, symbol: str, price: float, volume: float = 0.0, timestamp_ms: Optional[float] = None):
+        """A trade (with its size) or a ticker price (volume 0): updates every timeframe's open bar."""
+        if not price or price <= 0:
+            return
+        ts = timestamp_ms if timestamp_ms is not None else time.time() * 1000
+        for series in self._live_series(symbol).values():
+            series.update(ts, price, price, price, price, volume)
+        self.stats["ticks"] += 1
+
+    def on_market_tick(self, tick):
+        """``WebSocketManager.on_ticker`` callback (ticker stream: price only)."""
+        self.on_tick(tick.symbol, tick.last_price)
+
+    def on_base_bar(self, symbol: str, bar: Sequence[float]):
+        """
+        A base-timeframe kline, open or closed, as ``[ts, o, h, l, c, v]``.
+
+        Kline streams resend the open bar with cumulative volume; only the
+        volume added since the previous update is folded into higher bars.
+        """
+        ts, open_, high, low, close, volume = (float(x) for x in bar[:6])
+        previous = self._base_bars.get(symbol)
+        added = volume - previous[1] if previous and previous[0] == ts else volume
+        self._base_bars[symbol] = (ts, volume)
+        for timeframe, series in self._live_series(symbol).items():
+            if timeframe == self.base_timeframe:
+                # Same bar again: replace rather than accumulate
+                if series.n and series.bars[-1, TS] == ts:
+                    series.bars[-1] = (ts, open_, high, low, close, volume)
+                    series.updated_at = time.monotonic()
+                    continue
+                series.update(ts, open_, high, low, close, volume)
+            else:
+                series.update(ts, open_, high, low, close, max(added, 0.0))
+        self.stats["ticks"] += 1
+
+    # ------------------------------------------------------------------
+    # History
+    # ------------------------------------------------------------------
+
+    def seed(self, symbol: str, timeframe: str, ohlcv: Sequence[Sequence[float]]):
+        """Store fetched OHLCV; base-timeframe history also fills the higher timeframes it covers."""
+        if timeframe not in self.timeframes or not ohlcv:
+            return
+        bars = np.asarray(ohlcv, dtype=np.float64)[:, :6]
+        series = self._symbol_series(symbol)
+        series[timeframe].seed(bars)
+        if timeframe != self.base_timeframe:
+            return
+        for higher, higher_series in series.items():
+            if timeframe_ms(higher) <= timeframe_ms(timeframe):
+                continue
+            resampled = resample_ohlcv(bars, higher)
+            if len(resampled) > higher_series.n:
+                higher_series.seed(resampled)
+
+    def get_ohlcv(self, symbol: str, timeframe: str, limit: int,
+                  max_age: Optional[float] = None) -> Optional[List[List[float]]]:
+        """Last ``limit`` bars if held locally, recently updated and without gaps, else None."""
+        series = self._series.get(symbol, {}).get(timeframe)
+        if series is None or series.n < limit or series.updated_at is None or series.gap:
+            return None
+        if time.monotonic() - series.updated_at > (self.max_age if max_age is None else max_age):
+            return None
+        return series.to_ohlcv(limit)
+
+    async def ohlcv(self, symbol: str, timeframe: str, limit: int,
+                    fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Local bars when available, otherwise ``await fetch()`` once and seed.
+
+        Concurrent requests for the same series share one fetch; fetch
+        errors propagate to the callers.
+        """
+        rows = self.get_ohlcv(symbol, timeframe, limit)
+        if rows is not None:
+            self.stats["hits"] += 1
+            return rows
+        key = (symbol, timeframe)
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(self._fetch_and_seed(symbol, timeframe, fetch))
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+            self.stats["fetches"] += 1
+        return await asyncio.shield(task)
+
+    async def _fetch_and_seed(self, symbol: str, timeframe: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        rows = await fetch()
+        if rows:
+            self.seed(symbol, timeframe, rows)
+        return rows
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self._series),
+            "base_timeframe": self.base_timeframe,
+            "timeframes": list(self.timeframes),
+            **self.stats,
+        }
+
+
+# Shared stores, one per exchange
+_candle_stores: Dict[str, CandleStore] = {}
+
+
+def get_candle_store(exchange_name: str = "default") -> CandleStore:
+    """Get or create the process-wide CandleStore for ``exchange_name``."""
+    store = _candle_stores.get(exchange_name)
+    if store is None:
+        store = _candle_stores[exchange_name] = CandleStore()
+    return store
@@ -0,0 +1,338 @@
+"""
+Maintained L2 order book with incrementally updated depth metrics.
+
+Each side is kept as sorted, contiguous NumPy arrays (prices, sizes and
+running cumulative quantity / notional). Updates touch only the changed
+levels and refresh the cumulative arrays from the first changed index, so
+spread, depth within N bps, imbalance and the VWAP-to-fill curve are all
+answered with a binary search instead of a REST call and a Python loop.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class FillEstimate:
+    """Result of walking one side of the book for a given notional."""
+    side: str  # buy (consumes asks) / sell (consumes bids)
+    requested_notional: float
+    filled_notional: float
+    filled_qty: float
+    vwap: float
+    slippage_bps: float  # vs. best price on the consumed side
+    impact_bps: float  # vs. mid price (includes half the spread)
+    levels: int
+    complete: bool
+
+
+class _BookSide:
+    """One side of the book: ascending keys (price for asks, -price for bids)."""
+
+    def __init__(self, descending: bool, max_levels: int, capacity: int = 64):
+        self.descending = descending
+        self.max_levels = max_levels
+        self.n = 0
+        self._keys = np.empty(capacity, dtype=np.float64)
+        self._sizes = np.empty(capacity, dtype=np.float64)
+        self._cum_qty = np.empty(capacity, dtype=np.float64)
+        self._cum_notional = np.empty(capacity, dtype=np.float64)
+        self._dirty_from = 0
+
+    # -- Views ---------------------------------------------------------------
+    @property
+    def prices(self) -> np.ndarray:
+        keys = self._keys[:self.n]
+        return -keys if self.descending else keys
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self._sizes[:self.n]
+
+    @property
+    def cum_qty(self) -> np.ndarray:
+        return self._cum_qty[:self.n]
+
+    @property
+    def cum_notional(self) -> np.ndarray:
+        return self._cum_notional[:self.n]
+
+    def best(self) -> Optional[float]:
+        if not self.n:
+            return None
+        key = self._keys[0]
+        return float(-key if self.descending else key)
+
+    def price_at(self, index: int) -> float:
+        key = self._keys[index]
+        return float(-key if self.descending else key)
+
+    # -- Mutation ------------------------------------------------------------
+    def _reserve(self, size: int):
+        capacity = len(self._keys)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for name in ("_keys", "_sizes", "_cum_qty", "_cum_notional"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=np.float64)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def set_level(self, price: float, size: float):
+        """Insert, update or (size <= 0) remove one price level."""
+        key = -price if self.descending else price
+        n = self.n
+        index = int(np.searchsorted(self._keys[:n], key))
+        if index < n and self._keys[index] == key:
+            if size > 0:
+                self._sizes[index] = size
+            else:
+                self._keys[index:n - 1] = self._keys[index + 1:n]
+                self._sizes[index:n - 1] = self._sizes[index + 1:n]
+                self.n = n - 1
+        elif size > 0:
+            if index >= self.max_levels:
+                return
+            self._reserve(n + 1)
+            self._keys[index + 1:n + 1] = self._keys[index:n]
+            self._sizes[index + 1:n + 1] = self._sizes[index:n]
+            self._keys[index] = key
+            self._sizes[index] = size
+            self.n = min(n + 1, self.max_levels)
+        else:
+            return
+        self._dirty_from = min(self._dirty_from, index)
+
+    def replace(self, levels: Sequence[Sequence[float]]):
+        """
+        Replace the side with a full (sorted) level list.
+
+        Only the part after the first level that differs from the current
+        state is copied and re-accumulated.
+        """
+        if len(levels):
+            array = np.asarray([level[:2] for level in levels[:self.max_levels]], dtype=np.float64)
+            keys = -array[:, 0] if self.descending else array[:, 0]
+            sizes = array[:, 1]
+        else:
+            keys = sizes = np.empty(0, dtype=np.float64)
+        count = len(keys)
+        common = min(count, self.n)
+        differs = np.flatnonzero(
+            (self._keys[:common] != keys[:common]) | (self._sizes[:common] != sizes[:common])
+        )
+        start = int(differs[0]) if len(differs) else common
+        if start == count == self.n:
+            return
+        self._reserve(count)
+        self._keys[start:count] = keys[start:]
+        self._sizes[start:count] = sizes[start:]
+        self.n = count
+        self._dirty_from = min(self._dirty_from, start)
+
+    def refresh(self):
+        """Re-accumulate quantity and notional from the first changed level."""
+        start, n = self._dirty_from, self.n
+        if start < n:
+            base_qty = self._cum_qty[start - 1] if start else 0.0
+            base_notional = self._cum_notional[start - 1] if start else 0.0
+            sizes = self._sizes[start:n]
+            np.cumsum(sizes, out=self._cum_qty[start:n])
+            self._cum_qty[start:n] += base_qty
+            np.cumsum(np.abs(self._keys[start:n]) * sizes, out=self._cum_notional[start:n])
+            self._cum_notional[start:n] += base_notional
+        self._dirty_from = n
+
+    # -- Queries -------------------------------------------------------------
+    def depth_to(self, limit_price: float) -> float:
+        """Notional resting at prices no worse than ``limit_price``."""
+        key = -limit_price if self.descending else limit_price
+        index = int(np.searchsorted(self._keys[:self.n], key, side="right"))
+        return float(self._cum_notional[index - 1]) if index else 0.0
+
+
+class L2OrderBook:
+    """
+    Per-symbol L2 book fed by snapshots or diffs.
+
+    ``apply_deltas`` is for native diff feeds ([price, size] with size 0
+    meaning delete); ``sync`` takes a full level list (CCXT Pro hands out its
+    own merged book) and only re-applies what changed.
+    """
+
+    def __init__(self, symbol: str, max_levels: int = 1000):
+        self.symbol = symbol
+        self.bids = _BookSide(descending=True, max_levels=max_levels)
+        self.asks = _BookSide(descending=False, max_levels=max_levels)
+        self.nonce: Optional[int] = None
+        self.update_count = 0
+        self.updated_at = 0.0  # time.monotonic() of the last update
+        self.timestamp: Optional[datetime] = None
+
+    @classmethod
+    def from_snapshot(cls, symbol: str, bids: Sequence[Sequence[float]], asks: Sequence[Sequence[float]],
+                      max_levels: int = 1000) -> "L2OrderBook":
+        book = cls(symbol, max_levels=max_levels)
+        book.sync(bids, asks)
+        return book
+
+    # -- Updates -------------------------------------------------------------
+    def sync(self, bids: Sequence[Sequence[float]], asks: Sequence[Sequence[float]],
+             nonce: Optional[int] = None):
+        """Bring the book in line with a full, sorted snapshot."""
+        self.bids.replace(bids)
+        self.asks.replace(asks)
+        self._updated(nonce)
+
+    def apply_deltas(self, bids: Iterable[Sequence[float]] = (), asks: Iterable[Sequence[float]] = (),
+                     nonce: Optional[int] = None):
+        """Apply changed levels; a size of 0 removes the level."""
+        for price, size, *_ in bids:
+            self.bids.set_level(float(price), float(size))
+        for price, size, *_ in asks:
+            self.asks.set_level(float(price), float(size))
+        self._updated(nonce)
+
+    def _updated(self, nonce: Optional[int]):
+        self.bids.refresh()
+        self.asks.refresh()
+        self.nonce = nonce
+        self.update_count += 1
+        self.updated_at = time.monotonic()
+        self.timestamp = datetime.now()
+
+    @property
+    def age(self) -> float:
+        """Seconds since the last update (inf if never updated)."""
+        return time.monotonic() - self.updated_at if self.update_count else float("inf")
+
+    # -- Metrics -------------------------------------------------------------
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best()
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best()
+
+    @property
+    def mid(self) -> Optional[float]:
+        if not self.bids.n or not self.asks.n:
+            return None
+        return (self.bids.best() + self.asks.best()) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        if not self.bids.n or not self.asks.n:
+            return None
+        return self.asks.best() - self.bids.best()
+
+    @property
+    def spread_pct(self) -> Optional[float]:
+        """Spread relative to the best bid, in percent (matches the REST checks)."""
+        spread = self.spread
+        return spread / self.bids.best() * 100 if spread is not None and self.bids.best() else None
+
+    @property
+    def spread_bps(self) -> Optional[float]:
+        spread, mid = self.spread, self.mid
+        return spread / mid * 10000 if spread is not None and mid else None
+
+    def depth_within(self, bps: float, side: Optional[str] = None) -> float:
+        """
+        Notional within ``bps`` of the touch.
+
+        ``side`` is "bid", "ask" or None for both. Distances are measured
+        from the best price of each side, like the liquidity checks do.
+        """
+        total = 0.0
+        if side in (None, "bid") and self.bids.n:
+            total += self.bids.depth_to(self.bids.best() * (1 - bps / 10000))
+        if side in (None, "ask") and self.asks.n:
+            total += self.asks.depth_to(self.asks.best() * (1 + bps / 10000))
+        return total
+
+    def imbalance(self, bps: float = 50.0) -> float:
+        """(bid - ask) / (bid + ask) notional within ``bps``; -1..1."""
+        bid = self.depth_within(bps, "bid")
+        ask = self.depth_within(bps, "ask")
+        total = bid + ask
+        return (bid - ask) / total if total > 0 else 0.0
+
+    def estimate_fill(self, side: str, notional: float) -> FillEstimate:
+        """Walk the book for a market order of ``notional`` quote currency."""
+        book_side = self.asks if side == "buy" else self.bids
+        n = book_side.n
+        cum_notional = book_side.cum_notional
+        if n == 0 or notional <= 0:
+            best = book_side.best() or 0.0
+            return FillEstimate(side, notional, 0.0, 0.0, best, 0.0, 0.0, 0, notional <= 0)
+
+        index = int(np.searchsorted(cum_notional, notional, side="left"))
+        if index >= n:
+            filled_notional = float(cum_notional[-1])
+            filled_qty = float(book_side.cum_qty[-1])
+            levels, complete = n, False
+        else:
+            prior_notional = float(cum_notional[index - 1]) if index else 0.0
+            prior_qty = float(book_side.cum_qty[index - 1]) if index else 0.0
+            filled_notional = notional
+            filled_qty = prior_qty + (notional - prior_notional) / book_side.price_at(index)
+            levels, complete = index + 1, True
+
+        vwap = filled_notional / filled_qty
+        best = book_side.best()
+        mid = self.mid or best
+        sign = 1.0 if side == "buy" else -1.0
+        return FillEstimate(
+            side=side,
+            requested_notional=notional,
+            filled_notional=filled_notional,
+            filled_qty=filled_qty,
+            vwap=vwap,
+            slippage_bps=sign * (vwap - best) / best * 10000,
+            impact_bps=sign * (vwap - mid) / mid * 10000,
+            levels=levels,
+            complete=complete,
+        )
+
+    def fill_curve(self, side: str, notionals: Sequence[float]) -> np.ndarray:
+        """
+        VWAP for each notional in one vectorized pass (NaN beyond visible depth).
+        """
+        book_side = self.asks if side == "buy" else self.bids
+        targets = np.asarray(notionals, dtype=np.float64)
+        if book_side.n == 0:
+            return np.full(targets.shape, np.nan)
+        cum_notional, cum_qty, prices = book_side.cum_notional, book_side.cum_qty, book_side.prices
+        index = np.searchsorted(cum_notional, targets, side="left")
+        inside = index < book_side.n
+        clipped = np.minimum(index, book_side.n - 1)
+        prior = clipped - 1
+        prior_notional = np.where(prior >= 0, cum_notional[np.maximum(prior, 0)], 0.0)
+        prior_qty = np.where(prior >= 0, cum_qty[np.maximum(prior, 0)], 0.0)
+        qty = prior_qty + (targets - prior_notional) / prices[clipped]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = targets / qty
+        return np.where(inside & (targets > 0), vwap, np.nan)
+
+    # -- Export --------------------------------------------------------------
+    def levels(self, side: str, depth: Optional[int] = None) -> List[List[float]]:
+        book_side = self.bids if side == "bid" else self.asks
+        count = book_side.n if depth is None else min(depth, book_side.n)
+        return np.column_stack((book_side.prices[:count], book_side.sizes[:count])).tolist()
+
+    def to_dict(self, depth: Optional[int] = None) -> dict:
+        """CCXT-style ``{"bids": [[price, size], ...], "asks": ...}``."""
+        return {
+            "symbol": self.symbol,
+            "bids": self.levels("bid", depth),
+            "asks": self.levels("ask", depth),
+            "nonce": self.nonce,
+            "timestamp": self.timestamp,
+        }
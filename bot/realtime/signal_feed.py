@@ -0,0 +1,289 @@
+"""
+Signal Feed - wake bots as soon as a trading signal is written.
+
+Bots used to find new rows in ``trading_signals`` only at the start of their
+next cycle, up to ten minutes later. The feed delivers a notice the moment a
+BUY/SELL signal from a trusted source lands, so the owning bot (or every bot,
+for a global signal) runs its cycle right away.
+
+Two transports, one process-wide feed:
+
+- ``listen``: Postgres ``LISTEN trading_signals`` over asyncpg; the
+  ``notify_trading_signal`` trigger (bot/migrations/006) sends each insert.
+  Chosen only when the trigger exists, and backed by a slow poll, since a
+  transaction-mode pooler accepts LISTEN but never delivers notifications.
+- ``poll``: a cursor on ``created_at`` queried every few seconds - one small
+  indexed query for the whole process. Used when asyncpg, Postgres or the
+  trigger is unavailable, and while a LISTEN connection is being
+  re-established.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Same sources the trading cycle acts on (AutomatedTradingBot.get_signals_from_database)
+TRUSTED_SOURCES = ('titan_v3', 'COUNCIL_V2.0_FALLBACK')
+ACTIONABLE_TYPES = ('buy', 'sell')
+
+
+@dataclass
+class SignalNotice:
+    """A new signal row, as much as is needed to decide whom to wake."""
+    id: str
+    symbol: str
+    signal_type: str
+    source: Optional[str] = None
+    user_id: Optional[str] = None  # None: global signal for all users
+    created_at: Optional[datetime] = None
+    received_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def is_global(self) -> bool:
+        return self.user_id is None
+
+    @property
+    def delay_seconds(self) -> Optional[float]:
+        """Insert -> notice received."""
+        if self.created_at is None:
+            return None
+        created = self.created_at if self.created_at.tzinfo else self.created_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (self.received_at - created).total_seconds())
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> 'SignalNotice':
+        created_at = payload.get('created_at')
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        return cls(
+            id=str(payload['id']),
+            symbol=payload['symbol'],
+            signal_type=(payload.get('signal_type') or '').lower(),
+            source=payload.get('source'),
+            user_id=payload.get('user_id') or None,
+            created_at=created_at,
+        )
+
+
+class SignalFeed:
+    """Process-wide notifications of new actionable signals."""
+
+    POLL_INTERVAL = 3.0
+    POLL_OVERLAP = timedelta(seconds=5)  # Re-read rows committed slightly out of order
+    CHANNEL = "trading_signals"
+    TRIGGER = "trading_signals_notify"
+    LISTEN_POLL_INTERVAL = 30.0  # Safety poll while listening
+    MAX_RECONNECT_DELAY = 60
+    SEEN_IDS_LIMIT = 2000
+
+    def __init__(self, dsn: Optional[str] = None, poll_interval: float = POLL_INTERVAL):
+        self.dsn = dsn
+        self.poll_interval = poll_interval
+        self.mode: Optional[str] = None
+        self._subscribers: List[Tuple[Optional[str], Callable[[SignalNotice], Any]]] = []
+        self._users = 0
+        self._task: Optional[asyncio.Task] = None
+        self._cursor = datetime.now(timezone.utc)
+        self._seen_ids: "OrderedDict[str, None]" = OrderedDict()
+        self.stats = {"notices": 0, "delivered": 0, "polls": 0, "listen_errors": 0}
+        self._last_delay: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self, user_id: Optional[str], callback: Callable[[SignalNotice], Any]):
+        """``callback(notice)`` for the user's own signals and all global ones."""
+        self._subscribers.append((user_id, callback))
+
+    def unsubscribe(self, callback: Callable[[SignalNotice], Any]):
+        self._subscribers = [(uid, cb) for uid, cb in self._subscribers if cb != callback]
+
+    async def start(self):
+        """Start listening (reference counted - one transport per process)."""
+        self._users += 1
+        if self.running:
+            return
+        self._cursor = datetime.now(timezone.utc)
+        use_listen = ASYNCPG_AVAILABLE and self.dsn and self.dsn.startswith("postgres")
+        self._task = asyncio.create_task(self._listen_loop() if use_listen else self._poll_loop())
+        logger.info(f"📨 Signal feed started ({'LISTEN' if use_listen else f'polling every {self.poll_interval:.0f}s'})")
+
+    async def stop(self):
+        self._users = max(0, self._users - 1)
+        if self._users or self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("📨 Signal feed stopped")
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, notice: SignalNotice):
+        if notice.id in self._seen_ids:
+            return
+        self._seen_ids[notice.id] = None
+        if len(self._seen_ids) > self.SEEN_IDS_LIMIT:
+            self._seen_ids.popitem(last=False)
+        if notice.signal_type not in ACTIONABLE_TYPES or notice.source not in TRUSTED_SOURCES:
+            return
+
+        self.stats["notices"] += 1
+        if notice.delay_seconds is not None:
+            self._last_delay = notice.delay_seconds
+        for user_id, callback in list(self._subscribers):
+            if notice.is_global or notice.user_id == user_id:
+                try:
+                    callback(notice)
+                    self.stats["delivered"] += 1
+                except Exception as e:
+                    logger.error(f"Signal feed subscriber failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Transports
+    # ------------------------------------------------------------------
+
+    async def _listen_loop(self):
+        delay = 1
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self._asyncpg_dsn())
+                # Without the trigger (migration 006) nothing is ever sent
+                has_trigger = await conn.fetchval(
+                    "SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = $1)", self.TRIGGER
+                )
+                if not has_trigger:
+                    raise RuntimeError(f"trigger {self.TRIGGER} missing, run bot/migrations/006")
+                await conn.add_listener(self.CHANNEL, self._on_notify)
+                logger.info(f"📨 Listening on '{self.CHANNEL}'")
+                delay = 1
+                self.mode = "listen"
+                # Rows inserted while (re)connecting
+                await self._poll_once()
+                while True:
+                    await asyncio.sleep(self.LISTEN_POLL_INTERVAL)
+                    await conn.execute("SELECT 1")  # Detect dead connections
+                    # Catches signals whose notification never arrived (pooler)
+                    await self._poll_safely()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["listen_errors"] += 1
+                self.mode = "poll"
+                logger.warning(f"📨 Signal LISTEN unavailable ({e}) - polling, retry in {delay}s")
+                deadline = time.monotonic() + delay
+                while time.monotonic() < deadline:
+                    await self._poll_safely()
+                    await asyncio.sleep(self.poll_interval)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+            finally:
+                if conn is not None:
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self._dispatch(SignalNotice.from_payload(json.loads(payload)))
+        except Exception as e:
+            logger.warning(f"📨 Bad signal notification: {e}")
+
+    def _asyncpg_dsn(self) -> str:
+        # SQLAlchemy URLs carry the driver (postgresql+psycopg2://)
+        scheme, rest = self.dsn.split("://", 1)
+        return f"postgresql://{rest}"
+
+    async def _poll_loop(self):
+        self.mode = "poll"
+        while True:
+            await self._poll_safely()
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll_safely(self):
+        """One poll; failures are logged so the calling loop keeps running."""
+        try:
+            await self._poll_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"📨 Signal poll failed: {e}")
+
+    async def _poll_once(self):
+        self.stats["polls"] += 1
+        for notice in await asyncio.to_thread(self._fetch_new_signals):
+            self._dispatch(notice)
+
+    def _fetch_new_signals(self) -> List[SignalNotice]:
+        from bot.db import DatabaseManager, TradingSignal
+
+        since = self._cursor - self.POLL_OVERLAP
+        with DatabaseManager() as db:
+            rows = (
+                db.session.query(
+                    TradingSignal.id, TradingSignal.user_id, TradingSignal.symbol,
+                    TradingSignal.signal_type, TradingSignal.source, TradingSignal.created_at
+                )
+                .filter(TradingSignal.created_at > since)
+                .filter(TradingSignal.source.in_(TRUSTED_SOURCES))
+                .order_by(TradingSignal.created_at.asc())
+                .limit(500)
+                .all()
+            )
+        notices = []
+        for row in rows:
+            created_at = row.created_at
+            if created_at is not None and created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if created_at is not None and created_at > self._cursor:
+                self._cursor = created_at
+            notices.append(SignalNotice(
+                id=str(row.id), symbol=row.symbol, signal_type=(row.signal_type or '').lower(),
+                source=row.source, user_id=row.user_id or None, created_at=created_at,
+            ))
+        return notices
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "mode": self.mode,
+            "subscribers": len(self._subscribers),
+            "last_delay_seconds": self._last_delay,
+            **self.stats,
+        }
+
+
+# Singleton instance
+_signal_feed: Optional[SignalFeed] = None
+
+
+def get_signal_feed() -> SignalFeed:
+    """Get or create the process-wide SignalFeed."""
+    global _signal_feed
+    if _signal_feed is None:
+        _signal_feed = SignalFeed(
+            dsn=os.getenv("SUPABASE_DB_URL") or os.getenv("DATABASE_URL"),
+            poll_interval=float(os.getenv("SIGNAL_FEED_POLL_INTERVAL", SignalFeed.POLL_INTERVAL)),
+        )
+    return _signal_feed
@@ -0,0 +1,332 @@
+"""
+User Data Stream - private account events over WebSocket.
+
+Streams fills, order updates and balance changes via CCXT Pro
+(``watch_my_trades`` / ``watch_orders`` / ``watch_balance``) so position
+state can be updated as events happen instead of re-fetching everything by
+REST on a timer.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import ccxt.pro as ccxt_pro
+    CCXT_PRO_AVAILABLE = True
+except ImportError:
+    CCXT_PRO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FillEvent:
+    """A (partial) execution on the account."""
+    symbol: str
+    side: str  # 'buy' or 'sell'
+    amount: float
+    price: float
+    order_id: Optional[str] = None
+    trade_id: Optional[str] = None
+    reduce_only: bool = False
+    timestamp: datetime = field(default_factory=datetime.now)  # exchange execution time
+    latency_ms: Optional[float] = None  # exchange execution -> received here
+
+
+class UserDataStream:
+    """
+    Private WebSocket streams for one exchange account.
+
+    Fills come from ``watch_my_trades`` when the exchange supports it,
+    otherwise they are derived from filled-amount deltas on ``watch_orders``.
+    """
+
+    MAX_RECONNECT_DELAY = 60
+    SEEN_IDS_LIMIT = 5000
+
+    def __init__(
+        self,
+        exchange_name: str,
+        api_key: str,
+        api_secret: str,
+        testnet: bool = False,
+        market_type: str = 'spot'
+    ):
+        self.exchange_name = exchange_name.lower()
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self.market_type = market_type
+
+        self.exchange = None
+        self.connected = False
+        self.running = False
+        self._tasks: List[asyncio.Task] = []
+
+        self.fill_callbacks: List[Callable[[FillEvent], Any]] = []
+        self.order_callbacks: List[Callable[[Dict], Any]] = []
+        self.balance_callbacks: List[Callable[[Dict], Any]] = []
+
+        self._seen_trade_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._order_filled: Dict[str, float] = {}
+        self._failing: Dict[str, bool] = {}
+        self._trades_streamed = False
+
+        self.stats = {
+            'fills': 0,
+            'orders': 0,
+            'balances': 0,
+            'reconnects': 0,
+            'last_event_at': None,
+            'last_fill_latency_ms': None,
+        }
+
+    @classmethod
+    def from_adapter(cls, adapter, testnet: bool = False) -> 'UserDataStream':
+        """Build a stream for the account behind a CCXTAdapter."""
+        exchange = adapter.exchange
+        if getattr(adapter, 'margin', False):
+            market_type = 'margin'
+        elif getattr(adapter, 'futures', False):
+            market_type = 'future'
+        else:
+            market_type = 'spot'
+        return cls(
+            exchange_name=exchange.id,
+            api_key=exchange.apiKey,
+            api_secret=exchange.secret,
+            testnet=testnet,
+            market_type=market_type,
+        )
+
+    async def connect(self) -> bool:
+        """Create the CCXT Pro client."""
+        try:
+            if not CCXT_PRO_AVAILABLE:
+                logger.warning("CCXT Pro not available - user data stream disabled")
+                return False
+
+            exchange_class = getattr(ccxt_pro, self.exchange_name, None)
+            if not exchange_class:
+                logger.error(f"Exchange {self.exchange_name} not supported by CCXT Pro")
+                return False
+
+            config = {
+                'apiKey': self.api_key,
+                'secret': self.api_secret,
+                'enableRateLimit': True,
+                'options': {
+                    'adjustForTimeDifference': True,
+                    'defaultType': self.market_type,
+                }
+            }
+            if self.testnet:
+                if self.exchange_name == 'binance':
+                    config['sandbox'] = True
+                elif self.exchange_name == 'bybit':
+                    config['options']['testnet'] = True
+
+            self.exchange = exchange_class(config)
+            await self.exchange.load_markets()
+            self.connected = True
+            logger.info(f"✅ User data stream connected to {self.exchange_name} ({self.market_type})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to connect user data stream: {e}")
+            return False
+
+    def on_fill(self, callback: Callable[[FillEvent], Any]):
+        """Register callback for fills."""
+        self.fill_callbacks.append(callback)
+
+    def on_order(self, callback: Callable[[Dict], Any]):
+        """Register callback for raw order updates."""
+        self.order_callbacks.append(callback)
+
+    def on_balance(self, callback: Callable[[Dict], Any]):
+        """Register callback for balance snapshots."""
+        self.balance_callbacks.append(callback)
+
+    def start(self):
+        """Start the private watchers supported by the exchange."""
+        if not self.connected:
+            logger.warning("User data stream not connected. Call connect() first.")
+            return
+        self.running = True
+        has = getattr(self.exchange, 'has', {}) or {}
+        self._trades_streamed = bool(has.get('watchMyTrades'))
+
+        watchers = [
+            ('trades', 'watchMyTrades', self._watch_trades),
+            ('orders', 'watchOrders', self._watch_orders),
+            ('balance', 'watchBalance', self._watch_balance),
+        ]
+        for name, capability, watcher in watchers:
+            if not has.get(capability):
+                continue
+            self._failing[name] = False
+            self._tasks.append(asyncio.create_task(self._run(name, watcher)))
+
+        if not self._failing.keys() & {'trades', 'orders'}:
+            logger.warning(f"{self.exchange_name} has no private order/trade stream - fills will not be streamed")
+        logger.info(f"Private streams started: {sorted(self._failing)}")
+
+    async def stop(self):
+        """Stop watchers and close the client."""
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+        if self.exchange:
+            await self.exchange.close()
+            self.exchange = None
+        self.connected = False
+        logger.info("User data stream stopped")
+
+    def is_healthy(self) -> bool:
+        """True while every watcher is subscribed and not in reconnect backoff."""
+        return (
+            self.running
+            and self.connected
+            and bool(self._tasks)
+            and all(not task.done() for task in self._tasks)
+            and not any(self._failing.values())
+        )
+
+    # ------------------------------------------------------------------ watchers
+
+    async def _run(self, name: str, watcher: Callable):
+        reconnect_attempts = 0
+        while self.running:
+            try:
+                await watcher()
+                self._failing[name] = False
+                reconnect_attempts = 0
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._failing[name] = True
+                self.stats['reconnects'] += 1
+                delay = min(1 * (2 ** reconnect_attempts), self.MAX_RECONNECT_DELAY)
+                reconnect_attempts += 1
+                logger.error(f"User {name} stream error: {e} - reconnecting in {delay}s")
+                await asyncio.sleep(delay)
+
+    async def _watch_trades(self):
+        trades = await self.exchange.watch_my_trades()
+        for trade in trades:
+            trade_id = trade.get('id')
+            if trade_id is not None:
+                if trade_id in self._seen_trade_ids:
+                    continue
+                self._seen_trade_ids[trade_id] = None
+                if len(self._seen_trade_ids) > self.SEEN_IDS_LIMIT:
+                    self._seen_trade_ids.popitem(last=False)
+            await self._emit_fill(
+                symbol=trade.get('symbol'),
+                side=trade.get('side'),
+                amount=float(trade.get('amount') or 0),
+                price=float(trade.get('price') or 0),
+                order_id=trade.get('order'),
+                trade_id=trade_id,
+                info=trade.get('info') or {},
+                exchange_ts=trade.get('timestamp'),
+            )
+
+    async def _watch_orders(self):
+        orders = await self.exchange.watch_orders()
+        for order in orders:
+            self.stats['orders'] += 1
+            self._touch()
+            await self._dispatch(self.order_callbacks, order, "Order")
+
+            if self._trades_streamed:
+                continue
+            # No trade stream: derive fills from the filled-amount delta
+            order_id = order.get('id')
+            filled = float(order.get('filled') or 0)
+            delta = filled - self._order_filled.get(order_id, 0.0)
+            if order.get('status') in ('closed', 'canceled', 'expired', 'rejected'):
+                self._order_filled.pop(order_id, None)
+            else:
+                self._order_filled[order_id] = filled
+            if delta > 0:
+                await self._emit_fill(
+                    symbol=order.get('symbol'),
+                    side=order.get('side'),
+                    amount=delta,
+                    price=float(order.get('average') or order.get('price') or 0),
+                    order_id=order_id,
+                    trade_id=None,
+                    info=order.get('info') or {},
+                    exchange_ts=order.get('lastTradeTimestamp') or order.get('timestamp'),
+                    reduce_only=bool(order.get('reduceOnly')),
+                )
+
+    async def _watch_balance(self):
+        balance = await self.exchange.watch_balance()
+        self.stats['balances'] += 1
+        self._touch()
+        await self._dispatch(self.balance_callbacks, balance, "Balance")
+
+    # ------------------------------------------------------------------ helpers
+
+    def _touch(self):
+        self.stats['last_event_at'] = datetime.now()
+
+    async def _emit_fill(self, symbol, side, amount, price, order_id, trade_id, info,
+                         exchange_ts=None, reduce_only=None):
+        if not symbol or not side or amount <= 0:
+            return
+        latency_ms = None
+        timestamp = datetime.now()
+        if exchange_ts:
+            latency_ms = max(0.0, time.time() * 1000 - exchange_ts)
+            timestamp = datetime.fromtimestamp(exchange_ts / 1000)
+        if reduce_only is None:
+            reduce_only = str(info.get('reduceOnly', info.get('R', ''))).lower() == 'true'
+        fill = FillEvent(
+            symbol=symbol,
+            side=side,
+            amount=amount,
+            price=price,
+            order_id=order_id,
+            trade_id=trade_id,
+            reduce_only=reduce_only,
+            timestamp=timestamp,
+            latency_ms=latency_ms,
+        )
+        self.stats['fills'] += 1
+        self.stats['last_fill_latency_ms'] = latency_ms
+        self._touch()
+        await self._dispatch(self.fill_callbacks, fill, "Fill")
+
+    async def _dispatch(self, callbacks: List[Callable], payload: Any, label: str):
+        for callback in callbacks:
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(payload)
+                else:
+                    callback(payload)
+            except Exception as e:
+                logger.error(f"{label} callback error: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Connection health and event counters."""
+        return {
+            'exchange': self.exchange_name,
+            'market_type': self.market_type,
+            'healthy': self.is_healthy(),
+            'streams': {name: not failing for name, failing in self._failing.items()},
+            **self.stats,
+        }
@@ -10,6 +10,8 @@ from datetime import datetime
 from dataclasses import dataclass, field
 import json
 
+from bot.realtime.order_book import L2OrderBook
+
 try:
     import ccxt.pro as ccxt_pro
     CCXT_PRO_AVAILABLE = True
@@ -78,6 +80,7 @@ class WebSocketManager:
         # Data caches
         self.tickers: Dict[str, MarketTick] = {}
         self.order_books: Dict[str, OrderBookUpdate] = {}
+        self.l2_books: Dict[str, L2OrderBook] = {}  # Maintained books with live depth metrics
         
         # Callbacks
         self.ticker_callbacks: List[Callable[[MarketTick], Any]] = []
@@ -180,8 +183,10 @@ class WebSocketManager:
         
         self.running = True
         
-        task = asyncio.create_task(self._order_book_stream(symbols, depth))
-        self._tasks.append(task)
+        # One stream per symbol so a quiet market does not hold back the others' books
+        for symbol in symbols:
+            task = asyncio.create_task(self._order_book_stream([symbol], depth))
+            self._tasks.append(task)
         logger.info(f"Subscribed to order books: {symbols}")
     
     async def _ticker_stream(self, symbols: List[str]):
@@ -252,15 +257,21 @@ class WebSocketManager:
                     # Reset reconnect counter on successful connection
                     reconnect_attempts = 0
                     
-                    update = OrderBookUpdate(
-                        symbol=symbol,
-                        bids=order_book.get('bids', [])[:depth],
-                        asks=order_book.get('asks', [])[:depth],
-                        timestamp=datetime.now()
+                    # Apply to the maintained book (only changed levels are re-accumulated)
+                    book = self.l2_books.get(symbol)
+                    if book is None:
+                        book = self.l2_books[symbol] = L2OrderBook(symbol, max_levels=depth)
+                    book.sync(
+                        order_book.get('bids', [])[:depth],
+                        order_book.get('asks', [])[:depth],
+                        nonce=order_book.get('nonce')
                     )
                     
-                    # Update cache
-                    self.order_books[symbol] = update
+                    # Invalidate the list view; it is rebuilt on demand
+                    self.order_books.pop(symbol, None)
+                    if not self.order_book_callbacks:
+                        continue
+                    update = self.get_order_book(symbol)
                     
                     # Notify callbacks
                     for callback in self.order_book_callbacks:
@@ -292,10 +303,39 @@ class WebSocketManager:
     
     def get_order_book(self, symbol: str) -> Optional[OrderBookUpdate]:
         """Get latest order book from cache."""
-        return self.order_books.get(symbol)
+        update = self.order_books.get(symbol)
+        if update is None:
+            book = self.l2_books.get(symbol)
+            if book is None or not book.update_count:
+                return None
+            update = OrderBookUpdate(
+                symbol=symbol,
+                bids=book.levels('bid'),
+                asks=book.levels('ask'),
+                timestamp=book.timestamp
+            )
+            self.order_books[symbol] = update
+        return update
+    
+    def get_l2_book(self, symbol: str, max_age: Optional[float] = None) -> Optional[L2OrderBook]:
+        """
+        Get the maintained L2 book for a symbol.
+        
+        Returns None if the symbol is not streamed or the book is older
+        than ``max_age`` seconds (e.g. the stream is reconnecting).
+        """
+        book = self.l2_books.get(symbol)
+        if book is None or not book.update_count:
+            return None
+        if max_age is not None and book.age > max_age:
+            return None
+        return book
     
     def get_spread(self, symbol: str) -> Optional[float]:
         """Get current spread for symbol."""
+        book = self.l2_books.get(symbol)
+        if book is not None and book.spread_pct is not None:
+            return book.spread_pct
         tick = self.tickers.get(symbol)
         if tick and tick.bid and tick.ask:
             return (tick.ask - tick.bid) / tick.bid * 100
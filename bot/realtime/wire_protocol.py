@@ -0,0 +1,271 @@
+"""
+Compact binary WebSocket encoding for dashboard streams.
+
+JSON stays the default. A client that negotiates ``msgpack`` receives
+binary frames instead, each carrying a batch of updates:
+
+    frame  = [PROTOCOL_VERSION, base_ts_ms, [entry, ...]]
+    entry  = [op, channel, kind, ident, ts_offset_ms, body]
+
+- ``channel`` is sent as a string the first time it appears on the
+  connection and as an integer id afterwards (ids assigned in order of
+  first appearance, on both sides).
+- ``kind`` is the integer id of a schema from ``SCHEMAS`` or, for message
+  types without a schema, the type string.
+- ``ident`` identifies the instrument within the channel (symbol, order
+  id...), so deltas on a channel like ``prices.all`` track each symbol.
+- ``op`` SNAPSHOT: ``body`` is the list of schema field values by field id,
+  with a dict of non-schema fields appended when present.
+  ``op`` DELTA: ``body`` maps field id -> new value for changed fields
+  only (``-1`` holds changed non-schema fields; ``None`` means removed).
+  ``op`` RAW: ``body`` is the message data as-is (schema-less kinds).
+
+The encoder keeps the last snapshot sent per (channel, kind, ident) and
+sends a full snapshot every ``keyframe_interval`` updates of a key, or
+after its state is reset on reaching ``max_keys``. The
+schema descriptor is sent (as JSON) in the negotiation reply.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+OP_SNAPSHOT = 0
+OP_DELTA = 1
+OP_RAW = 2
+EXTRA_FIELD_ID = -1
+
+# Message kind -> (identity field, field names; field id = position). Append only.
+SCHEMAS: Dict[str, Tuple[Optional[str], Tuple[str, ...]]] = {
+    "price_feed": ("symbol", (
+        "symbol", "price", "bid", "ask", "volume", "change", "change_24h", "high", "low",
+    )),
+    "price_update": ("symbol", (
+        "symbol", "price", "bid", "ask", "volume", "change", "change_24h", "high", "low",
+    )),
+    "market_data": ("symbol", (
+        "symbol", "price", "bid", "ask", "volume", "change", "change_24h", "high", "low",
+    )),
+    "position_update": ("symbol", (
+        "symbol", "side", "size", "quantity", "entry_price", "current_price", "unrealized_pnl",
+        "pnl_percentage", "leverage", "stop_loss", "take_profit", "status", "user_id",
+    )),
+    "order_status": ("order_id", (
+        "order_id", "symbol", "side", "type", "status", "price", "amount", "filled",
+        "remaining", "user_id",
+    )),
+    "portfolio_change": (None, (
+        "total_value", "available_balance", "unrealized_pnl", "realized_pnl", "margin_used",
+        "positions_count", "user_id",
+    )),
+}
+KIND_IDS: Dict[str, int] = {kind: kind_id for kind_id, kind in enumerate(SCHEMAS)}
+KINDS_BY_ID: Dict[int, str] = {kind_id: kind for kind, kind_id in KIND_IDS.items()}
+_FIELD_IDS: Dict[str, Dict[str, int]] = {
+    kind: {name: field_id for field_id, name in enumerate(fields)}
+    for kind, (_, fields) in SCHEMAS.items()
+}
+
+_ENVELOPE_KEYS = ("type", "timestamp", "data")
+
+
+def available_encodings() -> List[str]:
+    return [ENCODING_JSON, ENCODING_MSGPACK] if MSGPACK_AVAILABLE else [ENCODING_JSON]
+
+
+def negotiate_encoding(requested: Optional[str]) -> str:
+    """Pick the encoding for a client request; unknown or unavailable means JSON."""
+    requested = (requested or ENCODING_JSON).lower()
+    if requested == ENCODING_MSGPACK and not MSGPACK_AVAILABLE:
+        logger.warning("Client requested msgpack but msgpack is not installed, using JSON")
+        return ENCODING_JSON
+    return requested if requested in available_encodings() else ENCODING_JSON
+
+
+def schema_descriptor() -> Dict[str, Any]:
+    """Schema table sent to clients when they switch to the binary encoding."""
+    return {
+        "version": PROTOCOL_VERSION,
+        "ops": {"snapshot": OP_SNAPSHOT, "delta": OP_DELTA, "raw": OP_RAW},
+        "extra_field_id": EXTRA_FIELD_ID,
+        "kinds": {
+            kind: {"id": KIND_IDS[kind], "ident": ident, "fields": list(fields)}
+            for kind, (ident, fields) in SCHEMAS.items()
+        },
+    }
+
+
+def _to_timestamp(value: Any) -> float:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        # Naive timestamps are UTC here (datetime.utcnow()), not server local time
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return time.time()
+
+
+def split_envelope(message: Dict[str, Any]) -> Tuple[str, Dict[str, Any], float]:
+    """
+    Normalize a dashboard message dict into (kind, data, timestamp).
+
+    Accepts both ``{"type", "data", "timestamp"}`` envelopes and flat
+    messages such as ``{"type": "price_update", "symbol": ..., "price": ...}``.
+    """
+    kind = str(message.get("type", "message"))
+    data = message.get("data")
+    if not isinstance(data, dict):
+        data = {key: value for key, value in message.items() if key not in _ENVELOPE_KEYS}
+    return kind, data, _to_timestamp(message.get("timestamp"))
+
+
+def update_to_json(kind: str, channel: Optional[str], data: Dict[str, Any], timestamp: float) -> str:
+    """JSON text of a ``(kind, channel, data, timestamp)`` update queued for a binary frame."""
+    message: Dict[str, Any] = {"type": kind, "data": data, "timestamp": timestamp}
+    if channel:
+        message["channel"] = channel
+    return json.dumps(message, default=str)
+
+
+class BinaryFrameEncoder:
+    """Per-connection msgpack encoder with channel interning and delta state."""
+
+    def __init__(self, keyframe_interval: int = 100, max_keys: int = 5000):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+        self.keyframe_interval = keyframe_interval
+        self.max_keys = max_keys
+        self._channels: Dict[str, int] = {}
+        self._snapshots: Dict[tuple, Dict[str, Any]] = {}
+        self._since_keyframe: Dict[tuple, int] = {}
+        self._packer = msgpack.Packer(use_bin_type=True, datetime=False, default=str)
+
+    def encode(self, updates: Iterable[Tuple[str, Optional[str], Dict[str, Any], float]]) -> bytes:
+        """Encode ``(kind, channel, data, timestamp)`` updates as one frame."""
+        updates = list(updates)
+        base_ms = int(min((ts for _, _, _, ts in updates), default=time.time()) * 1000)
+        entries = [self._entry(kind, channel or "", data, ts, base_ms) for kind, channel, data, ts in updates]
+        return self._packer.pack([PROTOCOL_VERSION, base_ms, entries])
+
+    def _channel_ref(self, channel: str) -> Any:
+        channel_id = self._channels.get(channel)
+        if channel_id is None:
+            self._channels[channel] = len(self._channels)
+            return channel
+        return channel_id
+
+    def _entry(self, kind: str, channel: str, data: Dict[str, Any], ts: float, base_ms: int) -> list:
+        channel_ref = self._channel_ref(channel)
+        ts_offset = int(ts * 1000) - base_ms
+        schema = SCHEMAS.get(kind)
+        if schema is None:
+            return [OP_RAW, channel_ref, kind, None, ts_offset, data]
+
+        ident_field, fields = schema
+        ident = data.get(ident_field) if ident_field else None
+        key = (channel, kind, ident)
+        previous = self._snapshots.get(key)
+        if previous is None and len(self._snapshots) >= self.max_keys:
+            # Bound per-connection state (e.g. many order ids); keys restart with snapshots
+            self._snapshots.clear()
+            self._since_keyframe.clear()
+        self._snapshots[key] = dict(data)
+        count = self._since_keyframe.get(key, 0)
+
+        if previous is None or count >= self.keyframe_interval:
+            self._since_keyframe[key] = 0
+            body: list = [data.get(name) for name in fields]
+            extras = {name: value for name, value in data.items() if name not in _FIELD_IDS[kind]}
+            if extras:
+                body.append(extras)
+            return [OP_SNAPSHOT, channel_ref, KIND_IDS[kind], ident, ts_offset, body]
+
+        self._since_keyframe[key] = count + 1
+        field_ids = _FIELD_IDS[kind]
+        delta: Dict[int, Any] = {}
+        extras = {}
+        for name in data.keys() | previous.keys():
+            value = data.get(name)
+            if name in previous and previous[name] == value and name in data:
+                continue
+            field_id = field_ids.get(name)
+            if field_id is None:
+                extras[name] = value
+            else:
+                delta[field_id] = value
+        if extras:
+            delta[EXTRA_FIELD_ID] = extras
+        return [OP_DELTA, channel_ref, KIND_IDS[kind], ident, ts_offset, delta]
+
+
+class BinaryFrameDecoder:
+    """Reference decoder (mirrors what a browser client does)."""
+
+    def __init__(self):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+        self._channels: List[str] = []
+        self._snapshots: Dict[tuple, Dict[str, Any]] = {}
+
+    def decode(self, frame: bytes) -> List[Dict[str, Any]]:
+        version, base_ms, entries = msgpack.unpackb(frame, raw=False, strict_map_key=False)
+        if version != PROTOCOL_VERSION:
+            raise ValueError(f"Unsupported protocol version {version}")
+        messages = []
+        for op, channel_ref, kind_ref, ident, ts_offset, body in entries:
+            if isinstance(channel_ref, str):
+                self._channels.append(channel_ref)
+                channel = channel_ref
+            else:
+                channel = self._channels[channel_ref]
+            kind = KINDS_BY_ID[kind_ref] if isinstance(kind_ref, int) else kind_ref
+
+            if op == OP_RAW:
+                data = body
+            else:
+                fields = SCHEMAS[kind][1]
+                key = (channel, kind, ident)
+                if op == OP_SNAPSHOT:
+                    data = {name: value for name, value in zip(fields, body) if value is not None}
+                    if len(body) > len(fields):
+                        data.update(body[len(fields)])
+                else:
+                    data = dict(self._snapshots.get(key, {}))
+                    for field_id, value in body.items():
+                        changes = value if field_id == EXTRA_FIELD_ID else {fields[field_id]: value}
+                        for name, new_value in changes.items():
+                            if new_value is None:
+                                data.pop(name, None)
+                            else:
+                                data[name] = new_value
+                self._snapshots[key] = data
+                data = dict(data)
+
+            messages.append({
+                "type": kind,
+                "channel": channel,
+                "data": data,
+                "timestamp": (base_ms + ts_offset) / 1000.0,
+            })
+        return messages
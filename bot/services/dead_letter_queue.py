@@ -19,7 +19,8 @@ import logging
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 import sqlite3
@@ -27,13 +28,11 @@ import uuid
 
 logger = logging.getLogger(__name__)
 
-# Try to import Supabase for cloud persistence
-try:
-    from supabase import create_client, Client
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
-    Client = None
+# Supabase is optional cloud persistence; the client library takes ~0.3s to
+# import, so it is only imported when a Supabase-backed queue is created
+SUPABASE_AVAILABLE = find_spec("supabase") is not None
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 class DLQEntryStatus(Enum):
@@ -160,7 +159,7 @@ class DeadLetterQueue:
         self._running = False
         
         # Supabase client
-        self._supabase: Optional[Client] = None
+        self._supabase: Optional["Client"] = None
         
         # Initialize storage
         if self.use_supabase:
@@ -211,6 +210,7 @@ class DeadLetterQueue:
         
         if url and key:
             try:
+                from supabase import create_client
                 self._supabase = create_client(url, key)
                 logger.info("✅ Dead Letter Queue connected to Supabase")
                 self._load_entries_from_supabase()
@@ -11,6 +11,7 @@ Version: 1.0
 """
 
 import asyncio
+import bisect
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Tuple, List, Dict
@@ -248,6 +249,83 @@ def _build_local_events() -> List[EconomicEvent]:
 # Pre-build local events cache
 LOCAL_EVENTS: List[EconomicEvent] = _build_local_events()
 
+IMPACT_PRIORITY = {
+    EventImpact.HIGH: 3,
+    EventImpact.MEDIUM: 2,
+    EventImpact.LOW: 1
+}
+
+
+class EconomicEventIndex:
+    """
+    Time-sorted index of events with a precomputed "next event" pointer per
+    impact level.
+    
+    Lookups only advance the pointer past events that have started since
+    the last call (time moves forward), so asking "what is next?" for every
+    position on every monitor pass is O(1) amortized instead of a scan.
+    """
+    
+    def __init__(self, events: List[EconomicEvent] = ()):
+        # priority -> (timestamps, events) holding only events at or above it
+        self._levels: Dict[int, Tuple[List[float], List[EconomicEvent]]] = {}
+        self._next: Dict[int, int] = {}
+        self._last_ts = float("-inf")
+        self.rebuild(events)
+    
+    def __len__(self) -> int:
+        return len(self._levels[1][1])
+    
+    def rebuild(self, events: List[EconomicEvent]):
+        """Replace the indexed events (duplicates by name and time are dropped)."""
+        unique = {(e.name, e.datetime_utc): e for e in events}
+        ordered = sorted(unique.values(), key=lambda e: e.datetime_utc)
+        for priority in (1, 2, 3):
+            level = [e for e in ordered if IMPACT_PRIORITY.get(e.impact, 0) >= priority]
+            self._levels[priority] = ([e.datetime_utc.timestamp() for e in level], level)
+            self._next[priority] = 0
+        self._last_ts = float("-inf")
+    
+    def next_event(self, now: datetime, min_impact: EventImpact = EventImpact.HIGH) -> Optional[EconomicEvent]:
+        """First event strictly after ``now`` with at least ``min_impact``."""
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        ts = now.timestamp()
+        priority = IMPACT_PRIORITY.get(min_impact, 1)
+        timestamps, events = self._levels[priority]
+        if ts < self._last_ts:
+            # Clock went backwards (or a caller asks about the past): re-seek
+            for level, (level_ts, _) in self._levels.items():
+                self._next[level] = bisect.bisect_right(level_ts, ts)
+        self._last_ts = ts
+        i = self._next[priority]
+        while i < len(timestamps) and timestamps[i] <= ts:
+            i += 1
+        self._next[priority] = i
+        return events[i] if i < len(events) else None
+    
+    def upcoming(
+        self,
+        now: datetime,
+        minutes_ahead: float,
+        min_impact: EventImpact = EventImpact.HIGH
+    ) -> Optional[Tuple[str, float]]:
+        """(event_name, minutes_until) of the next event within ``minutes_ahead``, or None."""
+        event = self.next_event(now, min_impact)
+        if event is None:
+            return None
+        minutes_until = event.minutes_until(now)
+        if 0 < minutes_until <= minutes_ahead:
+            return (event.name, minutes_until)
+        return None
+    
+    def between(self, start: datetime, end: datetime, min_impact: EventImpact = EventImpact.LOW) -> List[EconomicEvent]:
+        """Events with ``start <= time < end``."""
+        timestamps, events = self._levels[IMPACT_PRIORITY.get(min_impact, 1)]
+        lo = bisect.bisect_left(timestamps, start.timestamp())
+        hi = bisect.bisect_left(timestamps, end.timestamp())
+        return events[lo:hi]
+
 
 class EconomicCalendarService:
     """
@@ -270,6 +348,9 @@ class EconomicCalendarService:
         self._cache: List[EconomicEvent] = []
         self._cache_timestamp: Optional[datetime] = None
         self._session: Optional[aiohttp.ClientSession] = None
+        # Local + fetched events, rebuilt whenever the fetched list changes
+        self._index = EconomicEventIndex(LOCAL_EVENTS)
+        self._refresh_task: Optional[asyncio.Task] = None
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
@@ -298,19 +379,7 @@ class EconomicCalendarService:
         Returns:
             Tuple of (event_name, minutes_until) or None
         """
-        now = datetime.now(timezone.utc)
-        
-        # 1. Check local events first (most reliable)
-        event = self._check_local_events(now, minutes_ahead, min_impact)
-        if event:
-            return event
-        
-        # 2. Check cached external events
-        event = self._check_cached_events(now, minutes_ahead, min_impact)
-        if event:
-            return event
-        
-        return None
+        return self._index.upcoming(datetime.now(timezone.utc), minutes_ahead, min_impact)
     
     async def get_upcoming_event_async(
         self, 
@@ -318,7 +387,11 @@ class EconomicCalendarService:
         min_impact: EventImpact = EventImpact.HIGH
     ) -> Optional[Tuple[str, float]]:
         """
-        Async version that also fetches from external sources.
+        Async version that also keeps external sources fresh.
+        
+        Answers from the index immediately (stale-while-revalidate): an
+        expired external cache is refreshed in the background instead of
+        delaying the caller.
         
         Args:
             minutes_ahead: Look ahead window in minutes
@@ -327,95 +400,30 @@ class EconomicCalendarService:
         Returns:
             Tuple of (event_name, minutes_until) or None
         """
-        now = datetime.now(timezone.utc)
-        
-        # 1. Check local events first (most reliable)
-        event = self._check_local_events(now, minutes_ahead, min_impact)
-        if event:
-            return event
-        
-        # 2. Try to refresh cache from external source
-        await self._refresh_cache_if_needed()
+        if self._cache_expired() and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_cache_if_needed())
         
-        # 3. Check cached external events
-        event = self._check_cached_events(now, minutes_ahead, min_impact)
-        if event:
-            return event
-        
-        return None
+        return self.get_upcoming_event(minutes_ahead, min_impact)
     
-    def _check_local_events(
-        self, 
-        now: datetime, 
-        minutes_ahead: int,
-        min_impact: EventImpact
-    ) -> Optional[Tuple[str, float]]:
-        """Check hardcoded local events."""
-        impact_priority = {
-            EventImpact.HIGH: 3,
-            EventImpact.MEDIUM: 2,
-            EventImpact.LOW: 1
-        }
-        min_priority = impact_priority.get(min_impact, 1)
-        
-        for event in LOCAL_EVENTS:
-            # Skip low impact events if minimum is higher
-            if impact_priority.get(event.impact, 0) < min_priority:
-                continue
-            
-            minutes_until = event.minutes_until(now)
-            
-            # Event is in the past
-            if minutes_until < 0:
-                continue
-            
-            # Event is within our window
-            if 0 < minutes_until <= minutes_ahead:
-                return (event.name, minutes_until)
-            
-            # Events are sorted, so if we're past the window, stop
-            if minutes_until > minutes_ahead:
-                break
-        
-        return None
+    async def refresh(self):
+        """Refresh external events if expired (called by the background market context)."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            await self._refresh_task
+        else:
+            await self._refresh_cache_if_needed()
     
-    def _check_cached_events(
-        self, 
-        now: datetime, 
-        minutes_ahead: int,
-        min_impact: EventImpact
-    ) -> Optional[Tuple[str, float]]:
-        """Check cached external events."""
-        if not self._cache:
-            return None
-        
-        impact_priority = {
-            EventImpact.HIGH: 3,
-            EventImpact.MEDIUM: 2,
-            EventImpact.LOW: 1
-        }
-        min_priority = impact_priority.get(min_impact, 1)
-        
-        for event in self._cache:
-            if impact_priority.get(event.impact, 0) < min_priority:
-                continue
-            
-            minutes_until = event.minutes_until(now)
-            
-            if 0 < minutes_until <= minutes_ahead:
-                return (event.name, minutes_until)
-        
-        return None
+    def _cache_expired(self) -> bool:
+        if self._cache_timestamp is None:
+            return True
+        return (datetime.now(timezone.utc) - self._cache_timestamp).total_seconds() >= self.CACHE_TTL_SECONDS
     
     async def _refresh_cache_if_needed(self):
         """Refresh cache from external source if expired."""
         now = datetime.now(timezone.utc)
         
         # Check if cache is still valid
-        if self._cache_timestamp:
-            age = (now - self._cache_timestamp).total_seconds()
-            if age < self.CACHE_TTL_SECONDS:
-                return  # Cache is fresh
+        if not self._cache_expired():
+            return  # Cache is fresh
         
         # Try to fetch from Forex Factory
         try:
@@ -423,6 +431,7 @@ class EconomicCalendarService:
             if events:
                 self._cache = events
                 self._cache_timestamp = now
+                self._index.rebuild(LOCAL_EVENTS + events)
                 logger.debug(f"📅 Economic calendar cache refreshed: {len(events)} events")
         except Exception as e:
             logger.debug(f"Failed to refresh economic calendar: {e}")
@@ -543,13 +552,8 @@ class EconomicCalendarService:
     
     def get_events_for_date(self, target_date: datetime) -> List[EconomicEvent]:
         """Get all events for a specific date."""
-        events = []
-        
-        for event in LOCAL_EVENTS:
-            if event.datetime_utc.date() == target_date.date():
-                events.append(event)
-        
-        return events
+        day_start = datetime.combine(target_date.date(), datetime.min.time(), tzinfo=timezone.utc)
+        return self._index.between(day_start, day_start + timedelta(days=1))
     
     def get_high_impact_events_this_week(self) -> List[EconomicEvent]:
         """Get all high impact events for the current week."""
@@ -557,13 +561,7 @@ class EconomicCalendarService:
         week_start = now - timedelta(days=now.weekday())
         week_end = week_start + timedelta(days=7)
         
-        events = []
-        for event in LOCAL_EVENTS:
-            if (week_start <= event.datetime_utc < week_end and 
-                event.impact == EventImpact.HIGH):
-                events.append(event)
-        
-        return events
+        return self._index.between(week_start, week_end, EventImpact.HIGH)
 
 
 # Singleton instance
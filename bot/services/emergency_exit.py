@@ -0,0 +1,317 @@
+"""
+Emergency exit executor - flatten many positions at once.
+
+Liquidation auto-close and the kill switch used to close positions one at a
+time, each close waiting for the previous one's retries. In a crash that
+serial walk across users and exchanges takes far longer than the market
+gives. The executor closes a whole set concurrently instead:
+
+- positions are ordered by risk (notional / distance to liquidation), so the
+  ones closest to liquidation with the most at stake go first;
+- every exchange account gets its own small worker pool, sized to stay inside
+  its request budget; calls run at EMERGENCY priority in the account's
+  request scheduler, ahead of anything else queued there;
+- exits are reduce-only market orders, retried with jittered exponential
+  backoff (RetryHandler) unless the error cannot be fixed by retrying; each
+  exit carries a fixed client order id, and a retry first looks it up so a
+  close that reached the exchange before a timeout is not sent twice;
+- the position lock is held around the close, and the position is checked
+  on the exchange first (released protective orders, quantity still held);
+- each event yields a report with time-to-flat and per-position latency.
+
+Bots register their position monitors with the process-wide executor
+(``get_emergency_exit_executor``), so a kill-switch flatten covers all users.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, AsyncContextManager, Awaitable, Callable, Deque, Dict, List, Optional
+
+import ccxt
+
+from bot.core.retry_handler import RetryConfig, RetryHandler
+from bot.exchange_adapters.request_scheduler import RequestPriority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+class ExitAborted(Exception):
+    """The position must not be closed blindly; its state has to be re-synced first."""
+
+
+def new_client_order_id() -> str:
+    return f"exit-{uuid.uuid4().hex[:24]}"
+
+
+@dataclass
+class ExitRequest:
+    """One position to flatten."""
+    key: str
+    exchange: Any              # Adapter with place_order(..., reduce_only=True)
+    symbol: str
+    side: str                  # Position side: 'long' or 'short'
+    quantity: float
+    price: float
+    distance_pct: Optional[float] = None  # Distance to liquidation, None if unknown
+    user_id: Optional[str] = None
+    # Runs right before the order, under ``lock``: releases resting protective
+    # orders and returns the quantity actually held (0: already flat, None:
+    # keep ``quantity``); raises ExitAborted to skip the close
+    prepare: Optional[Callable[[], Awaitable[Optional[float]]]] = None
+    # Position lock held around prepare and the order; yields False on timeout
+    lock: Optional[Callable[[], AsyncContextManager[bool]]] = None
+    client_order_id: str = field(default_factory=new_client_order_id)
+
+    @property
+    def notional(self) -> float:
+        return abs(self.quantity * self.price)
+
+    @property
+    def risk_score(self) -> float:
+        # Unknown distance ranks as if 1% away
+        distance = self.distance_pct if self.distance_pct is not None else 1.0
+        return self.notional / max(distance, 0.01)
+
+
+@dataclass
+class ExitResult:
+    key: str
+    user_id: Optional[str]
+    symbol: str
+    success: bool
+    attempts: int = 0
+    latency_seconds: float = 0.0   # From event start until the close order returned
+    order_id: Optional[str] = None
+    error: Optional[str] = None
+    aborted: bool = False          # Not sent: see ExitAborted
+
+
+@dataclass
+class EmergencyExitReport:
+    event_id: str
+    reason: str
+    started_at: datetime
+    requested: int
+    results: List[ExitResult] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def closed(self) -> List[ExitResult]:
+        return [r for r in self.results if r.success]
+
+    @property
+    def failed(self) -> List[ExitResult]:
+        return [r for r in self.results if not r.success]
+
+    @property
+    def time_to_flat(self) -> Optional[float]:
+        """Seconds until the last position was closed; None while any failed."""
+        if self.failed or not self.results:
+            return None
+        return max(r.latency_seconds for r in self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event_id": self.event_id,
+            "reason": self.reason,
+            "started_at": self.started_at.isoformat(),
+            "requested": self.requested,
+            "closed": len(self.closed),
+            "failed": [{"key": r.key, "error": r.error, "attempts": r.attempts} for r in self.failed],
+            "time_to_flat_seconds": self.time_to_flat,
+            "duration_seconds": self.duration_seconds,
+        }
+
+
+NON_RETRYABLE_EXIT_ERRORS = {
+    ccxt.InvalidOrder,         # Includes reduce-only rejections: nothing left to close
+    ccxt.InsufficientFunds,
+    ccxt.BadSymbol,
+    ccxt.AuthenticationError,
+    ccxt.PermissionDenied,
+}
+
+
+class EmergencyExitExecutor:
+    """Concurrent, risk-ordered mass close across users and exchanges."""
+
+    MAX_CONCURRENT_PER_EXCHANGE = 4
+    MAX_RETRIES = 3
+    HISTORY_SIZE = 20
+
+    def __init__(self, max_concurrent_per_exchange: int = MAX_CONCURRENT_PER_EXCHANGE,
+                 max_retries: int = MAX_RETRIES):
+        self.max_concurrent_per_exchange = max_concurrent_per_exchange
+        self.retry_handler = RetryHandler(RetryConfig(
+            max_retries=max_retries,
+            base_delay=0.25,
+            max_delay=4.0,
+            jitter_factor=0.5,
+            non_retryable_exceptions=set(NON_RETRYABLE_EXIT_ERRORS),
+        ))
+        self.reports: Deque[EmergencyExitReport] = deque(maxlen=self.HISTORY_SIZE)
+        self._monitors: List[Any] = []
+        self._flatten_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    async def execute(self, requests: List[ExitRequest], reason: str,
+                      max_attempts: Optional[int] = None) -> EmergencyExitReport:
+        """
+        Close ``requests`` concurrently (highest risk first per exchange) and report.
+
+        Args:
+            max_attempts: Order attempts per position (default: executor's retry config)
+        """
+        report = EmergencyExitReport(
+            event_id=uuid.uuid4().hex[:8], reason=reason,
+            started_at=datetime.now(), requested=len(requests),
+        )
+        if not requests:
+            return report
+        started = time.monotonic()
+        retry_config = self.retry_handler.config
+        if max_attempts is not None:
+            retry_config = replace(retry_config, max_retries=max(0, max_attempts - 1))
+
+        # One queue per exchange account; the scheduler is shared per account
+        queues: Dict[int, Deque[ExitRequest]] = {}
+        for request in sorted(requests, key=lambda r: r.risk_score, reverse=True):
+            account = getattr(request.exchange, 'scheduler', request.exchange)
+            queues.setdefault(id(account), deque()).append(request)
+
+        logger.critical(
+            f"🚨 EMERGENCY EXIT {report.event_id} ({reason}): closing {len(requests)} positions "
+            f"on {len(queues)} exchange accounts"
+        )
+
+        async def worker(queue: Deque[ExitRequest]):
+            while queue:
+                report.results.append(await self._close(queue.popleft(), started, retry_config))
+
+        workers = [
+            worker(queue)
+            for queue in queues.values()
+            for _ in range(min(self.max_concurrent_per_exchange, len(queue)))
+        ]
+        await asyncio.gather(*workers)
+
+        report.duration_seconds = time.monotonic() - started
+        self.reports.append(report)
+        if report.failed:
+            logger.critical(
+                f"🚨 EMERGENCY EXIT {report.event_id}: {len(report.closed)}/{report.requested} closed, "
+                f"FAILED: {', '.join(r.key for r in report.failed)}"
+            )
+        else:
+            logger.critical(
+                f"✅ EMERGENCY EXIT {report.event_id}: flat in {report.time_to_flat:.2f}s "
+                f"({report.requested} positions)"
+            )
+        return report
+
+    async def _close(self, request: ExitRequest, started: float, retry_config: RetryConfig) -> ExitResult:
+        result = ExitResult(key=request.key, user_id=request.user_id, symbol=request.symbol, success=False)
+        # Adapters that can look orders up by client id get one fixed id per exit
+        lookup = getattr(request.exchange, 'get_order_by_client_id', None)
+        quantity = request.quantity
+
+        async def send_close():
+            result.attempts += 1
+            if lookup is not None and result.attempts > 1:
+                # The previous attempt may have reached the exchange before failing
+                existing = await lookup(request.client_order_id, request.symbol)
+                if existing and existing.get('status') not in ('canceled', 'rejected', 'expired'):
+                    return existing
+            kwargs = {'client_order_id': request.client_order_id} if lookup is not None else {}
+            return await request.exchange.place_order(
+                symbol=request.symbol,
+                side='sell' if request.side == 'long' else 'buy',
+                order_type='market',
+                quantity=quantity,
+                price=request.price,  # Cost check only - saves a ticker call
+                reduce_only=True,
+                **kwargs,
+            )
+
+        with request_priority(RequestPriority.EMERGENCY):
+            try:
+                async with (request.lock() if request.lock is not None else nullcontext(True)) as locked:
+                    if not locked:
+                        raise TimeoutError(f"position lock for {request.symbol} not acquired")
+                    if request.prepare is not None:
+                        held = await request.prepare()
+                        if held is not None:
+                            quantity = held
+                    if quantity > 0:
+                        order = await self.retry_handler.execute(
+                            send_close, operation_name="emergency_exit", config=retry_config
+                        )
+                        result.order_id = order.get('id') if isinstance(order, dict) else getattr(order, 'id', None)
+                    else:
+                        logger.info(f"🚨 {request.key} is already flat on the exchange - nothing to close")
+                    result.success = True
+            except ExitAborted as e:
+                result.aborted = True
+                result.error = str(e)
+                logger.warning(f"🚨 Emergency close of {request.key} skipped: {e}")
+            except Exception as e:
+                result.error = str(e)
+                logger.error(f"🚨 Emergency close of {request.key} failed after {result.attempts} attempts: {e}")
+        result.latency_seconds = time.monotonic() - started
+        return result
+
+    # ------------------------------------------------------------------
+    # Process-wide flatten (kill switch)
+    # ------------------------------------------------------------------
+
+    def register_monitor(self, monitor):
+        if monitor not in self._monitors:
+            self._monitors.append(monitor)
+
+    def unregister_monitor(self, monitor):
+        if monitor in self._monitors:
+            self._monitors.remove(monitor)
+
+    async def flatten_all(self, reason: str, leveraged_only: bool = True) -> EmergencyExitReport:
+        """Close positions of every registered monitor in one event."""
+        async with self._flatten_lock:
+            monitors = list(self._monitors)
+            requests: List[ExitRequest] = []
+            for monitor in monitors:
+                requests.extend(monitor.build_exit_requests(leveraged_only=leveraged_only))
+            report = await self.execute(requests, reason)
+            for monitor in monitors:
+                await monitor.apply_exit_report(report, reason)
+            return report
+
+    async def on_kill_switch(self, reason: str):
+        """Market context listener: flatten leveraged positions when the kill switch is raised."""
+        await self.flatten_all(f"kill_switch: {reason}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "registered_monitors": len(self._monitors),
+            "max_concurrent_per_exchange": self.max_concurrent_per_exchange,
+            "recent_events": [report.to_dict() for report in self.reports],
+        }
+
+
+# Singleton instance
+_emergency_exit_executor: Optional[EmergencyExitExecutor] = None
+
+
+def get_emergency_exit_executor() -> EmergencyExitExecutor:
+    """Get or create the process-wide EmergencyExitExecutor."""
+    global _emergency_exit_executor
+    if _emergency_exit_executor is None:
+        _emergency_exit_executor = EmergencyExitExecutor()
+    return _emergency_exit_executor
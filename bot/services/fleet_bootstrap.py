@@ -0,0 +1,263 @@
+"""
+Fleet bootstrap - start many per-user bots with one pass over shared state.
+
+Instead of every bot opening its own database engine, querying its API key,
+risk and DCA settings separately and downloading the exchange's market list,
+the launcher:
+
+1. Loads the first active API key, trading settings and DCA settings of all
+   users with three bulk ``IN`` queries over the shared engine, decrypting
+   the keys with a single SecurityManager.
+2. Loads market metadata once per exchange with a public client and hands it
+   to every bot's adapter (no per-bot ``load_markets``).
+3. Starts all bots concurrently, gated per exchange by a token bucket sized
+   from the exchange's request budget instead of a fixed semaphore and
+   stagger, so startup time stays roughly flat as users are added.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bot.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Estimated request weight of one bot's initialization (key validation,
+# balances, open positions, first trade-ledger sync), in ccxt cost units
+# like the request scheduler's METHOD_WEIGHTS
+DEFAULT_STARTUP_WEIGHT = 12.0
+
+
+@dataclass
+class SharedMarkets:
+    """Market metadata loaded once per exchange and reused by every bot."""
+    markets: Dict[str, Any]
+    currencies: Optional[Dict[str, Any]] = None
+    time_difference: Optional[int] = None
+
+
+@dataclass
+class UserBootstrap:
+    """Everything a bot would otherwise load from the database on startup."""
+    user_id: str
+    exchange: Optional[str] = None
+    testnet: bool = False
+    api_key: Optional[str] = None
+    api_secret: Optional[str] = None
+    trading_settings: Optional[Any] = None  # trading_settings row (risk_level, ..., take_profit_percentage)
+    dca_config: Optional[Any] = None        # DCAConfig, None = defaults
+    markets: Optional[SharedMarkets] = None
+    error: Optional[str] = None
+
+    @property
+    def has_keys(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
+
+class FleetBootstrap:
+    """
+    Bulk loader and startup gate for a fleet of per-user bots.
+
+    Usage:
+        fleet = FleetBootstrap(user_ids)
+        await fleet.load()
+        await fleet.prewarm_markets()
+        record = fleet.users[user_id]
+        await fleet.acquire_startup(record.exchange)
+        bot = AutomatedTradingBot(user_id=user_id, bootstrap=record, ...)
+    """
+
+    def __init__(self, user_ids: Optional[Sequence[str]] = None, exchange_filter: Optional[str] = None,
+                 startup_weight: float = DEFAULT_STARTUP_WEIGHT):
+        self.user_ids = [str(user_id) for user_id in user_ids] if user_ids else None
+        self.exchange_filter = exchange_filter
+        self.startup_weight = startup_weight
+        self.users: Dict[str, UserBootstrap] = {}
+        self.markets: Dict[Tuple[str, bool], SharedMarkets] = {}
+        self._startup_buckets: Dict[str, TokenBucket] = {}
+        self._startup_locks: Dict[str, asyncio.Lock] = {}
+
+    # ------------------------------------------------------------------
+    # Database
+    # ------------------------------------------------------------------
+
+    async def load(self) -> Dict[str, UserBootstrap]:
+        """Load keys and settings of all users (blocking DB work in a thread)."""
+        self.users = await asyncio.to_thread(self._load_sync)
+        found = sum(1 for record in self.users.values() if record.has_keys)
+        logger.info(f"📦 Fleet bootstrap: {found}/{len(self.users)} users with active API keys")
+        return self.users
+
+    def _load_sync(self) -> Dict[str, UserBootstrap]:
+        from sqlalchemy import bindparam, text
+        from bot.db import DatabaseManager, DCASettings
+        from bot.security import SecurityManager
+        from bot.services.dca_manager import DCAConfig
+
+        users: Dict[str, UserBootstrap] = {
+            user_id: UserBootstrap(user_id=user_id) for user_id in (self.user_ids or [])
+        }
+        security_manager = SecurityManager(os.getenv("ENCRYPTION_KEY"))
+
+        with DatabaseManager.session_scope() as session:
+            # First active key per user (same choice as the single-user loader)
+            query = """
+                SELECT user_id, encrypted_api_key, encrypted_api_secret, exchange, is_testnet
+                FROM api_keys
+                WHERE is_active = true
+            """
+            params: Dict[str, Any] = {}
+            if self.user_ids:
+                query += " AND user_id IN :user_ids"
+                params["user_ids"] = self.user_ids
+            if self.exchange_filter:
+                query += " AND exchange = :exchange"
+                params["exchange"] = self.exchange_filter
+            query += " ORDER BY user_id, created_at ASC"
+            statement = text(query)
+            if self.user_ids:
+                statement = statement.bindparams(bindparam("user_ids", expanding=True))
+
+            for row in session.execute(statement, params).fetchall():
+                user_id = str(row.user_id)
+                record = users.setdefault(user_id, UserBootstrap(user_id=user_id))
+                if record.exchange:
+                    continue
+                record.exchange = row.exchange
+                record.testnet = row.is_testnet if row.is_testnet is not None else False
+                try:
+                    record.api_key = security_manager.decrypt(row.encrypted_api_key)
+                    record.api_secret = security_manager.decrypt(row.encrypted_api_secret)
+                except Exception as e:
+                    record.error = f"Could not decrypt API keys: {e}"
+
+            user_ids = list(users)
+            if not user_ids:
+                return users
+
+            settings_rows = session.execute(
+                text("""
+                    SELECT
+                        user_id,
+                        risk_level,
+                        max_position_size,
+                        max_daily_loss,
+                        stop_loss_percentage,
+                        take_profit_percentage
+                    FROM trading_settings
+                    WHERE user_id IN :user_ids
+                """).bindparams(bindparam("user_ids", expanding=True)),
+                {"user_ids": user_ids}
+            ).fetchall()
+            for row in settings_rows:
+                record = users.get(str(row.user_id))
+                if record and record.trading_settings is None:
+                    # Same column order as AutomatedTradingBot._load_user_risk_settings
+                    record.trading_settings = tuple(row[1:])
+
+            for settings in session.query(DCASettings).filter(DCASettings.user_id.in_(user_ids)):
+                record = users.get(str(settings.user_id))
+                if record:
+                    record.dca_config = DCAConfig.from_db_settings(settings)
+
+        for record in users.values():
+            if not record.exchange and not record.error:
+                record.error = "No active API keys found"
+        return users
+
+    # ------------------------------------------------------------------
+    # Shared market metadata
+    # ------------------------------------------------------------------
+
+    async def prewarm_markets(self) -> None:
+        """Load markets once per exchange and attach them to every user record."""
+        # Testnet adapters use custom URLs, so those bots keep loading their own
+        targets = sorted({
+            (record.exchange, record.testnet)
+            for record in self.users.values()
+            if record.has_keys and not record.testnet
+        })
+        results = await asyncio.gather(
+            *(self._load_markets(exchange_name) for exchange_name, _ in targets), return_exceptions=True
+        )
+        for (exchange_name, testnet), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Could not pre-load {exchange_name} markets, bots will load their own: {result}")
+                continue
+            self.markets[(exchange_name, testnet)] = result
+            logger.info(f"✅ Pre-loaded {len(result.markets)} {exchange_name} markets for the fleet")
+
+        for record in self.users.values():
+            record.markets = self.markets.get((record.exchange, record.testnet))
+
+    @staticmethod
+    async def _load_markets(exchange_name: str) -> SharedMarkets:
+        from bot.exchange_adapters.ccxt_adapter import CCXTAdapter, REQUEST_TIMEOUT
+
+        exchange_class = CCXTAdapter.SUPPORTED_EXCHANGES[exchange_name]
+        exchange = exchange_class({
+            'enableRateLimit': True,
+            'timeout': REQUEST_TIMEOUT,
+            'options': {'adjustForTimeDifference': True},
+        })
+        try:
+            await exchange.load_markets()
+            return SharedMarkets(
+                markets=exchange.markets,
+                currencies=exchange.currencies,
+                time_difference=exchange.options.get('timeDifference'),
+            )
+        finally:
+            await exchange.close()
+
+    # ------------------------------------------------------------------
+    # Startup gate
+    # ------------------------------------------------------------------
+
+    def _startup_bucket(self, exchange_name: str) -> TokenBucket:
+        bucket = self._startup_buckets.get(exchange_name)
+        if bucket is None:
+            budget = 60000.0 / self._rate_limit_ms(exchange_name)  # weight per minute
+            bucket = TokenBucket(capacity=budget, rate=budget / 60.0)
+            self._startup_buckets[exchange_name] = bucket
+        return bucket
+
+    @staticmethod
+    def _rate_limit_ms(exchange_name: str) -> float:
+        try:
+            from bot.exchange_adapters.ccxt_adapter import CCXTAdapter
+            # rateLimit comes from describe(): the class attribute is ccxt's generic default
+            return CCXTAdapter.SUPPORTED_EXCHANGES[exchange_name]().rateLimit or 100
+        except Exception:
+            return 100
+
+    async def acquire_startup(self, exchange_name: Optional[str]) -> float:
+        """
+        Wait until one more bot can start on ``exchange_name`` within its
+        request budget. Returns the seconds waited.
+        """
+        if not exchange_name:
+            return 0.0
+        waited = 0.0
+        async with self._startup_locks.setdefault(exchange_name, asyncio.Lock()):
+            bucket = self._startup_bucket(exchange_name)
+            weight = min(self.startup_weight, bucket.capacity)
+            while not bucket.try_acquire(weight):
+                delay = bucket.retry_after(weight)
+                waited += delay
+                await asyncio.sleep(delay)
+        return waited
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'users': len(self.users),
+            'ready': sum(1 for record in self.users.values() if record.has_keys and not record.error),
+            'errors': {user_id: record.error for user_id, record in self.users.items() if record.error},
+            'shared_markets': [f"{name}{'-testnet' if testnet else ''}" for name, testnet in self.markets],
+        }
+
+    def ready_users(self) -> List[UserBootstrap]:
+        return [record for record in self.users.values() if record.has_keys and not record.error]
@@ -0,0 +1,155 @@
+"""
+Market context - shared market-wide state refreshed in the background.
+
+Sentiment (Fear & Greed, CoinGecko), the kill-switch verdict and the
+economic calendar are the same for every bot in the process. Instead of
+each trading cycle or monitor pass fetching them when a cache expires (and
+all bots hitting the same expiry together), one service refreshes each
+source on its own schedule:
+
+- ``MarketIntelligenceService.get_market_sentiment`` keeps serving the last
+  good value (stale-while-revalidate) and is refreshed here ahead of expiry.
+- The kill switch is evaluated here and published as an in-memory flag, so
+  ``should_kill_switch`` at the start of a cycle is a field read. Listeners
+  (e.g. the emergency exit executor) are told when it is raised.
+- The economic calendar's external events are refreshed into its
+  time-sorted index; position checks only read the "next event" pointer.
+
+Bots share one instance (``get_market_context``) and start/stop it with
+reference counting, so the refresh loops live as long as any bot does.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MarketContextService:
+    """Background refresher for process-wide market context."""
+
+    SENTIMENT_INTERVAL = 240.0    # Before the 5 min sentiment TTL expires
+    KILL_SWITCH_INTERVAL = 60.0
+    CALENDAR_INTERVAL = 300.0
+
+    def __init__(self, market_intelligence, calendar=None,
+                 sentiment_interval: float = SENTIMENT_INTERVAL,
+                 kill_switch_interval: float = KILL_SWITCH_INTERVAL,
+                 calendar_interval: float = CALENDAR_INTERVAL):
+        self.market_intelligence = market_intelligence
+        self.calendar = calendar
+        self.intervals = {
+            "sentiment": sentiment_interval,
+            "kill_switch": kill_switch_interval,
+            "calendar": calendar_interval,
+        }
+        self._tasks: List[asyncio.Task] = []
+        self._users = 0
+        self._last_refresh: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+        self._kill_switch_listeners: List[Callable[[str], Awaitable[Any]]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_kill_switch_listener(self, listener: Callable[[str], Awaitable[Any]]):
+        """Call ``listener(reason)`` each time the kill switch is raised."""
+        if listener not in self._kill_switch_listeners:
+            self._kill_switch_listeners.append(listener)
+
+    async def start(self):
+        """Start the refresh loops (first refresh runs immediately). Reference counted."""
+        self._users += 1
+        if self._tasks:
+            return
+        mi = self.market_intelligence
+        # A published verdict stays valid for two refresh periods; after that
+        # (loop stuck or stopped) callers evaluate inline again
+        mi.kill_switch_max_age = self.intervals["kill_switch"] * 2
+        refreshers: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "sentiment": mi.refresh_sentiment,
+            "kill_switch": self._refresh_kill_switch,
+        }
+        if self.calendar is not None:
+            refreshers["calendar"] = self.calendar.refresh
+        self._tasks = [
+            asyncio.create_task(self._refresh_loop(name, refresh))
+            for name, refresh in refreshers.items()
+        ]
+        logger.info(
+            "🌐 Market context refreshing in background: "
+            + ", ".join(f"{name} every {self.intervals[name]:.0f}s" for name in refreshers)
+        )
+
+    async def stop(self):
+        """Release one user; the loops stop when the last bot stops."""
+        self._users = max(0, self._users - 1)
+        if self._users or not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.market_intelligence.kill_switch_max_age = 0.0
+        logger.info("🌐 Market context refresh stopped")
+
+    async def _refresh_kill_switch(self):
+        was_active = self.market_intelligence.kill_switch_active
+        active, reason = await self.market_intelligence.refresh_kill_switch()
+        if active and not was_active:
+            for listener in self._kill_switch_listeners:
+                try:
+                    await listener(reason)
+                except Exception as e:
+                    logger.error(f"Kill switch listener failed: {e}")
+
+    async def _refresh_loop(self, name: str, refresh: Callable[[], Awaitable[Any]]):
+        while True:
+            try:
+                await refresh()
+                self._last_refresh[name] = time.time()
+                self._failures[name] = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Readers keep the last good value
+                self._failures[name] = self._failures.get(name, 0) + 1
+                logger.warning(f"Market context refresh '{name}' failed: {e}")
+            await asyncio.sleep(self.intervals[name])
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "running": self.running,
+            "users": self._users,
+            "kill_switch_active": self.market_intelligence.kill_switch_active,
+            "kill_switch_reason": self.market_intelligence.kill_switch_reason,
+            "sources": {
+                name: {
+                    "interval_seconds": interval,
+                    "age_seconds": now - self._last_refresh[name] if name in self._last_refresh else None,
+                    "failures": self._failures.get(name, 0),
+                }
+                for name, interval in self.intervals.items()
+            },
+        }
+
+
+# Singleton instance
+_market_context: Optional[MarketContextService] = None
+
+
+def get_market_context(market_intelligence=None) -> MarketContextService:
+    """Get or create the process-wide MarketContextService."""
+    global _market_context
+    if _market_context is None:
+        from bot.services.economic_calendar import get_economic_calendar
+        from bot.services.market_intelligence import get_market_intelligence
+        _market_context = MarketContextService(
+            market_intelligence or get_market_intelligence(),
+            calendar=get_economic_calendar()
+        )
+    return _market_context
@@ -23,6 +23,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 import time
 
+from bot.realtime.order_book import L2OrderBook
+
 logger = logging.getLogger(__name__)
 
 
@@ -285,12 +287,26 @@ class MarketIntelligenceService:
         self._cache_ttl = 300  # 5 minutes cache
         self._last_sentiment_fetch = None
         self._cached_sentiment: Optional[MarketSentiment] = None
+        self._sentiment_refresh: Optional[asyncio.Task] = None  # Single in-flight fetch
+        
+        # Kill switch state published by the background MarketContextService.
+        # kill_switch_max_age = 0 means no publisher: evaluate on every call.
+        self.kill_switch_active = False
+        self.kill_switch_reason = ""
+        self.kill_switch_max_age = 0.0
+        self._kill_switch_checked_at: Optional[float] = None
         
         # FIX 2025-12-16: Emergency cache invalidation support
         self._emergency_mode = False
         self._last_price_snapshot: Dict[str, float] = {}  # {symbol: price}
         self._flash_crash_threshold_pct = 5.0  # 5% drop = flash crash
         
+        # Live L2 books (WebSocketManager) for liquidity checks without REST calls
+        self.order_book_source = None
+        self._order_book_max_age = 5.0
+        # Books shared by a signal fan-out: {symbol: (book, expires_at)}
+        self._pinned_books: Dict[str, Tuple[L2OrderBook, float]] = {}
+        
         logger.info("🧠 Market Intelligence Service initialized")
     
     def invalidate_cache(self, reason: str = "manual"):
@@ -303,6 +319,7 @@ class MarketIntelligenceService:
         self._cache.clear()
         self._cached_sentiment = None
         self._last_sentiment_fetch = None
+        self._kill_switch_checked_at = None
         logger.warning(f"🚨 Market Intelligence cache INVALIDATED: {reason}")
     
     def check_flash_crash(self, symbol: str, current_price: float) -> bool:
@@ -331,6 +348,41 @@ class MarketIntelligenceService:
         
         return False
     
+    def set_order_book_source(self, source, max_age: float = 5.0):
+        """
+        Read liquidity from a live order book source instead of REST.
+        
+        ``source`` is anything with ``get_l2_book(symbol, max_age)`` (e.g.
+        WebSocketManager). Books older than ``max_age`` seconds are ignored
+        and the REST fetch is used instead.
+        """
+        self.order_book_source = source
+        self._order_book_max_age = max_age
+    
+    def pin_order_book(self, symbol: str, order_book: Dict, ttl: float = 10.0):
+        """
+        Serve liquidity checks for ``symbol`` from this REST book for ``ttl`` seconds.
+        
+        Used by the signal fan-out so every user's check reads one snapshot.
+        """
+        book = L2OrderBook.from_snapshot(symbol, order_book.get('bids', []), order_book.get('asks', []))
+        self._pinned_books[symbol] = (book, time.monotonic() + ttl)
+    
+    def _live_order_book(self, symbol: str) -> Optional[L2OrderBook]:
+        pinned = self._pinned_books.get(symbol)
+        if pinned is not None:
+            book, expires_at = pinned
+            if time.monotonic() < expires_at:
+                return book
+            del self._pinned_books[symbol]
+        if self.order_book_source is None:
+            return None
+        try:
+            return self.order_book_source.get_l2_book(symbol, max_age=self._order_book_max_age)
+        except Exception as e:
+            logger.debug(f"Live order book unavailable for {symbol}: {e}")
+            return None
+    
     def is_emergency_mode(self) -> bool:
         """Check if in emergency mode (flash crash detected recently)."""
         return self._emergency_mode
@@ -343,11 +395,16 @@ class MarketIntelligenceService:
     async def check_liquidity(
         self, 
         symbol: str, 
-        order_size_usd: float
+        order_size_usd: float,
+        side: str = "buy"
     ) -> LiquidityCheck:
         """
         Check if there's sufficient liquidity for the order.
         
+        Reads the WebSocket-maintained book when one is attached and fresh
+        (see ``set_order_book_source``) or a book pinned by the signal
+        fan-out (``pin_order_book``); otherwise fetches a 50-level book.
+        
         Returns LiquidityCheck with:
         - is_liquid: True if safe to trade this size
         - estimated_slippage_pct: Expected slippage
@@ -356,27 +413,29 @@ class MarketIntelligenceService:
         warnings = []
         
         try:
-            # Fetch order book
-            if self.exchange and hasattr(self.exchange, 'fetch_order_book'):
-                order_book = await self.exchange.fetch_order_book(symbol, limit=50)
-            else:
-                # Fallback: assume liquid for major pairs
-                base = symbol.split('/')[0] if '/' in symbol else symbol.replace('USDT', '')
-                is_major = base in ['BTC', 'ETH', 'SOL', 'XRP']
-                return LiquidityCheck(
-                    symbol=symbol,
-                    is_liquid=is_major or order_size_usd < 5000,
-                    bid_ask_spread_pct=0.1 if is_major else 0.3,
-                    order_book_depth_usd=1000000 if is_major else 100000,
-                    estimated_slippage_pct=0.1 if is_major else 0.5,
-                    max_safe_order_usd=50000 if is_major else 10000,
-                    warnings=["Order book not available, using estimates"]
+            book = self._live_order_book(symbol)
+            if book is None:
+                # Fetch order book
+                if self.exchange and hasattr(self.exchange, 'fetch_order_book'):
+                    order_book = await self.exchange.fetch_order_book(symbol, limit=50)
+                else:
+                    # Fallback: assume liquid for major pairs
+                    base = symbol.split('/')[0] if '/' in symbol else symbol.replace('USDT', '')
+                    is_major = base in ['BTC', 'ETH', 'SOL', 'XRP']
+                    return LiquidityCheck(
+                        symbol=symbol,
+                        is_liquid=is_major or order_size_usd < 5000,
+                        bid_ask_spread_pct=0.1 if is_major else 0.3,
+                        order_book_depth_usd=1000000 if is_major else 100000,
+                        estimated_slippage_pct=0.1 if is_major else 0.5,
+                        max_safe_order_usd=50000 if is_major else 10000,
+                        warnings=["Order book not available, using estimates"]
+                    )
+                book = L2OrderBook.from_snapshot(
+                    symbol, order_book.get('bids', []), order_book.get('asks', [])
                 )
             
-            bids = order_book.get('bids', [])
-            asks = order_book.get('asks', [])
-            
-            if not bids or not asks:
+            if not book.bids.n or not book.asks.n:
                 return LiquidityCheck(
                     symbol=symbol,
                     is_liquid=False,
@@ -388,23 +447,21 @@ class MarketIntelligenceService:
                 )
             
             # Calculate bid-ask spread
-            best_bid = float(bids[0][0])
-            best_ask = float(asks[0][0])
-            spread_pct = ((best_ask - best_bid) / best_bid) * 100
-            
-            # Calculate order book depth (within 2% of mid price)
-            mid_price = (best_bid + best_ask) / 2
-            depth_range = mid_price * 0.02
+            spread_pct = book.spread_pct
             
-            bid_depth = sum(float(b[0]) * float(b[1]) for b in bids if float(b[0]) >= best_bid - depth_range)
-            ask_depth = sum(float(a[0]) * float(a[1]) for a in asks if float(a[0]) <= best_ask + depth_range)
-            total_depth = bid_depth + ask_depth
+            # Calculate order book depth (within 2% of the touch on each side)
+            total_depth = book.depth_within(200)
             
-            # Estimate slippage for order size
+            # Estimate slippage for order size by walking the book
             if order_size_usd > 0:
-                # Simple slippage model: slippage increases with order size relative to depth
-                depth_ratio = order_size_usd / total_depth if total_depth > 0 else 999
-                estimated_slippage = spread_pct / 2 + (depth_ratio * 100)  # Base spread + impact
+                fill = book.estimate_fill(side, order_size_usd)
+                if fill.complete:
+                    estimated_slippage = fill.impact_bps / 100  # vs. mid, includes half spread
+                else:
+                    # Beyond visible depth: slippage increases with order size relative to depth
+                    depth_ratio = order_size_usd / total_depth if total_depth > 0 else 999
+                    estimated_slippage = spread_pct / 2 + (depth_ratio * 100)
+                    warnings.append("Order size exceeds visible order book depth")
             else:
                 estimated_slippage = spread_pct / 2
             
@@ -496,6 +553,33 @@ class MarketIntelligenceService:
         )
     
     async def get_market_sentiment(self) -> MarketSentiment:
+        """
+        Overall market sentiment, served stale-while-revalidate.
+        
+        The last good value is returned immediately; once it is older than
+        the cache TTL a single background refresh is started, so bots sharing
+        this service never wait for (or stampede) the external APIs together.
+        Only the very first call, or the first after an emergency cache
+        invalidation, waits for the fetch.
+        """
+        if self._cached_sentiment and self._last_sentiment_fetch:
+            if (datetime.now() - self._last_sentiment_fetch).total_seconds() >= self._cache_ttl:
+                self._sentiment_refresh_task()
+            return self._cached_sentiment
+        
+        return await self.refresh_sentiment()
+    
+    async def refresh_sentiment(self) -> MarketSentiment:
+        """Fetch sentiment now, joining a fetch already in flight."""
+        # Shared fetch: a cancelled caller must not cancel it for the others
+        return await asyncio.shield(self._sentiment_refresh_task())
+    
+    def _sentiment_refresh_task(self) -> asyncio.Task:
+        if self._sentiment_refresh is None or self._sentiment_refresh.done():
+            self._sentiment_refresh = asyncio.create_task(self._fetch_sentiment())
+        return self._sentiment_refresh
+    
+    async def _fetch_sentiment(self) -> MarketSentiment:
         """
         Fetch overall market sentiment indicators with CircuitBreaker protection.
         
@@ -506,12 +590,7 @@ class MarketIntelligenceService:
         
         FIX 2025-12-16: Added CircuitBreaker integration for API resilience
         """
-        # Use cache if recent
         now = datetime.now()
-        if (self._cached_sentiment and self._last_sentiment_fetch and 
-            (now - self._last_sentiment_fetch).seconds < self._cache_ttl):
-            return self._cached_sentiment
-        
         fear_greed = 50
         fear_greed_label = "Neutral"
         btc_dominance = 50.0
@@ -519,6 +598,8 @@ class MarketIntelligenceService:
         funding_rate = 0.0
         warnings = []
         
+        fg_result = cg_result = None
+        
         # Get circuit breaker instance
         circuit_breaker = get_api_circuit_breaker()
         
@@ -582,6 +663,11 @@ class MarketIntelligenceService:
             logger.error(f"Sentiment fetch error: {e}")
             warnings.append(f"Sentiment API error: {str(e)}")
         
+        if fg_result is None and cg_result is None and self._cached_sentiment is not None:
+            # Both sources down: keep serving the last good value, retry on the next refresh
+            logger.warning("Sentiment sources unavailable - keeping last known sentiment")
+            return self._cached_sentiment
+        
         # Determine market regime
         regime = self._determine_regime(fear_greed, market_cap_change)
         
@@ -703,8 +789,29 @@ class MarketIntelligenceService:
         """
         Check if emergency kill switch should be activated.
         
+        Reads the in-memory flag published by the background market context
+        while it is fresh; evaluates inline (BTC ticker + sentiment) otherwise.
+        
         Returns (should_kill, reason)
         """
+        if (self._kill_switch_checked_at is not None and
+                time.monotonic() - self._kill_switch_checked_at < self.kill_switch_max_age):
+            return self.kill_switch_active, self.kill_switch_reason
+        return await self.refresh_kill_switch()
+    
+    async def refresh_kill_switch(self) -> Tuple[bool, str]:
+        """Evaluate the kill switch and publish the result."""
+        should_kill, reason = await self._evaluate_kill_switch()
+        if should_kill != self.kill_switch_active:
+            if should_kill:
+                logger.warning(f"Kill switch raised: {reason}")
+            else:
+                logger.info("✅ Kill switch cleared")
+        self.kill_switch_active, self.kill_switch_reason = should_kill, reason
+        self._kill_switch_checked_at = time.monotonic()
+        return should_kill, reason
+    
+    async def _evaluate_kill_switch(self) -> Tuple[bool, str]:
         try:
             # Get BTC price change
             if self.exchange:
@@ -0,0 +1,275 @@
+"""
+Market scanner - the whole exchange's tickers from one call, screened as arrays.
+
+Strategies used to look only at their configured symbols, with one REST
+ticker per symbol fetched serially each cycle, and ``get_top_volume_symbols``
+sorted every ticker on each call. In scanner mode one ``fetch_tickers()`` per
+interval pulls the full universe into ``TickerUniverse``: one contiguous
+NumPy column per field, one row per symbol (rows are stable, new listings
+are appended). On top of it:
+
+- strategies screen all symbols at once (``TradingStrategy.screen`` returns
+  a boolean mask); only the few candidates go through their per-symbol logic;
+- top-volume and candidate lists are cached per universe version, so they
+  are recomputed once per scan instead of on every call, and candidate
+  changes are logged as additions/removals;
+- the engine reads market data for any symbol from the columns instead of
+  fetching tickers.
+
+Scanners are shared per exchange (``get_market_scanner``) and reference
+counted like the market context: the scan loop runs while any bot uses it.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from bot.exchange_adapters.request_scheduler import RequestPriority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+class TickerUniverse:
+    """Columnar snapshot of every ticker on one exchange."""
+
+    # column -> ccxt ticker field
+    COLUMNS = {
+        'last': 'last',
+        'high': 'high',
+        'low': 'low',
+        'bid': 'bid',
+        'ask': 'ask',
+        'base_volume': 'baseVolume',
+        'quote_volume': 'quoteVolume',
+        'change_pct': 'percentage',
+    }
+
+    def __init__(self, capacity: int = 1024):
+        self.n = 0
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.version = 0
+        self.updated_at: Optional[float] = None  # time.monotonic() of the last update
+        self._columns = {name: np.full(capacity, np.nan) for name in self.COLUMNS}
+        self._quote_codes = np.full(capacity, -1, dtype=np.int32)
+        self._quotes: Dict[str, int] = {}
+        self._seen_version = np.zeros(capacity, dtype=np.int64)  # Last update that included the row
+        self._top_cache: Dict[Tuple[str, int, float], List[str]] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        """View of one column over all rows (NaN where the exchange sent nothing)."""
+        return self._columns[name][:self.n]
+
+    def _reserve(self, size: int):
+        capacity = len(self._quote_codes)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for name, values in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self.n] = values[:self.n]
+            self._columns[name] = grown
+        for attr, fill in (('_quote_codes', -1), ('_seen_version', 0)):
+            old = getattr(self, attr)
+            grown = np.full(capacity, fill, dtype=old.dtype)
+            grown[:self.n] = old[:self.n]
+            setattr(self, attr, grown)
+
+    def _row(self, symbol: str) -> int:
+        row = self.index.get(symbol)
+        if row is None:
+            row = self.n
+            self._reserve(row + 1)
+            self.index[symbol] = row
+            self.symbols.append(symbol)
+            # 'BTC/USDT' and 'BTC/USDT:USDT' (swap) both quote in USDT
+            quote = symbol.split('/')[1].split(':')[0] if '/' in symbol else ''
+            self._quote_codes[row] = self._quotes.setdefault(quote, len(self._quotes))
+            self.n += 1
+        return row
+
+    def update(self, tickers: Dict[str, Dict[str, Any]]) -> int:
+        """Write a ``fetch_tickers()`` result; one vectorized scatter per column."""
+        if not tickers:
+            return 0
+        rows = np.fromiter((self._row(symbol) for symbol in tickers), dtype=np.int64, count=len(tickers))
+        values = list(tickers.values())
+        for name, field_name in self.COLUMNS.items():
+            self._columns[name][rows] = np.array([t.get(field_name) for t in values], dtype=np.float64)
+        self.version += 1
+        self._seen_version[rows] = self.version
+        self.updated_at = time.monotonic()
+        self._top_cache.clear()
+        return len(rows)
+
+    def mask(self, quote: Optional[str] = None, min_quote_volume: float = 0.0) -> np.ndarray:
+        """Rows in the latest update with a price, optionally one quote currency and minimum volume."""
+        mask = (self._seen_version[:self.n] == self.version) & (self.column('last') > 0)
+        if quote is not None:
+            mask &= self._quote_codes[:self.n] == self._quotes.get(quote, -2)
+        if min_quote_volume > 0:
+            mask &= self.column('quote_volume') >= min_quote_volume
+        return mask
+
+    def select(self, mask: np.ndarray, limit: Optional[int] = None) -> List[str]:
+        """Symbols where ``mask`` is set, highest quote volume first."""
+        rows = np.flatnonzero(mask)
+        if limit is not None and len(rows) > limit:
+            volume = np.nan_to_num(self.column('quote_volume')[rows], nan=-1.0)
+            rows = rows[np.argpartition(-volume, limit - 1)[:limit]]
+        volume = np.nan_to_num(self.column('quote_volume')[rows], nan=-1.0)
+        return [self.symbols[row] for row in rows[np.argsort(-volume, kind='stable')]]
+
+    def top_volume(self, limit: int = 20, quote: str = 'USDT', min_quote_volume: float = 0.0) -> List[str]:
+        """Top symbols by quote volume, computed once per universe version."""
+        key = (quote, limit, min_quote_volume)
+        cached = self._top_cache.get(key)
+        if cached is None:
+            cached = self._top_cache[key] = self.select(self.mask(quote, min_quote_volume), limit)
+        return cached
+
+    def market_data(self, symbols: Iterable[str]) -> Dict[str, Any]:
+        """``MarketData`` for the requested symbols present in the universe."""
+        from datetime import datetime
+        from bot.strategies import MarketData
+
+        now = datetime.now()
+        result = {}
+        for symbol in symbols:
+            row = self.index.get(symbol)
+            if row is None or self._seen_version[row] != self.version:
+                continue
+            last = float(self._columns['last'][row])
+            if not last > 0:
+                continue
+            high = self._columns['high'][row]
+            low = self._columns['low'][row]
+            volume = self._columns['quote_volume'][row]
+            change = self._columns['change_pct'][row]
+            result[symbol] = MarketData(
+                symbol=symbol,
+                current_price=last,
+                high_24h=float(high) if high == high else last,
+                low_24h=float(low) if low == low else last,
+                volume_24h=float(volume) if volume == volume else 0.0,
+                change_24h_percent=float(change) if change == change else 0.0,
+                timestamp=now,
+            )
+        return result
+
+
+class MarketScanner:
+    """Refreshes a TickerUniverse from ``fetch_tickers()`` on a schedule."""
+
+    INTERVAL = 30.0
+
+    def __init__(self, exchange, interval: float = INTERVAL):
+        self.exchange = exchange  # ccxt exchange (or ScheduledExchange)
+        self.interval = interval
+        self.universe = TickerUniverse()
+        self._users = 0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"scans": 0, "failures": 0, "symbols": 0, "last_scan_seconds": None}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def is_fresh(self) -> bool:
+        """A scan completed within the last two intervals."""
+        updated_at = self.universe.updated_at
+        return updated_at is not None and time.monotonic() - updated_at < self.interval * 2
+
+    async def start(self):
+        """Start the scan loop (first scan runs immediately). Reference counted."""
+        self._users += 1
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._scan_loop())
+        logger.info(f"🔭 Market scanner started ({getattr(self.exchange, 'id', '?')}, every {self.interval:.0f}s)")
+
+    async def stop(self):
+        self._users = max(0, self._users - 1)
+        if self._users or self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("🔭 Market scanner stopped")
+
+    async def scan(self) -> int:
+        """One ``fetch_tickers()`` for the whole exchange into the universe."""
+        started = time.monotonic()
+        with request_priority(RequestPriority.MARKET_DATA):
+            tickers = await self.exchange.fetch_tickers()
+        count = self.universe.update(tickers)
+        self.stats["scans"] += 1
+        self.stats["symbols"] = self.universe.n
+        self.stats["last_scan_seconds"] = time.monotonic() - started
+        return count
+
+    async def _scan_loop(self):
+        while True:
+            try:
+                await self.scan()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Readers fall back to per-symbol fetches once the universe goes stale
+                self.stats["failures"] += 1
+                logger.warning(f"🔭 Market scan failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def get_status(self) -> Dict[str, Any]:
+        updated_at = self.universe.updated_at
+        return {
+            "running": self.running,
+            "users": self._users,
+            "fresh": self.is_fresh(),
+            "age_seconds": time.monotonic() - updated_at if updated_at is not None else None,
+            "interval_seconds": self.interval,
+            **self.stats,
+        }
+
+
+def screen_candidates(strategy, universe: TickerUniverse, quote: Optional[str] = None,
+                      min_quote_volume: float = 0.0, limit: int = 20) -> List[str]:
+    """
+    Run ``strategy.screen`` over the universe, once per universe version.
+
+    The result is kept on the strategy (``scan_symbols``); changes against
+    the previous scan are logged.
+    """
+    if getattr(strategy, '_scan_version', None) == universe.version:
+        return strategy.scan_symbols
+    mask = strategy.screen(universe)
+    symbols = [] if mask is None else universe.select(mask & universe.mask(quote, min_quote_volume), limit)
+    previous = set(strategy.scan_symbols)
+    added = [s for s in symbols if s not in previous]
+    removed = previous.difference(symbols)
+    if added or removed:
+        logger.info(
+            f"🔭 {strategy.name} candidates: {len(symbols)} "
+            f"(+{', '.join(added) or '-'} / -{', '.join(sorted(removed)) or '-'})"
+        )
+    strategy.scan_symbols = symbols
+    strategy._scan_version = universe.version
+    return symbols
+
+
+# Shared scanners, one per exchange
+_market_scanners: Dict[str, MarketScanner] = {}
+
+
+def get_market_scanner(exchange_name: str, exchange=None, interval: float = MarketScanner.INTERVAL) -> Optional[MarketScanner]:
+    """Get or create the process-wide MarketScanner for ``exchange_name``."""
+    scanner = _market_scanners.get(exchange_name)
+    if scanner is None and exchange is not None:
+        scanner = _market_scanners[exchange_name] = MarketScanner(exchange, interval=interval)
+    return scanner
@@ -41,6 +41,8 @@ except ImportError:
     RateLimitConfig = None
 
 from bot.logging_setup import get_logger
+from bot.exchange_adapters.request_scheduler import RequestPriority, with_request_priority
+from bot.services.emergency_exit import EmergencyExitReport, ExitAborted, ExitRequest, get_emergency_exit_executor
 logger = get_logger(__name__)
 
 
@@ -150,6 +152,7 @@ class MonitoredPosition:
     # Values: "bot", "manual", "unknown", "external"
     # Bot will NOT auto-close positions with source="manual"
     source: str = "bot"
+    strategy: Optional[str] = None  # Strategy that opened it (trade analytics)
     
     # K1 FIX: Leverage tracking for proper SL/TP calculation
     leverage: float = 1.0  # 1.0 = no leverage (spot)
@@ -291,7 +294,10 @@ class PositionMonitorService:
         partial_tp_levels: List[Dict] = None,  # NEW
         user_settings: Dict = None,  # NEW: User-specific settings
         liquidation_config: LiquidationConfig = None,  # v4.0: Liquidation config
-        default_user_id: str = None  # v4.3: Default user_id for sync from exchange
+        default_user_id: str = None,  # v4.3: Default user_id for sync from exchange
+        user_stream=None,  # Optional UserDataStream: fills/balances applied as they happen
+        protective_orders=None,  # Optional ProtectiveOrderManager: SL/TP resting on the exchange
+        emergency_exit=None  # EmergencyExitExecutor (default: the process-wide one)
     ):
         self.exchange = exchange_adapter
         self.default_user_id = default_user_id  # v4.3: Store for sync operations
@@ -337,6 +343,28 @@ class PositionMonitorService:
         self._liquidation_check_counter = 0
         self._liquidation_check_interval = 2  # Every 2 * 5s = 10s
         
+        # Private user-data stream. While it is healthy the REST validation /
+        # reconciliation passes only run as a slow safety net.
+        self.user_stream = user_stream
+        self._user_stream_safety_factor = 10  # REST passes run 10x less often
+        self._stream_resync_task: Optional[asyncio.Task] = None
+        self._stream_resync_pending: set = set()
+        self._stream_resync_delay = 3.0  # Debounce event-triggered REST resyncs
+        self._rest_sync_runs = {"validation": 0, "reconciliation": 0, "stream_resync": 0}
+        
+        # Exchange-native protective orders follow the in-memory SL/TP; the
+        # monitor's own SL/TP checks remain the backstop
+        self.protective_orders = protective_orders
+        
+        # Mass closes (liquidation risk, kill switch) run concurrently through
+        # the emergency exit executor
+        self.emergency_exit = emergency_exit or get_emergency_exit_executor()
+        
+        # Trailing SL moves are written to the DB in batches, not per step
+        self._pending_sl_writes: Dict[str, Dict[str, Any]] = {}
+        self._sl_flush_interval = 30.0
+        self._last_sl_flush = datetime.now()
+        
         # v4.0: Liquidation events log (in-memory, also persisted to DB)
         self._liquidation_events: List[LiquidationEvent] = []
         
@@ -363,6 +391,10 @@ class PositionMonitorService:
         # T4 FIX: Lock for Supabase sync to prevent race conditions
         self._sync_lock = asyncio.Lock()
         
+        # Warm restart: positions restored from the local state snapshot
+        self._snapshot_restored_keys: set = set()
+        self._snapshot_restored_at: Optional[datetime] = None
+        
         # FIX 2025-12-16: Rate limiter for close operations to prevent API hammering
         self._close_rate_limiter: Optional['RateLimiter'] = None
         self._close_attempts_this_minute: Dict[str, int] = {}  # {symbol: count}
@@ -511,6 +543,9 @@ class PositionMonitorService:
                     
                     # Add to RAM
                     key = f"{position.user_id}:{position.symbol}" if position.user_id else position.symbol
+                    if key in self._snapshot_restored_keys and not self._row_newer_than_snapshot(row):
+                        # Local warm-restart snapshot carries fresher trigger state
+                        continue
                     self.positions[key] = position
                     restored_count += 1
                     
@@ -749,6 +784,77 @@ class PositionMonitorService:
     # END v4.1: HYBRID PERSISTENCE
     # ========================================================================
 
+    # ========================================================================
+    # WARM-RESTART SNAPSHOT (local, see bot.core.state_snapshot)
+    # ========================================================================
+    
+    _SNAPSHOT_DATETIME_FIELDS = ("created_at", "opened_at", "last_sl_update", "last_liquidation_check")
+    
+    def export_snapshot(self) -> Dict[str, Any]:
+        """Monitored positions with their trigger state, plus the last known prices."""
+        positions = {}
+        for key, position in self.positions.items():
+            data = asdict(position)
+            for name in self._SNAPSHOT_DATETIME_FIELDS:
+                if data.get(name) is not None:
+                    data[name] = data[name].isoformat()
+            positions[key] = data
+        snapshot = {"positions": positions, "prices": dict(self._price_cache)}
+        if self.protective_orders is not None:
+            snapshot["protective_orders"] = self.protective_orders.export_state()
+        return snapshot
+    
+    def restore_snapshot(self, state: Dict[str, Any], taken_at: Optional[datetime] = None) -> int:
+        """
+        Load positions from ``export_snapshot`` before start(), so SL/TP
+        checks run immediately; exchange/DB reconciliation follows later.
+    
+        Returns:
+            Number of positions restored
+        """
+        known_fields = set(MonitoredPosition.__dataclass_fields__)
+        restored = 0
+        for key, data in (state.get("positions") or {}).items():
+            if key in self.positions:
+                continue
+            try:
+                data = {name: value for name, value in data.items() if name in known_fields}
+                for name in self._SNAPSHOT_DATETIME_FIELDS:
+                    if data.get(name):
+                        data[name] = datetime.fromisoformat(data[name])
+                self.positions[key] = MonitoredPosition(**data)
+                self._snapshot_restored_keys.add(key)
+                restored += 1
+            except Exception as e:
+                logger.warning(f"🧊 Skipping snapshot position {key}: {e}")
+        for symbol, price in (state.get("prices") or {}).items():
+            self._price_cache.setdefault(symbol, price)
+        if self.protective_orders is not None and state.get("protective_orders"):
+            # Adopt orders still resting on the exchange instead of placing duplicates
+            self.protective_orders.restore_state({
+                key: entry for key, entry in state["protective_orders"].items() if key in self.positions
+            })
+        self._snapshot_restored_at = taken_at or datetime.now()
+        if restored:
+            logger.info(f"🧊 Restored {restored} monitored positions from local snapshot")
+        return restored
+    
+    def _row_newer_than_snapshot(self, row: Dict) -> bool:
+        """Whether a Supabase row was synced after the local snapshot was taken."""
+        if not row.get("last_sync") or self._snapshot_restored_at is None:
+            return False
+        try:
+            synced_at = datetime.fromisoformat(row["last_sync"].replace("Z", "+00:00"))
+        except (TypeError, ValueError):
+            return False
+        if synced_at.tzinfo is not None:
+            synced_at = synced_at.astimezone().replace(tzinfo=None)
+        return synced_at > self._snapshot_restored_at
+    
+    # ========================================================================
+    # END WARM-RESTART SNAPSHOT
+    # ========================================================================
+
     async def _save_reevaluation(
         self,
         pos: 'MonitoredPosition',
@@ -976,7 +1082,8 @@ class PositionMonitorService:
         enable_news_protection: bool = False,
         news_close_minutes_before: int = 30,
         # v4.1: Source tracking - "bot", "manual", "unknown", "external"
-        source: str = "bot"
+        source: str = "bot",
+        strategy: Optional[str] = None
     ):
         """Add a position to monitor with optional trailing stop and dynamic SL.
         
@@ -1073,6 +1180,7 @@ class PositionMonitorService:
             take_profit=take_profit,
             user_id=user_id,
             source=source,  # v4.1: Source tracking
+            strategy=strategy,
             trailing_enabled=trailing_enabled,
             trailing_distance_percent=trailing_distance_percent,
             dynamic_sl_enabled=dynamic_sl_enabled,
@@ -1580,6 +1688,10 @@ class PositionMonitorService:
         
         self.running = True
         self._task = asyncio.create_task(self._monitor_loop())
+        self.emergency_exit.register_monitor(self)
+        
+        if self.user_stream is not None:
+            await self.start_user_stream(self.user_stream)
         
         # v4.1: Start persistence background task
         if self._supabase_client:
@@ -1591,6 +1703,12 @@ class PositionMonitorService:
     async def stop(self):
         """Stop the monitoring loop."""
         self.running = False
+        self.emergency_exit.unregister_monitor(self)
+        
+        if self.user_stream is not None:
+            await self.user_stream.stop()
+        if self._stream_resync_task:
+            self._stream_resync_task.cancel()
         
         # v4.1: Stop persistence task first (with final sync)
         if self._persistence_task:
@@ -1608,8 +1726,156 @@ class PositionMonitorService:
             except asyncio.CancelledError:
                 pass
         
+        await self._flush_sl_writes()
+        
         logger.info("Position monitor stopped")
     
+    # ========================================================================
+    # PRIVATE USER-DATA STREAM
+    # ========================================================================
+    
+    async def start_user_stream(self, stream) -> bool:
+        """
+        Connect a UserDataStream and apply its fills/balances to monitored positions.
+        
+        Returns:
+            True if the stream is connected and running.
+        """
+        self.user_stream = stream
+        if not stream.connected and not await stream.connect():
+            logger.warning("User data stream unavailable - keeping REST reconciliation schedule")
+            return False
+        stream.on_fill(self._on_stream_fill)
+        if stream.market_type == 'spot':
+            stream.on_balance(self._on_stream_balance)
+        stream.start()
+        logger.info(
+            f"📡 User data stream active - REST validation/reconciliation every "
+            f"{self._user_stream_safety_factor}x normal interval while healthy"
+        )
+        return True
+    
+    def _user_stream_healthy(self) -> bool:
+        return self.user_stream is not None and self.user_stream.is_healthy()
+    
+    def _positions_for_symbol(self, symbol: str) -> List[tuple]:
+        """Monitored (key, position) pairs for a unified symbol (settle suffix ignored)."""
+        base = symbol.split(':')[0]
+        return [
+            (key, pos) for key, pos in self.positions.items()
+            if pos.symbol == symbol or pos.symbol.split(':')[0] == base
+        ]
+    
+    async def _release_protective_orders(self, key: str) -> bool:
+        """
+        Cancel the resting SL/TP of ``key`` before the monitor's own close.
+        
+        Returns False if one of them filled (or its status is unknown): the
+        close is skipped and the position re-synced from the exchange instead
+        of sending an order that would sell other holdings (spot) or open
+        the opposite side (margin/futures).
+        """
+        if self.protective_orders is None or await self.protective_orders.release(key):
+            return True
+        logger.warning(f"🛡️ {key}: exchange-side exit may have filled - skipping close, re-syncing position")
+        self._schedule_stream_resync("reconcile")
+        self._schedule_stream_resync("sync")
+        return False
+    
+    def _drop_closed_position(self, key: str, reason: str):
+        if key in self.positions:
+            del self.positions[key]
+            self._mark_dirty()
+            asyncio.create_task(self._remove_from_supabase(key))
+            logger.info(f"📡 {key} closed on exchange ({reason}) - removed from monitoring")
+        # DB still shows OPEN; let the ghost reconciliation close it now
+        self._schedule_stream_resync("reconcile")
+    
+    async def _on_stream_fill(self, fill):
+        """Apply a streamed execution to the in-memory position state."""
+        # Entry prices come from the trade ledger; have it pick this fill up
+        trade_ledger = getattr(self.exchange, 'trade_ledger', None)
+        if trade_ledger is not None and ':' not in fill.symbol:
+            trade_ledger.mark_stale(fill.symbol.split('/')[0])
+        
+        # The bot's own market orders are applied by the code that sent them
+        is_own_fill = getattr(self.exchange, 'is_own_fill', None)
+        if is_own_fill and is_own_fill(fill.symbol, fill.side, fill.order_id):
+            return
+        
+        matches = self._positions_for_symbol(fill.symbol)
+        if not matches:
+            # Possibly a position opened outside the bot
+            if not (fill.reduce_only or (self.user_stream.market_type == 'spot' and fill.side == 'sell')):
+                self._schedule_stream_resync("sync")
+            return
+        
+        DUST_THRESHOLD = 0.0001
+        remaining = fill.amount
+        for key, pos in matches:
+            applied = remaining
+            closing = (pos.side == 'long') == (fill.side == 'sell')
+            if closing:
+                # A closing fill larger than this position carries over to the next match
+                applied = min(pos.quantity, remaining)
+                pos.quantity -= applied
+                remaining -= applied
+                if pos.quantity < max(DUST_THRESHOLD, (pos.original_quantity or 0) * 0.001):
+                    self._drop_closed_position(key, f"{fill.side} {applied} @ {fill.price}")
+                    if remaining > DUST_THRESHOLD:
+                        continue
+                    break
+            elif fill.price > 0:
+                new_qty = pos.quantity + applied
+                pos.entry_price = (pos.entry_price * pos.quantity + fill.price * applied) / new_qty
+                pos.quantity = new_qty
+            self._mark_dirty()
+            latency = f" ({fill.latency_ms:.0f}ms)" if fill.latency_ms is not None else ""
+            logger.info(f"📡 Fill applied to {key}: {fill.side} {applied} @ {fill.price} → qty {pos.quantity:.6f}{latency}")
+            # Whatever is left of the fill is absorbed by this position
+            break
+    
+    def _on_stream_balance(self, balance: Dict):
+        """
+        Spot: drop positions whose base asset balance went to zero (sold or
+        withdrawn outside the bot). Partial changes are left to fills, since
+        the bot's own partial closes update quantities themselves.
+        """
+        totals = balance.get('total') or {}
+        for key, pos in list(self.positions.items()):
+            if pos.leverage > 1.0:
+                continue
+            base = pos.symbol.split('/')[0]
+            if base in totals and float(totals.get(base) or 0) < 0.00001:
+                self._drop_closed_position(key, f"{base} balance is 0")
+    
+    def _schedule_stream_resync(self, kind: str):
+        """Debounced, event-triggered REST resync ('sync' new positions / 'reconcile' closed ones)."""
+        self._stream_resync_pending.add(kind)
+        if self._stream_resync_task is None or self._stream_resync_task.done():
+            self._stream_resync_task = asyncio.create_task(self._run_stream_resync())
+    
+    async def _run_stream_resync(self):
+        await asyncio.sleep(self._stream_resync_delay)
+        pending, self._stream_resync_pending = self._stream_resync_pending, set()
+        self._rest_sync_runs["stream_resync"] += 1
+        try:
+            if "reconcile" in pending:
+                await self.reconcile_ghost_positions(self._db_manager)
+            if "sync" in pending:
+                await self.sync_from_exchange(self._db_manager, retry_count=0)
+        except Exception as e:
+            logger.warning(f"Stream-triggered resync failed: {e}")
+    
+    def get_user_stream_status(self) -> Dict[str, Any]:
+        """User-data stream health plus how often REST reconciliation ran."""
+        return {
+            "enabled": self.user_stream is not None,
+            "healthy": self._user_stream_healthy(),
+            "stream": self.user_stream.get_status() if self.user_stream is not None else None,
+            "rest_sync_runs": dict(self._rest_sync_runs),
+        }
+    
     async def _monitor_loop(self):
         """Main monitoring loop with periodic validation."""
         logger.info("Position monitoring loop started")
@@ -1626,6 +1892,12 @@ class PositionMonitorService:
             try:
                 await self._check_all_positions()
                 
+                if (datetime.now() - self._last_sl_flush).total_seconds() >= self._sl_flush_interval:
+                    await self._flush_sl_writes()
+                
+                # Streamed fills keep state current - REST passes become a safety net
+                slowdown = self._user_stream_safety_factor if self._user_stream_healthy() else 1
+                
                 # v4.0: LIQUIDATION MONITOR CHECK (every 10s = 2 iterations at 5s)
                 if self.enable_liquidation_monitor and self.liquidation_config.enabled:
                     self._liquidation_check_counter += 1
@@ -1638,8 +1910,9 @@ class PositionMonitorService:
                 
                 # Periodic validation to detect position discrepancies
                 validation_counter += 1
-                if validation_counter >= validation_interval:
+                if validation_counter >= validation_interval * slowdown:
                     validation_counter = 0
+                    self._rest_sync_runs["validation"] += 1
                     try:
                         await self.validate_margin_positions()
                     except Exception as ve:
@@ -1647,8 +1920,9 @@ class PositionMonitorService:
                 
                 # NEW v2.5: Periodic ghost position reconciliation
                 reconciliation_counter += 1
-                if reconciliation_counter >= reconciliation_interval:
+                if reconciliation_counter >= reconciliation_interval * slowdown:
                     reconciliation_counter = 0
+                    self._rest_sync_runs["reconciliation"] += 1
                     try:
                         await self.reconcile_ghost_positions()
                     except Exception as re:
@@ -1688,6 +1962,10 @@ class PositionMonitorService:
         if should_check_dynamic:
             self._dynamic_check_counter = 0
         
+        # Drop exchange protection of positions no longer monitored
+        if self.protective_orders is not None:
+            await self.protective_orders.prune(self.positions.keys())
+        
         # Check each position
         positions_to_remove = []
         
@@ -1787,6 +2065,10 @@ class PositionMonitorService:
                     await self._handle_tp_trigger(key, pos, current_price)
                     positions_to_remove.append(key)
                     continue
+            
+            # ========== EXCHANGE-NATIVE PROTECTION ==========
+            if self.protective_orders is not None:
+                await self.protective_orders.sync(key, pos)
         
         # Remove triggered positions
         for key in positions_to_remove:
@@ -2382,6 +2664,9 @@ class PositionMonitorService:
         """Execute partial position close."""
         try:
             if self.exchange:
+                # Resting SL/TP is re-placed for the remaining size on the next check
+                if not await self._release_protective_orders(key):
+                    return False
                 close_side = 'sell' if pos.side == 'long' else 'buy'
                 await self.exchange.place_order(
                     symbol=pos.symbol,
@@ -2432,7 +2717,9 @@ class PositionMonitorService:
                     pos.last_sl_update = datetime.now()
                     
                     # L12 FIX: Cancel exchange SL when trailing activates
-                    if pos.disable_exchange_sl_when_trailing and not pos.exchange_sl_cancelled:
+                    # (exchange-native protection amends it instead)
+                    if (self.protective_orders is None and pos.disable_exchange_sl_when_trailing
+                            and not pos.exchange_sl_cancelled):
                         await self._cancel_exchange_sl_order(key, pos)
                         pos.exchange_sl_cancelled = True
                     
@@ -2447,22 +2734,8 @@ class PositionMonitorService:
                         f"Current: {current_price:.4f}"
                     )
                     
-                    # Update in database
-                    await self._update_position_sl_in_db(pos, new_sl)
-                    
-                    # Save reevaluation to DB
-                    await self._save_reevaluation(
-                        pos=pos,
-                        reevaluation_type='trailing_update',
-                        old_sl=old_sl,
-                        new_sl=new_sl,
-                        old_tp=pos.take_profit,
-                        new_tp=pos.take_profit,
-                        current_price=current_price,
-                        profit_pct=profit_pct,
-                        reason=f"Trailing stop raised from {old_sl:.4f} to {new_sl:.4f}",
-                        action_taken='adjusted'
-                    )
+                    # Update in database (batched with the reevaluation record)
+                    self._queue_sl_write(key, pos, old_sl, current_price, profit_pct)
                     
                     # Send alert (only for significant updates > 1%)
                     if profit_pct > 1.0:
@@ -2518,11 +2791,11 @@ class PositionMonitorService:
                     
                     logger.info(
                         f"📈 Simple Trailing (LONG) {key}: "
-                        f"SL {old_sl:.4f if old_sl else 'None'} → {new_trailing_sl:.4f} | "
+                        f"SL {f'{old_sl:.4f}' if old_sl else 'None'} → {new_trailing_sl:.4f} | "
                         f"High: {pos.highest_price:.4f} | Profit: {profit_pct:.2f}%"
                     )
                     
-                    await self._update_position_sl_in_db(pos, new_trailing_sl)
+                    self._queue_sl_write(key, pos, old_sl, current_price, profit_pct)
         
         else:  # short
             # Track lowest price
@@ -2544,11 +2817,11 @@ class PositionMonitorService:
                     
                     logger.info(
                         f"📈 Simple Trailing (SHORT) {key}: "
-                        f"SL {old_sl:.4f if old_sl else 'None'} → {new_trailing_sl:.4f} | "
+                        f"SL {f'{old_sl:.4f}' if old_sl else 'None'} → {new_trailing_sl:.4f} | "
                         f"Low: {pos.lowest_price:.4f} | Profit: {profit_pct:.2f}%"
                     )
                     
-                    await self._update_position_sl_in_db(pos, new_trailing_sl)
+                    self._queue_sl_write(key, pos, old_sl, current_price, profit_pct)
     
     async def _apply_dynamic_sl_tp(
         self,
@@ -2631,6 +2904,68 @@ class PositionMonitorService:
         except Exception as e:
             logger.error(f"L12: Failed to cancel exchange SL for {key}: {e}")
     
+    def _queue_sl_write(
+        self,
+        key: str,
+        pos: MonitoredPosition,
+        old_sl: Optional[float],
+        current_price: float,
+        profit_pct: float
+    ):
+        """Record a trailing SL move; consecutive moves collapse into one DB write."""
+        pending = self._pending_sl_writes.get(key)
+        if pending is None:
+            self._pending_sl_writes[key] = {
+                'pos': pos, 'old_sl': old_sl, 'steps': 1,
+                'current_price': current_price, 'profit_pct': profit_pct,
+            }
+        else:
+            pending.update(pos=pos, current_price=current_price, profit_pct=profit_pct)
+            pending['steps'] += 1
+    
+    async def _flush_sl_writes(self):
+        """Write queued trailing SL moves: one session for the SL columns, one reevaluation per position."""
+        self._last_sl_flush = datetime.now()
+        if not self._pending_sl_writes:
+            return
+        pending, self._pending_sl_writes = self._pending_sl_writes, {}
+        
+        try:
+            from bot.db import DatabaseManager, Position as DBPosition
+            
+            with DatabaseManager.session_scope() as session:
+                for entry in pending.values():
+                    pos = entry['pos']
+                    query = session.query(DBPosition).filter(
+                        DBPosition.symbol == pos.symbol,
+                        DBPosition.status == "OPEN"
+                    )
+                    if pos.user_id:
+                        query = query.filter(DBPosition.user_id == pos.user_id)
+                    db_pos = query.first()
+                    if db_pos:
+                        db_pos.stop_loss = pos.stop_loss
+                session.commit()
+            logger.debug(f"Updated trailing SL in DB for {len(pending)} positions")
+        except Exception as e:
+            logger.warning(f"Failed to update trailing SL in DB: {e}")
+        
+        for entry in pending.values():
+            pos, old_sl = entry['pos'], entry['old_sl']
+            old_label = f"{old_sl:.4f}" if old_sl else "None"
+            await self._save_reevaluation(
+                pos=pos,
+                reevaluation_type='trailing_update',
+                old_sl=old_sl,
+                new_sl=pos.stop_loss,
+                old_tp=pos.take_profit,
+                new_tp=pos.take_profit,
+                current_price=entry['current_price'],
+                profit_pct=entry['profit_pct'],
+                reason=f"Trailing stop moved from {old_label} to {pos.stop_loss:.4f} ({entry['steps']} steps)",
+                action_taken='adjusted'
+            )
+    
     async def _update_position_sl_in_db(
         self,
         pos: MonitoredPosition,
@@ -2792,6 +3127,28 @@ class PositionMonitorService:
         except Exception as e:
             logger.error(f"Error handling TP trigger for {key}: {e}")
     
+    @with_request_priority(RequestPriority.EMERGENCY)
+    async def _held_quantity(self, position: MonitoredPosition) -> Optional[float]:
+        """
+        Quantity of ``position`` actually held on the exchange: the open
+        position (futures/margin) or, failing that, the base-asset balance
+        (spot). 0.0 if neither exists, None if the adapter cannot tell.
+        """
+        if not hasattr(self.exchange, 'get_positions'):
+            return None
+        for ex_pos in await self.exchange.get_positions():
+            if ex_pos.symbol == position.symbol and ex_pos.quantity > 0:
+                return ex_pos.quantity
+        
+        # Also check spot balances for spot trading
+        try:
+            balance = await self.exchange.get_specific_balance(position.symbol.split('/')[0])
+            if balance > 0.00001:
+                return balance
+        except Exception as be:
+            logger.debug(f"Could not check spot balance: {be}")
+        return 0.0
+    
     async def _close_position(self, position: MonitoredPosition, max_retries: int = 3):
         """Close a position on the exchange.
         
@@ -2842,42 +3199,18 @@ class PositionMonitorService:
                     logger.info(f"✅ Dust position {position.symbol} removed from monitoring")
                 return  # Exit without trying to place order
             
+            # Resting exchange SL/TP would hold the balance (spot) or close twice
+            protective_key = next((k for k, p in self.positions.items() if p is position), None)
+            if protective_key is not None and not await self._release_protective_orders(protective_key):
+                return
+            
             # NEW v3.0: Acquire lock before closing position
             async def _do_close() -> bool:
                 """Inner function to close position (for locking)."""
                 # NEW v2.5: Verify position exists on exchange before closing
-                if hasattr(self.exchange, 'get_positions'):
-                    exchange_positions = await self.exchange.get_positions()
-                    position_exists = False
-                    
-                    for ex_pos in exchange_positions:
-                        if ex_pos.symbol == position.symbol and ex_pos.quantity > 0:
-                            position_exists = True
-                            # Update quantity to actual exchange quantity (may differ from DB)
-                            if abs(ex_pos.quantity - position.quantity) > 0.0001:
-                                logger.info(
-                                    f"📊 Adjusting close quantity: {position.quantity:.6f} → {ex_pos.quantity:.6f}"
-                                )
-                                position.quantity = ex_pos.quantity
-                            break
-                    
-                    # Also check spot balances for spot trading
-                    if not position_exists:
-                        try:
-                            base_asset = position.symbol.split('/')[0]
-                            balance = await self.exchange.get_specific_balance(base_asset)
-                            
-                            if balance > 0.00001:
-                                position_exists = True
-                                if abs(balance - position.quantity) > 0.0001:
-                                    logger.info(
-                                        f"📊 Adjusting close quantity from balance: {position.quantity:.6f} → {balance:.6f}"
-                                    )
-                                    position.quantity = balance
-                        except Exception as be:
-                            logger.debug(f"Could not check spot balance: {be}")
-                    
-                    if not position_exists:
+                held = await self._held_quantity(position)
+                if held is not None:
+                    if not held:
                         logger.warning(
                             f"⚠️ GHOST POSITION: {position.symbol} exists in DB but NOT on exchange. "
                             f"Skipping close order. Position will be cleaned up by reconciliation."
@@ -2888,6 +3221,11 @@ class PositionMonitorService:
                             del self.positions[key]
                             logger.info(f"🧹 Ghost position {position.symbol} removed from monitoring")
                         return True  # Return True to avoid retry on ghost positions
+                    
+                    # Update quantity to actual exchange quantity (may differ from DB)
+                    if abs(held - position.quantity) > 0.0001:
+                        logger.info(f"📊 Adjusting close quantity: {position.quantity:.6f} → {held:.6f}")
+                        position.quantity = held
                 
                 # P0 FIX: Check minimum order size before placing close order
                 if hasattr(self.exchange, 'get_symbol_info'):
@@ -3505,7 +3843,8 @@ class PositionMonitorService:
                     f"Liq Price: {pos.liquidation_price:.4f} | "
                     f"Current: {current_price:.4f}"
                 )
-                await self._send_liquidation_alert(pos, current_price, distance_pct, risk_level)
+                # Alerts go out in the background - they must not delay closes
+                asyncio.create_task(self._send_liquidation_alert(pos, current_price, distance_pct, risk_level))
                 
             elif risk_level == LiquidationRiskLevel.WARNING:
                 if pos.liquidation_warnings_sent < 3:  # Limit warnings
@@ -3515,11 +3854,11 @@ class PositionMonitorService:
                         f"Leverage: {pos.leverage}x"
                     )
                     pos.liquidation_warnings_sent += 1
-                    await self._send_liquidation_alert(pos, current_price, distance_pct, risk_level)
+                    asyncio.create_task(self._send_liquidation_alert(pos, current_price, distance_pct, risk_level))
         
-        # Execute auto-close for critical positions
-        for key, pos, current_price, distance_pct in positions_to_close:
-            await self._execute_liquidation_auto_close(key, pos, current_price, distance_pct)
+        # Execute auto-close for critical positions (concurrently, highest risk first)
+        if positions_to_close:
+            await self._execute_liquidation_auto_close(positions_to_close)
     
     async def _send_liquidation_alert(
         self,
@@ -3582,162 +3921,200 @@ class PositionMonitorService:
         except Exception as e:
             logger.error(f"Failed to send liquidation alert: {e}")
     
-    async def _execute_liquidation_auto_close(
-        self,
-        key: str,
-        pos: MonitoredPosition,
-        current_price: float,
-        distance_pct: float
-    ):
+    async def _execute_liquidation_auto_close(self, critical: List[tuple]):
         """
-        Execute auto-close for position at critical liquidation risk.
+        Execute auto-close for positions at critical liquidation risk.
         
         Strategy:
-        1. Try full close first
-        2. If fails, try partial close (50%) as emergency measure
-        3. Log all attempts and send critical alerts
+        1. Close all of them at once through the emergency exit executor
+           (reduce-only market orders, highest risk first, jittered retries)
+        2. For closes that failed, try partial close (50%) as emergency measure
+        3. Log all attempts and send critical alerts (after the orders are out)
         
-        v4.2: Manual positions receive CRITICAL ALERTS but NO auto-close.
-        User maintains full control over manual position closures.
-        """
-        pos.auto_close_attempted = True
+        v4.3: Manual positions are included - liquidation protection is the
+        only auto-close feature enabled for them.
         
-        # v4.3: Manual positions NOW HAVE Liquidation Protection with AUTO-CLOSE
-        # This is the ONLY protection feature enabled for manual positions
-        # (SL/TP/Trailing/TimeExit remain disabled for user control)
-        if pos.is_manual_position:
+        Args:
+            critical: (key, pos, current_price, distance_pct) tuples
+        """
+        for key, pos, current_price, distance_pct in critical:
+            pos.auto_close_attempted = True
             logger.critical(
-                f"🚨🚨🚨 MANUAL POSITION LIQUIDATION PROTECTION TRIGGERED: {key} | "
-                f"Distance: {distance_pct:.2f}% | Leverage: {pos.leverage}x | "
-                f"⚠️ EMERGENCY AUTO-CLOSE INITIATING to prevent liquidation!"
+                f"🚨 INITIATING AUTO-CLOSE for {key} | "
+                f"Distance to liquidation: {distance_pct:.2f}%"
             )
-            # Send critical alert
-            await self._send_liquidation_alert(pos, current_price, distance_pct, LiquidationRiskLevel.CRITICAL)
-            # Log event - but continue to auto-close (don't return!)
-            await self._log_liquidation_event(
+            # Alerts and event logs go out in the background - they must not delay closes
+            if pos.is_manual_position:
+                logger.critical(
+                    f"🚨🚨🚨 MANUAL POSITION LIQUIDATION PROTECTION TRIGGERED: {key} | "
+                    f"Distance: {distance_pct:.2f}% | Leverage: {pos.leverage}x | "
+                    f"⚠️ EMERGENCY AUTO-CLOSE INITIATING to prevent liquidation!"
+                )
+                asyncio.create_task(self._send_liquidation_alert(
+                    pos, current_price, distance_pct, LiquidationRiskLevel.CRITICAL
+                ))
+                asyncio.create_task(self._log_liquidation_event(
+                    pos, current_price, distance_pct,
+                    LiquidationRiskLevel.CRITICAL,
+                    event_type="manual_position_liquidation_protection",
+                    action_taken="Auto-close initiated for manual position (liquidation protection)"
+                ))
+            asyncio.create_task(self._log_liquidation_event(
                 pos, current_price, distance_pct,
                 LiquidationRiskLevel.CRITICAL,
-                event_type="manual_position_liquidation_protection",
-                action_taken="Auto-close initiated for manual position (liquidation protection)"
-            )
-            # NOTE: Don't return here - continue to auto-close logic below
-        
-        max_retries = self.liquidation_config.auto_close_max_retries
-        
-        logger.critical(
-            f"🚨 INITIATING AUTO-CLOSE for {key} | "
-            f"Distance to liquidation: {distance_pct:.2f}% | "
-            f"Max retries: {max_retries}"
-        )
-        
-        # Log event
-        await self._log_liquidation_event(
-            pos, current_price, distance_pct,
-            LiquidationRiskLevel.CRITICAL,
-            event_type="auto_close_attempt",
-            action_taken="Initiating auto-close"
+                event_type="auto_close_attempt",
+                action_taken="Initiating auto-close"
+            ))
+        
+        details = {key: (pos, current_price, distance_pct) for key, pos, current_price, distance_pct in critical}
+        requests = [
+            self._exit_request(key, pos, current_price, distance_pct)
+            for key, pos, current_price, distance_pct in critical
+        ]
+        report = await self.emergency_exit.execute(
+            requests, "liquidation_risk", max_attempts=self.liquidation_config.auto_close_max_retries
         )
         
-        success = False
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"🚨 Auto-close attempt {attempt + 1}/{max_retries} for {pos.symbol}")
-                
-                # Try full close
-                await self._close_position(pos, max_retries=1)
-                
-                success = True
+        failed = []
+        for result in report.results:
+            pos, current_price, distance_pct = details[result.key]
+            if result.success:
                 logger.info(
-                    f"✅ AUTO-CLOSE SUCCESSFUL: {key} | "
-                    f"Avoided liquidation at {distance_pct:.2f}% distance"
+                    f"✅ AUTO-CLOSE SUCCESSFUL: {result.key} | "
+                    f"Avoided liquidation at {distance_pct:.2f}% distance "
+                    f"({result.latency_seconds:.2f}s, {result.attempts} attempts)"
                 )
-                
-                # Send success alert
+                self._drop_exited_position(result.key)
                 await self._send_auto_close_alert(pos, current_price, distance_pct, success=True)
-                
-                # Log success
                 await self._log_liquidation_event(
                     pos, current_price, distance_pct,
                     LiquidationRiskLevel.CRITICAL,
                     event_type="auto_close_success",
                     action_taken="Position fully closed"
                 )
-                
-                # Call callback
                 if self.on_auto_close_triggered:
                     await self.on_auto_close_triggered(pos, current_price, "liquidation_risk")
-                
-                # Remove from monitoring
-                if key in self.positions:
-                    del self.positions[key]
-                
-                break
-                
-            except Exception as e:
-                last_error = str(e)
-                delay = (2 ** attempt) * 0.5
-                logger.error(
-                    f"🚨 Auto-close attempt {attempt + 1} failed for {pos.symbol}: {e}. "
-                    f"Retrying in {delay:.1f}s..."
+            elif not result.aborted:
+                failed.append(result)
+        
+        if not failed:
+            return
+        
+        # Full close failed - try emergency partial close of the same set
+        partial_closed = set()
+        if self.liquidation_config.enable_partial_emergency_close:
+            logger.critical(
+                f"🚨🚨 FULL CLOSE FAILED - Attempting emergency partial close (50%) for "
+                f"{', '.join(result.key for result in failed)}"
+            )
+            partial_requests = []
+            for result in failed:
+                pos, current_price, distance_pct = details[result.key]
+                request = self._exit_request(result.key, pos, current_price, distance_pct)
+                request.quantity = pos.quantity * 0.5
+                request.prepare = None
+                partial_requests.append(request)
+            partial_report = await self.emergency_exit.execute(partial_requests, "liquidation_risk_partial")
+            for result in partial_report.closed:
+                pos, current_price, distance_pct = details[result.key]
+                pos.quantity *= 0.5
+                self._mark_dirty()
+                partial_closed.add(result.key)
+                logger.warning(
+                    f"⚠️ PARTIAL CLOSE EXECUTED: {result.key} | "
+                    f"50% position closed to reduce liquidation risk"
+                )
+                await self._log_liquidation_event(
+                    pos, current_price, distance_pct,
+                    LiquidationRiskLevel.CRITICAL,
+                    event_type="partial_close_success",
+                    action_taken="Emergency 50% partial close"
                 )
-                
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(delay)
         
-        if not success:
-            # All retries failed - try emergency partial close
-            if self.liquidation_config.enable_partial_emergency_close:
+        for result in failed:
+            pos, current_price, distance_pct = details[result.key]
+            if result.key not in partial_closed:
                 logger.critical(
-                    f"🚨🚨 FULL CLOSE FAILED - Attempting emergency partial close (50%) for {key}"
+                    f"🚨🚨🚨 AUTO-CLOSE FAILED COMPLETELY for {result.key}! "
+                    f"MANUAL INTERVENTION REQUIRED! Last error: {result.error}"
                 )
-                
-                try:
-                    await self._execute_partial_close(
-                        pos,
-                        current_price,
-                        close_percent=50,  # Emergency 50% close
-                        reason="emergency_liquidation_risk"
-                    )
-                    
-                    logger.warning(
-                        f"⚠️ PARTIAL CLOSE EXECUTED: {key} | "
-                        f"50% position closed to reduce liquidation risk"
-                    )
-                    
-                    await self._log_liquidation_event(
-                        pos, current_price, distance_pct,
-                        LiquidationRiskLevel.CRITICAL,
-                        event_type="partial_close_success",
-                        action_taken="Emergency 50% partial close"
-                    )
-                    
-                except Exception as pe:
-                    logger.critical(
-                        f"🚨🚨🚨 EMERGENCY PARTIAL CLOSE ALSO FAILED: {key} | Error: {pe}"
-                    )
-            
-            # Send failure alert
             await self._send_auto_close_alert(
                 pos, current_price, distance_pct,
-                success=False, error=last_error
+                success=False, error=result.error
             )
-            
-            # Log failure
             await self._log_liquidation_event(
                 pos, current_price, distance_pct,
                 LiquidationRiskLevel.CRITICAL,
                 event_type="auto_close_failed",
                 action_taken="All close attempts failed",
-                error_message=last_error
-            )
-            
-            logger.critical(
-                f"🚨🚨🚨 AUTO-CLOSE FAILED COMPLETELY for {key}! "
-                f"MANUAL INTERVENTION REQUIRED! Last error: {last_error}"
+                error_message=result.error
             )
     
+    # ========================================================================
+    # EMERGENCY EXIT (liquidation auto-close, kill-switch flatten)
+    # ========================================================================
+    
+    def _exit_request(
+        self,
+        key: str,
+        pos: MonitoredPosition,
+        current_price: float,
+        distance_pct: Optional[float] = None
+    ) -> ExitRequest:
+        async def prepare() -> Optional[float]:
+            # Resting exchange SL/TP would hold the balance or close twice
+            if not await self._release_protective_orders(key):
+                raise ExitAborted(f"resting SL/TP of {key} may have filled - re-syncing instead")
+            return await self._held_quantity(pos)
+        
+        def position_lock():
+            # Same lock as _close_position: the two closes must not overlap
+            return self._position_lock_manager.acquire_lock(pos.symbol, "emergency_exit", timeout=30.0)
+        
+        lock = position_lock if self._position_lock_manager and CORE_MODULES_AVAILABLE else None
+        
+        return ExitRequest(
+            key=key,
+            exchange=self.exchange,
+            symbol=pos.symbol,
+            side=pos.side,
+            quantity=pos.quantity,
+            price=current_price,
+            distance_pct=distance_pct,
+            user_id=pos.user_id,
+            prepare=prepare,
+            lock=lock,
+        )
+    
+    def build_exit_requests(self, leveraged_only: bool = True) -> List[ExitRequest]:
+        """Exit requests for this monitor's positions (kill-switch flatten); manual positions are left alone."""
+        requests = []
+        for key, pos in self.positions.items():
+            if pos.is_manual_position or (leveraged_only and pos.leverage <= 1.0):
+                continue
+            price = self._price_cache.get(pos.symbol) or pos.entry_price
+            distance_pct = None
+            if pos.liquidation_price:
+                distance_pct = self.calculate_distance_to_liquidation(price, pos.liquidation_price, pos.side)
+            requests.append(self._exit_request(key, pos, price, distance_pct))
+        return requests
+    
+    async def apply_exit_report(self, report: EmergencyExitReport, reason: str):
+        """Stop monitoring the positions an emergency exit closed."""
+        for result in report.closed:
+            pos = self.positions.get(result.key)
+            if pos is None or pos.user_id != result.user_id:
+                continue
+            self._drop_exited_position(result.key)
+            if self.on_auto_close_triggered:
+                await self.on_auto_close_triggered(pos, self._price_cache.get(pos.symbol, pos.entry_price), reason)
+    
+    def _drop_exited_position(self, key: str):
+        if key in self.positions:
+            del self.positions[key]
+            self._mark_dirty()
+            asyncio.create_task(self._remove_from_supabase(key))
+    
     async def _send_auto_close_alert(
         self,
         pos: MonitoredPosition,
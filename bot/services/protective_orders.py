@@ -0,0 +1,252 @@
+"""
+Exchange-native protective orders for monitored positions.
+
+The position monitor decides where each position's stop loss and take profit
+should be; this manager keeps matching orders resting on the exchange, so an
+exit fires at exchange speed even when the monitor loop lags or the process
+is down. The monitor's in-memory SL/TP check stays active as the backstop.
+
+Orders follow the desired levels lazily to keep private API calls down:
+
+- a stop is only moved once the desired level is ``min_step_pct`` away from
+  the resting one, and at most once per ``min_interval`` seconds per position;
+- moves are amended in place where the exchange supports it, otherwise the
+  order is replaced (futures: new stop before cancelling the old one);
+- spot positions with SL and TP rest as one OCO list (they share the balance),
+  or as a lone stop where OCO is unavailable.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProtectiveOrderState:
+    """Orders resting on the exchange for one monitored position."""
+    symbol: str
+    side: str                  # Position side: 'long' or 'short'
+    quantity: float
+    stop_price: Optional[float] = None
+    take_profit: Optional[float] = None
+    stop_order_id: Optional[str] = None
+    tp_order_id: Optional[str] = None
+    oco: bool = False
+    updated_at: float = 0.0    # time.time() of the last place/amend attempt
+
+    @property
+    def order_ids(self) -> List[str]:
+        return [oid for oid in (self.stop_order_id, self.tp_order_id) if oid]
+
+
+class ProtectiveOrderManager:
+    """Keep exchange-side SL/TP orders in step with the position monitor."""
+
+    MIN_STEP_PCT = 0.25       # Ignore moves smaller than this (% of the resting price)
+    MIN_INTERVAL = 15.0       # Seconds between two amends of the same position
+    QUANTITY_TOLERANCE = 0.001  # Relative size change that forces a replace
+
+    def __init__(self, exchange_adapter, min_step_pct: float = MIN_STEP_PCT,
+                 min_interval: float = MIN_INTERVAL):
+        self.exchange = exchange_adapter
+        self.min_step_pct = min_step_pct
+        self.min_interval = min_interval
+        self._orders: Dict[str, ProtectiveOrderState] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"placed": 0, "amended": 0, "throttled": 0, "cancelled": 0, "errors": 0}
+
+    def is_protected(self, key: str) -> bool:
+        state = self._orders.get(key)
+        return bool(state and state.stop_order_id)
+
+    def _lock_for(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def _moved(self, resting: Optional[float], desired: Optional[float]) -> bool:
+        if not desired:
+            return False
+        if not resting:
+            return True
+        return abs(desired - resting) / resting * 100 >= self.min_step_pct
+
+    async def sync(self, key: str, pos) -> bool:
+        """
+        Bring the exchange orders for ``pos`` towards its current SL/TP.
+
+        Returns:
+            True if an order was placed or amended.
+        """
+        if pos.is_manual_position or pos.quantity <= 0 or not (pos.stop_loss or pos.take_profit):
+            return False
+        async with self._lock_for(key):
+            state = self._orders.get(key)
+            if state is not None and abs(state.quantity - pos.quantity) > pos.quantity * self.QUANTITY_TOLERANCE:
+                # Size changed outside the monitor (external fill) - start over
+                await self._cancel(state)
+                state = None
+            if state is None:
+                return await self._place(key, pos)
+
+            stop_moved = self._moved(state.stop_price, pos.stop_loss)
+            tp_moved = self._moved(state.take_profit, pos.take_profit)
+            if not stop_moved and not tp_moved:
+                return False
+            if time.time() - state.updated_at < self.min_interval:
+                self.stats["throttled"] += 1
+                return False
+            return await self._amend(key, state, pos, stop_moved, tp_moved)
+
+    async def _place(self, key: str, pos) -> bool:
+        state = ProtectiveOrderState(
+            symbol=pos.symbol, side=pos.side, quantity=pos.quantity, updated_at=time.time()
+        )
+        self._orders[key] = state
+        try:
+            await self._place_orders(state, pos.stop_loss, pos.take_profit)
+        except Exception as e:
+            # Retried after min_interval; the monitor's SL/TP check still applies
+            self.stats["errors"] += 1
+            logger.warning(f"🛡️ Could not place exchange protection for {key}: {e}")
+            return False
+        self.stats["placed"] += 1
+        logger.info(
+            f"🛡️ Exchange protection for {key}: SL={state.stop_price} TP={state.take_profit}"
+            f"{' (OCO)' if state.oco else ''}"
+        )
+        return True
+
+    async def _place_orders(self, state: ProtectiveOrderState, stop_loss: Optional[float],
+                            take_profit: Optional[float]):
+        adapter = self.exchange
+        derivatives = adapter.futures or adapter.margin
+        if stop_loss and take_profit and not derivatives and adapter.supports_oco:
+            ids = await adapter.place_oco_exit(state.symbol, state.side, state.quantity, stop_loss, take_profit)
+            state.stop_order_id = ids[0] if ids else None
+            state.tp_order_id = ids[1] if len(ids) > 1 else None
+            state.oco = True
+            state.stop_price, state.take_profit = stop_loss, take_profit
+            return
+        if stop_loss:
+            state.stop_order_id = await adapter.place_stop_order(state.symbol, state.side, state.quantity, stop_loss)
+            state.stop_price = stop_loss
+        # Spot without OCO: a TP limit would need the balance the stop holds
+        if take_profit and derivatives:
+            state.tp_order_id = await adapter.place_take_profit_order(
+                state.symbol, state.side, state.quantity, take_profit
+            )
+            state.take_profit = take_profit
+
+    async def _amend(self, key: str, state: ProtectiveOrderState, pos,
+                     stop_moved: bool, tp_moved: bool) -> bool:
+        state.updated_at = time.time()
+        adapter = self.exchange
+        try:
+            if state.oco or not state.order_ids:
+                # An OCO list cannot be edited leg by leg; failed placements start fresh
+                await self._cancel(state)
+                state.stop_order_id = state.tp_order_id = None
+                state.oco = False
+                await self._place_orders(state, pos.stop_loss, pos.take_profit)
+            else:
+                if stop_moved and state.stop_order_id:
+                    state.stop_order_id = await adapter.amend_stop_order(
+                        state.symbol, state.stop_order_id, state.side, state.quantity, pos.stop_loss
+                    )
+                    state.stop_price = pos.stop_loss
+                elif stop_moved:
+                    state.stop_order_id = await adapter.place_stop_order(
+                        state.symbol, state.side, state.quantity, pos.stop_loss
+                    )
+                    state.stop_price = pos.stop_loss
+                if tp_moved and (adapter.futures or adapter.margin):
+                    new_tp_id = await adapter.place_take_profit_order(
+                        state.symbol, state.side, state.quantity, pos.take_profit
+                    )
+                    if state.tp_order_id:
+                        await adapter.cancel_order(state.tp_order_id, state.symbol)
+                    state.tp_order_id = new_tp_id
+                    state.take_profit = pos.take_profit
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"🛡️ Could not amend exchange protection for {key}: {e}")
+            return False
+        self.stats["amended"] += 1
+        logger.debug(f"🛡️ Exchange protection for {key} moved: SL={state.stop_price} TP={state.take_profit}")
+        return True
+
+    async def _cancel(self, state: ProtectiveOrderState) -> bool:
+        cancelled = True
+        for order_id in state.order_ids:
+            cancelled = await self.exchange.cancel_order(order_id, state.symbol) and cancelled
+            if state.oco:
+                break  # Cancelling one leg cancels the list
+        self.stats["cancelled"] += 1
+        return cancelled
+
+    async def _filled_amount(self, state: ProtectiveOrderState) -> Optional[float]:
+        """Quantity filled across the orders of ``state``; None if a status could not be read."""
+        filled = 0.0
+        for order_id in state.order_ids:
+            order = await self.exchange.get_order(order_id, state.symbol)
+            if order is None:
+                return None
+            filled += float(order.get('filled') or 0.0)
+        return filled
+
+    async def release(self, key: str) -> bool:
+        """
+        Cancel the orders for ``key`` before the monitor closes (part of) the
+        position itself - on spot they hold the balance the close needs.
+
+        Returns:
+            False if an order filled, or could not be cancelled and its
+            status could not be read: the position may already be (partly)
+            closed, so the caller must not send its own close.
+        """
+        async with self._lock_for(key):
+            state = self._orders.pop(key, None)
+            if state is None or not state.order_ids:
+                return True
+            if await self._cancel(state):
+                return True
+            filled = await self._filled_amount(state)
+            if filled is None:
+                # Still tracked, so the next attempt checks again instead of duplicating it
+                self._orders[key] = state
+                logger.warning(f"🛡️ Protective order for {key} could not be cancelled or checked - it may have filled")
+                return False
+            if filled > 0:
+                logger.warning(f"🛡️ Protective order for {key} already filled ({filled}) - exchange closed the position")
+                return False
+            return True  # Already cancelled on the exchange
+
+    async def prune(self, active_keys: Iterable[str]):
+        """Cancel orders of positions the monitor no longer tracks."""
+        active = set(active_keys)
+        for key in [k for k in self._orders if k not in active]:
+            await self.release(key)
+            self._locks.pop(key, None)
+
+    def export_state(self) -> Dict[str, Dict[str, Any]]:
+        """Resting orders by position key (warm restart: adopt instead of duplicating)."""
+        return {key: asdict(state) for key, state in self._orders.items() if state.order_ids}
+
+    def restore_state(self, entries: Dict[str, Dict[str, Any]]) -> int:
+        for key, entry in (entries or {}).items():
+            self._orders[key] = ProtectiveOrderState(**entry)
+        return len(entries or {})
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "protected_positions": sum(1 for state in self._orders.values() if state.stop_order_id),
+            "min_step_pct": self.min_step_pct,
+            "min_interval_seconds": self.min_interval,
+            **self.stats,
+        }
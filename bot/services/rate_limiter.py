@@ -12,12 +12,15 @@ Features:
 """
 
 import logging
+import math
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
 import asyncio
 
+from bot.core.rate_limit import SlidingWindowLimiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,7 +58,6 @@ class TradingMetrics:
     daily_pnl_pct: float = 0.0
     current_drawdown_pct: float = 0.0
     last_trade_time: Optional[datetime] = None
-    last_hour_reset: Optional[datetime] = None
     last_day_reset: Optional[datetime] = None
 
 
@@ -71,14 +73,27 @@ class RateLimitResult:
 class RateLimiter:
     """
     Rate limiter to prevent excessive trading.
+    
+    The hourly trade limit is a sliding window (not reset on the hour), so
+    a burst straddling an hour boundary cannot double the limit. Pass a
+    shared ``backend`` (e.g. ``RedisRateLimitBackend``) to enforce it
+    across worker processes.
     """
     
-    def __init__(self, config: Optional[RateLimitConfig] = None):
+    def __init__(self, config: Optional[RateLimitConfig] = None, backend=None):
         self.config = config or RateLimitConfig()
         
         # Track per-user metrics
         self._user_metrics: Dict[str, TradingMetrics] = defaultdict(TradingMetrics)
         
+        # Sliding hourly trade counts per user; idle users are evicted
+        self._hourly = SlidingWindowLimiter(
+            [('hour', self.config.max_trades_per_hour, 3600)],
+            backend=backend,
+            max_keys=100000,
+            idle_ttl=7200,
+        )
+        
         # Track symbol cooldowns per user {user_id: {symbol: last_trade_time}}
         self._symbol_cooldowns: Dict[str, Dict[str, datetime]] = defaultdict(dict)
         
@@ -97,16 +112,12 @@ class RateLimiter:
         self._reset_time_windows(user_id)
     
     def _reset_time_windows(self, user_id: str):
-        """Reset hourly/daily counters if windows have passed."""
+        """Refresh the sliding hourly count and reset daily counters at midnight."""
         user_id_str = str(user_id)  # Convert UUID to string if needed
         metrics = self._user_metrics[user_id]
         now = datetime.now()
         
-        # Reset hourly counter
-        if metrics.last_hour_reset is None or (now - metrics.last_hour_reset) >= timedelta(hours=1):
-            metrics.trades_this_hour = 0
-            metrics.last_hour_reset = now
-            logger.debug(f"Reset hourly counter for user {user_id_str[:8]}")
+        metrics.trades_this_hour = self._trades_this_hour(user_id)
         
         # Reset daily counter (at midnight)
         if metrics.last_day_reset is None or now.date() > metrics.last_day_reset.date():
@@ -145,8 +156,8 @@ class RateLimiter:
             )
         
         # 2. Check hourly limit
-        if metrics.trades_this_hour >= self.config.max_trades_per_hour:
-            wait = 3600 - (now - metrics.last_hour_reset).seconds if metrics.last_hour_reset else 3600
+        if self._hourly.check(str(user_id)) is not None:
+            wait = int(math.ceil(self._hourly.retry_after(str(user_id))))
             return RateLimitResult(
                 is_allowed=False,
                 reason=f"Hourly limit reached ({self.config.max_trades_per_hour} trades/hour)",
@@ -172,6 +183,7 @@ class RateLimiter:
                     reason=f"Symbol {base_symbol} in cooldown ({wait}s remaining)",
                     wait_seconds=wait
                 )
+            del self._symbol_cooldowns[user_id][base_symbol]
         
         # 5. Check max concurrent positions
         current_pos_count = len(self._current_positions[user_id])
@@ -217,7 +229,8 @@ class RateLimiter:
         
         # Update counters
         self._cycle_signals[user_id] += 1
-        metrics.trades_this_hour += 1
+        self._hourly.record(str(user_id))
+        metrics.trades_this_hour = self._trades_this_hour(user_id)
         metrics.trades_today += 1
         metrics.last_trade_time = now
         
@@ -260,9 +273,14 @@ class RateLimiter:
         self._user_metrics[user_id].consecutive_losses = 0
         logger.info(f"Reset consecutive losses for {str(user_id)[:8]}")
     
+    def _trades_this_hour(self, user_id: str) -> int:
+        """Trades in the sliding hour window (weighted estimate, rounded up)."""
+        return int(math.ceil(self._hourly.counts(str(user_id))["hour"] - 1e-9))
+    
     def get_metrics(self, user_id: str) -> Dict:
         """Get current metrics for a user."""
         metrics = self._user_metrics[user_id]
+        metrics.trades_this_hour = self._trades_this_hour(user_id)
         return {
             "trades_this_hour": metrics.trades_this_hour,
             "trades_today": metrics.trades_today,
@@ -276,6 +294,46 @@ class RateLimiter:
             "max_trades_per_day": self.config.max_trades_per_day
         }
     
+    def export_user_state(self, user_id: str) -> Dict:
+        """Counters, cooldowns and hourly window of one user (for warm-restart snapshots)."""
+        metrics = self._user_metrics.get(user_id) or TradingMetrics()
+        return {
+            "trades_today": metrics.trades_today,
+            "consecutive_losses": metrics.consecutive_losses,
+            "daily_pnl_pct": metrics.daily_pnl_pct,
+            "current_drawdown_pct": metrics.current_drawdown_pct,
+            "last_trade_time": metrics.last_trade_time.isoformat() if metrics.last_trade_time else None,
+            "last_day_reset": metrics.last_day_reset.isoformat() if metrics.last_day_reset else None,
+            "cooldowns": {
+                symbol: at.isoformat() for symbol, at in self._symbol_cooldowns.get(user_id, {}).items()
+            },
+            # A shared backend (Redis) already survives restarts
+            "hourly": self._hourly.local.export_state([str(user_id)])
+                      if self._hourly.backend is self._hourly.local else {},
+        }
+    
+    def restore_user_state(self, user_id: str, state: Dict):
+        """Restore what ``export_user_state`` produced; daily counters reset on the next cycle if stale."""
+        metrics = self._user_metrics[user_id]
+        metrics.trades_today = int(state.get("trades_today", 0))
+        metrics.consecutive_losses = int(state.get("consecutive_losses", 0))
+        metrics.daily_pnl_pct = float(state.get("daily_pnl_pct", 0.0))
+        metrics.current_drawdown_pct = float(state.get("current_drawdown_pct", 0.0))
+        if state.get("last_trade_time"):
+            metrics.last_trade_time = datetime.fromisoformat(state["last_trade_time"])
+        if state.get("last_day_reset"):
+            metrics.last_day_reset = datetime.fromisoformat(state["last_day_reset"])
+    
+        cooldown_cutoff = datetime.now() - timedelta(minutes=self.config.symbol_cooldown_minutes)
+        for symbol, at in (state.get("cooldowns") or {}).items():
+            at = datetime.fromisoformat(at)
+            if at > cooldown_cutoff:
+                self._symbol_cooldowns[user_id][symbol] = at
+    
+        if state.get("hourly") and self._hourly.backend is self._hourly.local:
+            self._hourly.local.restore_state(state["hourly"])
+        metrics.trades_this_hour = self._trades_this_hour(user_id)
+    
     def _normalize_symbol(self, symbol: str) -> str:
         """Normalize symbol to base asset (e.g., BTC/USDT -> BTC)."""
         if '/' in symbol:
@@ -8,12 +8,17 @@ Features:
 4. Volatility-based sizing - adjusts size based on instrument volatility
 """
 
+import asyncio
 import logging
+import math
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from enum import Enum
 
+from bot.core.rolling_stats import RollingTradingStats, RunningMoments
+from bot.exchange_adapters.request_scheduler import RequestPriority, with_request_priority
+
 logger = logging.getLogger(__name__)
 
 
@@ -261,6 +266,13 @@ class RiskManagerService:
         # Trading statistics for Kelly
         self._trading_stats: Dict[str, Dict] = {}
         
+        # Per-user rolling statistics (Kelly/Sharpe/VaR inputs): loaded once,
+        # then updated in memory on trade close and day close
+        self._rolling_stats: Dict[str, RollingTradingStats] = {}
+        self._rolling_stats_locks: Dict[str, asyncio.Lock] = {}
+        self._pending_trade_closes: Dict[str, List[Tuple[Optional[str], float, datetime]]] = {}
+        self._last_equity: Dict[str, float] = {}  # Seeds daily returns of stats built later
+        
         # Risk per trade based on level (fallback if no user settings)
         self._risk_per_trade = {
             RiskLevel.CONSERVATIVE: 0.005,  # 0.5%
@@ -1315,14 +1327,20 @@ class RiskManagerService:
             details={'risk_percent': risk_percent}
         )
     
+    @with_request_priority(RequestPriority.ANALYTICS)
     async def _fetch_ohlcv(
         self,
         symbol: str,
         timeframe: str,
         limit: int
     ) -> Optional[List]:
-        """Fetch OHLCV data from exchange."""
+        """Fetch OHLCV data from local candles (bot.realtime.candles) or the exchange."""
         try:
+            candle_store = getattr(self.exchange, 'candle_store', None)
+            if candle_store is not None:
+                return await candle_store.ohlcv(
+                    symbol, timeframe, limit, lambda: self.exchange.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                )
             if hasattr(self.exchange, 'exchange'):
                 # CCXT exchange
                 ohlcv = await self.exchange.exchange.fetch_ohlcv(
@@ -1355,7 +1373,18 @@ class RiskManagerService:
         symbol: str,
         user_id: Optional[str] = None
     ) -> Dict:
-        """Get trading statistics from database."""
+        """Get trading statistics for Kelly sizing (user's rolling stats when available)."""
+        if user_id:
+            stats = await self.get_rolling_stats(user_id)
+            if stats is not None:
+                outcomes = stats.symbol_outcomes(symbol)
+                return {
+                    'total_trades': outcomes.decided,
+                    'win_rate': outcomes.win_rate,
+                    'avg_win': outcomes.avg_win,
+                    'avg_loss': outcomes.avg_loss
+                }
+        
         try:
             from bot.db import DatabaseManager, Trade
             
@@ -1400,11 +1429,159 @@ class RiskManagerService:
                 'avg_loss': 0.0
             }
     
+    # ========================================================================
+    # ROLLING TRADING STATISTICS
+    # ========================================================================
+    
+    async def get_rolling_stats(self, user_id: str, equity: Optional[float] = None) -> Optional[RollingTradingStats]:
+        """
+        Rolling statistics of a user.
+        
+        The first call per user reads the stored snapshot (or replays the
+        user's closed trades once if there is none); later calls are a dict
+        lookup kept current by record_trade_close / record_equity. ``equity``
+        (current account value) is the return base when no balance is known yet.
+        """
+        stats = self._rolling_stats.get(user_id)
+        if stats is not None:
+            return stats
+        
+        lock = self._rolling_stats_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            if user_id in self._rolling_stats:
+                return self._rolling_stats[user_id]
+            equity = self._last_equity.get(user_id) or equity
+            try:
+                stats, built = await asyncio.to_thread(self._load_rolling_stats, user_id, equity)
+            except Exception as e:
+                logger.warning(f"Could not load rolling stats for {user_id}: {e} - starting empty")
+                stats, built = RollingTradingStats(), False
+            if stats.reference_equity is None and equity and equity > 0:
+                stats.reference_equity = float(equity)
+            
+            pending = self._pending_trade_closes.pop(user_id, [])
+            if not built:
+                # A rebuild from the trades table already contains these
+                for symbol, pnl, at in pending:
+                    stats.add_trade(symbol, pnl, at=at)
+            self._rolling_stats[user_id] = stats
+            logger.info(
+                f"📊 Rolling stats loaded for {user_id}: {stats.trades.pnl.count} trades, "
+                f"{stats.daily.count} trading days, equity base {stats.reference_equity}"
+            )
+            return stats
+    
+    @staticmethod
+    def _load_rolling_stats(user_id: str, equity: Optional[float] = None) -> Tuple[RollingTradingStats, bool]:
+        from bot.db import (
+            DatabaseManager,
+            build_rolling_trading_stats,
+            load_rolling_trading_stats,
+            save_rolling_trading_stats,
+        )
+        
+        with DatabaseManager.session_scope() as session:
+            stats = load_rolling_trading_stats(session, user_id=user_id)
+            if stats is not None:
+                return stats, False
+            stats = build_rolling_trading_stats(session, user_id=user_id, equity=equity)
+            save_rolling_trading_stats(session, user_id=user_id, stats=stats)
+            return stats, True
+    
+    @staticmethod
+    def _save_rolling_stats(user_id: str, payload: Dict[str, Any]):
+        from bot.db import DatabaseManager, save_rolling_trading_stats
+        
+        with DatabaseManager.session_scope() as session:
+            save_rolling_trading_stats(
+                session, user_id=user_id, stats=RollingTradingStats.from_dict(payload)
+            )
+    
+    def _persist_rolling_stats(self, user_id: str):
+        stats = self._rolling_stats.get(user_id)
+        if stats is None:
+            return
+        payload = stats.to_dict()
+        
+        async def _write():
+            try:
+                await asyncio.to_thread(self._save_rolling_stats, user_id, payload)
+            except Exception as e:
+                logger.debug(f"Could not persist rolling stats for {user_id}: {e}")
+        
+        try:
+            asyncio.get_running_loop().create_task(_write())
+        except RuntimeError:
+            pass  # No event loop (sync caller) - persisted on the next update
+    
+    def record_trade_close(
+        self,
+        user_id: str,
+        symbol: Optional[str],
+        pnl: float,
+        at: Optional[datetime] = None
+    ) -> None:
+        """Fold a closed trade's realized P&L into the user's rolling stats."""
+        at = at or datetime.utcnow()
+        stats = self._rolling_stats.get(user_id)
+        if stats is None:
+            # Applied once the stats are loaded
+            self._pending_trade_closes.setdefault(user_id, []).append((symbol, float(pnl), at))
+            return
+        stats.add_trade(symbol, pnl, at=at)
+        self._persist_rolling_stats(user_id)
+    
+    def record_equity(self, user_id: str, equity: float, at: Optional[datetime] = None) -> None:
+        """
+        Latest account equity: base for daily returns, and the day-close hook
+        (the previous day is folded into the daily stats when the date changes).
+        """
+        if equity and equity > 0:
+            self._last_equity[user_id] = float(equity)
+        stats = self._rolling_stats.get(user_id)
+        if stats is None:
+            return
+        day = stats.day
+        stats.record_equity(equity, at=at)
+        if stats.day != day:
+            self._persist_rolling_stats(user_id)
+    
     def update_risk_level(self, level: RiskLevel):
         """Update the risk level."""
         self.risk_level = level
         logger.info(f"🛡️ Risk level updated to: {level.value}")
     
+    def export_atr_cache(self) -> List[Dict]:
+        """Unexpired ATR values (for warm-restart snapshots)."""
+        now = datetime.now()
+        return [
+            {
+                'symbol': atr.symbol,
+                'atr_value': atr.atr_value,
+                'atr_percent': atr.atr_percent,
+                'period': atr.period,
+                'calculated_at': atr.calculated_at.isoformat(),
+            }
+            for atr in self._atr_cache.values()
+            if now - atr.calculated_at < self._cache_ttl
+        ]
+    
+    def restore_atr_cache(self, entries: List[Dict]) -> int:
+        """Load ATR values from ``export_atr_cache``; the usual TTL still applies."""
+        restored = 0
+        for entry in entries:
+            atr = ATRData(
+                symbol=entry['symbol'],
+                atr_value=float(entry['atr_value']),
+                atr_percent=float(entry['atr_percent']),
+                period=int(entry['period']),
+                calculated_at=datetime.fromisoformat(entry['calculated_at'])
+            )
+            if datetime.now() - atr.calculated_at < self._cache_ttl:
+                self._atr_cache.setdefault(f"{atr.symbol}_{atr.period}", atr)
+                restored += 1
+        return restored
+    
     def get_status(self, user_id: Optional[str] = None) -> Dict:
         """
         Get current status of Risk Manager.
@@ -1446,7 +1623,8 @@ class RiskManagerService:
         self, 
         portfolio_value: float,
         confidence_level: float = 0.95,
-        lookback_days: int = 30
+        lookback_days: int = 30,
+        user_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Calculate Daily Value-at-Risk (VaR) for portfolio.
@@ -1457,91 +1635,69 @@ class RiskManagerService:
             portfolio_value: Current portfolio value in USD
             confidence_level: VaR confidence (0.95 = 95%)
             lookback_days: Historical period for calculation
+            user_id: User whose daily returns are used
             
         Returns:
             Dict with var_absolute, var_percent, can_trade, warning
         """
-        import numpy as np
         try:
-            from bot.db import DatabaseManager, TradingStats
-            
-            with DatabaseManager.session_scope() as session:
-                # Get daily returns from TradingStats
-                from datetime import datetime, timedelta
-                cutoff_date = datetime.utcnow() - timedelta(days=lookback_days)
-                
-                stats = session.query(TradingStats).filter(
-                    TradingStats.date >= cutoff_date
-                ).order_by(TradingStats.date.asc()).all()
-                
-                if len(stats) < 10:
-                    logger.warning("VaR: Not enough data (<10 days), using conservative estimate")
-                    # Conservative fallback: 5% VaR
-                    return {
-                        'var_absolute': portfolio_value * 0.05,
-                        'var_percent': 5.0,
-                        'can_trade': portfolio_value > 100,
-                        'warning': None,
-                        'data_points': len(stats),
-                        'confidence_level': confidence_level
-                    }
-                
-                # Calculate daily returns
-                daily_returns = []
-                for i in range(1, len(stats)):
-                    if stats[i-1].ending_balance > 0:
-                        ret = (stats[i].ending_balance - stats[i-1].ending_balance) / stats[i-1].ending_balance
-                        daily_returns.append(ret)
-                
-                if not daily_returns:
-                    return {
-                        'var_absolute': portfolio_value * 0.05,
-                        'var_percent': 5.0,
-                        'can_trade': True,
-                        'warning': 'No return data available',
-                        'data_points': 0,
-                        'confidence_level': confidence_level
-                    }
-                
-                # Parametric VaR using normal distribution
-                mean_return = np.mean(daily_returns)
-                std_return = np.std(daily_returns)
-                
-                # Z-score for confidence level
-                z_scores = {0.90: 1.282, 0.95: 1.645, 0.99: 2.326}
-                z = z_scores.get(confidence_level, 1.645)
-                
-                # VaR = portfolio * (mean - z * std)
-                var_return = mean_return - z * std_return
-                var_absolute = abs(var_return * portfolio_value)
-                var_percent = abs(var_return * 100)
-                
-                # Risk checks
-                warning = None
-                can_trade = True
-                
-                # Halt trading if VaR exceeds 10% of portfolio
-                if var_percent > 10.0:
-                    warning = f"⚠️ HIGH VaR: {var_percent:.2f}% exceeds 10% threshold"
-                    can_trade = False
-                elif var_percent > 5.0:
-                    warning = f"⚠️ Elevated VaR: {var_percent:.2f}%"
-                
-                logger.info(
-                    f"📊 VaR({confidence_level*100:.0f}%): ${var_absolute:.2f} ({var_percent:.2f}%) | "
-                    f"Can Trade: {'✅' if can_trade else '❌'}"
-                )
-                
+            stats = await self.get_rolling_stats(user_id, equity=portfolio_value) if user_id else None
+            daily = RunningMoments()
+            for daily_return, _ in (stats.daily_returns(lookback_days) if stats is not None else []):
+                daily.add(daily_return)
+            data_points = daily.count
+            
+            if data_points < 10:
+                logger.warning("VaR: Not enough data (<10 days), using conservative estimate")
+                # Conservative fallback: 5% VaR
                 return {
-                    'var_absolute': var_absolute,
-                    'var_percent': var_percent,
-                    'can_trade': can_trade,
-                    'warning': warning,
-                    'data_points': len(daily_returns),
-                    'confidence_level': confidence_level,
-                    'mean_daily_return': mean_return * 100,
-                    'std_daily_return': std_return * 100
+                    'var_absolute': portfolio_value * 0.05,
+                    'var_percent': 5.0,
+                    'can_trade': portfolio_value > 100,
+                    'warning': None,
+                    'data_points': data_points,
+                    'confidence_level': confidence_level
                 }
+            
+            # Parametric VaR using normal distribution
+            mean_return = daily.mean
+            std_return = daily.std
+            
+            # Z-score for confidence level
+            z_scores = {0.90: 1.282, 0.95: 1.645, 0.99: 2.326}
+            z = z_scores.get(confidence_level, 1.645)
+            
+            # VaR = portfolio * (mean - z * std)
+            var_return = mean_return - z * std_return
+            var_absolute = abs(var_return * portfolio_value)
+            var_percent = abs(var_return * 100)
+            
+            # Risk checks
+            warning = None
+            can_trade = True
+            
+            # Halt trading if VaR exceeds 10% of portfolio
+            if var_percent > 10.0:
+                warning = f"⚠️ HIGH VaR: {var_percent:.2f}% exceeds 10% threshold"
+                can_trade = False
+            elif var_percent > 5.0:
+                warning = f"⚠️ Elevated VaR: {var_percent:.2f}%"
+            
+            logger.info(
+                f"📊 VaR({confidence_level*100:.0f}%): ${var_absolute:.2f} ({var_percent:.2f}%) | "
+                f"Can Trade: {'✅' if can_trade else '❌'}"
+            )
+            
+            return {
+                'var_absolute': var_absolute,
+                'var_percent': var_percent,
+                'can_trade': can_trade,
+                'warning': warning,
+                'data_points': data_points,
+                'confidence_level': confidence_level,
+                'mean_daily_return': mean_return * 100,
+                'std_daily_return': std_return * 100
+            }
                 
         except Exception as e:
             logger.error(f"VaR calculation failed: {e}")
@@ -1554,6 +1710,7 @@ class RiskManagerService:
                 'confidence_level': confidence_level
             }
     
+    @with_request_priority(RequestPriority.ANALYTICS)
     async def check_multi_timeframe_confirmation(
         self, 
         symbol: str, 
@@ -1583,6 +1740,7 @@ class RiskManagerService:
                 # Get OHLCV data for each timeframe
                 try:
                     if self.exchange:
+                        # Served from local candles when the adapter has them (one stream, no REST per TF)
                         ohlcv = await self.exchange.fetch_ohlcv(symbol, tf, limit=50)
                         
                         if ohlcv and len(ohlcv) >= 20:
@@ -1789,125 +1947,102 @@ class RiskManagerService:
         Professional standard: Live risk-adjusted return monitoring.
         
         Args:
-            user_id: Optional user filter
+            user_id: User whose daily returns are used
             lookback_days: Period for calculation
             risk_free_rate: Annual risk-free rate
             
         Returns:
             Dict with sharpe_ratio, quality, can_scale, interpretation
         """
-        import numpy as np
-        
         try:
-            from bot.db import DatabaseManager, TradingStats, Trade
-            from datetime import datetime, timedelta
+            stats = await self.get_rolling_stats(user_id) if user_id else None
+            days = stats.daily_returns(lookback_days) if stats is not None else []
+            total_trades = sum(trades for _, trades in days)
             
-            cutoff = datetime.utcnow() - timedelta(days=lookback_days)
+            if total_trades < 5:
+                return {
+                    'sharpe_ratio': None,
+                    'quality': 'unknown',
+                    'can_scale': False,
+                    'interpretation': 'Not enough trades (<5)',
+                    'total_trades': total_trades,
+                    'lookback_days': lookback_days
+                }
             
-            with DatabaseManager.session_scope() as session:
-                # Get daily returns from trades
-                query = session.query(Trade).filter(
-                    Trade.created_at >= cutoff,
-                    Trade.pnl.isnot(None)
-                )
-                
-                if user_id:
-                    query = query.filter(Trade.user_id == user_id)
-                
-                trades = query.order_by(Trade.created_at.asc()).all()
-                
-                if len(trades) < 5:
-                    return {
-                        'sharpe_ratio': None,
-                        'quality': 'unknown',
-                        'can_scale': False,
-                        'interpretation': 'Not enough trades (<5)',
-                        'total_trades': len(trades),
-                        'lookback_days': lookback_days
-                    }
-                
-                # Group trades by day and calculate daily returns
-                daily_pnl = {}
-                for trade in trades:
-                    day = trade.created_at.date()
-                    if day not in daily_pnl:
-                        daily_pnl[day] = 0
-                    daily_pnl[day] += float(trade.pnl or 0)
-                
-                if len(daily_pnl) < 5:
-                    return {
-                        'sharpe_ratio': None,
-                        'quality': 'unknown',
-                        'can_scale': False,
-                        'interpretation': 'Not enough trading days (<5)',
-                        'total_trades': len(trades),
-                        'trading_days': len(daily_pnl)
-                    }
-                
-                # Calculate returns (assume $10k base for simplicity)
-                base_capital = 10000
-                daily_returns = [pnl / base_capital for pnl in daily_pnl.values()]
-                
-                # Sharpe calculation
-                mean_return = np.mean(daily_returns)
-                std_return = np.std(daily_returns)
-                
-                if std_return == 0:
-                    return {
-                        'sharpe_ratio': 0,
-                        'quality': 'neutral',
-                        'can_scale': False,
-                        'interpretation': 'Zero volatility (suspicious)',
-                        'total_trades': len(trades)
-                    }
-                
-                # Daily risk-free rate
-                daily_rf = risk_free_rate / 365
-                
-                # Annualized Sharpe
-                excess_return = mean_return - daily_rf
-                sharpe = (excess_return / std_return) * np.sqrt(365)
-                
-                # Interpretation
-                if sharpe >= 2.0:
-                    quality = 'excellent'
-                    interpretation = '🌟 Outstanding risk-adjusted returns'
-                    can_scale = True
-                elif sharpe >= 1.0:
-                    quality = 'good'
-                    interpretation = '✅ Good risk-adjusted returns'
-                    can_scale = True
-                elif sharpe >= 0.5:
-                    quality = 'acceptable'
-                    interpretation = '⚠️ Moderate risk-adjusted returns'
-                    can_scale = False
-                elif sharpe >= 0:
-                    quality = 'poor'
-                    interpretation = '❌ Poor risk-adjusted returns'
-                    can_scale = False
-                else:
-                    quality = 'negative'
-                    interpretation = '🚫 Negative returns - consider reducing exposure'
-                    can_scale = False
-                
-                logger.info(
-                    f"📊 Live Sharpe: {sharpe:.2f} ({quality}) | "
-                    f"Can Scale: {'✅' if can_scale else '❌'} | "
-                    f"Trades: {len(trades)} over {len(daily_pnl)} days"
-                )
-                
+            trading_days = len(days)
+            if trading_days < 5:
                 return {
-                    'sharpe_ratio': round(sharpe, 2),
-                    'quality': quality,
-                    'can_scale': can_scale,
-                    'interpretation': interpretation,
-                    'total_trades': len(trades),
-                    'trading_days': len(daily_pnl),
-                    'mean_daily_return_pct': round(mean_return * 100, 4),
-                    'std_daily_return_pct': round(std_return * 100, 4),
-                    'annualized_return_pct': round(mean_return * 365 * 100, 2),
-                    'annualized_volatility_pct': round(std_return * np.sqrt(365) * 100, 2)
+                    'sharpe_ratio': None,
+                    'quality': 'unknown',
+                    'can_scale': False,
+                    'interpretation': 'Not enough trading days (<5)',
+                    'total_trades': total_trades,
+                    'trading_days': trading_days
                 }
+            
+            # Sharpe calculation
+            daily = RunningMoments()
+            for daily_return, _ in days:
+                daily.add(daily_return)
+            mean_return = daily.mean
+            std_return = daily.std
+            
+            if std_return == 0:
+                return {
+                    'sharpe_ratio': 0,
+                    'quality': 'neutral',
+                    'can_scale': False,
+                    'interpretation': 'Zero volatility (suspicious)',
+                    'total_trades': total_trades
+                }
+            
+            # Daily risk-free rate
+            daily_rf = risk_free_rate / 365
+            
+            # Annualized Sharpe
+            excess_return = mean_return - daily_rf
+            sharpe = (excess_return / std_return) * math.sqrt(365)
+            
+            # Interpretation
+            if sharpe >= 2.0:
+                quality = 'excellent'
+                interpretation = '🌟 Outstanding risk-adjusted returns'
+                can_scale = True
+            elif sharpe >= 1.0:
+                quality = 'good'
+                interpretation = '✅ Good risk-adjusted returns'
+                can_scale = True
+            elif sharpe >= 0.5:
+                quality = 'acceptable'
+                interpretation = '⚠️ Moderate risk-adjusted returns'
+                can_scale = False
+            elif sharpe >= 0:
+                quality = 'poor'
+                interpretation = '❌ Poor risk-adjusted returns'
+                can_scale = False
+            else:
+                quality = 'negative'
+                interpretation = '🚫 Negative returns - consider reducing exposure'
+                can_scale = False
+            
+            logger.info(
+                f"📊 Live Sharpe: {sharpe:.2f} ({quality}) | "
+                f"Can Scale: {'✅' if can_scale else '❌'} | "
+                f"Trades: {total_trades} over {trading_days} days"
+            )
+            
+            return {
+                'sharpe_ratio': round(sharpe, 2),
+                'quality': quality,
+                'can_scale': can_scale,
+                'interpretation': interpretation,
+                'total_trades': total_trades,
+                'trading_days': trading_days,
+                'mean_daily_return_pct': round(mean_return * 100, 4),
+                'std_daily_return_pct': round(std_return * 100, 4),
+                'annualized_return_pct': round(mean_return * 365 * 100, 2),
+                'annualized_volatility_pct': round(std_return * math.sqrt(365) * 100, 2)
+            }
                 
         except Exception as e:
             logger.error(f"Live Sharpe calculation failed: {e}")
@@ -1954,7 +2089,7 @@ class RiskManagerService:
         blockers = []
         
         # 1. VaR Check
-        var_result = await self.calculate_var_daily(portfolio_value)
+        var_result = await self.calculate_var_daily(portfolio_value, user_id=user_id)
         checks['var'] = var_result
         if not var_result['can_trade']:
             blockers.append(f"VaR limit exceeded: {var_result['var_percent']:.2f}%")
@@ -378,6 +378,11 @@ class SignalDeduplicator:
         # Persist state after recording
         self._persist_state(user_id)
     
+    def was_executed(self, user_id: str, signal_id: Optional[str]) -> bool:
+        """True if this exact signal was already executed for the user (e.g. by the fan-out)."""
+        record = self._processed_signals[user_id].get(signal_id) if signal_id else None
+        return record is not None and record.was_executed
+    
     def _cleanup_old_records(self, user_id: str, now: datetime):
         """Remove records older than signal window."""
         cutoff = now - timedelta(hours=self.signal_window_hours * 2)
@@ -0,0 +1,415 @@
+"""
+Signal fan-out - execute one global signal for all users at once.
+
+A global signal (trading_signals.user_id IS NULL) used to be picked up by
+each user's bot on its own schedule. Every bot then repeated the same
+market-data fetch, volatility-adjusted SL/TP, consensus validation and
+order book read, so fills across users were spread over minutes at
+progressively worse prices.
+
+The fan-out executor splits the work:
+
+- shared, computed once per signal: kill-switch check, consensus from
+  SignalValidatorService, and per exchange/market the ticker, the order book
+  used by liquidity checks and the volatility-adjusted SL/TP levels;
+- per user, run concurrently: quote currency, risk gates, AI portfolio
+  evaluation, sizing, portfolio/margin checks and order placement
+  (``AutomatedTradingBot.execute_shared_signal``).
+
+Each event yields a report with per-user dispatch latency and the dispersion
+of fill prices around the shared reference price. Processed signals are
+recorded in the user's SignalDeduplicator so the regular cycle skips them.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from bot.core.symbol_normalizer import get_base
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SharedSignalContext:
+    """Everything about a signal that is the same for all users of one market."""
+    symbol: str
+    exchange_name: str
+    signal: Dict[str, Any]         # Enriched signal: current_price, SL/TP, consensus
+    market_data: Any               # bot.strategies.MarketData
+    book_pinned: bool = False      # Liquidity checks read one shared order book
+    prepare_seconds: float = 0.0
+
+    @property
+    def reference_price(self) -> float:
+        return self.market_data.current_price
+
+
+@dataclass
+class FanoutResult:
+    user_id: str
+    status: str                        # 'filled', 'skipped' or 'failed'
+    symbol: Optional[str] = None
+    latency_seconds: float = 0.0       # From event start until the user's order returned
+    fill_price: Optional[float] = None
+    reference_price: Optional[float] = None
+    quantity: Optional[float] = None
+    reason: str = ""
+
+    @property
+    def slippage_bps(self) -> Optional[float]:
+        """Fill vs. shared reference price (the report signs it by side)."""
+        if not self.fill_price or not self.reference_price:
+            return None
+        return (self.fill_price / self.reference_price - 1) * 10000
+
+
+@dataclass
+class FanoutReport:
+    event_id: str
+    signal_id: str
+    symbol: str
+    action: str
+    started_at: datetime
+    signal_age_seconds: Optional[float] = None  # Signal insert -> fan-out start
+    results: List[FanoutResult] = field(default_factory=list)
+    prepare_seconds: float = 0.0
+    duration_seconds: float = 0.0
+    skipped_reason: str = ""                    # Whole signal rejected by a shared check
+
+    @property
+    def filled(self) -> List[FanoutResult]:
+        return [r for r in self.results if r.status == 'filled']
+
+    def _signed_slippage(self) -> List[float]:
+        sign = 1 if self.action == 'BUY' else -1
+        return [sign * r.slippage_bps for r in self.filled if r.slippage_bps is not None]
+
+    @property
+    def fill_dispersion_bps(self) -> Optional[float]:
+        """Spread between the best and worst fill, in bps of the reference price."""
+        slippage = self._signed_slippage()
+        return max(slippage) - min(slippage) if slippage else None
+
+    @property
+    def fill_stdev_bps(self) -> Optional[float]:
+        slippage = self._signed_slippage()
+        return statistics.pstdev(slippage) if len(slippage) > 1 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        latencies = [r.latency_seconds for r in self.filled]
+        slippage = self._signed_slippage()
+        return {
+            "event_id": self.event_id,
+            "signal_id": self.signal_id,
+            "symbol": self.symbol,
+            "action": self.action,
+            "started_at": self.started_at.isoformat(),
+            "signal_age_seconds": self.signal_age_seconds,
+            "users": len(self.results),
+            "filled": len(self.filled),
+            "skipped_reason": self.skipped_reason or None,
+            "prepare_seconds": self.prepare_seconds,
+            "duration_seconds": self.duration_seconds,
+            "dispatch_latency_p50": statistics.median(latencies) if latencies else None,
+            "dispatch_latency_max": max(latencies) if latencies else None,
+            "fill_slippage_mean_bps": statistics.fmean(slippage) if slippage else None,
+            "fill_dispersion_bps": self.fill_dispersion_bps,
+            "fill_stdev_bps": self.fill_stdev_bps,
+            "users_detail": [
+                {"user_id": r.user_id, "status": r.status, "latency": r.latency_seconds,
+                 "fill_price": r.fill_price, "slippage_bps": r.slippage_bps, "reason": r.reason}
+                for r in self.results
+            ],
+        }
+
+
+def price_levels(action: str, price: float, sl_pct: float, tp_pct: float) -> Tuple[float, float]:
+    """(stop_loss, take_profit) ``sl_pct``/``tp_pct`` percent away from ``price``."""
+    if action == 'BUY':
+        return round(price * (1 - sl_pct / 100), 8), round(price * (1 + tp_pct / 100), 8)
+    return round(price * (1 + sl_pct / 100), 8), round(price * (1 - tp_pct / 100), 8)
+
+
+class SignalFanoutExecutor:
+    """Executes global signals for all registered bots in one concurrent event."""
+
+    MAX_CONCURRENT = 50
+    BOOK_TTL = 10.0  # Seconds a shared order book serves liquidity checks
+    HISTORY_SIZE = 20
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT):
+        self.max_concurrent = max_concurrent
+        self.reports: Deque[FanoutReport] = deque(maxlen=self.HISTORY_SIZE)
+        self._bots: List[Any] = []
+        self._feed = None
+        self._tasks: set = set()
+        self._in_flight: set = set()  # Signal ids being fanned out
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def register_bot(self, bot, feed=None):
+        """Add a bot; the first one subscribes the executor to ``feed`` for global signals."""
+        if bot not in self._bots:
+            self._bots.append(bot)
+        if feed is not None and self._feed is None:
+            self._feed = feed
+            feed.subscribe(None, self.on_signal_notice)
+
+    def unregister_bot(self, bot):
+        if bot in self._bots:
+            self._bots.remove(bot)
+        if not self._bots and self._feed is not None:
+            self._feed.unsubscribe(self.on_signal_notice)
+            self._feed = None
+
+    def is_registered(self, bot) -> bool:
+        return bot in self._bots
+
+    def on_signal_notice(self, notice):
+        """SignalFeed callback (user_id=None subscription: global signals only)."""
+        if not notice.is_global or not self._bots or notice.id in self._in_flight:
+            return
+        task = asyncio.create_task(self.fan_out(notice.id, signal_age=notice.delay_seconds))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    async def fan_out(self, signal_id: str, signal_age: Optional[float] = None) -> Optional[FanoutReport]:
+        """Load a global signal and execute it for every registered bot."""
+        self._in_flight.add(signal_id)
+        try:
+            signal = await asyncio.to_thread(self._load_signal, signal_id)
+            if signal is None:
+                logger.warning(f"📡 Fan-out: signal {signal_id[:8]} not found or not actionable")
+                return None
+            return await self.execute(signal, signal_age=signal_age)
+        except Exception as e:
+            logger.error(f"📡 Fan-out of signal {signal_id[:8]} failed: {e}", exc_info=True)
+            return None
+        finally:
+            self._in_flight.discard(signal_id)
+
+    async def execute(self, signal: Dict[str, Any], signal_age: Optional[float] = None) -> FanoutReport:
+        """
+        Execute ``signal`` (base symbol, action BUY/SELL) for all registered bots.
+
+        Shared checks run once; each bot then sizes and places its own order
+        concurrently, at most ``max_concurrent`` at a time.
+        """
+        action = signal['action'].upper()
+        report = FanoutReport(
+            event_id=uuid.uuid4().hex[:8], signal_id=signal.get('signal_id', ''),
+            symbol=signal['symbol'], action=action, started_at=datetime.now(),
+            signal_age_seconds=signal_age,
+        )
+        started = time.monotonic()
+        bots = [bot for bot in self._bots if getattr(bot, 'running', True)]
+
+        signal, report.skipped_reason = await self._shared_checks(signal, bots)
+        if report.skipped_reason:
+            logger.info(f"📡 Fan-out {report.event_id}: {action} {report.symbol} skipped - {report.skipped_reason}")
+            for bot in bots:
+                report.results.append(FanoutResult(user_id=bot.user_id, status='skipped', reason=report.skipped_reason))
+                self._record_processed(bot, signal, was_executed=False)
+            self.reports.append(report)
+            return report
+
+        logger.info(f"📡 Fan-out {report.event_id}: {action} {report.symbol} for {len(bots)} users")
+        contexts: Dict[Tuple[str, str], asyncio.Task] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def dispatch(bot):
+            async with semaphore:
+                result = await self._dispatch(bot, signal, contexts, started)
+            report.results.append(result)
+
+        await asyncio.gather(*(dispatch(bot) for bot in bots))
+
+        prepared = [task.result() for task in contexts.values() if task.done() and task.result()]
+        report.prepare_seconds = max((c.prepare_seconds for c in prepared), default=0.0)
+        report.duration_seconds = time.monotonic() - started
+        self.reports.append(report)
+
+        dispersion = report.fill_dispersion_bps
+        logger.info(
+            f"📡 Fan-out {report.event_id} done: {len(report.filled)}/{len(bots)} filled in "
+            f"{report.duration_seconds:.2f}s (shared prep {report.prepare_seconds:.2f}s)"
+            f"{f' | fill dispersion {dispersion:.1f} bps' if dispersion is not None else ''}"
+        )
+        return report
+
+    async def _shared_checks(self, signal: Dict[str, Any], bots: List[Any]) -> Tuple[Dict[str, Any], str]:
+        """Market-wide checks and consensus, once per signal. Returns (signal, skip reason)."""
+        if not bots:
+            return signal, "no registered bots"
+
+        intelligence = next((b.market_intelligence for b in bots if getattr(b, 'market_intelligence', None)), None)
+        if intelligence is not None:
+            should_kill, reason = await intelligence.should_kill_switch()
+            if should_kill:
+                return signal, f"kill switch: {reason}"
+
+        validator = next((b.signal_validator for b in bots if getattr(b, 'signal_validator', None)), None)
+        if validator is None:
+            return {**signal, 'consensus_score': 0.5, 'validation_reasons': ('No validator configured',)}, ""
+
+        validation = await asyncio.to_thread(validator.validate_signal, signal, signal['symbol'])
+        logger.info(
+            f"📊 Fan-out validation for {signal['symbol']}: execute={validation.should_execute}, "
+            f"consensus={validation.consensus_score:.2f}"
+        )
+        signal = {
+            **signal,
+            'confidence': validation.confidence_adjusted,
+            'consensus_score': validation.consensus_score,
+            'validation_reasons': validation.reasons,
+        }
+        if not validation.should_execute:
+            return signal, f"validation: {', '.join(validation.reasons)}"
+        return signal, ""
+
+    async def _dispatch(self, bot, signal: Dict[str, Any], contexts: Dict[Tuple[str, str], asyncio.Task],
+                        started: float) -> FanoutResult:
+        result = FanoutResult(user_id=bot.user_id, status='failed')
+        executed = None
+        try:
+            # The bot's own cycle must not interleave with this order
+            async with bot.cycle_lock:
+                quote = await bot.manage_capital()
+                result.symbol = f"{get_base(signal['symbol'])}/{quote}"
+
+                key = (bot.exchange_name, result.symbol)
+                if key not in contexts:
+                    contexts[key] = asyncio.create_task(self._prepare(bot, signal, result.symbol))
+                context = await contexts[key]
+                if context is None:
+                    result.reason = f"no market data for {result.symbol}"
+                    return result
+                result.reference_price = context.reference_price
+
+                executed, result.reason = await bot.execute_shared_signal(context.signal, context.market_data)
+            if executed is not None:
+                result.status = 'filled'
+                result.quantity = executed.quantity
+                result.fill_price = getattr(executed, 'fill_price', None) or executed.price
+            else:
+                result.status = 'skipped'
+        except Exception as e:
+            result.reason = str(e)
+            logger.error(f"📡 Fan-out dispatch for user {str(bot.user_id)[:8]} failed: {e}")
+        finally:
+            result.latency_seconds = time.monotonic() - started
+            self._record_processed(bot, {**signal, 'symbol': result.symbol or signal['symbol']},
+                                   was_executed=executed is not None)
+        return result
+
+    async def _prepare(self, bot, signal: Dict[str, Any], symbol: str) -> Optional[SharedSignalContext]:
+        """Ticker, shared order book and SL/TP levels for one exchange market."""
+        prepare_started = time.monotonic()
+        market_data = await bot.fetch_symbol_market_data(symbol)
+        if market_data is None or not market_data.current_price:
+            return None
+
+        price = market_data.current_price
+        enriched = {
+            **signal,
+            'symbol': symbol,
+            'current_price': price,
+            'market_data': market_data,
+            'is_global_signal': True,
+        }
+        if enriched.get('entry_price') is None:
+            enriched['entry_price'] = price
+
+        context = SharedSignalContext(symbol=symbol, exchange_name=bot.exchange_name,
+                                      signal=enriched, market_data=market_data)
+
+        intelligence = getattr(bot, 'market_intelligence', None)
+        if intelligence is not None:
+            # Volatility-adjusted SL/TP (user settings fill in per user otherwise)
+            try:
+                sentiment = await intelligence.get_market_sentiment()
+                profile = intelligence.get_volatility_adjusted_sl_tp(symbol=symbol, market_regime=sentiment.regime)
+                stop_loss, take_profit = price_levels(
+                    enriched['action'].upper(), price, profile.suggested_sl_pct, profile.suggested_tp_pct
+                )
+                if enriched.get('stop_loss') is None:
+                    enriched['stop_loss'] = stop_loss
+                if enriched.get('take_profit') is None:
+                    enriched['take_profit'] = take_profit
+            except Exception as e:
+                logger.debug(f"Fan-out: volatility-adjusted SL/TP unavailable for {symbol}: {e}")
+
+            # One order book read serves every user's liquidity check
+            if hasattr(bot.exchange, 'fetch_order_book'):
+                try:
+                    order_book = await bot.exchange.fetch_order_book(symbol, limit=50)
+                    intelligence.pin_order_book(symbol, order_book, ttl=self.BOOK_TTL)
+                    context.book_pinned = True
+                except Exception as e:
+                    logger.debug(f"Fan-out: shared order book unavailable for {symbol}: {e}")
+
+        context.prepare_seconds = time.monotonic() - prepare_started
+        return context
+
+    def _record_processed(self, bot, signal: Dict[str, Any], was_executed: bool):
+        deduplicator = getattr(bot, 'signal_deduplicator', None)
+        if deduplicator is None or not bot.user_id:
+            return
+        try:
+            deduplicator.record_processed(bot.user_id, signal, was_executed=was_executed)
+        except Exception as e:
+            logger.debug(f"Fan-out: could not record processed signal: {e}")
+
+    def _load_signal(self, signal_id: str) -> Optional[Dict[str, Any]]:
+        from bot.db import DatabaseManager, TradingSignal
+
+        with DatabaseManager() as db:
+            sig = db.session.query(TradingSignal).filter(TradingSignal.id == signal_id).first()
+            if sig is None or sig.user_id or (sig.signal_type or '').lower() not in ('buy', 'sell'):
+                return None
+            return {
+                'symbol': get_base(sig.symbol.strip()),
+                'action': sig.signal_type.upper(),
+                'confidence': float(sig.confidence_score or 0) / 100.0,
+                'reasoning': sig.ai_analysis or sig.reasoning or 'Signal from trading_signals table',
+                'stop_loss': float(sig.stop_loss) if sig.stop_loss else None,
+                'take_profit': float(sig.take_profit) if sig.take_profit else None,
+                'entry_price': float(sig.entry_price) if sig.entry_price else None,
+                'source': f"db:{sig.source or 'trading_signals'}",
+                'signal_id': str(sig.id),
+                'timeframe': sig.timeframe,
+                'is_global_signal': True,
+                'created_at': sig.created_at.isoformat() if sig.created_at else None,
+            }
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "registered_bots": len(self._bots),
+            "in_flight": len(self._in_flight),
+            "recent_events": [report.to_dict() for report in self.reports],
+        }
+
+
+# Singleton instance
+_signal_fanout: Optional[SignalFanoutExecutor] = None
+
+
+def get_signal_fanout() -> SignalFanoutExecutor:
+    """Get or create the process-wide SignalFanoutExecutor."""
+    global _signal_fanout
+    if _signal_fanout is None:
+        _signal_fanout = SignalFanoutExecutor()
+    return _signal_fanout
@@ -98,6 +98,8 @@ class Signal:
     confidence: float = 0.5  # 0-1
     timestamp: Optional[datetime] = None  # P1-7: For signal age validation
     trading_mode: Optional[str] = "day_trading"  # NEW: Trading mode for Quick Exit
+    fill_price: Optional[float] = None  # Average fill reported by the broker, set on execution
+    strategy_name: Optional[str] = None  # Set from the emitting strategy when collected
     
     def __post_init__(self):
         if self.timestamp is None:
@@ -135,6 +137,25 @@ class TradingStrategy(ABC):
         # NEW: Risk manager and user settings injection
         self.risk_manager = None
         self.user_settings: Optional[Dict] = None
+        # Scanner mode: candidates picked by screen() across the whole exchange
+        self.scan_symbols: List[str] = []
+        self._scan_version: Optional[int] = None
+        
+    def screen(self, universe):
+        """
+        Vectorized pre-filter over a TickerUniverse (bot.services.market_scanner).
+        
+        Returns a boolean mask over the universe rows worth a full analyze(),
+        or None if the strategy does not scan beyond its configured symbols.
+        """
+        return None
+    
+    def symbols_to_analyze(self) -> List[str]:
+        """Configured symbols followed by scanner candidates."""
+        if not self.scan_symbols:
+            return self.symbols
+        configured = set(self.symbols)
+        return self.symbols + [s for s in self.scan_symbols if s not in configured]
         
     def set_risk_manager(self, risk_manager) -> None:
         """Inject risk manager for dynamic position sizing."""
@@ -343,11 +364,15 @@ class MomentumStrategy(TradingStrategy):
         # Volume confirmation threshold (20% above average)
         self.volume_confirmation_ratio = 1.2
         
+    def screen(self, universe):
+        """Moves beyond the threshold either way (entries up, exits down)."""
+        return abs(universe.column('change_pct')) > self.threshold
+        
     def analyze(self, market_data: Dict[str, MarketData], positions: Dict) -> List[Signal]:
         """Synchronous analyze - uses default quantity. For dynamic sizing, use analyze_async."""
         signals = []
         
-        for symbol in self.symbols:
+        for symbol in self.symbols_to_analyze():
             if symbol not in market_data:
                 continue
                 
@@ -403,7 +428,7 @@ class MomentumStrategy(TradingStrategy):
         """Async analyze with full Risk Manager integration for dynamic position sizing."""
         signals = []
         
-        for symbol in self.symbols:
+        for symbol in self.symbols_to_analyze():
             if symbol not in market_data:
                 continue
                 
@@ -469,11 +494,17 @@ class MeanReversionStrategy(TradingStrategy):
         super().__init__("MeanReversion", symbols, config)
         self.band_width = band_width  # 4% bands (was 2% - too narrow for crypto)
         
+    def screen(self, universe):
+        """Price outside the bands around the 24h mid."""
+        mid_price = (universe.column('high') + universe.column('low')) / 2
+        price = universe.column('last')
+        return (price <= mid_price * (1 - self.band_width)) | (price >= mid_price * (1 + self.band_width))
+        
     async def analyze(self, market_data: Dict[str, MarketData], positions: Dict) -> List[Signal]:
         """Analyze market data for mean reversion opportunities with dynamic position sizing."""
         signals = []
         
-        for symbol in self.symbols:
+        for symbol in self.symbols_to_analyze():
             if symbol not in market_data:
                 continue
                 
@@ -550,11 +581,19 @@ class GridTradingStrategy(TradingStrategy):
         self.levels = levels
         self.grids: Dict[str, List[float]] = {}
         
+    # No screen(): a grid is a standing ladder of orders on one market, so it
+    # only runs on configured symbols, not on candidates that change each scan
+    
     async def analyze(self, market_data: Dict[str, MarketData], positions: Dict) -> List[Signal]:
         """Analyze market data for grid trading with dynamic position sizing."""
         signals = []
         
-        for symbol in self.symbols:
+        symbols = self.symbols_to_analyze()
+        # Drop grids of symbols no longer traded
+        for symbol in set(self.grids).difference(symbols):
+            del self.grids[symbol]
+        
+        for symbol in symbols:
             if symbol not in market_data:
                 continue
                 
@@ -833,6 +872,12 @@ class AutoTradingEngine:
         # Real-time data cache (updated by WebSocket or polling)
         self._market_data_cache: Dict[str, MarketData] = {}
         self._cache_expiry_seconds = 60  # Cache valid for 60 seconds
+        
+        # Scanner mode: whole-exchange tickers instead of per-symbol fetches
+        self.market_scanner = None
+        self.scan_quote = "USDT"
+        self.scan_min_quote_volume = 0.0
+        self.scan_max_candidates = 20
     
     def set_portfolio_manager(self, portfolio_manager) -> None:
         """Set the portfolio manager for portfolio-aware trading."""
@@ -847,6 +892,14 @@ class AutoTradingEngine:
     def set_dca_manager(self, dca_manager) -> None:
         """Set the DCA manager for Dollar Cost Averaging."""
         self.dca_manager = dca_manager
+    
+    def set_market_scanner(self, market_scanner, quote: str = "USDT",
+                           min_quote_volume: float = 0.0, max_candidates: int = 20) -> None:
+        """Set the market scanner: market data from its universe, strategies screen the whole exchange."""
+        self.market_scanner = market_scanner
+        self.scan_quote = quote
+        self.scan_min_quote_volume = min_quote_volume
+        self.scan_max_candidates = max_candidates
         
     def add_strategy(self, strategy: TradingStrategy) -> None:
         """Add a strategy to the engine and inject dependencies."""
@@ -887,7 +940,12 @@ class AutoTradingEngine:
         
         # Check if we have a LiveBroker with CCXT client
         if hasattr(self.broker, 'client'):
-            for symbol in self.symbols:
+            symbols = self.symbols
+            if self.market_scanner and self.market_scanner.is_fresh():
+                # Scanner mode: served from the last fetch_tickers(), no request per symbol
+                market_data = self.market_scanner.universe.market_data(self.symbols)
+                symbols = [s for s in self.symbols if s not in market_data]
+            for symbol in symbols:
                 try:
                     # Fetch ticker data from exchange
                     if hasattr(self.broker.client, 'get_ticker_stats'):
@@ -931,6 +989,28 @@ class AutoTradingEngine:
             
         return market_data
         
+    def _with_scan_candidates(self, market_data: Dict[str, MarketData],
+                              strategies: List[TradingStrategy]) -> Dict[str, MarketData]:
+        """Screen the scanner universe per strategy and merge candidate market data."""
+        from .services.market_scanner import screen_candidates
+        
+        universe = self.market_scanner.universe
+        candidates = set()
+        for strategy in strategies:
+            if not strategy.active:
+                continue
+            try:
+                candidates.update(screen_candidates(
+                    strategy, universe, quote=self.scan_quote,
+                    min_quote_volume=self.scan_min_quote_volume, limit=self.scan_max_candidates
+                ))
+            except Exception as e:
+                logger.warning(f"Strategy {strategy.name} screen failed: {e}")
+        missing = candidates.difference(market_data)
+        if not missing:
+            return market_data
+        return {**universe.market_data(missing), **market_data}
+        
     def get_mock_market_data(self) -> Dict[str, MarketData]:
         """Generate mock market data for testing only."""
         # WARNING: This should only be used in test mode!
@@ -1088,7 +1168,7 @@ class AutoTradingEngine:
                 # Prepare order data
                 order_data = {
                     'user_id': self.user_id,
-                    'strategy': signal.strategy_name if hasattr(signal, 'strategy_name') else 'AI_SIGNAL',
+                    'strategy': signal.strategy_name or 'AI_SIGNAL',
                     'symbol': try_symbol, # Use try_symbol
                     'side': side.upper(),
                     'order_type': signal.order_type,
@@ -1283,11 +1363,13 @@ class AutoTradingEngine:
         except Exception as e:
             logger.error(f"Failed to add signal to DLQ: {e}")
         
-    async def run_cycle(self, external_market_data: Dict[str, MarketData] = None) -> List[Signal]:
+    async def run_cycle(self, external_market_data: Dict[str, MarketData] = None,
+                        strategies: Optional[List[TradingStrategy]] = None) -> List[Signal]:
         """Run one trading cycle - analyze and execute signals.
         
         Args:
             external_market_data: Optional pre-fetched market data to avoid duplicate API calls
+            strategies: Only run these strategies (default: all added strategies)
         """
         if not self.active:
             return []
@@ -1308,6 +1390,12 @@ class AutoTradingEngine:
             
             logger.info(f"📊 Fetched real market data for {len(market_data)} symbols")
         
+        # Scanner mode: add the candidates each strategy's screen picked across the exchange
+        if self.market_scanner and self.market_scanner.is_fresh():
+            market_data = self._with_scan_candidates(
+                market_data, strategies if strategies is not None else self.strategies
+            )
+        
         # Handle async vs sync broker and normalize positions to Dict
         if hasattr(self.broker, 'client'):
             positions_list = await self.broker.get_positions()
@@ -1336,7 +1424,7 @@ class AutoTradingEngine:
         
         # Collect signals from all strategies (now supports async analyze)
         all_signals = []
-        for strategy in self.strategies:
+        for strategy in (strategies if strategies is not None else self.strategies):
             if strategy.active:
                 try:
                     # Support both async and sync strategies
@@ -1344,6 +1432,8 @@ class AutoTradingEngine:
                         signals = await strategy.analyze(market_data, positions)
                     else:
                         signals = strategy.analyze(market_data, positions)
+                    for signal in signals:
+                        signal.strategy_name = signal.strategy_name or strategy.name
                     all_signals.extend(signals)
                 except Exception as e:
                     logger.error(f"Strategy {strategy.name} analyze failed: {e}")
@@ -1684,6 +1774,8 @@ class AutoTradingEngine:
                                         continue  # Skip to next signal after all retries
                                     order_success = True
                                     order_result = result
+                                    if isinstance(result, dict):
+                                        signal.fill_price = result.get('average_price')
                                     break  # Success - exit retry loop
                                 except Exception as order_err:
                                     logger.error(f"Order execution failed (attempt {retry_attempt+1}/{TradingConstants.ORDER_RETRY_COUNT}) for {signal.symbol}: {order_err}")
@@ -1751,7 +1843,8 @@ class AutoTradingEngine:
                         try:
                             mi = get_market_intelligence(self.broker.client)
                             order_value_usd = signal.quantity * current_price
-                            liquidity = await mi.check_liquidity(signal.symbol, order_value_usd)
+                            # A sell walks the bids, not the asks
+                            liquidity = await mi.check_liquidity(signal.symbol, order_value_usd, side="sell")
                             
                             if not liquidity.is_liquid:
                                 logger.warning(
@@ -1797,6 +1890,8 @@ class AutoTradingEngine:
                                 logger.error(f"Order failed: {result.get('error')}")
                                 continue
                             order_success = True
+                            if isinstance(result, dict):
+                                signal.fill_price = result.get('average_price')
                         except Exception as order_err:
                             logger.error(f"SELL order execution failed for {signal.symbol}: {order_err}")
                             continue
@@ -2089,6 +2184,7 @@ class AutoTradingEngine:
                 stop_loss=signal.stop_loss,
                 take_profit=signal.take_profit,
                 user_id=self.user_id,
+                strategy=signal.strategy_name,
                 trailing_enabled=trailing_enabled,
                 dynamic_sl_enabled=True,  # Enable dynamic SL/TP adjustment
                 max_hold_hours=max_hold_hours,
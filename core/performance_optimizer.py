@@ -4,10 +4,9 @@ Optimized for 16GB RAM, 6 cores @ 2.271GHz server
 """
 
 import asyncio
-import uvloop
 import concurrent.futures
-import psutil
 import gc
+import importlib
 import os
 import sys
 from typing import Dict, List, Optional, Any, Callable
@@ -17,16 +16,45 @@ import time
 import weakref
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-import asyncpg
-import aioredis
 import json
 from datetime import datetime, timedelta
 
-# Set uvloop as default event loop for better performance
-asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
-
 logger = logging.getLogger(__name__)
 
+
+class _LazyModule:
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# Optional heavy dependencies: importing this module (e.g. from the API
+# routes) no longer loads them; the first optimizer call that needs one does
+psutil = _LazyModule("psutil")
+asyncpg = _LazyModule("asyncpg")
+aioredis = _LazyModule("aioredis")
+
+
+def install_uvloop() -> bool:
+    """
+    Use uvloop for event loops created from now on. Call before the loop
+    starts (uvicorn already picks uvloop by itself when it is installed).
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
 @dataclass
 class SystemResources:
     """System resource configuration for optimization"""
@@ -124,8 +152,8 @@ class OptimizedConnectionManager:
     
     def __init__(self, resources: SystemResources):
         self.resources = resources
-        self.pg_pool: Optional[asyncpg.Pool] = None
-        self.redis_pool: Optional[aioredis.ConnectionPool] = None
+        self.pg_pool: Optional[Any] = None
+        self.redis_pool: Optional[Any] = None
         self.connection_stats = {
             'pg_active': 0,
             'pg_idle': 0,
@@ -713,6 +741,8 @@ async def get_system_performance_stats():
 
 # Example usage
 if __name__ == "__main__":
+    install_uvloop()
+    
     async def main():
         # Initialize optimizer
         await performance_optimizer.initialize()
@@ -13,26 +13,41 @@ from fastapi.responses import HTMLResponse
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any, Optional, Set
+from collections import defaultdict
 from datetime import datetime
 import uuid
 
 # Import our WebSocket system
-from websocket_realtime_system import WebSocketServer, DataStreamPublisher, WebSocketMessage, MessageType
+from websocket_realtime_system import (
+    WebSocketServer, DataStreamPublisher, ClientStream
+)
+
+from bot.realtime.wire_protocol import (
+    ENCODING_MSGPACK, BinaryFrameEncoder, negotiate_encoding, schema_descriptor, split_envelope
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Message types where only the latest value per (channel, symbol) matters
+CONFLATED_MESSAGE_TYPES = {"price_update", "price_feed", "ticker", "market_data"}
+
 class FastAPIWebSocketIntegration:
     """Integracja WebSocket z FastAPI"""
     
-    def __init__(self, app: FastAPI):
+    def __init__(self, app: FastAPI, stream_max_rate: float = 10.0, stream_max_pending: int = 500):
         self.app = app
         self.websocket_server = WebSocketServer()
         self.data_publisher = DataStreamPublisher(self.websocket_server)
         self.active_connections: Dict[str, WebSocket] = {}
         self.connection_info: Dict[str, Dict[str, Any]] = {}
+        self.streams: Dict[str, ClientStream] = {}  # Per-connection send queues
+        self.channel_subscribers: Dict[str, Set[str]] = defaultdict(set)
+        self.stream_max_rate = stream_max_rate
+        self.stream_max_pending = stream_max_pending
+        self.slow_clients_dropped = 0
         
         # Setup WebSocket routes
         self._setup_websocket_routes()
@@ -65,13 +80,70 @@ class FastAPIWebSocketIntegration:
         async def portfolio_websocket(websocket: WebSocket, user_id: str):
             await self._handle_portfolio_websocket(websocket, user_id)
     
+    def _register_connection(self, connection_id: str, websocket: WebSocket):
+        """Rejestruje połączenie z własną kolejką wysyłkową (konflacja + back-pressure)"""
+        self.active_connections[connection_id] = websocket
+        
+        def on_slow(slow_id: str, reason: str):
+            self.slow_clients_dropped += 1
+            asyncio.create_task(self._close_slow_connection(slow_id, reason))
+        
+        async def send(payload: Any):
+            if isinstance(payload, bytes):
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload)
+        
+        self.streams[connection_id] = ClientStream(
+            connection_id,
+            send,
+            max_rate=self.stream_max_rate,
+            max_pending=self.stream_max_pending,
+            on_slow=on_slow,
+        ).start()
+        
+        # ?encoding=msgpack switches the connection before the welcome message
+        requested = websocket.query_params.get("encoding")
+        if requested:
+            self._set_encoding(connection_id, requested)
+    
+    def _set_encoding(self, connection_id: str, requested: Optional[str]) -> str:
+        """
+        Ustawia kodowanie połączenia (JSON albo ramki msgpack).
+        
+        Potwierdzenie ze schematem idzie jeszcze jako JSON; wszystko, co
+        trafi do kolejki później, jest kodowane już nowym enkoderem.
+        """
+        encoding = negotiate_encoding(requested)
+        stream = self.streams.get(connection_id)
+        if stream is None:
+            return encoding
+        stream.offer(json.dumps({
+            "type": "encoding_negotiated",
+            "data": {
+                "encoding": encoding,
+                "schema": schema_descriptor() if encoding == ENCODING_MSGPACK else None
+            }
+        }))
+        stream.encoder = BinaryFrameEncoder().encode if encoding == ENCODING_MSGPACK else None
+        return encoding
+    
+    async def _close_slow_connection(self, connection_id: str, reason: str):
+        websocket = self.active_connections.get(connection_id)
+        await self._cleanup_connection(connection_id)
+        if websocket is not None:
+            try:
+                await websocket.close(code=1013, reason="Client too slow")
+            except Exception:
+                pass
+    
     async def _handle_websocket_connection(self, websocket: WebSocket):
         """Obsługuje główne połączenie WebSocket"""
         connection_id = str(uuid.uuid4())
         
         try:
             await websocket.accept()
-            self.active_connections[connection_id] = websocket
+            self._register_connection(connection_id, websocket)
             
             # Store connection info
             self.connection_info[connection_id] = {
@@ -123,7 +195,7 @@ class FastAPIWebSocketIntegration:
         
         try:
             await websocket.accept()
-            self.active_connections[connection_id] = websocket
+            self._register_connection(connection_id, websocket)
             
             # Auto-subscribe to trading channels
             await self._auto_subscribe_trading(connection_id)
@@ -145,7 +217,7 @@ class FastAPIWebSocketIntegration:
         
         try:
             await websocket.accept()
-            self.active_connections[connection_id] = websocket
+            self._register_connection(connection_id, websocket)
             
             # Auto-subscribe to analytics channels
             await self._auto_subscribe_analytics(connection_id)
@@ -167,7 +239,7 @@ class FastAPIWebSocketIntegration:
         
         try:
             await websocket.accept()
-            self.active_connections[connection_id] = websocket
+            self._register_connection(connection_id, websocket)
             
             # Store user info
             if connection_id not in self.connection_info:
@@ -214,6 +286,9 @@ class FastAPIWebSocketIntegration:
             elif message_type == "get_status":
                 await self._send_status_update(connection_id)
                 
+            elif message_type == "negotiate":
+                self._set_encoding(connection_id, message.get("encoding"))
+                
             else:
                 logger.warning(f"Unknown message type from {connection_id}: {message_type}")
                 
@@ -290,9 +365,11 @@ class FastAPIWebSocketIntegration:
             await self._send_error(connection_id, "Channel required for subscription")
             return
         
-        # Add to connection subscriptions
+        # Add to connection subscriptions (trading/analytics sockets keep no
+        # connection info and receive direct replies only, not broadcasts)
         if connection_id in self.connection_info:
             self.connection_info[connection_id]["subscriptions"].add(channel)
+            self.channel_subscribers[channel].add(connection_id)
         
         await self._send_message(connection_id, {
             "type": "subscription_confirmed",
@@ -344,6 +421,14 @@ class FastAPIWebSocketIntegration:
     
     async def _send_message(self, connection_id: str, message: Dict[str, Any]):
         """Wysyła wiadomość do konkretnego połączenia"""
+        stream = self.streams.get(connection_id)
+        if stream is not None:
+            if stream.encoder is not None:
+                kind, data, timestamp = split_envelope(message)
+                stream.offer((kind, message.get("channel"), data, timestamp))
+            else:
+                stream.offer(json.dumps(message))
+            return
         if connection_id in self.active_connections:
             try:
                 websocket = self.active_connections[connection_id]
@@ -391,7 +476,17 @@ class FastAPIWebSocketIntegration:
     async def _cleanup_connection(self, connection_id: str):
         """Czyści połączenie"""
         self.active_connections.pop(connection_id, None)
-        self.connection_info.pop(connection_id, None)
+        conn_info = self.connection_info.pop(connection_id, None)
+        stream = self.streams.pop(connection_id, None)
+        if stream is not None:
+            stream.close()
+        channels = conn_info.get("subscriptions", ()) if conn_info else ()
+        for channel in list(channels):
+            subscribers = self.channel_subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(connection_id)
+                if not subscribers:
+                    del self.channel_subscribers[channel]
         logger.info(f"Cleaned up connection: {connection_id}")
     
     # Trading-specific handlers
@@ -445,11 +540,44 @@ class FastAPIWebSocketIntegration:
             }
         })
     
-    async def broadcast_to_channel(self, channel: str, message: Dict[str, Any]):
-        """Broadcastuje wiadomość do wszystkich subskrybentów kanału"""
-        for connection_id, conn_info in self.connection_info.items():
-            if channel in conn_info.get("subscriptions", set()):
+    async def broadcast_to_channel(self, channel: str, message: Dict[str, Any],
+                                   conflate_key: Optional[str] = None) -> int:
+        """
+        Broadcastuje wiadomość do wszystkich subskrybentów kanału.
+        
+        Nie czeka na klientów - payload trafia do kolejek per połączenie.
+        Dla cen (CONFLATED_MESSAGE_TYPES z symbolem albo jawny
+        ``conflate_key``) wolny klient dostaje tylko najnowszą wartość.
+        JSON jest serializowany raz; klienci binarni dostają wspólną
+        krotkę, którą ich strumień koduje deltami we własnej ramce.
+        """
+        subscribers = self.channel_subscribers.get(channel)
+        if not subscribers:
+            return 0
+        
+        if conflate_key is None and message.get("type") in CONFLATED_MESSAGE_TYPES:
+            data = message.get("data")
+            conflate_key = (data.get("symbol") if isinstance(data, dict) else None) or message.get("symbol")
+        key = (channel, conflate_key) if conflate_key is not None else None
+        
+        payload = None
+        update = None
+        sent = 0
+        for connection_id in list(subscribers):
+            stream = self.streams.get(connection_id)
+            if stream is not None and stream.encoder is not None:
+                if update is None:
+                    kind, data, timestamp = split_envelope(message)
+                    update = (kind, channel, data, timestamp)
+                sent += stream.offer(update, key)
+            elif stream is not None:
+                if payload is None:
+                    payload = json.dumps(message)
+                sent += stream.offer(payload, key)
+            else:
                 await self._send_message(connection_id, message)
+                sent += 1
+        return sent
     
     async def broadcast_to_user(self, user_id: str, message: Dict[str, Any]):
         """Broadcastuje wiadomość do konkretnego użytkownika"""
@@ -468,6 +596,10 @@ class FastAPIWebSocketIntegration:
                 "portfolio": len([c for c in self.active_connections.keys() if c.startswith("portfolio_")])
             },
             "total_subscriptions": sum(len(info.get("subscriptions", set())) for info in self.connection_info.values()),
+            "degraded_clients": sum(1 for stream in self.streams.values() if stream.degraded),
+            "queued_messages": sum(stream.backlog for stream in self.streams.values()),
+            "slow_clients_dropped": self.slow_clients_dropped,
+            "binary_clients": sum(1 for stream in self.streams.values() if stream.encoder is not None),
             "authenticated_users": len({info.get("user_id") for info in self.connection_info.values() if info.get("user_id")})
         }
 
@@ -30,6 +30,7 @@ try:
 except ImportError:
     SQLALCHEMY_AVAILABLE = False
 
+from bot.core.performance_metrics import PerformanceAggregate
 from bot.security import get_security_manager
 from bot.exchange_adapters.ccxt_adapter import CCXTAdapter, Position
 
@@ -284,6 +285,47 @@ async def get_monthly_pnl_from_supabase(supabase: 'Client', user_id: str) -> dic
     return result
 
 
+def get_monthly_pnl_from_metrics(conn, user_id: str, since: datetime.datetime) -> dict:
+    """
+    Monthly P&L from the daily trade_performance_metrics buckets.
+
+    Reads at most ~30 pre-aggregated rows instead of rescanning trades.
+    Returns an empty dict when the store has nothing for the user.
+    """
+    rows = conn.execute(text("""
+        SELECT trade_count, win_count, loss_count, pnl_sum, pnl_sum_sq,
+               gross_profit, gross_loss, volume, best_trade, worst_trade,
+               equity, peak_equity, trough_equity, max_drawdown,
+               first_trade_at, last_trade_at
+        FROM trade_performance_metrics
+        WHERE user_id = :user_id
+        AND strategy_name = ''
+        AND resolution = '1d'
+        AND bucket_start >= :since
+        ORDER BY bucket_start ASC
+    """), {"user_id": user_id, "since": since.replace(hour=0, minute=0, second=0, microsecond=0)}).mappings().all()
+    if not rows:
+        return {}
+
+    metrics = PerformanceAggregate()
+    for row in rows:
+        metrics.merge(PerformanceAggregate.from_row(dict(row)))
+    return {
+        'total_pnl': metrics.pnl_sum,
+        'realized_pnl': metrics.pnl_sum,
+        'trade_count': metrics.trade_count,
+        'winning_trades': metrics.win_count,
+        'losing_trades': metrics.loss_count,
+        'win_rate': metrics.win_rate,
+        'avg_win': metrics.average_win,
+        'avg_loss': metrics.average_loss,
+        'best_trade': max(metrics.best_trade or 0.0, 0.0),
+        'worst_trade': min(metrics.worst_trade or 0.0, 0.0),
+        'total_volume': metrics.volume,
+        'max_drawdown': metrics.max_drawdown,
+    }
+
+
 async def get_monthly_pnl_from_db(engine, user_id: str) -> dict:
     """Fetch monthly P&L statistics from trades and positions tables."""
     result = {
@@ -306,6 +348,14 @@ async def get_monthly_pnl_from_db(engine, user_id: str) -> dict:
             # Get trades from last 30 days
             thirty_days_ago = datetime.datetime.now() - timedelta(days=30)
             
+            # Aggregates come from the metrics store when it covers the user;
+            # the trade queries below then only feed the recent-trades list.
+            try:
+                aggregated = get_monthly_pnl_from_metrics(conn, user_id, thirty_days_ago)
+            except Exception:
+                conn.rollback()
+                aggregated = {}
+            
             all_trades = []
             
             # === SOURCE 1: Try 'trades' table ===
@@ -468,6 +518,8 @@ async def get_monthly_pnl_from_db(engine, user_id: str) -> dict:
                 if losing_pnls:
                     result['avg_loss'] = sum(losing_pnls) / len(losing_pnls)
                     result['worst_trade'] = min(losing_pnls)
+            
+            result.update(aggregated)
                     
     except Exception as e:
         # Log error for debugging
@@ -8,6 +8,7 @@ import os
 import sys
 import asyncio
 import logging
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -47,41 +48,50 @@ class UserPrefixFormatter(logging.Formatter):
         )
 
 
-async def run_bot_for_user(user_id: str, color: str, semaphore: asyncio.Semaphore):
+async def run_bot_for_user(user_id: str, color: str, fleet):
     """Run a bot instance for a single user."""
-    async with semaphore:
-        print(f"{color}🚀 Starting bot for user {user_id[:8]}...{RESET}")
+    record = fleet.users.get(user_id)
+    if record is None or not record.has_keys or record.error:
+        reason = record.error if record else "not loaded"
+        print(f"{color}⏭️  Skipping user {user_id[:8]}: {reason}{RESET}")
+        return
+    
+    # Czekamy tylko na budżet zapytań giełdy, bez sztywnego limitu i odstępów
+    waited = await fleet.acquire_startup(record.exchange)
+    print(f"{color}🚀 Starting bot for user {user_id[:8]}"
+          f"{f' (waited {waited:.1f}s for {record.exchange} budget)' if waited else ''}...{RESET}")
+    
+    try:
+        from bot.auto_trader import AutomatedTradingBot
+        
+        # Create bot instance
+        bot = AutomatedTradingBot(
+            user_id=user_id,
+            exchange_name=None,  # Will load from DB
+            test_mode=False,
+            futures=False,
+            margin=True,  # Enable margin for shorting
+            bootstrap=record  # Keys, settings and markets already loaded
+        )
         
-        try:
-            from bot.auto_trader import AutomatedTradingBot
-            
-            # Create bot instance
-            bot = AutomatedTradingBot(
-                user_id=user_id,
-                exchange_name=None,  # Will load from DB
-                test_mode=False,
-                futures=False,
-                margin=True  # Enable margin for shorting
-            )
-            
-            # Setup custom logger for this user
-            bot_logger = logging.getLogger(f'bot.{user_id[:8]}')
-            handler = logging.StreamHandler()
-            handler.setFormatter(UserPrefixFormatter(user_id, color))
-            bot_logger.handlers = [handler]
-            bot_logger.setLevel(logging.INFO)
-            
-            # Initialize and run
-            await bot.initialize()
-            print(f"{color}✅ Bot initialized for user {user_id[:8]}{RESET}")
-            
-            # Run forever
-            await bot.run_forever()
-            
-        except Exception as e:
-            print(f"{color}❌ Bot error for user {user_id[:8]}: {e}{RESET}")
-            import traceback
-            traceback.print_exc()
+        # Setup custom logger for this user
+        bot_logger = logging.getLogger(f'bot.{user_id[:8]}')
+        handler = logging.StreamHandler()
+        handler.setFormatter(UserPrefixFormatter(user_id, color))
+        bot_logger.handlers = [handler]
+        bot_logger.setLevel(logging.INFO)
+        
+        # Initialize and run
+        await bot.initialize()
+        print(f"{color}✅ Bot initialized for user {user_id[:8]}{RESET}")
+        
+        # Run forever
+        await bot.run_forever()
+        
+    except Exception as e:
+        print(f"{color}❌ Bot error for user {user_id[:8]}: {e}{RESET}")
+        import traceback
+        traceback.print_exc()
 
 
 async def main():
@@ -95,17 +105,22 @@ async def main():
     # Create logs directory
     Path("logs").mkdir(exist_ok=True)
     
-    # Limit concurrent initializations to avoid rate limiting
-    semaphore = asyncio.Semaphore(3)
+    from bot.services.fleet_bootstrap import FleetBootstrap
+    
+    # Jedno przejście: klucze API, ustawienia i rynki dla wszystkich użytkowników
+    started = time.monotonic()
+    fleet = FleetBootstrap(USER_IDS)
+    await fleet.load()
+    await fleet.prewarm_markets()
+    status = fleet.get_status()
+    print(f"📦 Bootstrap: {status['ready']}/{status['users']} users ready in {time.monotonic() - started:.1f}s "
+          f"| shared markets: {', '.join(status['shared_markets']) or 'none'}")
     
-    # Create tasks for all users
-    tasks = []
-    for i, user_id in enumerate(USER_IDS):
-        color = COLORS[i % len(COLORS)]
-        task = asyncio.create_task(run_bot_for_user(user_id, color, semaphore))
-        tasks.append(task)
-        # Stagger starts to avoid rate limiting
-        await asyncio.sleep(2)
+    # Create tasks for all users (startup is gated per exchange inside)
+    tasks = [
+        asyncio.create_task(run_bot_for_user(user_id, COLORS[i % len(COLORS)], fleet))
+        for i, user_id in enumerate(USER_IDS)
+    ]
     
     # Wait for all bots (they run forever)
     try:
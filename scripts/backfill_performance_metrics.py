@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Rebuild trade_performance_metrics from closed trades.
+
+New closes are folded in as they are saved; run this once after applying
+migration 003 (or to repair a user's metrics with --force).
+
+Run: python scripts/backfill_performance_metrics.py [--user USER_ID] [--force] [--batch-size 5000]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import DatabaseManager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user", action="append", dest="users",
+                        help="User id to rebuild (repeatable; default: every user with closed trades)")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild even if the metrics already cover the trade history")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with DatabaseManager() as db:
+        users = args.users or db.list_trade_user_ids()
+
+    for user_id in users:
+        with DatabaseManager() as db:
+            if not args.force and not db.performance_metrics_need_backfill(user_id=user_id):
+                print(f"{user_id}: up to date")
+                continue
+            processed = db.backfill_performance_metrics(user_id=user_id, batch_size=args.batch_size)
+            metrics = db.get_performance_metrics(user_id=user_id)
+        print(f"{user_id}: {processed} trades, pnl={metrics.pnl_sum:+.2f} "
+              f"win_rate={metrics.win_rate:.1f}% max_dd={metrics.max_drawdown:.2f}")
+
+
+if __name__ == "__main__":
+    main()
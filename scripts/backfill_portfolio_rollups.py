@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Fold portfolio snapshot history into portfolio_rollups.
+
+New snapshots are folded in as they are recorded; run this once after
+applying migration 002 (or to repair a user's rollups with --force).
+
+Run: python scripts/backfill_portfolio_rollups.py [--user USER_ID] [--force] [--batch-size 5000]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot.db import DatabaseManager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user", action="append", dest="users",
+                        help="User id to rebuild (repeatable; default: every user with snapshots)")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild even if the rollups already cover the snapshot history")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with DatabaseManager() as db:
+        users = args.users or db.list_portfolio_user_ids()
+
+    for user_id in users:
+        with DatabaseManager() as db:
+            if not args.force and not db.portfolio_rollups_need_backfill(user_id=user_id):
+                print(f"{user_id}: up to date")
+                continue
+            processed = db.backfill_portfolio_rollups(user_id=user_id, batch_size=args.batch_size)
+        print(f"{user_id}: {processed} snapshots")
+
+
+if __name__ == "__main__":
+    main()
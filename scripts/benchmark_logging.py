@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Measure event-loop time spent in logging calls, sync vs queue-based pipeline.
+
+Simulates position monitor passes (several emoji f-string INFO lines per
+position per pass) inside a coroutine and times only the logging calls as
+seen by the event loop. Output goes to a temporary file so terminal speed
+does not dominate.
+
+Run: python scripts/benchmark_logging.py [--positions 50] [--passes 40] [--format rich]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bot import logging_setup  # noqa: E402
+
+
+async def _monitor_pass(logger, positions: int) -> float:
+    spent = 0.0
+    for i in range(positions):
+        symbol = f"COIN{i}/USDT"
+        price = 100.0 + i
+        start = time.perf_counter()
+        logger.info(f"📊 {symbol}: price={price:.4f} entry={price * 0.98:.4f} pnl=+2.04%")
+        logger.info(f"🛡️ {symbol}: SL={price * 0.95:.4f} TP={price * 1.1:.4f} trailing=active")
+        logger.info(f"🎯 {symbol}: distance to SL 5.00%, distance to TP 10.00%")
+        logger.info(f"⏱️ {symbol}: next check in 5s (api_key=abcdef123456 should be redacted)")
+        spent += time.perf_counter() - start
+        await asyncio.sleep(0)
+    return spent
+
+
+async def _run(logger, positions: int, passes: int) -> float:
+    total = 0.0
+    for _ in range(passes):
+        total += await _monitor_pass(logger, positions)
+    return total
+
+
+def _measure(label: str, mode: str, fmt: str, positions: int, passes: int, **options) -> float:
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as sink:
+        logging_setup.configure_logging(mode=mode, fmt=fmt, stream=sink, **options)
+        logger = logging_setup.get_logger(f"benchmark.{label}")
+        wall_start = time.perf_counter()
+        spent = asyncio.run(_run(logger, positions, passes))
+        logging_setup.stop_logging()
+        wall = time.perf_counter() - wall_start
+    calls = positions * passes * 4
+    print(f"{label:<28} loop time in logging: {spent * 1000:9.1f} ms "
+          f"({spent / calls * 1e6:7.2f} us/call)   wall incl. drain: {wall * 1000:9.1f} ms")
+    return spent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--passes", type=int, default=40)
+    parser.add_argument("--format", default="rich", choices=["rich", "text", "json"])
+    args = parser.parse_args()
+
+    print(f"{args.positions} positions x {args.passes} passes x 4 lines, format={args.format}")
+    before = _measure("sync (before)", "sync", args.format, args.positions, args.passes)
+    no_sampling = _measure("async, no sampling", "async", args.format, args.positions, args.passes,
+                           rate=1e9, burst=10**9, sample_burst=10**9)
+    after = _measure("async + sampling (after)", "async", args.format, args.positions, args.passes)
+    print(f"event-loop logging time reduced {before / max(no_sampling, 1e-9):.1f}x by the queue, "
+          f"{before / max(after, 1e-9):.1f}x with sampling")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Profile import time and memory of the bot and API entry points.
+
+Each entry point is loaded in a fresh interpreter under ``-X importtime``
+(its top-level code runs, ``__main__`` blocks do not), then the modules its
+startup path imports are imported. The report shows wall time, total import
+time, peak RSS, the packages and modules that dominate, and whether any heavy
+optional stack (torch, sklearn, textblob, openai, uvloop, psutil, ...) was
+loaded eagerly.
+
+With --check the run fails when an entry point exceeds its import budget or
+loads a heavy optional module at startup - restart time is time in which
+open positions are not monitored.
+
+Run: python scripts/profile_startup.py [--entry start_bot] [--module bot.db] [--top 15] [--check] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (script run as a module, modules its startup path imports)
+ENTRY_POINTS: Dict[str, tuple] = {
+    "start_bot": ("start_bot.py", ("bot.auto_trader",)),
+    "run_single_user": ("run_single_user.py", ()),
+    "app": ("app.py", ()),
+    "src_main": ("src/main.py", ()),
+}
+
+# Total import time allowed per entry point (ms). Raise deliberately, with
+# the profile that justifies it, never to silence a regression.
+IMPORT_BUDGET_MS: Dict[str, float] = {
+    "start_bot": 2500.0,
+    "run_single_user": 2500.0,
+    "app": 2000.0,
+    "src_main": 2000.0,
+}
+
+# Optional subsystems that must only be imported when actually used
+HEAVY_OPTIONAL_MODULES = (
+    "torch", "sklearn", "ta", "textblob", "nltk", "openai",
+    "uvloop", "psutil", "asyncpg", "aioredis",
+)
+
+# Heavy modules an entry point may load because a required dependency does
+ALLOWED_HEAVY: Dict[str, tuple] = {
+    "src_main": ("psutil",),  # opentelemetry.sdk resource detection
+}
+
+_RESULT_MARKER = "@@startup-profile@@"
+
+_CHILD = r"""
+import json, runpy, sys, time
+start = time.perf_counter()
+script, modules = sys.argv[1], sys.argv[2:]
+error = None
+try:
+    if script:
+        runpy.run_path(script, run_name="__startup_profile__")
+    for name in modules:
+        __import__(name)
+except BaseException as exc:  # SystemExit from config checks too
+    error = f"{type(exc).__name__}: {str(exc).splitlines()[0] if str(exc) else ''}"
+elapsed_ms = (time.perf_counter() - start) * 1000
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss_kb / (1024 * 1024) if sys.platform == "darwin" else rss_kb / 1024
+except ImportError:
+    rss_mb = None
+packages = sorted({name.split(".")[0] for name in list(sys.modules)})
+print(MARKER + json.dumps({"error": error, "wall_ms": elapsed_ms, "rss_mb": rss_mb,
+                           "module_count": len(sys.modules), "packages": packages}))
+""".replace("MARKER", repr(_RESULT_MARKER))
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Parse ``-X importtime`` lines into {name, self_us, cumulative_us, depth}."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        raw_name = parts[2].rstrip()
+        name = raw_name.lstrip()
+        records.append({
+            "name": name,
+            "self_us": int(parts[0]),
+            "cumulative_us": int(parts[1]),
+            "depth": (len(raw_name) - len(name) - 1) // 2,
+        })
+    return records
+
+
+def profile_entry(script: Optional[str], modules: Sequence[str] = ()) -> dict:
+    """Load ``script`` and import ``modules`` in a fresh interpreter and measure it."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, script or "", *modules],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(_RESULT_MARKER):
+            result = json.loads(line[len(_RESULT_MARKER):])
+    if result is None:
+        result = {"error": f"interpreter exited with {proc.returncode}: {proc.stderr.strip()[-300:]}",
+                  "wall_ms": None, "rss_mb": None, "module_count": 0, "packages": []}
+
+    records = parse_importtime(proc.stderr)
+    by_package: Dict[str, int] = defaultdict(int)
+    for record in records:
+        by_package[record["name"].split(".")[0]] += record["self_us"]
+    result["import_ms"] = sum(record["self_us"] for record in records) / 1000
+    result["packages_ms"] = {
+        package: us / 1000 for package, us in sorted(by_package.items(), key=lambda item: -item[1])
+    }
+    result["slowest"] = [
+        (record["name"], record["cumulative_us"] / 1000)
+        for record in sorted(records, key=lambda record: -record["cumulative_us"])
+    ]
+    result["heavy"] = sorted(set(HEAVY_OPTIONAL_MODULES) & set(result["packages"]))
+    return result
+
+
+def _print_report(name: str, target: str, result: dict, top: int, budget: Optional[float]):
+    print(f"== {name} ({target})")
+    wall = f"{result['wall_ms']:.0f} ms" if result["wall_ms"] is not None else "n/a"
+    rss = f"{result['rss_mb']:.1f} MB" if result["rss_mb"] is not None else "n/a"
+    budget_note = f" / budget {budget:.0f} ms" if budget else ""
+    print(f"   wall {wall} | imports {result['import_ms']:.0f} ms{budget_note} "
+          f"({result['module_count']} modules) | peak RSS {rss}")
+    if result["error"]:
+        print(f"   ⚠️  incomplete, startup raised {result['error']}")
+    packages = list(result["packages_ms"].items())[:top]
+    print("   packages (self time): " + ", ".join(f"{package} {ms:.0f}" for package, ms in packages))
+    print("   slowest imports (cumulative ms):")
+    for module, ms in result["slowest"][:top]:
+        print(f"      {ms:8.1f}  {module}")
+    print(f"   heavy optional modules loaded: {', '.join(result['heavy']) or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entry", action="append", choices=sorted(ENTRY_POINTS),
+                        help="entry point to profile (repeatable, default: all)")
+    parser.add_argument("--module", action="append", default=[],
+                        help="profile importing a module instead (repeatable)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 when a budget is exceeded or a heavy optional module is loaded")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+
+    if args.module:
+        targets = {"modules": (None, tuple(args.module))}
+    else:
+        targets = {name: ENTRY_POINTS[name] for name in (args.entry or ENTRY_POINTS)}
+
+    results = {}
+    failures = []
+    for name, (script, modules) in targets.items():
+        result = profile_entry(script, modules)
+        results[name] = result
+        budget = IMPORT_BUDGET_MS.get(name)
+        if not args.json:
+            _print_report(name, " + ".join(filter(None, [script, *modules])), result, args.top, budget)
+        if budget and result["import_ms"] > budget:
+            failures.append(f"{name}: imports took {result['import_ms']:.0f} ms (budget {budget:.0f} ms)")
+        heavy = [module for module in result["heavy"] if module not in ALLOWED_HEAVY.get(name, ())]
+        if heavy:
+            failures.append(f"{name}: heavy optional modules imported at startup: {', '.join(heavy)}")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    if args.check and failures:
+        print("\n❌ Startup import budget exceeded:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,14 @@
 
 import re
 import ipaddress
-from typing import Set, List, Dict, Any
+from typing import Set, List, Dict, Any, Optional
 from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 import json
 import time
 from src.infrastructure.logging.logger import get_logger
+from bot.core.rate_limit import SlidingWindowLimiter
 
 logger = get_logger(__name__)
 
@@ -16,7 +17,14 @@ logger = get_logger(__name__)
 class WAFMiddleware(BaseHTTPMiddleware):
     """Web Application Firewall middleware."""
     
-    def __init__(self, app):
+    def __init__(self, app, rate_limit_backend: Optional[Any] = None, max_tracked_ips: int = 100000):
+        """
+        Args:
+            rate_limit_backend: Optional shared counter backend (e.g.
+                ``RedisRateLimitBackend``) so per-IP limits hold across workers
+            max_tracked_ips: Cap on per-IP counters kept in memory; the least
+                recently seen IPs are evicted first
+        """
         super().__init__(app)
         self.blocked_ips: Set[str] = set()
         self.allowed_ips: Set[str] = set()
@@ -52,10 +60,18 @@ class WAFMiddleware(BaseHTTPMiddleware):
             r"%2e%2e\\",
         ]
         
-        # Rate limiting per IP
-        self.request_counts: Dict[str, List[float]] = {}
+        # Rate limiting per IP (fixed-memory sliding windows, idle IPs evicted)
         self.max_requests_per_minute = 60
         self.max_requests_per_hour = 1000
+        self.rate_limiter = SlidingWindowLimiter(
+            [
+                ("hour", self.max_requests_per_hour, 3600),
+                ("minute", self.max_requests_per_minute, 60),
+            ],
+            backend=rate_limit_backend,
+            max_keys=max_tracked_ips,
+            idle_ttl=3600,
+        )
 
     async def dispatch(self, request: Request, call_next):
         """Process request through WAF."""
@@ -131,35 +147,8 @@ class WAFMiddleware(BaseHTTPMiddleware):
             return False
 
     def check_rate_limit(self, ip: str) -> bool:
-        """Check if IP is within rate limits."""
-        now = time.time()
-        
-        # Initialize if not exists
-        if ip not in self.request_counts:
-            self.request_counts[ip] = []
-        
-        # Clean old requests (older than 1 hour)
-        self.request_counts[ip] = [
-            req_time for req_time in self.request_counts[ip] 
-            if now - req_time < 3600
-        ]
-        
-        # Check hourly limit
-        if len(self.request_counts[ip]) >= self.max_requests_per_hour:
-            return False
-        
-        # Check per-minute limit
-        recent_requests = [
-            req_time for req_time in self.request_counts[ip]
-            if now - req_time < 60
-        ]
-        
-        if len(recent_requests) >= self.max_requests_per_minute:
-            return False
-        
-        # Add current request
-        self.request_counts[ip].append(now)
-        return True
+        """Check if IP is within rate limits and count the request if so."""
+        return self.rate_limiter.hit(f"waf:{ip}") is None
 
     async def detect_attack(self, request: Request) -> bool:
         """Detect various attack patterns."""
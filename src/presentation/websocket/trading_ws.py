@@ -3,10 +3,18 @@
 import json
 import asyncio
 import random
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect, Depends
 from datetime import datetime
 
+from bot.realtime.wire_protocol import (
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    BinaryFrameEncoder,
+    negotiate_encoding,
+    schema_descriptor,
+    split_envelope,
+)
 from src.application.services.user_service import UserService
 from src.presentation.api.dependencies import get_user_service
 from src.infrastructure.logging.logger import get_logger
@@ -21,22 +29,27 @@ class ConnectionManager:
         self.active_connections: Dict[str, WebSocket] = {}
         self.user_connections: Dict[int, Set[str]] = {}
         self.subscriptions: Dict[str, Set[str]] = {}  # channel -> connection_ids
+        self.encoders: Dict[str, BinaryFrameEncoder] = {}  # binary connections only
         
-    async def connect(self, websocket: WebSocket, connection_id: str, user_id: int):
-        """Accept WebSocket connection."""
+    async def connect(self, websocket: WebSocket, connection_id: str, user_id: int,
+                      encoding: str = ENCODING_JSON):
+        """Accept WebSocket connection; returns the negotiated encoding."""
         await websocket.accept()
         self.active_connections[connection_id] = websocket
+        encoding = self.set_encoding(connection_id, encoding)
         
         if user_id not in self.user_connections:
             self.user_connections[user_id] = set()
         self.user_connections[user_id].add(connection_id)
         
-        logger.info(f"WebSocket connected: {connection_id} (user: {user_id})")
+        logger.info(f"WebSocket connected: {connection_id} (user: {user_id}, encoding: {encoding})")
+        return encoding
 
     def disconnect(self, connection_id: str, user_id: int):
         """Remove WebSocket connection."""
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
+        self.encoders.pop(connection_id, None)
             
         if user_id in self.user_connections:
             self.user_connections[user_id].discard(connection_id)
@@ -49,6 +62,16 @@ class ConnectionManager:
             
         logger.info(f"WebSocket disconnected: {connection_id}")
 
+    def set_encoding(self, connection_id: str, encoding: Optional[str]) -> str:
+        """Switch a connection between JSON and binary frames; returns the encoding in effect."""
+        encoding = negotiate_encoding(encoding)
+        if encoding == ENCODING_MSGPACK:
+            # Delta state is per connection, so each one gets its own encoder
+            self.encoders[connection_id] = BinaryFrameEncoder()
+        else:
+            self.encoders.pop(connection_id, None)
+        return encoding
+
     async def send_personal_message(self, message: str, connection_id: str):
         """Send message to specific connection."""
         if connection_id in self.active_connections:
@@ -70,6 +93,53 @@ class ConnectionManager:
             for connection_id in self.subscriptions[channel].copy():
                 await self.send_personal_message(message, connection_id)
 
+    async def broadcast_updates(self, updates: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Broadcast a batch of (channel, message) updates.
+
+        JSON connections get one text message per update, serialized once
+        per update. Binary connections get a single frame with all of the
+        updates they are subscribed to.
+        """
+        text_batches: Dict[str, List[str]] = {}
+        binary_batches: Dict[str, List[tuple]] = {}
+        for channel, message in updates:
+            subscribers = self.subscriptions.get(channel)
+            if not subscribers:
+                continue
+            payload = None
+            update = None
+            for connection_id in subscribers:
+                if connection_id in self.encoders:
+                    if update is None:
+                        kind, data, timestamp = split_envelope(message)
+                        update = (kind, channel, data, timestamp)
+                    binary_batches.setdefault(connection_id, []).append(update)
+                else:
+                    if payload is None:
+                        payload = json.dumps(message)
+                    text_batches.setdefault(connection_id, []).append(payload)
+
+        sends = [self._send_texts(connection_id, payloads) for connection_id, payloads in text_batches.items()]
+        sends += [self._send_frame(connection_id, batch) for connection_id, batch in binary_batches.items()]
+        if sends:
+            await asyncio.gather(*sends)
+
+    async def _send_texts(self, connection_id: str, payloads: List[str]):
+        for payload in payloads:
+            await self.send_personal_message(payload, connection_id)
+
+    async def _send_frame(self, connection_id: str, batch: List[tuple]):
+        websocket = self.active_connections.get(connection_id)
+        encoder = self.encoders.get(connection_id)
+        if websocket is None or encoder is None:
+            return
+        try:
+            await websocket.send_bytes(encoder.encode(batch))
+        except Exception:
+            # Connection might be closed
+            pass
+
     def subscribe_to_channel(self, connection_id: str, channel: str):
         """Subscribe connection to a channel."""
         if channel not in self.subscriptions:
@@ -94,6 +164,7 @@ class TradingWebSocket:
         self.user_service = user_service
         self.connection_id = f"ws_{datetime.now().timestamp()}"
         self.user = None
+        self.encoding = ENCODING_JSON
         
     async def handle_connection(self):
         """Handle WebSocket connection lifecycle."""
@@ -106,15 +177,19 @@ class TradingWebSocket:
                 return
                 
             # Connect to manager
-            await manager.connect(self.websocket, self.connection_id, self.user.id)
+            self.encoding = await manager.connect(
+                self.websocket, self.connection_id, self.user.id, self.encoding
+            )
             
-            # Send welcome message
+            # Send welcome message (always JSON; carries the schema for binary clients)
             await self.send_message({
                 "type": "connected",
                 "user": {
                     "id": self.user.id,
                     "username": self.user.username
                 },
+                "encoding": self.encoding,
+                "schema": schema_descriptor() if self.encoding == ENCODING_MSGPACK else None,
                 "timestamp": datetime.utcnow().isoformat()
             })
             
@@ -140,6 +215,8 @@ class TradingWebSocket:
             
             auth_data = json.loads(auth_message)
             token = auth_data.get("token")
+            # Optional: {"token": ..., "encoding": "msgpack"} for binary frames
+            self.encoding = auth_data.get("encoding") or ENCODING_JSON
             
             if token:
                 self.user = await self.user_service.get_user_by_session(token)
@@ -185,6 +262,14 @@ class TradingWebSocket:
         elif message_type == "ping":
             await self.send_message({"type": "pong"})
             
+        elif message_type == "negotiate":
+            self.encoding = manager.set_encoding(self.connection_id, message.get("encoding"))
+            await self.send_message({
+                "type": "negotiated",
+                "encoding": self.encoding,
+                "schema": schema_descriptor() if self.encoding == ENCODING_MSGPACK else None
+            })
+            
         else:
             logger.warning(f"Unknown message type: {message_type}")
 
@@ -216,6 +301,7 @@ class PriceFeedService:
         self.running = True
         
         while self.running:
+            updates = []
             for symbol in self.symbols:
                 # Simulate price movement
                 current_price = self.prices[symbol]
@@ -232,10 +318,10 @@ class PriceFeedService:
                     "timestamp": datetime.utcnow().isoformat()
                 }
                 
-                await manager.broadcast_to_channel(
-                    json.dumps(price_update),
-                    f"prices.{symbol}"
-                )
+                updates.append((f"prices.{symbol}", price_update))
+            
+            # One batch per tick: a single frame per binary client
+            await manager.broadcast_updates(updates)
             
             await asyncio.sleep(1)  # Update every second
 
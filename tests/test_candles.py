@@ -0,0 +1,109 @@
+"""
+Test local candles: resampling from base bars, incremental open-bar updates and OHLCV serving
+
+Run: python -m pytest tests/test_candles.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.realtime.candles import CandleStore, resample_ohlcv  # noqa: E402
+
+HOUR = 3_600_000
+MINUTE = 60_000
+
+
+def _minute_bars(start, count):
+    closes = 100.0 + np.arange(count) * 0.1
+    return [[start + i * MINUTE, c - 0.05, c + 0.2, c - 0.3, c, 1.0] for i, c in enumerate(closes)]
+
+
+def test_resampled_and_live_bars_match_exchange_aggregation():
+    start = 1_700_000_000_000 - 1_700_000_000_000 % (4 * HOUR)
+    rows = _minute_bars(start - 30 * MINUTE, 30 + 8 * 60)  # Starts mid-hour
+
+    hourly = resample_ohlcv(np.array(rows), '1h')
+    assert len(hourly) == 8 and hourly[0, 0] == start  # Partial first hour dropped
+    first = np.array(rows[30:90])
+    assert hourly[0, 1] == first[0, 1] and hourly[0, 4] == first[-1, 4]
+    assert hourly[0, 2] == first[:, 2].max() and hourly[0, 3] == first[:, 3].min() and hourly[0, 5] == 60
+
+    store = CandleStore()
+    store.seed('BTC/USDT', '1m', rows)
+    assert store.get_ohlcv('BTC/USDT', '1h', 8) == hourly.tolist()
+    assert store.get_ohlcv('BTC/USDT', '4h', 2)[-1][0] == start + 4 * HOUR
+    assert store.get_ohlcv('BTC/USDT', '1d', 2) is None  # Only the open day is covered: fetch history
+
+    # A kline opening a new hour, resent with cumulative volume: counted once
+    open_time = start + 8 * HOUR
+    store.on_base_bar('BTC/USDT', [open_time, 150.0, 151.0, 149.0, 150.5, 2.0])
+    store.on_base_bar('BTC/USDT', [open_time, 150.0, 152.0, 149.0, 151.5, 5.0])
+    last = store.get_ohlcv('BTC/USDT', '1h', 9)[-1]
+    assert last == [open_time, 150.0, 152.0, 149.0, 151.5, 5.0]
+    assert store.get_ohlcv('BTC/USDT', '1m', 1)[-1] == last
+
+    # Ticker prices move the open bar of every timeframe
+    store.on_tick('BTC/USDT', 153.0, timestamp_ms=open_time + 30_000)
+    assert store.get_ohlcv('BTC/USDT', '5m', 1)[-1][2:5] == [153.0, 149.0, 153.0]
+    four_hour = store.get_ohlcv('BTC/USDT', '4h', 3)[-1]
+    assert four_hour[0] == open_time and four_hour[4] == 153.0
+
+
+def test_ohlcv_fetches_once_then_serves_locally():
+    store = CandleStore(max_age=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [[i * HOUR, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(50)]
+
+    async def run():
+        # Concurrent consumers share one REST call; later ones read local bars
+        first = await asyncio.gather(*(store.ohlcv('ETH/USDT', '4h', 50, fetch) for _ in range(3)))
+        again = await store.ohlcv('ETH/USDT', '4h', 20, fetch)
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert len(calls) == 1 and all(len(rows) == 50 for rows in first)
+    assert len(again) == 20 and again[-1][0] == 49 * HOUR
+    assert store.get_status()["hits"] == 1
+
+    store.max_age = 0.0
+    assert store.get_ohlcv('ETH/USDT', '4h', 20) is None  # No live feed: refetch
+
+
+def _fetch(rows):
+    async def fetch():
+        return rows
+    return fetch
+
+
+def test_bars_missed_by_the_live_feed_are_refetched():
+    start = 1_700_000_000_000 - 1_700_000_000_000 % HOUR
+    store = CandleStore()
+    store.seed('BTC/USDT', '1m', _minute_bars(start, 60))
+    store.on_tick('BTC/USDT', 106.0, timestamp_ms=start + 60 * MINUTE)
+    assert store.get_ohlcv('BTC/USDT', '1m', 10) is not None
+
+    # Reconnected three minutes later: the bars in between never arrived
+    store.on_tick('BTC/USDT', 107.0, timestamp_ms=start + 63 * MINUTE)
+    assert store.get_ohlcv('BTC/USDT', '1m', 10) is None
+    assert store.get_ohlcv('BTC/USDT', '1h', 1) is not None  # Its open bar is still continuous
+
+    fetched = _minute_bars(start, 64)
+    assert asyncio.run(store.ohlcv('BTC/USDT', '1m', 10, _fetch(fetched))) == fetched
+    rows = store.get_ohlcv('BTC/USDT', '1m', 10)
+    assert [row[0] for row in rows] == [start + i * MINUTE for i in range(54, 64)]
+
+    # A silent feed leaves every open bar incomplete, even without a skipped bucket
+    store._last_live['BTC/USDT'] -= 120
+    store.on_tick('BTC/USDT', 108.0, timestamp_ms=start + 63 * MINUTE + 30_000)
+    assert store.get_ohlcv('BTC/USDT', '1h', 1) is None
+    assert store.get_status()["gaps"] == 1
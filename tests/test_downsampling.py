@@ -0,0 +1,40 @@
+"""
+Test LTTB downsampling used by /api/portfolio/performance
+
+Run: python -m pytest tests/test_downsampling.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.core.downsampling import lttb, lttb_indices
+
+
+def test_keeps_short_series_unchanged():
+    xs = [0, 1, 2]
+    ys = [5.0, 6.0, 7.0]
+    assert lttb_indices(xs, ys, 10) == [0, 1, 2]
+
+
+def test_reduces_to_budget_and_keeps_endpoints():
+    xs = list(range(10000))
+    ys = [float((i * 37) % 101) for i in xs]
+    indices = lttb_indices(xs, ys, 200)
+
+    assert len(indices) == 200
+    assert indices[0] == 0
+    assert indices[-1] == len(xs) - 1
+    assert indices == sorted(set(indices))
+
+
+def test_keeps_spike():
+    xs = list(range(1000))
+    ys = [100.0] * 1000
+    ys[500] = 1000.0
+
+    points = lttb([(x, y, "extra") for x, y in zip(xs, ys)], 50)
+
+    assert (500, 1000.0, "extra") in points
@@ -0,0 +1,130 @@
+"""
+Test the emergency exit executor: risk ordering, per-exchange concurrency, retries
+
+Run: python -m pytest tests/test_emergency_exit.py
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import ccxt
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.services.emergency_exit import EmergencyExitExecutor, ExitAborted, ExitRequest  # noqa: E402
+
+
+class _FakeAccount:
+    """Exchange adapter that takes 20ms per order and can fail on demand."""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.orders = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def place_order(self, symbol, side, order_type, quantity, price=None, reduce_only=False):
+        assert reduce_only and order_type == 'market'
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.02)
+            error = self.failures.get(symbol)
+            if error is not None:
+                if isinstance(error, list):
+                    error = error.pop(0) if error else None
+                if error is not None:
+                    raise error
+            self.orders.append((symbol, side))
+            return None
+        finally:
+            self.in_flight -= 1
+
+
+def _request(exchange, symbol, quantity, distance_pct, side='long'):
+    return ExitRequest(key=f"u1:{symbol}", exchange=exchange, symbol=symbol, side=side,
+                       quantity=quantity, price=100.0, distance_pct=distance_pct, user_id="u1")
+
+
+def test_mass_exit_concurrent_risk_ordered_with_retries():
+    async def run():
+        binance = _FakeAccount(failures={
+            "ETH/USDT": [ccxt.NetworkError("timeout")],      # transient: retried
+            "DOGE/USDT": ccxt.InvalidOrder("ReduceOnly rejected"),  # permanent: not retried
+        })
+        bybit = _FakeAccount()
+        requests = [_request(binance, f"A{i}/USDT", 1.0, 5.0) for i in range(6)]
+        requests += [
+            _request(binance, "BTC/USDT", 10.0, 1.0),   # highest risk
+            _request(binance, "ETH/USDT", 5.0, 2.0),
+            _request(binance, "DOGE/USDT", 1.0, 3.0),
+            _request(bybit, "SOL/USDT", 3.0, 2.0, side='short'),
+        ]
+        executor = EmergencyExitExecutor(max_concurrent_per_exchange=2, max_retries=2)
+
+        report = await executor.execute(requests, "test")
+        results = {r.symbol: r for r in report.results}
+
+        assert binance.orders[0] == ("BTC/USDT", "sell")
+        assert bybit.orders == [("SOL/USDT", "buy")]
+        assert binance.max_in_flight == 2  # per-exchange budget
+        assert results["ETH/USDT"].success and results["ETH/USDT"].attempts == 2
+        assert not results["DOGE/USDT"].success and results["DOGE/USDT"].attempts == 1
+        assert len(report.closed) == 9 and report.time_to_flat is None
+        # Ten orders on two accounts, two at a time: far below a serial walk
+        assert report.duration_seconds < 10 * 0.02 + 1.0
+        assert executor.get_status()["recent_events"][0]["failed"][0]["key"] == "u1:DOGE/USDT"
+
+    asyncio.run(run())
+
+
+class _TimeoutAfterSendAccount:
+    """Accepts the first order, then times out before answering."""
+
+    def __init__(self):
+        self.orders = {}
+
+    async def place_order(self, symbol, side, order_type, quantity, price=None, reduce_only=False,
+                          client_order_id=None):
+        self.orders[client_order_id] = {"id": f"o{len(self.orders) + 1}", "status": "closed", "filled": quantity}
+        raise ccxt.RequestTimeout("read timeout")
+
+    async def get_order_by_client_id(self, client_order_id, symbol):
+        return self.orders.get(client_order_id)
+
+
+def test_retry_finds_the_sent_close_instead_of_sending_it_again():
+    async def run():
+        account = _TimeoutAfterSendAccount()
+        flat = _request(account, "BTC/USDT", 1.0, 1.0)
+        held = []
+
+        async def already_flat():
+            held.append("ETH/USDT")
+            return 0.0
+
+        async def filled_stop():
+            raise ExitAborted("resting SL/TP may have filled")
+
+        gone = _request(account, "ETH/USDT", 1.0, 1.0)
+        gone.prepare = already_flat
+        racing = _request(account, "SOL/USDT", 1.0, 1.0)
+        racing.prepare = filled_stop
+        report = await EmergencyExitExecutor(max_retries=3).execute([flat, gone, racing], "test")
+        return account, report, held
+
+    account, report, held = asyncio.run(run())
+    results = {r.symbol: r for r in report.results}
+    assert len(account.orders) == 1  # Sent once despite the timeout
+    assert results["BTC/USDT"].success and results["BTC/USDT"].attempts == 2
+    assert results["BTC/USDT"].order_id == "o1"
+    # Nothing held on the exchange: no order, reported closed
+    assert held == ["ETH/USDT"] and results["ETH/USDT"].success and results["ETH/USDT"].attempts == 0
+    assert results["SOL/USDT"].aborted and not results["SOL/USDT"].success
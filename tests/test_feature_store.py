@@ -0,0 +1,89 @@
+"""
+Test the incremental inference feature store: updates match a full recompute, caching and invalidation
+
+Run: python -m pytest tests/test_feature_store.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# neural_prediction imports torch, sklearn and ta at module level
+pytest.importorskip("torch")
+pytest.importorskip("sklearn")
+pytest.importorskip("ta")
+
+from bot.analysis.neural_prediction import FeatureStore  # noqa: E402
+
+
+def _candles(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'timestamp': pd.date_range("2026-01-01", periods=n, freq="5min"),
+        'open': close + rng.normal(0, 0.2, n),
+        'high': close + 1.0,
+        'low': close - 1.0,
+        'close': close,
+        'volume': rng.uniform(10, 100, n),
+    })
+
+
+def _features(df):
+    """Windowed indicators plus the frame-relative cumulative ones the store carries forward."""
+    typical = (df['high'] + df['low'] + df['close']) / 3
+    signed = np.where(df['close'].diff() < 0, -df['volume'], df['volume'])
+    return pd.DataFrame({
+        'sma_10': df['close'].rolling(10, min_periods=1).mean(),
+        'ema_9': df['close'].ewm(span=9, adjust=False).mean(),
+        'vwap': (typical * df['volume']).cumsum() / df['volume'].cumsum(),
+        'obv': np.cumsum(signed),
+    }, index=df.index)
+
+
+def _full(df):
+    return FeatureStore(_features, capacity=50).update("BTC/USDT:5m", df)
+
+
+def test_incremental_updates_match_a_full_recompute():
+    candles = _candles(400)
+    store = FeatureStore(_features, capacity=50, warmup=100)  # Only a bounded tail is recomputed
+    store.update("BTC/USDT:5m", candles.iloc[:300])
+
+    for end, revision in ((301, 0.0), (304, 0.0), (304, 0.5), (330, 0.0)):
+        df = candles.iloc[:end].copy()
+        df.iloc[-1, df.columns.get_loc('close')] += revision  # Still-forming candle revised
+        window = store.update("BTC/USDT:5m", df).copy()
+        np.testing.assert_allclose(window, _full(df), rtol=1e-5)
+
+    assert store.stats['full_rebuilds'] == 1
+    assert store.stats['incremental_updates'] == 4
+
+
+def test_cache_hits_and_invalidation():
+    candles = _candles(200)
+    store = FeatureStore(_features, capacity=50, warmup=100)
+    first = store.update("ETH/USDT:5m", candles).copy()
+    np.testing.assert_array_equal(store.update("ETH/USDT:5m", candles), first)
+    assert store.stats == {'cache_hits': 1, 'incremental_updates': 0, 'full_rebuilds': 1}
+
+    # Rewound history and more new candles than the window resync from scratch
+    store.update("ETH/USDT:5m", candles.iloc[:150])
+    store.update("ETH/USDT:5m", candles)
+    assert store.stats['full_rebuilds'] == 3
+
+    store.invalidate("ETH/USDT:5m")
+    np.testing.assert_allclose(store.update("ETH/USDT:5m", candles), first, rtol=1e-5)
+    assert store.stats['full_rebuilds'] == 4
+
+    store.update("SOL/USDT:5m", candles)
+    store.invalidate()
+    store.update("SOL/USDT:5m", candles)
+    assert store.stats['full_rebuilds'] == 6
+    assert store.stats['cache_hits'] == 1
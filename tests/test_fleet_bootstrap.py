@@ -0,0 +1,73 @@
+"""
+Test bulk loading of fleet startup state and the per-exchange startup gate
+
+Run: python -m pytest tests/test_fleet_bootstrap.py
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from sqlalchemy import text  # noqa: E402
+
+from bot.db import DatabaseManager, DCASettings, init_db  # noqa: E402
+from bot.services.fleet_bootstrap import FleetBootstrap  # noqa: E402
+
+
+def _seed():
+    init_db()
+    with DatabaseManager.session_scope() as session:
+        session.execute(text("""
+            CREATE TABLE IF NOT EXISTS api_keys (
+                user_id TEXT, encrypted_api_key TEXT, encrypted_api_secret TEXT,
+                exchange TEXT, is_testnet BOOLEAN, is_active BOOLEAN, created_at TEXT
+            )
+        """))
+        session.execute(text("""
+            CREATE TABLE IF NOT EXISTS trading_settings (
+                user_id TEXT, risk_level INTEGER, max_position_size REAL, max_daily_loss REAL,
+                stop_loss_percentage REAL, take_profit_percentage REAL
+            )
+        """))
+        session.execute(text("""
+            INSERT INTO api_keys VALUES
+                ('u1', 'key-old', 'secret-old', 'binance', 0, 1, '2025-01-01'),
+                ('u1', 'key-new', 'secret-new', 'kraken', 0, 1, '2025-06-01'),
+                ('u2', 'key-2', 'secret-2', 'binance', 1, 1, '2025-01-01'),
+                ('u3', 'key-3', 'secret-3', 'binance', 0, 0, '2025-01-01'),
+                ('u4', 'key-4', 'secret-4', 'binance', 0, 1, '2025-01-01')
+        """))
+        session.execute(text("INSERT INTO trading_settings VALUES ('u1', 4, 2500, 150, 2.5, 6.0)"))
+        session.add(DCASettings(user_id="u2", dca_enabled=True))
+
+
+def test_bulk_load_picks_first_active_key_and_settings():
+    _seed()
+    # Plain-text "encrypted" values pass through SecurityManager.decrypt
+    users = FleetBootstrap(["u1", "u2", "u3"])._load_sync()
+
+    assert set(users) == {"u1", "u2", "u3"}  # u4 was not requested
+    assert (users["u1"].exchange, users["u1"].api_key, users["u1"].api_secret) == ("binance", "key-old", "secret-old")
+    assert users["u1"].trading_settings == (4, 2500, 150, 2.5, 6.0)
+    assert users["u1"].dca_config is None
+    assert users["u2"].testnet and users["u2"].dca_config.enabled
+    assert users["u3"].error and not users["u3"].has_keys  # inactive key only
+
+
+def test_startup_gate_spends_exchange_budget():
+    fleet = FleetBootstrap(startup_weight=40)
+
+    async def run():
+        return [await fleet.acquire_startup("binance") for _ in range(3)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.0]
+    bucket = fleet._startup_buckets["binance"]
+    assert bucket.capacity - bucket.available() >= 3 * 40 - 1
@@ -0,0 +1,46 @@
+"""
+Test that optional heavy stacks stay out of the startup import path
+
+Run: python -m pytest tests/test_import_budget.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add project root and scripts to path
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+# bot.db needs a database URL at import time (inherited by the profiled interpreter)
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from profile_startup import parse_importtime, profile_entry  # noqa: E402
+
+
+def test_parse_importtime_lines():
+    records = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     bot.core.cost_basis\n"
+        "import time:      2500 |       2620 |   bot.core\n"
+    )
+    assert [(r["name"], r["self_us"], r["cumulative_us"], r["depth"]) for r in records] == [
+        ("bot.core.cost_basis", 120, 120, 2),
+        ("bot.core", 2500, 2620, 1),
+    ]
+
+
+def test_optional_subsystems_load_lazily():
+    result = profile_entry(None, [
+        "bot.analysis.advanced_analyzer",
+        "core.performance_optimizer",
+        "bot.services.dead_letter_queue",
+        "bot.broker",
+    ])
+    assert result["error"] is None
+    # torch/sklearn/textblob/openai/uvloop/psutil/... only on first use
+    assert result["heavy"] == []
+    # Live brokers, WebSocket streams and the Supabase client likewise
+    assert not {"ccxt", "supabase"} & set(result["packages"])
+    assert result["import_ms"] > 0
@@ -0,0 +1,58 @@
+"""
+Test the async logging pipeline: listener-side formatting and redaction, call-site sampling and shutdown
+
+Run: python -m pytest tests/test_logging_setup.py
+"""
+
+import io
+import json
+import logging
+import queue
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.logging_setup import (  # noqa: E402
+    LazyQueueHandler, RateLimitFilter, configure_logging, get_logger, stop_logging,
+)
+
+
+def _record(lineno=10, level=logging.INFO):
+    return logging.LogRecord("bot.test", level, "bot/x.py", lineno, "tick %s", ("BTC",), None)
+
+
+def test_records_are_queued_raw_and_formatted_by_the_listener():
+    handler = LazyQueueHandler(queue.Queue())
+    handler.handle(_record())
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args) == ("tick %s", ("BTC",))  # No formatting in the caller
+
+    stream = io.StringIO()
+    configure_logging(mode="async", fmt="json", stream=stream)
+    logger = get_logger("bot.test_logging_setup")
+    try:
+        logger.info("state %s", {"price": 1})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed api_key=abcdef123456")
+        stop_logging()
+        logger.info("after stop")  # Written synchronously, not lost in the queue
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == [
+            "state {'price': 1}", "failed api_key=***REDACTED***", "after stop",
+        ]
+        assert "ValueError: boom" in lines[1]["exc"]
+    finally:
+        configure_logging()  # Back to the LOG_* environment defaults
+
+
+def test_call_site_sampling():
+    limiter = RateLimitFilter(rate=1000.0, burst=1000, sample_burst=2, sample_every=100)
+    assert [limiter.filter(_record()) for _ in range(4)] == [True, True, False, False]
+    # Another call site has its own budget, warnings always pass
+    assert limiter.filter(_record(lineno=11))
+    assert limiter.filter(_record(level=logging.WARNING))
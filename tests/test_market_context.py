@@ -0,0 +1,96 @@
+"""
+Test the economic event index and the background-refreshed market context
+
+Run: python -m pytest tests/test_market_context.py
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.services.economic_calendar import EconomicEvent, EconomicEventIndex, EventImpact  # noqa: E402
+from bot.services.market_context import MarketContextService  # noqa: E402
+from bot.services.market_intelligence import MarketIntelligenceService, MarketRegime, MarketSentiment  # noqa: E402
+
+
+def test_event_index_next_pointer():
+    t0 = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+    index = EconomicEventIndex([
+        EconomicEvent("PPI", t0 + timedelta(minutes=10), EventImpact.MEDIUM),
+        EconomicEvent("CPI", t0 + timedelta(minutes=20), EventImpact.HIGH),
+        EconomicEvent("CPI", t0 + timedelta(minutes=20), EventImpact.HIGH),  # duplicate from feed
+        EconomicEvent("FOMC", t0 + timedelta(hours=3), EventImpact.HIGH),
+    ])
+    assert len(index) == 3
+
+    assert index.upcoming(t0, 30, EventImpact.HIGH) == ("CPI", 20.0)
+    assert index.upcoming(t0, 30, EventImpact.MEDIUM) == ("PPI", 10.0)
+    assert index.upcoming(t0, 15, EventImpact.HIGH) is None
+    # Pointer moves past events that have started
+    assert index.next_event(t0 + timedelta(minutes=20)).name == "FOMC"
+    assert index.next_event(t0 + timedelta(hours=4)) is None
+    # ... and re-seeks when asked about an earlier time
+    assert index.next_event(t0, EventImpact.MEDIUM).name == "PPI"
+    assert [e.name for e in index.between(t0, t0 + timedelta(hours=1))] == ["PPI", "CPI"]
+
+
+def _sentiment(fear_greed: int) -> MarketSentiment:
+    return MarketSentiment(
+        fear_greed_index=fear_greed, fear_greed_label="", btc_dominance=50.0,
+        total_market_cap_change_24h=0.0, funding_rate_avg=0.0,
+        regime=MarketRegime.SIDEWAYS, is_safe_to_trade=fear_greed >= 10,
+    )
+
+
+class _CountingIntelligence(MarketIntelligenceService):
+    """Sentiment source without network: returns the next queued value."""
+
+    def __init__(self, values):
+        super().__init__()
+        self.values = list(values)
+        self.fetches = 0
+
+    async def _fetch_sentiment(self):
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        self._cached_sentiment = _sentiment(self.values.pop(0))
+        self._last_sentiment_fetch = datetime.now()
+        return self._cached_sentiment
+
+
+def test_sentiment_stale_while_revalidate_and_published_kill_switch():
+    async def run():
+        mi = _CountingIntelligence([50, 5, 60])
+
+        # Cold: concurrent callers share one fetch
+        first = await asyncio.gather(*(mi.get_market_sentiment() for _ in range(5)))
+        assert {s.fear_greed_index for s in first} == {50} and mi.fetches == 1
+
+        # Stale: last value served immediately, one refresh in the background
+        mi._last_sentiment_fetch -= timedelta(seconds=mi._cache_ttl + 1)
+        stale = await asyncio.gather(*(mi.get_market_sentiment() for _ in range(5)))
+        assert {s.fear_greed_index for s in stale} == {50}
+        await asyncio.sleep(0.05)
+        assert mi.fetches == 2 and (await mi.get_market_sentiment()).fear_greed_index == 5
+
+        # Background context publishes the kill switch; cycles only read it
+        context = MarketContextService(mi, sentiment_interval=3600, kill_switch_interval=3600)
+        await context.start()
+        await asyncio.sleep(0.05)
+        fetches = mi.fetches
+        # Evaluated against the sentiment cached when the loop started
+        assert await mi.should_kill_switch() == (True, "🚨 KILL SWITCH: Extreme Fear (5)")
+        assert mi.fetches == fetches  # read from the flag, no inline evaluation
+        await context.stop()
+        assert not context.running and mi.kill_switch_max_age == 0.0
+
+    asyncio.run(run())
@@ -0,0 +1,93 @@
+"""
+Test the market scanner: columnar ticker universe, cached top-volume ranking and strategy screens
+
+Run: python -m pytest tests/test_market_scanner.py
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.services.market_scanner import MarketScanner, screen_candidates  # noqa: E402
+from bot.strategies import GridTradingStrategy, MeanReversionStrategy, MomentumStrategy  # noqa: E402
+
+
+def _tickers(count=500):
+    tickers = {}
+    for i in range(count):
+        quote = "USDC" if i % 10 == 9 else "USDT"
+        price = 10.0 + i
+        change = 6.0 if i % 50 == 0 else (-4.0 if i % 50 == 1 else 0.5)
+        high, low = price * 1.01, price * 0.99
+        if i % 50 == 2:
+            high, low = price * 1.15, price * 1.06  # Well below the band around the mid
+        tickers[f"C{i}/{quote}"] = {
+            "last": price, "high": high, "low": low, "bid": price * 0.999, "ask": price * 1.001,
+            "baseVolume": 1000.0, "quoteVolume": 1e6 + i * 1e4, "percentage": change,
+        }
+    tickers["NOVOL/USDT"] = {"last": 1.0, "quoteVolume": None, "percentage": None}
+    return tickers
+
+
+class _Exchange:
+    id = "fake"
+
+    def __init__(self, tickers):
+        self.tickers = tickers
+        self.calls = 0
+
+    async def fetch_tickers(self):
+        self.calls += 1
+        return self.tickers
+
+
+def test_universe_ranks_once_per_scan_and_strategies_screen_all_symbols():
+    tickers = _tickers()
+    exchange = _Exchange(tickers)
+    scanner = MarketScanner(exchange, interval=60)
+    assert not scanner.is_fresh()
+    assert asyncio.run(scanner.scan()) == 501 and scanner.is_fresh()
+    universe = scanner.universe
+
+    # Highest quote volume first, one quote currency, ranking cached until the next scan
+    top = universe.top_volume(5, "USDT")
+    assert top == ["C498/USDT", "C497/USDT", "C496/USDT", "C495/USDT", "C494/USDT"]
+    assert universe.top_volume(5, "USDT") is top
+    assert universe.top_volume(3, "USDC") == ["C499/USDC", "C489/USDC", "C479/USDC"]
+
+    # New listing appended, existing rows keep their index, delisted rows drop out
+    index = universe.index["C10/USDT"]
+    del tickers["C498/USDT"]
+    tickers["NEW/USDT"] = {"last": 5.0, "high": 5.0, "low": 5.0, "quoteVolume": 9e9, "percentage": 0.0}
+    asyncio.run(scanner.scan())
+    assert universe.index["C10/USDT"] == index and universe.n == 502
+    assert universe.top_volume(2, "USDT") == ["NEW/USDT", "C497/USDT"]
+    assert "C498/USDT" not in universe.market_data(["C498/USDT", "C10/USDT"])
+    assert universe.market_data(["NOVOL/USDT"])["NOVOL/USDT"].volume_24h == 0.0
+
+    # Screens over every row; candidates limited to the quote and ranked by volume
+    momentum = MomentumStrategy(["BTC/USDT"], None)
+    candidates = screen_candidates(momentum, universe, quote="USDT", limit=100)
+    expected = [f"C{i}/USDT" for i in range(499, -1, -1) if i % 50 in (0, 1) and i % 10 != 9]
+    assert candidates == expected
+    assert momentum.symbols_to_analyze() == ["BTC/USDT"] + expected
+
+    reversion = MeanReversionStrategy([], None)
+    assert screen_candidates(reversion, universe, quote="USDT", limit=3) == ["C452/USDT", "C402/USDT", "C352/USDT"]
+    # Grids stay on their configured symbols
+    grid = GridTradingStrategy(["BTC/USDT"], None)
+    assert screen_candidates(grid, universe, quote="USDT", limit=1000) == []
+    assert grid.symbols_to_analyze() == ["BTC/USDT"]
+
+    # Same version: the screen is not re-run
+    momentum.screen = None
+    assert screen_candidates(momentum, universe, quote="USDT", limit=100) is candidates
+    assert exchange.calls == 2
@@ -0,0 +1,83 @@
+"""
+Test the maintained L2 order book used for liquidity and slippage checks
+
+Run: python -m pytest tests/test_order_book.py
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.realtime.order_book import L2OrderBook
+
+
+def _walk(levels, notional):
+    remaining, qty = notional, 0.0
+    for price, size in levels:
+        take = min(remaining, price * size)
+        qty += take / price
+        remaining -= take
+        if remaining <= 0:
+            break
+    return notional / qty
+
+
+def test_deltas_match_brute_force_book():
+    rng = random.Random(7)
+    book = L2OrderBook("BTC/USDT")
+    bids, asks = {}, {}
+    for _ in range(2000):
+        price, size = round(rng.uniform(90, 100), 1), rng.choice([0.0, rng.uniform(0.1, 5)])
+        bids.pop(price, None) if not size else bids.__setitem__(price, size)
+        book.apply_deltas(bids=[[price, size]])
+        price, size = round(rng.uniform(100.1, 110), 1), rng.choice([0.0, rng.uniform(0.1, 5)])
+        asks.pop(price, None) if not size else asks.__setitem__(price, size)
+        book.apply_deltas(asks=[[price, size]])
+
+    expected_bids = sorted(bids.items(), reverse=True)
+    expected_asks = sorted(asks.items())
+    assert book.levels("bid") == [list(level) for level in expected_bids]
+    assert book.levels("ask") == [list(level) for level in expected_asks]
+
+    best_bid = expected_bids[0][0]
+    depth = sum(p * q for p, q in expected_bids if p >= best_bid * 0.99)
+    assert book.depth_within(100, "bid") == pytest.approx(depth)
+
+    notional = sum(p * q for p, q in expected_asks) / 3
+    fill = book.estimate_fill("buy", notional)
+    assert fill.complete
+    assert fill.vwap == pytest.approx(_walk(expected_asks, notional))
+    assert book.fill_curve("buy", [notional])[0] == pytest.approx(fill.vwap)
+
+
+def test_sync_reapplies_only_changed_levels():
+    bids = [[100.0 - i * 0.1, 1.0 + i % 3] for i in range(50)]
+    asks = [[100.1 + i * 0.1, 2.0] for i in range(50)]
+    book = L2OrderBook.from_snapshot("ETH/USDT", bids, asks)
+    before = book.asks.cum_notional.copy()
+
+    bids[10][1] = 9.0
+    book.sync(bids, asks[:40])
+
+    assert book.levels("bid")[10] == [bids[10][0], 9.0]
+    assert book.asks.n == 40
+    np.testing.assert_allclose(book.asks.cum_notional, before[:40])
+    assert book.bids.cum_qty[-1] == pytest.approx(sum(size for _, size in bids))
+
+
+def test_spread_imbalance_and_partial_fill():
+    book = L2OrderBook.from_snapshot("SOL/USDT", [[99.0, 3.0], [98.0, 1.0]], [[101.0, 1.0]])
+    assert book.spread == pytest.approx(2.0)
+    assert book.spread_bps == pytest.approx(200.0)
+    assert book.imbalance(bps=500) == pytest.approx((395.0 - 101.0) / 496.0)
+
+    fill = book.estimate_fill("buy", 1000.0)
+    assert not fill.complete
+    assert fill.filled_notional == pytest.approx(101.0)
+    assert np.isnan(book.fill_curve("buy", [1000.0])[0])
@@ -0,0 +1,53 @@
+"""
+Test the array-based SmartOrderFlowAnalyzer
+
+Run: python -m pytest tests/test_order_flow.py
+"""
+
+import asyncio
+import math
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.analysis.order_flow import SmartOrderFlowAnalyzer  # noqa: E402
+from bot.realtime.order_book import L2OrderBook  # noqa: E402
+
+
+def _book():
+    bids = [[100.0 - i * 0.1, 1.0] for i in range(30)]
+    asks = [[100.1 + i * 0.1, 1.0] for i in range(30)]
+    bids[3][1] = 800.0  # $80k bid wall
+    asks[5][1] = 20.0
+    return {"bids": bids, "asks": asks}
+
+
+def test_dict_and_l2_inputs_agree():
+    analyzer = SmartOrderFlowAnalyzer({"impact_notionals": [2000.0, 1e7]})
+    book = _book()
+    from_dict = asyncio.run(analyzer.analyze_order_book("DOGE/USDT", book))
+    from_l2 = asyncio.run(analyzer.analyze_order_book(
+        "DOGE/USDT", L2OrderBook.from_snapshot("DOGE/USDT", book["bids"], book["asks"])
+    ))
+
+    assert [(w.side, w.price, w.size) for w in from_dict["whale_orders"]] == [("buy", 99.7, 800.0)]
+    assert vars(from_dict["flow_metrics"]) == pytest.approx(vars(from_l2["flow_metrics"]))
+    assert [(w["side"], w["price"]) for w in from_dict["walls"]] == [("buy", 99.7), ("sell", 100.6)]
+    assert from_dict["book_impact"]["buy"][0] == pytest.approx((100.6 - 100.1) / 100.1 * 100)
+    assert math.isnan(from_l2["book_impact"]["buy"][1])
+
+
+def test_whale_alerts_are_bounded_by_size_and_age():
+    analyzer = SmartOrderFlowAnalyzer({"max_whale_alerts": 3, "whale_alert_ttl": 60})
+    for _ in range(5):
+        asyncio.run(analyzer.analyze_order_book("DOGE/USDT", _book()))
+    assert len(analyzer.get_whale_alerts("DOGE/USDT")) == 3
+
+    for alert in analyzer.whale_alerts:
+        alert.timestamp = datetime.now() - timedelta(minutes=5)
+    assert analyzer.get_whale_alerts() == []
@@ -0,0 +1,124 @@
+"""
+Test running trade-performance aggregates used by the metrics store
+
+Run: python -m pytest tests/test_performance_metrics.py
+"""
+
+import math
+import os
+import random
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.db needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.core.performance_metrics import PerformanceAggregate, daily_pnl_sharpe  # noqa: E402
+from bot.db import DatabaseManager, Trade, TradePerformanceMetrics  # noqa: E402
+
+
+def _replay(pnls):
+    aggregate = PerformanceAggregate()
+    for pnl in pnls:
+        aggregate.add(pnl)
+    return aggregate
+
+
+def test_add_tracks_counts_and_drawdown():
+    aggregate = _replay([10.0, -4.0, -8.0, 5.0, 0.0])
+
+    assert aggregate.trade_count == 5
+    assert aggregate.win_count == 2
+    assert aggregate.loss_count == 2
+    assert aggregate.pnl_sum == 3.0
+    assert aggregate.best_trade == 10.0
+    assert aggregate.worst_trade == -8.0
+    assert aggregate.max_drawdown == -12.0
+    assert aggregate.profit_factor == 15.0 / 12.0
+
+
+def test_merged_buckets_match_full_replay():
+    random.seed(7)
+    pnls = [random.uniform(-50, 60) for _ in range(500)]
+
+    merged = PerformanceAggregate()
+    for start in range(0, len(pnls), 37):
+        merged.merge(_replay(pnls[start:start + 37]))
+    full = _replay(pnls)
+
+    assert merged.trade_count == full.trade_count
+    assert math.isclose(merged.pnl_sum, full.pnl_sum)
+    assert math.isclose(merged.max_drawdown, full.max_drawdown)
+    assert math.isclose(merged.peak_equity, full.peak_equity)
+    assert math.isclose(merged.pnl_std, full.pnl_std)
+    assert merged.best_trade == full.best_trade
+    assert merged.worst_trade == full.worst_trade
+
+
+def test_from_row_round_trip():
+    aggregate = _replay([1.0, -2.0, 3.0])
+    restored = PerformanceAggregate.from_row(aggregate.to_dict())
+    assert restored == aggregate
+    assert PerformanceAggregate.from_row({}) == PerformanceAggregate()
+
+
+def test_row_with_aware_timestamps_accepts_naive_trade_times():
+    # timestamptz columns come back aware; trade created_at is naive UTC
+    stored = _replay([1.0]).to_dict()
+    stored["first_trade_at"] = stored["last_trade_at"] = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    aggregate = PerformanceAggregate.from_row(stored)
+
+    aggregate.add(2.0, at=datetime(2024, 5, 1, 11, 0))
+    aggregate.add(-1.0, at=datetime(2024, 5, 1, 13, 0))
+
+    assert aggregate.first_trade_at == datetime(2024, 5, 1, 11, 0, tzinfo=timezone.utc)
+    assert aggregate.last_trade_at == datetime(2024, 5, 1, 13, 0, tzinfo=timezone.utc)
+    assert PerformanceAggregate.from_row(aggregate.to_dict()) == aggregate
+
+
+def _db(*tables):
+    engine = create_engine("sqlite:///:memory:")
+    for table in tables:
+        table.__table__.create(engine)
+    db = DatabaseManager()
+    db.session = sessionmaker(bind=engine)()
+    return db
+
+
+def _close(db, pnl):
+    db.save_trade(user_id="u1", symbol="BTC/USDT", trade_type="sell", price=51000.0, amount=0.1,
+                  pnl=pnl, exchange="binance", entry_price=50000.0, strategy_name="momentum")
+    db.session.commit()
+
+
+def test_closed_trades_update_metrics_and_survive_metric_failures():
+    db = _db(Trade, TradePerformanceMetrics)
+    _close(db, 100.0)
+    _close(db, -40.0)
+    metrics = db.get_performance_metrics(user_id="u1", strategy_name="momentum")
+    assert (metrics.trade_count, metrics.pnl_sum) == (2, 60.0)
+    days = db.get_daily_performance(user_id="u1", since=datetime.utcnow())
+    assert [(day.trade_count, day.win_rate) for day in days] == [(2, 50.0)]
+    db.session.close()
+
+    # Metrics table not migrated yet: the trade is still recorded
+    db = _db(Trade)
+    _close(db, 100.0)
+    assert db.session.query(Trade).count() == 1
+    db.session.close()
+
+
+def test_daily_pnl_sharpe_is_scale_free():
+    pnls = [12.0, -5.0, 8.0, 3.0, -2.0]
+    assert daily_pnl_sharpe(pnls) > 0
+    assert math.isclose(daily_pnl_sharpe(pnls), daily_pnl_sharpe([pnl * 100 for pnl in pnls]))
+    assert daily_pnl_sharpe([5.0]) == 0.0
+    assert daily_pnl_sharpe([5.0, 5.0]) == 0.0
@@ -0,0 +1,214 @@
+"""
+Test exchange-native protective orders and coalesced trailing SL writes
+
+Run: python -m pytest tests/test_protective_orders.py
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.services.position_monitor import PositionMonitorService  # noqa: E402
+from bot.services.protective_orders import ProtectiveOrderManager  # noqa: E402
+
+
+class _FakeFuturesAdapter:
+    """Records private calls instead of sending them."""
+
+    futures = True
+    margin = False
+    supports_oco = False
+
+    def __init__(self):
+        self.calls = []
+
+    async def place_stop_order(self, symbol, position_side, quantity, stop_price):
+        self.calls.append(("stop", stop_price))
+        return f"sl-{len(self.calls)}"
+
+    async def place_take_profit_order(self, symbol, position_side, quantity, take_profit):
+        self.calls.append(("tp", take_profit))
+        return f"tp-{len(self.calls)}"
+
+    async def amend_stop_order(self, symbol, order_id, position_side, quantity, stop_price):
+        self.calls.append(("amend", stop_price))
+        return order_id
+
+    async def cancel_order(self, order_id, symbol):
+        self.calls.append(("cancel", order_id))
+        return True
+
+
+def test_trailing_amends_are_throttled_and_db_writes_coalesced():
+    async def run():
+        adapter = _FakeFuturesAdapter()
+        manager = ProtectiveOrderManager(adapter, min_step_pct=0.25, min_interval=15.0)
+        monitor = PositionMonitorService(exchange_adapter=None, default_user_id="u1", protective_orders=manager)
+        monitor.add_position(
+            symbol="BTC/USDT", side="long", entry_price=50000.0, quantity=0.1,
+            stop_loss=48000.0, take_profit=60000.0, user_id="u1"
+        )
+        key, pos = next(iter(monitor.positions.items()))
+
+        assert await manager.sync(key, pos)
+        assert adapter.calls == [("stop", 48000.0), ("tp", 60000.0)]
+
+        # Ten trailing steps: one pending DB write, no exchange call yet (interval)
+        for price in range(51000, 52000, 100):
+            await monitor._apply_simple_trailing(key, pos, float(price))
+            await manager.sync(key, pos)
+        assert len(adapter.calls) == 2 and manager.stats["throttled"] > 0
+        assert monitor._pending_sl_writes[key]["steps"] == 10
+
+        # Once the interval passes, a single amend to the latest level
+        manager._orders[key].updated_at -= 15.0
+        assert await manager.sync(key, pos)
+        assert adapter.calls[-1] == ("amend", pos.stop_loss)
+        # Sub-step moves stay local
+        pos.stop_loss += 1.0
+        manager._orders[key].updated_at -= 15.0
+        assert not await manager.sync(key, pos)
+
+        await monitor._flush_sl_writes()
+        assert monitor._pending_sl_writes == {}
+
+        # Position no longer monitored: its exchange orders are cancelled
+        monitor.positions.clear()
+        await manager.prune(monitor.positions.keys())
+        assert [call[0] for call in adapter.calls[-2:]] == ["cancel", "cancel"]
+        assert not manager.is_protected(key)
+
+    asyncio.run(run())
+
+
+class _FilledStopAdapter(_FakeFuturesAdapter):
+    """The stop filled on the exchange before the monitor's own close."""
+
+    async def cancel_order(self, order_id, symbol):
+        self.calls.append(("cancel", order_id))
+        return False
+
+    async def get_order(self, order_id, symbol):
+        return {"id": order_id, "status": "closed" if order_id.startswith("sl") else "canceled",
+                "filled": 0.1 if order_id.startswith("sl") else 0.0}
+
+    async def place_order(self, **kwargs):
+        self.calls.append(("close", kwargs["quantity"]))
+
+
+def test_close_is_skipped_when_the_resting_stop_already_filled():
+    async def run():
+        adapter = _FilledStopAdapter()
+        manager = ProtectiveOrderManager(adapter)
+        monitor = PositionMonitorService(exchange_adapter=adapter, default_user_id="u1", protective_orders=manager)
+        monitor._stream_resync_delay = 3600  # Keep the scheduled resync from running
+        monitor.add_position(
+            symbol="BTC/USDT", side="long", entry_price=50000.0, quantity=0.1,
+            stop_loss=48000.0, take_profit=60000.0, user_id="u1"
+        )
+        key, pos = next(iter(monitor.positions.items()))
+        await manager.sync(key, pos)
+
+        assert not await monitor._execute_partial_close(key, pos, 0.05, 61000.0, 0)
+        assert not any(call[0] == "close" for call in adapter.calls)
+        assert monitor._stream_resync_pending == {"reconcile", "sync"}
+        monitor._stream_resync_task.cancel()
+
+    asyncio.run(run())
+
+
+def test_spot_oco_uses_binance_order_list_endpoint():
+    from bot.exchange_adapters.ccxt_adapter import CCXTAdapter
+
+    async def run():
+        adapter = CCXTAdapter("binance", "key", "secret", futures=False)
+        exchange = adapter.exchange._exchange  # Real ccxt binance: no unified create_oco_order
+        assert adapter.supports_oco
+        assert not CCXTAdapter("binance", "key", "secret", futures=True).supports_oco
+
+        exchange.set_markets([{
+            "id": "BTCUSDT", "symbol": "BTC/USDT", "base": "BTC", "quote": "USDT", "baseId": "BTC",
+            "quoteId": "USDT", "type": "spot", "spot": True, "active": True,
+            "precision": {"amount": 0.00001, "price": 0.01}, "limits": {},
+        }])
+        requests = []
+
+        async def private_post_orderlist_oco(request):
+            requests.append(request)
+            return {"orderReports": [
+                {"orderId": 11, "type": "LIMIT_MAKER"},
+                {"orderId": 12, "type": "STOP_LOSS_LIMIT"},
+            ]}
+
+        exchange.private_post_orderlist_oco = private_post_orderlist_oco
+        ids = await adapter.place_oco_exit("BTC/USDT", "long", 0.1234567, 48000.0, 60000.0)
+        await exchange.close()
+        # Streamed fills of either leg are the bot's own exit, not an external trade
+        assert all(adapter.is_own_fill("BTC/USDT", "sell", order_id) for order_id in ids)
+        return ids, requests
+
+    ids, requests = asyncio.run(run())
+    assert ids == ["12", "11"]  # Stop first
+    assert requests == [{
+        "symbol": "BTCUSDT", "side": "SELL", "quantity": "0.12345",
+        "aboveType": "LIMIT_MAKER", "abovePrice": "60000",
+        "belowType": "STOP_LOSS_LIMIT", "belowStopPrice": "48000", "belowPrice": "47760",
+        "belowTimeInForce": "GTC",
+    }]
+
+
+def test_close_position_sends_a_reduce_only_market_order():
+    from bot.exchange_adapters.ccxt_adapter import CCXTAdapter, Position
+
+    async def run():
+        adapter = CCXTAdapter("binance", "key", "secret", futures=True)
+        exchange = adapter.exchange._exchange
+        orders = []
+
+        async def get_positions(symbol=None):
+            return [Position(symbol="BTC/USDT:USDT", side="long", quantity=0.2, entry_price=50000.0,
+                             unrealized_pnl=0.0, leverage=5.0)]
+
+        async def create_market_order(symbol, side, amount, params=None):
+            orders.append((symbol, side, amount, params))
+            return {"id": "close-1"}
+
+        adapter.get_positions = get_positions
+        exchange.create_market_order = create_market_order
+        closed = await adapter.close_position("BTC/USDT:USDT")
+        await exchange.close()
+        return adapter, closed, orders
+
+    adapter, closed, orders = asyncio.run(run())
+    assert closed
+    assert orders == [("BTC/USDT:USDT", "sell", 0.2, {"reduceOnly": True})]
+    assert adapter.is_own_fill("BTC/USDT:USDT", "sell", "close-1")
+
+
+def test_limit_orders_are_remembered_as_own():
+    from bot.exchange_adapters.ccxt_adapter import CCXTAdapter
+
+    async def run():
+        adapter = CCXTAdapter("binance", "key", "secret", futures=False)
+        exchange = adapter.exchange._exchange
+
+        async def create_limit_order(symbol, side, amount, price, params=None):
+            return {"id": "limit-1", "symbol": symbol, "side": side, "type": "limit",
+                    "amount": amount, "price": price, "status": "open"}
+
+        exchange.create_limit_order = create_limit_order
+        await adapter.place_order("ETH/USDT", "buy", "limit", 1.0, price=2000.0)
+        await exchange.close()
+        return adapter
+
+    adapter = asyncio.run(run())
+    assert adapter.is_own_fill("ETH/USDT", "buy", "limit-1")
+    assert not adapter.is_own_fill("ETH/USDT", "buy", "manual-1")
@@ -0,0 +1,73 @@
+"""
+Test the shared sliding-window and token-bucket rate-limit primitives
+
+Run: python -m pytest tests/test_rate_limit.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.core.rate_limit import RedisRateLimitBackend, SlidingWindowLimiter, TokenBucket  # noqa: E402
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, names):
+        return [self.data.get(name) for name in names]
+
+    def pipeline(self):
+        return self
+
+    def incrby(self, name, amount):
+        self.data[name] = self.data.get(name, 0) + amount
+
+    def expire(self, name, seconds):
+        pass
+
+    def execute(self):
+        pass
+
+
+def test_sliding_window_weights_previous_window():
+    limiter = SlidingWindowLimiter([("minute", 10, 60)])
+    start = 6000.0  # window boundary
+    for i in range(10):
+        assert limiter.hit("ip", now=start + 50 + i * 0.5) is None
+    assert limiter.hit("ip", now=start + 59) == "minute"
+
+    # 15s into the next window 75% of the previous one still counts
+    assert limiter.counts("ip", now=start + 75)["minute"] == pytest.approx(7.5)
+    assert limiter.remaining("ip", now=start + 75)["minute"] == 2
+    wait = limiter.retry_after("ip", now=start + 60)
+    assert limiter.check("ip", now=start + 60 + wait) is None
+    assert limiter.check("ip", now=start + 60 + wait - 1) == "minute"
+
+
+def test_idle_keys_are_evicted_and_backend_is_shared():
+    limiter = SlidingWindowLimiter([("minute", 5, 60)], max_keys=3, idle_ttl=120)
+    for i in range(5):
+        limiter.hit(f"ip{i}", now=1000.0)
+    assert len(limiter.local) == 3
+    limiter.hit("late", now=1200.0)
+    assert len(limiter.local) == 1
+
+    redis = _FakeRedis()
+    workers = [SlidingWindowLimiter([("minute", 4, 60)], backend=RedisRateLimitBackend(redis)) for _ in range(2)]
+    for i in range(4):
+        assert workers[i % 2].hit("user", now=6000.0 + i) is None
+    assert workers[0].hit("user", now=6010.0) == "minute"
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(capacity=3, rate=3, now=0.0)
+    assert all(bucket.try_acquire(now=0.0) for _ in range(3))
+    assert not bucket.try_acquire(now=0.0)
+    assert bucket.retry_after(now=0.0) == pytest.approx(1 / 3)
+    assert bucket.try_acquire(now=0.34)
@@ -0,0 +1,109 @@
+"""
+Test the priority-aware exchange request scheduler
+
+Run: python -m pytest tests/test_request_scheduler.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.exchange_adapters.request_scheduler import (  # noqa: E402
+    ExchangeRequestScheduler,
+    RequestPriority,
+    RequestShed,
+    ScheduledExchange,
+    SchedulerConfig,
+    request_priority,
+)
+
+
+class _FakeExchange:
+    id = "fake"
+
+    def __init__(self):
+        self.calls = []
+        self.last_response_headers = {}
+
+    async def fetch_ohlcv(self, symbol, timeframe="1h", limit=100):
+        self.calls.append(("fetch_ohlcv", symbol))
+        return [[0, 1, 1, 1, 1, 1]]
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.calls.append(("create_order", symbol))
+        return {"id": "1"}
+
+    async def fetch_balance(self, params=None):
+        self.calls.append(("fetch_balance", None))
+        self.last_response_headers = {"X-MBX-USED-WEIGHT-1M": "5400"}  # Raw weight, spot cap 6000
+        return {"total": {}}
+
+
+def test_urgent_requests_jump_the_queue_and_analytics_is_shed():
+    async def run():
+        # 600 weight/min = 10/s; the bucket starts drained so everything queues
+        scheduler = ExchangeRequestScheduler("fake", 600, SchedulerConfig(reserve={}, shed_queue_depth=3, max_wait=5))
+        scheduler._bucket.tokens = 0
+        order = []
+
+        async def request(priority, tag):
+            await scheduler.acquire(priority, weight=1)
+            order.append(tag)
+
+        tasks = [asyncio.create_task(request(RequestPriority.MARKET_DATA, f"md{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        with pytest.raises(RequestShed):
+            await scheduler.acquire(RequestPriority.ANALYTICS)
+        tasks.append(asyncio.create_task(request(RequestPriority.ORDER, "order")))
+        await request(RequestPriority.EMERGENCY, "emergency")
+        await asyncio.gather(*tasks)
+        return scheduler, order
+
+    scheduler, order = asyncio.run(run())
+    assert order[:2] == ["emergency", "order"]
+    assert order[2:] == ["md0", "md1", "md2"]
+    metrics = scheduler.get_metrics()
+    assert metrics["classes"]["analytics"]["shed"] == 1
+    assert metrics["classes"]["market_data"]["dispatched"] == 3
+    assert metrics["queue_depth"] == 0
+
+
+def test_proxy_uses_method_defaults_context_and_reported_weight():
+    async def run():
+        raw = _FakeExchange()
+        scheduler = ExchangeRequestScheduler("fake", 1200)
+        exchange = ScheduledExchange(raw, scheduler)
+        await exchange.create_order("BTC/USDT", "market", "sell", 1)
+        with request_priority(RequestPriority.ANALYTICS):
+            await exchange.fetch_ohlcv("BTC/USDT")
+        await exchange.fetch_balance()
+        return raw, scheduler, exchange
+
+    raw, scheduler, exchange = asyncio.run(run())
+    assert exchange.id == "fake"
+    assert [c[0] for c in raw.calls] == ["create_order", "fetch_ohlcv", "fetch_balance"]
+    classes = scheduler.get_metrics()["classes"]
+    assert classes["order"]["dispatched"] == 1
+    assert classes["analytics"]["dispatched"] == 1
+    assert classes["position_sync"]["dispatched"] == 1
+    # 5400 of 6000 raw weight = 1080 of 1200 cost units
+    assert 0 < scheduler.get_metrics()["available_weight"] <= 1200 - 1080 + 1
+
+
+def test_method_weights_use_ccxt_cost_units():
+    import ccxt.async_support as ccxt_async
+
+    from bot.exchange_adapters.request_scheduler import METHOD_WEIGHTS
+
+    binance = ccxt_async.binance()
+    public, private = binance.api["public"]["get"], binance.api["private"]["get"]
+    assert 60000 / binance.rateLimit == 1200
+    assert METHOD_WEIGHTS["fetch_tickers"] == public["ticker/24hr"]["noSymbol"]
+    assert METHOD_WEIGHTS["fetch_ohlcv"] == public["klines"]["cost"]
+    assert METHOD_WEIGHTS["fetch_balance"] == private["account"]["cost"]
+    assert METHOD_WEIGHTS["fetch_my_trades"] == private["myTrades"]["cost"]
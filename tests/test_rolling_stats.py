@@ -0,0 +1,145 @@
+"""
+Test incrementally maintained trading statistics, their rebuild from history and their use in sizing
+
+Run: python -m pytest tests/test_rolling_stats.py
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.core.rolling_stats import KELLY_WINDOW_TRADES, RollingTradingStats, RunningMoments  # noqa: E402
+from bot.db import PortfolioRollup, Trade, build_rolling_trading_stats  # noqa: E402
+from bot.services.risk_manager import RiskManagerService  # noqa: E402
+
+
+def test_moments_and_daily_rollover():
+    values = [12.5, -3.0, 7.25, 0.0, -9.5, 4.0]
+    moments = RunningMoments()
+    for value in values:
+        moments.add(value)
+    assert moments.mean == pytest.approx(np.mean(values))
+    assert moments.std == pytest.approx(np.std(values))
+
+    stats = RollingTradingStats()
+    start = datetime(2026, 1, 1, 12)
+    stats.record_equity(1000.0, at=start)
+    stats.add_trade("BTC/USDT", 10.0, at=start)
+    stats.add_trade("BTC/USDT", -4.0, at=start + timedelta(hours=1))
+    stats.add_trade("ETH/USDT", 0.0, at=start + timedelta(hours=2))
+    assert stats.daily.count == 0  # day still open
+
+    # Next day: the first day's P&L becomes a return on the recorded equity
+    stats.add_trade("ETH/USDT", -5.0, at=start + timedelta(days=1))
+    assert stats.daily.count == 1
+    assert stats.daily.mean == pytest.approx(6.0 / 1000.0)
+
+    btc = stats.symbol_outcomes("BTC/USDT")
+    assert (btc.decided, btc.win_rate, btc.avg_win, btc.avg_loss) == (2, 0.5, 10.0, -4.0)
+    assert stats.trades.pnl.count == 4
+    assert stats.trades.decided == 3
+
+    restored = RollingTradingStats.from_dict(stats.to_dict())
+    assert restored.to_dict() == stats.to_dict()
+
+
+def test_sizing_reads_rolling_stats_without_db():
+    service = RiskManagerService()
+    stats = RollingTradingStats()
+    returns = [0.01, -0.005, 0.02, -0.01, 0.015, 0.0, -0.02, 0.01, 0.005, -0.003, 0.012]
+    day = datetime.utcnow() - timedelta(days=len(returns))
+    stats.record_equity(10000, at=day)
+    for i, daily_return in enumerate(returns):
+        stats.add_trade("BTC/USDT", daily_return * 10000, at=day + timedelta(days=i))
+    stats.record_equity(10000, at=day + timedelta(days=len(returns)))
+    service._rolling_stats["user-1"] = stats
+
+    # A close before the stats are loaded is queued, afterwards applied directly
+    service.record_trade_close("user-2", "BTC/USDT", 5.0)
+    assert service._pending_trade_closes["user-2"][0][1] == 5.0
+
+    async def run():
+        kelly_stats = await service._get_trading_stats("BTC/USDT", "user-1")
+        assert kelly_stats["total_trades"] == 10
+        var = await service.calculate_var_daily(10000, user_id="user-1")
+        sharpe = await service.calculate_sharpe_live("user-1")
+        return var, sharpe
+
+    var, sharpe = asyncio.run(run())
+    assert var["data_points"] == len(returns)
+    expected = abs(np.mean(returns) - 1.645 * np.std(returns)) * 100
+    assert var["var_percent"] == pytest.approx(expected)
+    assert sharpe["trading_days"] == len(returns)
+    assert sharpe["sharpe_ratio"] is not None
+
+
+def test_lookback_and_kelly_window():
+    stats = RollingTradingStats()
+    start = datetime(2026, 1, 1, 12)
+    stats.record_equity(1000.0, at=start)
+    for i in range(KELLY_WINDOW_TRADES + 20):
+        stats.add_trade("BTC/USDT", -1.0 if i < 20 else 2.0, at=start + timedelta(days=i))
+    stats.close_day()
+
+    # Only the last 100 trades size the position: the early losses have aged out
+    btc = stats.symbol_outcomes("BTC/USDT")
+    assert (btc.decided, btc.win_rate) == (KELLY_WINDOW_TRADES, 1.0)
+    assert stats.trades.pnl.count == KELLY_WINDOW_TRADES + 20
+
+    last_day = (start + timedelta(days=KELLY_WINDOW_TRADES + 19)).date()
+    assert stats.daily_returns(9, as_of=last_day) == [(0.002, 1)] * 10
+    assert len(stats.daily_returns(365, as_of=last_day)) == KELLY_WINDOW_TRADES + 20
+
+
+def _session(*tables):
+    engine = create_engine("sqlite:///:memory:")
+    for table in tables:
+        table.__table__.create(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _trade(session, at, pnl):
+    session.add(Trade(user_id="u1", symbol="BTC/USDT", trade_type="sell", amount=0.1, price=50000.0,
+                      pnl=pnl, created_at=at))
+
+
+def test_rebuild_takes_returns_on_the_real_account_equity():
+    start = datetime(2026, 3, 2, 12)
+    session = _session(Trade, PortfolioRollup)
+    for i, pnl in enumerate([10.0, -20.0, 30.0]):
+        _trade(session, start + timedelta(days=i), pnl)
+    for i, value in enumerate([500.0, 510.0]):
+        bucket = datetime(2026, 3, 2 + i)
+        session.add(PortfolioRollup(user_id="u1", resolution="1d", bucket_start=bucket, open_value=value,
+                                    high_value=value, low_value=value, close_value=value,
+                                    first_timestamp=bucket, last_timestamp=bucket))
+    session.commit()
+
+    stats = build_rolling_trading_stats(session, user_id="u1")
+    stats.close_day()
+    # Day 1 on the first known value, then on the previous day's close
+    assert [r for r, _ in stats.daily_returns(30, as_of=start.date())] == pytest.approx(
+        [10.0 / 500.0, -20.0 / 500.0, 30.0 / 510.0]
+    )
+
+    # No portfolio history: the current balance is the base
+    session = _session(Trade, PortfolioRollup)
+    _trade(session, start, 10.0)
+    session.commit()
+    stats = build_rolling_trading_stats(session, user_id="u1", equity=200.0)
+    stats.close_day()
+    assert stats.daily_returns(30, as_of=start.date()) == [(0.05, 1)]
@@ -0,0 +1,74 @@
+"""
+Test the shared sentiment scorer: content-hash cache, hit/miss accounting, in-flight sharing and pool fallback
+
+Run: python -m pytest tests/test_sentiment_scorer.py
+"""
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+pytest.importorskip("textblob")
+
+from bot.analysis.sentiment import SentimentScorer, close_sentiment_scorers, score_text  # noqa: E402
+
+BULLISH = ("moon", "bullish")
+BEARISH = ("dump", "bearish")
+TEXTS = ["BTC to the moon, great rally", "Bearish dump incoming", "btc TO the   moon, great rally"]
+
+
+def _scorer(**kwargs):
+    return SentimentScorer(list(BULLISH), list(BEARISH), max_workers=0, **kwargs)
+
+
+def test_duplicates_are_scored_once_and_counted_once():
+    scorer = _scorer()
+    expected = [score_text(text, BULLISH, BEARISH) for text in TEXTS]
+
+    # Texts equal up to case and whitespace share one cache entry
+    assert asyncio.run(scorer.score_many(TEXTS)) == pytest.approx(expected)
+    assert scorer.stats == {'hits': 0, 'misses': 2, 'batches': 1}
+
+    assert asyncio.run(scorer.score_many(TEXTS)) == pytest.approx(expected)
+    assert scorer.stats == {'hits': 2, 'misses': 2, 'batches': 1}
+    assert scorer.score_cached(TEXTS[1]) == pytest.approx(expected[1])
+    assert scorer.stats['hits'] == 3
+
+
+def test_cache_evicts_least_recently_used():
+    scorer = _scorer(cache_size=2)
+    asyncio.run(scorer.score_many(TEXTS[:2]))
+    scorer.score_cached(TEXTS[0])  # Most recent again
+    scorer.score_cached("Neutral market update")
+    assert list(scorer._cache) == [scorer.text_key(TEXTS[0]), scorer.text_key("Neutral market update")]
+
+
+def test_concurrent_callers_share_in_flight_scoring():
+    scorer = _scorer()
+
+    async def run():
+        return await asyncio.gather(scorer.score_many(TEXTS[:2]), scorer.score_many(TEXTS[:2]))
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert scorer.stats['misses'] == 2
+
+
+def test_broken_worker_pool_falls_back_to_inline_scoring():
+    scorer = SentimentScorer(list(BULLISH), list(BEARISH), max_workers=1)
+    broken = ThreadPoolExecutor(max_workers=1)
+    broken.shutdown()
+    scorer._executor = broken  # Refuses new work, like a pool whose worker died
+
+    scores = asyncio.run(scorer.score_many(TEXTS[:2]))
+    assert scores == pytest.approx([score_text(text, BULLISH, BEARISH) for text in TEXTS[:2]])
+    assert scorer.stats['misses'] == 2
+
+    close_sentiment_scorers()
+    assert scorer._executor is None
@@ -0,0 +1,159 @@
+"""
+Test the global signal fan-out: shared preparation once per market, concurrent per-user dispatch
+
+Run: python -m pytest tests/test_signal_fanout.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.auto_trader import AutomatedTradingBot  # noqa: E402
+from bot.services.signal_fanout import SignalFanoutExecutor  # noqa: E402
+from bot.services.signal_validator import SignalValidation  # noqa: E402
+from bot.strategies import AIStrategy, MarketData  # noqa: E402
+
+
+class _Validator:
+    def __init__(self):
+        self.calls = 0
+
+    def validate_signal(self, signal, symbol):
+        self.calls += 1
+        return SignalValidation(symbol=symbol, action=signal['action'], should_execute=True,
+                                confidence_adjusted=0.8, consensus_score=0.9, reasons=("ok",),
+                                recent_signals_count=3)
+
+
+class _Deduplicator:
+    def __init__(self):
+        self.records = []
+
+    def record_processed(self, user_id, signal, was_executed):
+        self.records.append((user_id, signal['symbol'], was_executed))
+
+
+class _FakeBot:
+    """Bot whose order takes 50ms and fills ``fill_offset`` away from the ticker."""
+
+    def __init__(self, user_id, exchange_name, fill_offset, quote="USDT", approve=True,
+                 validator=None, deduplicator=None, ticker_calls=None):
+        self.user_id = user_id
+        self.exchange_name = exchange_name
+        self.exchange = SimpleNamespace()
+        self.market_intelligence = None
+        self.signal_validator = validator
+        self.signal_deduplicator = deduplicator
+        self.cycle_lock = asyncio.Lock()
+        self.fill_offset = fill_offset
+        self.quote = quote
+        self.approve = approve
+        self.ticker_calls = ticker_calls
+        self.received = None
+
+    async def manage_capital(self):
+        return self.quote
+
+    async def fetch_symbol_market_data(self, symbol):
+        self.ticker_calls.append((self.exchange_name, symbol))
+        await asyncio.sleep(0.01)
+        return MarketData(symbol=symbol, current_price=100.0, high_24h=101.0, low_24h=99.0,
+                          volume_24h=1e6, change_24h_percent=0.0, timestamp=datetime.now())
+
+    async def execute_shared_signal(self, signal, market_data):
+        self.received = signal
+        await asyncio.sleep(0.05)
+        if not self.approve:
+            return None, "rejected by AI portfolio evaluation"
+        return SimpleNamespace(quantity=1.0, price=market_data.current_price,
+                               fill_price=market_data.current_price + self.fill_offset), "executed"
+
+
+def test_global_signal_fans_out_once_per_market_and_reports_dispersion():
+    async def run():
+        ticker_calls = []
+        validator = _Validator()
+        dedup = _Deduplicator()
+        bots = [
+            _FakeBot("u1", "binance", 0.0, validator=validator, deduplicator=dedup, ticker_calls=ticker_calls),
+            _FakeBot("u2", "binance", 0.05, deduplicator=dedup, ticker_calls=ticker_calls),
+            _FakeBot("u3", "binance", 0.02, approve=False, deduplicator=dedup, ticker_calls=ticker_calls),
+            _FakeBot("u4", "kraken", 0.1, quote="USDC", deduplicator=dedup, ticker_calls=ticker_calls),
+        ]
+        executor = SignalFanoutExecutor()
+        for bot in bots:
+            executor.register_bot(bot)
+
+        signal = {"symbol": "BTC", "action": "BUY", "confidence": 0.7, "signal_id": "sig-1",
+                  "stop_loss": None, "take_profit": None, "entry_price": None}
+        started = time.monotonic()
+        report = await executor.execute(signal)
+        elapsed = time.monotonic() - started
+
+        # Shared parts once: one validation, one ticker per exchange market
+        assert validator.calls == 1
+        assert sorted(ticker_calls) == [("binance", "BTC/USDT"), ("kraken", "BTC/USDC")]
+        assert bots[0].received["confidence"] == 0.8 and bots[0].received["current_price"] == 100.0
+        assert bots[3].received["symbol"] == "BTC/USDC"
+
+        # Per-user orders concurrent, not one after another
+        assert elapsed < 4 * 0.05
+        results = {r.user_id: r for r in report.results}
+        assert len(report.filled) == 3
+        assert results["u3"].status == "skipped" and "AI portfolio" in results["u3"].reason
+        assert all(r.latency_seconds > 0 for r in report.results)
+
+        # Fills at 100.00 / 100.05 / 100.10 against a 100.00 reference
+        assert abs(report.fill_dispersion_bps - 10.0) < 1e-6
+        assert abs(report.to_dict()["fill_slippage_mean_bps"] - 5.0) < 1e-6
+        assert sorted(dedup.records) == [("u1", "BTC/USDT", True), ("u2", "BTC/USDT", True),
+                                         ("u3", "BTC/USDT", False), ("u4", "BTC/USDC", True)]
+
+    asyncio.run(run())
+
+
+def test_shared_signal_does_not_linger_in_the_bots_ai_strategy(monkeypatch):
+    class _Engine:
+        def __init__(self):
+            self.seen = []
+
+        async def run_cycle(self, external_market_data=None, strategies=None):
+            self.seen.append({s.name: dict(s.latest_signals) for s in strategies})
+            return [SimpleNamespace(symbol="BTC/USDT")]
+
+    def _no_evaluator():
+        raise RuntimeError("no evaluator in tests")
+
+    monkeypatch.setattr("bot.services.ai_portfolio_evaluator.get_ai_portfolio_evaluator", _no_evaluator)
+    bot = AutomatedTradingBot.__new__(AutomatedTradingBot)
+    bot.user_id = "u1"
+    bot.daily_loss_tracker = None
+    bot.config = None
+    bot.trading_engine = _Engine()
+    bot.ai_strategy = AIStrategy(["ETH/USDT"], None, can_short=True)
+    bot.ai_strategy.update_signals([{"symbol": "ETH/USDT", "action": "BUY"}])
+
+    async def _within_limits():
+        return True
+
+    bot.check_risk_limits = _within_limits
+    market_data = MarketData(symbol="BTC/USDT", current_price=100.0, high_24h=101.0, low_24h=99.0,
+                             volume_24h=1e6, change_24h_percent=0.0, timestamp=datetime.now())
+    signal = {"symbol": "BTC/USDT", "action": "SELL", "confidence": 0.7, "stop_loss": 105.0, "take_profit": 90.0}
+    executed, reason = asyncio.run(bot.execute_shared_signal(signal, market_data))
+
+    assert reason == "executed"
+    assert list(bot.trading_engine.seen[0]["AIStrategy"]) == ["BTC/USDT"]
+    # The bot's own cycle still sees only its own signals, not the fanned-out SELL
+    assert list(bot.ai_strategy.latest_signals) == ["ETH/USDT"]
@@ -0,0 +1,122 @@
+"""
+Test signal feed routing: global vs per-user signals, filtering and de-duplication
+
+Run: python -m pytest tests/test_signal_feed.py
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.realtime import signal_feed  # noqa: E402
+from bot.realtime.signal_feed import SignalFeed, SignalNotice  # noqa: E402
+
+
+def test_notices_wake_owner_and_global_subscribers_once():
+    feed = SignalFeed(poll_interval=0.01)
+    woken = {"u1": [], "u2": []}
+    feed.subscribe("u1", lambda notice: woken["u1"].append(notice.symbol))
+    feed.subscribe("u2", lambda notice: woken["u2"].append(notice.symbol))
+
+    created = (datetime.now(timezone.utc) - timedelta(seconds=2)).isoformat()
+    payloads = [
+        {"id": "1", "user_id": None, "symbol": "BTC/USDT", "signal_type": "BUY", "source": "titan_v3", "created_at": created},
+        {"id": "2", "user_id": "u2", "symbol": "ETH/USDT", "signal_type": "sell", "source": "COUNCIL_V2.0_FALLBACK"},
+        {"id": "3", "user_id": None, "symbol": "SOL/USDT", "signal_type": "hold", "source": "titan_v3"},
+        {"id": "4", "user_id": None, "symbol": "XRP/USDT", "signal_type": "buy", "source": "manual"},
+    ]
+    for payload in payloads:
+        feed._on_notify(None, 0, SignalFeed.CHANNEL, json.dumps(payload))
+    # The poll fallback re-reads the same rows: delivered once only
+    feed._fetch_new_signals = lambda: [SignalNotice.from_payload(payloads[0])]
+
+    async def run():
+        await feed.start()
+        await asyncio.sleep(0.05)
+        await feed.stop()
+
+    asyncio.run(run())
+
+    assert woken == {"u1": ["BTC/USDT"], "u2": ["BTC/USDT", "ETH/USDT"]}
+    status = feed.get_status()
+    assert status["notices"] == 2 and status["mode"] == "poll" and status["polls"] >= 1
+    assert 1.5 < status["last_delay_seconds"] < 60
+
+
+def test_listen_keeps_retrying_when_the_fallback_poll_fails():
+    pytest.importorskip("asyncpg")
+    feed = SignalFeed(dsn="postgresql://feed@localhost/none", poll_interval=0.01)
+
+    def no_connection():
+        raise OSError("connection refused")
+
+    def no_database():
+        raise OSError("database unavailable")
+
+    feed._asyncpg_dsn = no_connection
+    feed._fetch_new_signals = no_database
+
+    async def run():
+        await feed.start()
+        await asyncio.sleep(1.2)  # First reconnect delay is 1s
+        running = feed.running
+        await feed.stop()
+        return running
+
+    assert asyncio.run(run())
+    status = feed.get_status()
+    assert status["listen_errors"] >= 2 and status["polls"] > 10 and status["mode"] == "poll"
+
+
+class _Connection:
+    def __init__(self, has_trigger):
+        self.has_trigger = has_trigger
+        self.listeners = []
+
+    async def fetchval(self, query, *args):
+        assert args == (SignalFeed.TRIGGER,)
+        return self.has_trigger
+
+    async def add_listener(self, channel, callback):
+        self.listeners.append(channel)
+
+    async def execute(self, query):
+        return "SELECT 1"
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.parametrize("has_trigger", [True, False])
+def test_listen_needs_the_trigger_and_keeps_a_slow_poll(monkeypatch, has_trigger):
+    pytest.importorskip("asyncpg")
+    connection = _Connection(has_trigger)
+
+    async def connect(dsn):
+        return connection
+
+    monkeypatch.setattr(signal_feed.asyncpg, "connect", connect)
+    monkeypatch.setattr(SignalFeed, "LISTEN_POLL_INTERVAL", 0.01)
+    feed = SignalFeed(dsn="postgresql://feed@localhost/signals", poll_interval=0.01)
+    feed._fetch_new_signals = lambda: []
+
+    async def run():
+        await feed.start()
+        await asyncio.sleep(0.1)
+        status = feed.get_status()
+        await feed.stop()
+        return status
+
+    status = asyncio.run(run())
+    assert status["polls"] > 3  # Polled either way: alongside LISTEN, or instead of it
+    if has_trigger:
+        assert (status["mode"], status["listen_errors"], connection.listeners) == ("listen", 0, [SignalFeed.CHANNEL])
+    else:
+        assert (status["mode"], status["listen_errors"], connection.listeners) == ("poll", 1, [])
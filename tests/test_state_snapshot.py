@@ -0,0 +1,116 @@
+"""
+Test the warm-restart state snapshot store and position/rate-limit round trips
+
+Run: python -m pytest tests/test_state_snapshot.py
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# bot.services pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.core.state_snapshot import StateSnapshotStore  # noqa: E402
+from bot.services.position_monitor import PositionMonitorService  # noqa: E402
+from bot.services.rate_limiter import RateLimiter  # noqa: E402
+
+
+def test_store_round_trip_rejects_corrupt_and_stale(tmp_path):
+    store = StateSnapshotStore(tmp_path / "bot.snap")
+    assert store.read() is None
+
+    store.write({"markets": {"BTC/USDT": {"id": "BTCUSDT"}}, "prices": {"BTC/USDT": 50000.0}})
+    snapshot = store.read(max_age=60)
+    assert snapshot.get("prices") == {"BTC/USDT": 50000.0}
+    assert snapshot.age_seconds < 60
+    assert list(tmp_path.iterdir()) == [store.path]  # no temp file left behind
+
+    store.write({"prices": {}}, created_at=datetime.now().timestamp() - 7200)
+    assert store.read(max_age=3600) is None
+
+    data = bytearray(store.path.read_bytes())
+    data[-2] ^= 0xFF
+    store.path.write_bytes(bytes(data))
+    assert store.read() is None
+
+
+def test_positions_and_rate_limits_survive_restart(tmp_path):
+    monitor = PositionMonitorService(exchange_adapter=None, default_user_id="u1")
+    monitor.add_position(
+        symbol="BTC/USDT", side="long", entry_price=50000.0, quantity=0.1,
+        stop_loss=48000.0, take_profit=55000.0, user_id="u1"
+    )
+    key, position = next(iter(monitor.positions.items()))
+    position.trailing_activated = True
+    position.highest_price = 53000.0
+    position.partial_tp_executed = [0]
+    monitor._price_cache["BTC/USDT"] = 52900.0
+
+    limiter = RateLimiter()
+    limiter.record_trade("u1", "ETH/USDT")
+    limiter.record_close("u1", "ETH/USDT", -1.5)
+
+    store = StateSnapshotStore(tmp_path / "bot.snap")
+    store.write({"position_monitor": monitor.export_snapshot(), "rate_limiter": limiter.export_user_state("u1")})
+    snapshot = store.read()
+
+    restarted = PositionMonitorService(exchange_adapter=None, default_user_id="u1")
+    assert restarted.restore_snapshot(snapshot.get("position_monitor")) == 1
+    restored = restarted.positions[key]
+    assert (restored.stop_loss, restored.highest_price, restored.trailing_activated) == (48000.0, 53000.0, True)
+    assert restored.partial_tp_executed == [0]
+    assert restored.opened_at == position.opened_at
+    assert restarted._price_cache["BTC/USDT"] == 52900.0
+    # A Supabase row synced before the snapshot does not overwrite it
+    old_sync = (datetime.now() - timedelta(minutes=5)).isoformat()
+    assert not restarted._row_newer_than_snapshot({"last_sync": old_sync})
+
+    restarted_limiter = RateLimiter()
+    restarted_limiter.restore_user_state("u1", snapshot.get("rate_limiter"))
+    metrics = restarted_limiter.get_metrics("u1")
+    assert (metrics["trades_this_hour"], metrics["trades_today"], metrics["consecutive_losses"]) == (1, 1, 1)
+    assert not restarted_limiter.check_can_trade("u1", "ETH/USDT").is_allowed  # cooldown kept
+
+
+def test_unchanged_payload_is_not_rewritten(tmp_path):
+    store = StateSnapshotStore(tmp_path / "markets.snap")
+    markets = {"markets": {"BTC/USDT": {"id": "BTCUSDT"}}, "time_difference": 12}
+
+    assert store.write({"markets": markets}, only_if_changed=True) > 0
+    written_at = store.read().created_at
+    # Another bot (or the next interval) with the same markets: nothing written
+    assert StateSnapshotStore(store.path).write({"markets": markets}, only_if_changed=True) == 0
+    assert store.read().created_at == written_at
+
+    markets["markets"]["ETH/USDT"] = {"id": "ETHUSDT"}
+    assert store.write({"markets": markets}, only_if_changed=True) > 0
+    assert "ETH/USDT" in store.read().get("markets")["markets"]
+
+
+def test_concurrent_writers_leave_one_complete_snapshot(tmp_path):
+    path = tmp_path / "bot.snap"
+    errors = []
+
+    def writer(n):
+        try:
+            for i in range(20):
+                StateSnapshotStore(path).write({"writer": n, "i": i, "pad": "x" * 1000})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert StateSnapshotStore(path).read().get("i") == 19
+    assert list(tmp_path.iterdir()) == [path]  # every temp file renamed or cleaned up
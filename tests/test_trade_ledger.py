@@ -0,0 +1,125 @@
+"""
+Test the incremental trade ledger and FIFO cost basis
+
+Run: python -m pytest tests/test_trade_ledger.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bot.core.cost_basis import CostBasis  # noqa: E402
+from bot.exchange_adapters.trade_ledger import TradeLedger  # noqa: E402
+
+
+class _Exchange:
+    """myTrades oldest first: from a trade id (Binance) or a time (others)."""
+
+    markets = {"BTC/USDT": {}, "ETH/USDT": {}}
+
+    def __init__(self, trades, exchange_id="binance"):
+        self.id = exchange_id
+        self.trades = trades
+        self.calls = []
+
+    async def fetch_my_trades(self, symbol, since=None, limit=None, params=None):
+        from_id = (params or {}).get("fromId")
+        self.calls.append((symbol, since if from_id is None else f"id>={from_id}"))
+        rows = [t for t in self.trades if t["symbol"] == symbol]
+        if from_id is not None:
+            rows = [t for t in rows if int(t["id"]) >= from_id]
+        elif since is not None:
+            rows = [t for t in rows if t["timestamp"] >= since]
+        else:
+            rows = rows[-limit:]  # Without a start the exchange returns the newest trades
+        return rows[:limit]
+
+
+def _trade(trade_id, timestamp, side, amount, price, fee=None):
+    return {
+        "id": trade_id,
+        "symbol": "BTC/USDT",
+        "timestamp": timestamp,
+        "side": side,
+        "amount": amount,
+        "price": price,
+        "fee": fee,
+    }
+
+
+def test_cost_basis_fifo_and_fees():
+    basis = CostBasis()
+    basis.apply_trade("buy", 1.0, 100.0, fee_cost=1.0, fee_currency="USDT", base="BTC")
+    basis.apply_trade("buy", 1.0, 200.0)
+    assert basis.fifo_price == pytest.approx(150.5)
+
+    pnl = basis.apply_trade("sell", 1.5, 300.0)
+    assert pnl == pytest.approx(1.0 * (300 - 101) + 0.5 * (300 - 200))
+    assert basis.quantity == pytest.approx(0.5)
+    assert basis.fifo_price == pytest.approx(200.0)
+    # Average cost is not changed by sells
+    assert basis.average_price == pytest.approx(150.5)
+
+    # Fee paid in the base asset shrinks the holding, not the unit cost
+    basis.apply_trade("buy", 0.5, 400.0, fee_cost=0.1, fee_currency="BTC", base="BTC")
+    assert basis.quantity == pytest.approx(0.9)
+
+    restored = CostBasis.from_row(basis.to_dict())
+    assert restored.fifo_price == pytest.approx(basis.fifo_price)
+
+    basis.apply_trade("sell", 5.0, 500.0)
+    assert basis.fifo_price is None
+
+
+def test_ledger_syncs_incrementally_from_cursor():
+    exchange = _Exchange([
+        _trade("1", 1000, "buy", 1.0, 100.0),
+        _trade("2", 2000, "buy", 1.0, 200.0),
+    ])
+    ledger = TradeLedger(exchange, min_sync_interval=60.0)
+
+    async def run():
+        assert await ledger.get_entry_price("BTC") == pytest.approx(150.0)
+        # Only the listed market is queried, from the first trade id
+        assert exchange.calls == [("BTC/USDT", "id>=0")]
+
+        # Served from the index within the sync interval
+        assert await ledger.get_entry_price("BTC") == pytest.approx(150.0)
+        assert len(exchange.calls) == 1
+
+        # A new fill at the cursor's millisecond is picked up once, from the next trade id
+        exchange.trades.append(_trade("3", 2000, "sell", 1.0, 300.0))
+        ledger.mark_stale("BTC")
+        assert await ledger.sync_asset("BTC") == 1
+        assert exchange.calls[-1] == ("BTC/USDT", "id>=3")
+        assert ledger.entry_price("BTC") == pytest.approx(200.0)
+        assert ledger.get_basis("BTC").realized_pnl == pytest.approx(200.0)
+
+        assert await ledger.sync_asset("BTC", force=True) == 0
+        assert ledger.get_basis("BTC").quantity == pytest.approx(1.0)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("exchange_id", ["binance", "kraken"])
+def test_first_sync_pages_through_the_whole_history(exchange_id):
+    trades = [_trade(str(i), 1000 + i * 10, "buy", 1.0, 100.0 + i) for i in range(25)]
+    exchange = _Exchange(trades, exchange_id)
+    ledger = TradeLedger(exchange)
+    ledger.PAGE_LIMIT = 10
+
+    async def run():
+        assert await ledger.sync_asset("BTC") == 25
+        # Three pages forward from the start, not the newest page only
+        assert len(exchange.calls) == 3
+        exchange.trades.append(_trade("25", 2000, "sell", 25.0, 200.0))
+        assert await ledger.sync_asset("BTC", force=True) == 1
+
+    asyncio.run(run())
+    assert ledger.get_basis("BTC").quantity == pytest.approx(0.0)
+    assert ledger.get_basis("BTC").realized_pnl == pytest.approx(sum(200.0 - (100.0 + i) for i in range(25)))
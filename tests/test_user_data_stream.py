@@ -0,0 +1,114 @@
+"""
+Test applying private user-data stream events to monitored positions
+
+Run: python -m pytest tests/test_user_data_stream.py
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# position_monitor pulls in bot.db, which needs a database URL at import time
+os.environ.setdefault("SUPABASE_DB_URL", "sqlite:///:memory:")
+os.environ.setdefault("ALLOW_SQLITE_FALLBACK", "1")
+
+from bot.realtime.user_data_stream import FillEvent, UserDataStream  # noqa: E402
+from bot.services.position_monitor import PositionMonitorService  # noqa: E402
+
+
+class _Adapter:
+    def __init__(self):
+        self.own_orders = {"bot-1"}
+
+    def is_own_fill(self, symbol, side, order_id):
+        return order_id in self.own_orders
+
+
+class _Stream(UserDataStream):
+    def __init__(self):
+        super().__init__("binance", "key", "secret", market_type="spot")
+        self.connected = True
+        self.healthy = True
+
+    def start(self):
+        self.running = True
+
+    def is_healthy(self):
+        return self.healthy
+
+
+def _monitor():
+    monitor = PositionMonitorService(
+        _Adapter(), enable_auto_sl_tp=False, enable_liquidation_monitor=False
+    )
+    monitor._stream_resync_delay = 0
+    monitor.reconcile_ghost_positions = _count_calls(monitor, "reconcile")
+    monitor.sync_from_exchange = _count_calls(monitor, "sync")
+    monitor._remove_from_supabase = _noop
+    monitor.calls = []
+    return monitor
+
+
+def _count_calls(monitor, name):
+    async def call(*args, **kwargs):
+        monitor.calls.append(name)
+        return 0
+    return call
+
+
+async def _noop(*args, **kwargs):
+    return True
+
+
+def test_fills_update_positions_and_trigger_targeted_resync():
+    async def run():
+        monitor = _monitor()
+        assert await monitor.start_user_stream(_Stream())
+        monitor.add_position("ETH/USDT", "long", 2000.0, 1.0, stop_loss=1900.0, take_profit=2200.0, user_id="u1")
+
+        await monitor._on_stream_fill(FillEvent("ETH/USDT", "buy", 1.0, 2100.0, order_id="x1"))
+        pos = monitor.positions["u1:ETH/USDT"]
+        assert pos.quantity == pytest.approx(2.0)
+        assert pos.entry_price == pytest.approx(2050.0)
+
+        # The bot's own market order was already accounted for by its caller
+        await monitor._on_stream_fill(FillEvent("ETH/USDT", "sell", 1.0, 2100.0, order_id="bot-1"))
+        assert pos.quantity == pytest.approx(2.0)
+
+        # Closed manually on the exchange
+        await monitor._on_stream_fill(FillEvent("ETH/USDT", "sell", 2.0, 2120.0, order_id="manual"))
+        assert "u1:ETH/USDT" not in monitor.positions
+
+        # Unknown buy: a position opened outside the bot
+        await monitor._on_stream_fill(FillEvent("SOL/USDT", "buy", 5.0, 150.0, order_id="manual-2"))
+        await asyncio.sleep(0.01)
+        return monitor
+
+    monitor = asyncio.run(run())
+    assert monitor.calls == ["reconcile", "sync"]
+    assert monitor._user_stream_healthy()
+    assert monitor.get_user_stream_status()["rest_sync_runs"]["stream_resync"] == 1
+
+
+def test_closing_fill_is_split_across_matching_positions():
+    async def run():
+        monitor = _monitor()
+        monitor.add_position("ETH/USDT", "long", 2000.0, 1.0, stop_loss=1900.0, take_profit=2200.0, user_id="u1")
+        monitor.add_position("ETH/USDT", "long", 2050.0, 1.0, stop_loss=1950.0, take_profit=2250.0, user_id="u2")
+
+        # 1.5 sold: the first position is closed, the second keeps 0.5
+        await monitor._on_stream_fill(FillEvent("ETH/USDT", "sell", 1.5, 2100.0, order_id="manual"))
+        assert list(monitor.positions) == ["u2:ETH/USDT"]
+        assert monitor.positions["u2:ETH/USDT"].quantity == pytest.approx(0.5)
+
+        # Exactly the remainder: nothing carries over
+        await monitor._on_stream_fill(FillEvent("ETH/USDT", "sell", 0.5, 2100.0, order_id="manual-2"))
+        assert not monitor.positions
+
+    asyncio.run(run())
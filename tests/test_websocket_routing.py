@@ -0,0 +1,87 @@
+"""
+Test WebSocket channel routing: exact and wildcard subscriptions, cache invalidation and one serialization per broadcast
+
+Run: python -m pytest tests/test_websocket_routing.py
+"""
+
+import asyncio
+import fnmatch
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from websocket_realtime_system import (  # noqa: E402
+    ClientStream,
+    ConnectionInfo,
+    ConnectionState,
+    MessageType,
+    SubscriptionManager,
+    WebSocketMessage,
+    WebSocketServer,
+)
+
+SUBSCRIPTIONS = {
+    "c1": ["prices.BTC"],
+    "c2": ["prices.*"],
+    "c3": ["*.BTC", "orders.?"],
+    "c4": ["orders.[ab]*", "user.42.*"],
+}
+CHANNELS = ["prices.BTC", "prices.ETH", "prices", "orders.a", "orders.ab", "orders.b1", "trades.BTC",
+            "user.42.alerts", "user.4.alerts", ""]
+
+
+def test_wildcard_routing_matches_fnmatch_and_follows_unsubscribes():
+    manager = SubscriptionManager()
+    for connection_id, channels in SUBSCRIPTIONS.items():
+        for channel in channels:
+            manager.subscribe(connection_id, channel)
+
+    def expected(subscriptions):
+        return {
+            channel: {
+                cid for cid, patterns in subscriptions.items()
+                if any(fnmatch.fnmatchcase(channel, pattern) for pattern in patterns)
+            }
+            for channel in CHANNELS
+        }
+
+    assert {channel: set(manager.get_subscribers(channel)) for channel in CHANNELS} == expected(SUBSCRIPTIONS)
+
+    # Cached results are dropped on any change
+    manager.unsubscribe("c2", "prices.*")
+    manager.unsubscribe_all("c3")
+    remaining = {"c1": SUBSCRIPTIONS["c1"], "c4": SUBSCRIPTIONS["c4"]}
+    assert {channel: set(manager.get_subscribers(channel)) for channel in CHANNELS} == expected(remaining)
+
+
+def test_broadcast_serializes_once_for_active_subscribers():
+    server = WebSocketServer()
+    received = {}
+
+    async def run():
+        for connection_id, state in (("a", ConnectionState.ACTIVE), ("b", ConnectionState.ACTIVE),
+                                     ("c", ConnectionState.CONNECTING)):
+            async def send(payload, connection_id=connection_id):
+                received.setdefault(connection_id, []).append(payload)
+
+            server.connection_info[connection_id] = ConnectionInfo(
+                connection_id=connection_id, user_id="u1", session_id="s", client_ip="127.0.0.1", user_agent="test",
+                connected_at=datetime.utcnow(), last_activity=datetime.utcnow(), state=state, subscriptions=set(),
+            )
+            server.streams[connection_id] = ClientStream(connection_id, send).start()
+            server.subscription_manager.subscribe(connection_id, "prices.*")
+
+        message = WebSocketMessage(MessageType.PRICE_FEED, {"symbol": "BTC", "price": 1.0}, time.time(), "m1")
+        sent = await server.broadcast_to_channel("prices.BTC", message)
+        await asyncio.sleep(0.05)
+        for stream in server.streams.values():
+            stream.close()
+        return sent
+
+    assert asyncio.run(run()) == 2
+    assert sorted(received) == ["a", "b"]  # Not the connection still handshaking
+    assert received["a"][0] is received["b"][0]
@@ -0,0 +1,110 @@
+"""
+Test per-client WebSocket streams in the FastAPI integration: broadcast routing, price conflation and slow-client dropping
+
+Run: python -m pytest tests/test_websocket_streams.py
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI  # noqa: E402
+
+from fastapi_websocket_integration import FastAPIWebSocketIntegration  # noqa: E402
+
+
+class _Socket:
+    def __init__(self, stall=False):
+        self.query_params = {}
+        self.sent = []
+        self.closed_with = None
+        self._stall = stall
+
+    async def send_text(self, payload):
+        if self._stall:
+            await asyncio.Event().wait()  # Never drains, like a stuck browser tab
+        self.sent.append(json.loads(payload))
+
+    async def send_bytes(self, payload):
+        self.sent.append(payload)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+
+def _connect(integration, connection_id, socket, with_info=True):
+    integration._register_connection(connection_id, socket)
+    if with_info:
+        integration.connection_info[connection_id] = {
+            "connected_at": datetime.utcnow(), "subscriptions": set(), "user_id": None,
+            "last_activity": datetime.utcnow(),
+        }
+
+
+def _price(symbol, price):
+    return {"type": "price_update", "data": {"symbol": symbol, "price": price}}
+
+
+def test_broadcasts_reach_subscribers_with_prices_conflated():
+    integration = FastAPIWebSocketIntegration(FastAPI(), stream_max_rate=5)
+    general, trading = _Socket(), _Socket()
+
+    async def run():
+        _connect(integration, "general", general)
+        _connect(integration, "trading_1", trading, with_info=False)
+        await integration._handle_subscription("general", {"channel": "prices.all"})
+        await integration._auto_subscribe_trading("trading_1")
+        await asyncio.sleep(0.01)
+
+        for i in range(10):
+            await integration.broadcast_to_channel("prices.all", _price("BTC/USDT", 100.0 + i))
+        await integration.broadcast_to_channel("prices.all", _price("ETH/USDT", 10.0))
+        await integration.broadcast_to_channel("prices.all", {"type": "risk_alert", "data": {"level": "high"}})
+        await asyncio.sleep(0.05)
+        stats = integration.streams["general"].stats
+        for connection_id in list(integration.streams):
+            await integration._cleanup_connection(connection_id)
+        return stats
+
+    stats = asyncio.run(run())
+    updates = [message for message in general.sent if message["type"] != "subscription_confirmed"]
+    # Only the latest price per symbol was left to send; other messages are never conflated
+    assert updates == [
+        {"type": "risk_alert", "data": {"level": "high"}},
+        _price("BTC/USDT", 109.0),
+        _price("ETH/USDT", 10.0),
+    ]
+    assert stats["conflated"] == 9
+    # Trading sockets answer requests only; they are not broadcast targets
+    assert {message["type"] for message in trading.sent} == {"subscription_confirmed"}
+    assert not integration.channel_subscribers
+
+
+def test_slow_client_is_dropped_without_blocking_others():
+    integration = FastAPIWebSocketIntegration(FastAPI(), stream_max_pending=3)
+    slow, fast = _Socket(stall=True), _Socket()
+
+    async def run():
+        _connect(integration, "slow", slow)
+        _connect(integration, "fast", fast)
+        for connection_id in ("slow", "fast"):
+            await integration._handle_subscription(connection_id, {"channel": "alerts"})
+        for i in range(8):
+            await integration.broadcast_to_channel("alerts", {"type": "risk_alert", "data": {"n": i}})
+            await asyncio.sleep(0)  # Healthy streams drain between alerts
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert integration.slow_clients_dropped == 1
+    assert slow.closed_with == 1013 and "slow" not in integration.streams
+    assert [m["data"]["n"] for m in fast.sent if m["type"] == "risk_alert"] == list(range(8))
+    assert integration.channel_subscribers["alerts"] == {"fast"}
@@ -0,0 +1,103 @@
+"""
+Test the binary WebSocket wire protocol (msgpack frames with deltas)
+
+Run: python -m pytest tests/test_wire_protocol.py
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+msgpack = pytest.importorskip("msgpack")
+
+from bot.realtime.wire_protocol import (  # noqa: E402
+    OP_DELTA,
+    BinaryFrameDecoder,
+    BinaryFrameEncoder,
+    negotiate_encoding,
+    split_envelope,
+)
+from websocket_realtime_system import ClientStream  # noqa: E402
+
+
+def _ticks(count):
+    for i in range(count):
+        yield [
+            ("price_feed", "prices.all", {"symbol": symbol, "price": 100.0 + i + n, "volume": 10.0}, 1700000000.0 + i)
+            for n, symbol in enumerate(("BTC/USDT", "ETH/USDT"))
+        ]
+
+
+def test_round_trip_restores_every_update():
+    encoder, decoder = BinaryFrameEncoder(keyframe_interval=3), BinaryFrameDecoder()
+    for updates in _ticks(10):
+        decoded = decoder.decode(encoder.encode(updates))
+        assert [(m["type"], m["channel"], m["data"]) for m in decoded] == [u[:3] for u in updates]
+        assert decoded[0]["timestamp"] == pytest.approx(updates[0][3])
+
+
+def test_deltas_carry_only_changed_fields_and_removals():
+    encoder, decoder = BinaryFrameEncoder(), BinaryFrameDecoder()
+    decoder.decode(encoder.encode([("position_update", "positions", {"symbol": "BTC", "size": 1, "stop_loss": 90}, 0.0)]))
+    frame = encoder.encode([("position_update", "positions", {"symbol": "BTC", "size": 2, "note": "x"}, 0.0)])
+
+    _, _, entries = msgpack.unpackb(frame, strict_map_key=False)
+    assert entries[0][0] == OP_DELTA
+    assert decoder.decode(frame)[0]["data"] == {"symbol": "BTC", "size": 2, "note": "x"}
+
+
+def test_frames_are_much_smaller_than_json_envelopes():
+    encoder = BinaryFrameEncoder()
+    json_bytes = binary_bytes = 0
+    for updates in _ticks(50):
+        json_bytes += sum(len(json.dumps({"type": k, "data": d, "timestamp": ts})) for k, _, d, ts in updates)
+        binary_bytes += len(encoder.encode(updates))
+    assert binary_bytes * 3 < json_bytes
+
+
+def test_schema_less_messages_and_negotiation_fallback():
+    decoder = BinaryFrameDecoder()
+    frame = BinaryFrameEncoder().encode([("risk_alert", None, {"level": "high"}, 0.0)])
+    assert decoder.decode(frame)[0]["data"] == {"level": "high"}
+    assert negotiate_encoding("cbor") == "json"
+    assert negotiate_encoding(None) == "json"
+    assert split_envelope({"type": "price_update", "symbol": "BTC", "price": 1})[:2] == (
+        "price_update", {"symbol": "BTC", "price": 1}
+    )
+
+
+def test_naive_timestamps_are_utc():
+    aware = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc).timestamp()
+    assert split_envelope({"type": "x", "timestamp": "2026-10-18T12:00:00"})[2] == aware
+    assert split_envelope({"type": "x", "timestamp": "2026-10-18T12:00:00Z"})[2] == aware
+    assert split_envelope({"type": "x", "timestamp": datetime(2026, 10, 18, 12, 0)})[2] == aware
+
+
+def test_updates_queued_for_frames_go_out_as_json_after_switching_back():
+    sent = []
+
+    async def send(payload):
+        sent.append(payload)
+
+    async def run():
+        stream = ClientStream("c1", send)
+        stream.encoder = BinaryFrameEncoder().encode
+        stream.offer(("risk_alert", "alerts", {"level": "high"}, 1.0))
+        stream.offer(("price_feed", "prices", {"symbol": "BTC", "price": 1.0}, 1.0), conflate_key=("prices", "BTC"))
+        stream.encoder = None  # Negotiated back to JSON before the stream ran
+        stream.start()
+        await asyncio.sleep(0.05)
+        stream.close()
+
+    asyncio.run(run())
+    assert [json.loads(payload) for payload in sent] == [
+        {"type": "risk_alert", "channel": "alerts", "data": {"level": "high"}, "timestamp": 1.0},
+        {"type": "price_feed", "channel": "prices", "data": {"symbol": "BTC", "price": 1.0}, "timestamp": 1.0},
+    ]
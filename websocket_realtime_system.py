@@ -8,11 +8,13 @@ System WebSocket dla strumieniowego przesyłania danych w czasie rzeczywistym
 # ==================================================================================
 
 import asyncio
+import fnmatch
 import json
 import logging
+import re
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Set, Any, Optional, Callable
+from typing import Dict, List, Set, Any, Optional, Callable, Awaitable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import weakref
@@ -20,6 +22,15 @@ from collections import defaultdict, deque
 import hashlib
 import uuid
 
+from bot.realtime.wire_protocol import (
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    BinaryFrameEncoder,
+    negotiate_encoding,
+    schema_descriptor,
+    update_to_json,
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -93,14 +104,100 @@ class ConnectionInfo:
     bytes_sent: int = 0
     bytes_received: int = 0
     error_count: int = 0
+    encoding: str = ENCODING_JSON
     
+_WILDCARD_CHARS = ('*', '?', '[')
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Część wzorca przed pierwszym znakiem wieloznacznym"""
+    cut = len(pattern)
+    for char in _WILDCARD_CHARS:
+        index = pattern.find(char)
+        if index != -1:
+            cut = min(cut, index)
+    return pattern[:cut]
+
+
+class _PatternNode:
+    __slots__ = ('children', 'patterns')
+
+    def __init__(self):
+        self.children: Dict[str, '_PatternNode'] = {}
+        # pattern -> (compiled matcher or None for "prefix*", subscriber ids)
+        self.patterns: Dict[str, list] = {}
+
+
+class _PatternTrie:
+    """
+    Trie wzorców wg ich dosłownego prefiksu.
+
+    Dopasowanie kanału schodzi po jego znakach i sprawdza tylko wzorce,
+    których prefiks jest prefiksem kanału. Wzorce "prefiks*" pasują bez
+    wyrażenia regularnego; pozostałe mają skompilowany regex (semantyka
+    fnmatch, '*' obejmuje także kropki).
+    """
+
+    def __init__(self):
+        self.root = _PatternNode()
+
+    def add(self, pattern: str, connection_id: str):
+        node = self.root
+        prefix = _literal_prefix(pattern)
+        for char in prefix:
+            node = node.children.setdefault(char, _PatternNode())
+        entry = node.patterns.get(pattern)
+        if entry is None:
+            tail = pattern[len(prefix):]
+            matcher = None if tail == '*' else re.compile(fnmatch.translate(pattern)).match
+            entry = node.patterns[pattern] = [matcher, set()]
+        entry[1].add(connection_id)
+
+    def remove(self, pattern: str, connection_id: str):
+        path = [self.root]
+        for char in _literal_prefix(pattern):
+            child = path[-1].children.get(char)
+            if child is None:
+                return
+            path.append(child)
+        node = path[-1]
+        entry = node.patterns.get(pattern)
+        if entry is None:
+            return
+        entry[1].discard(connection_id)
+        if entry[1]:
+            return
+        del node.patterns[pattern]
+        # Prune empty branches
+        prefix = _literal_prefix(pattern)
+        for depth in range(len(path) - 1, 0, -1):
+            if path[depth].patterns or path[depth].children:
+                break
+            del path[depth - 1].children[prefix[depth - 1]]
+
+    def match(self, channel: str, into: Set[str]):
+        node = self.root
+        index = 0
+        while node is not None:
+            for matcher, subscribers in node.patterns.values():
+                if matcher is None or matcher(channel):
+                    into.update(subscribers)
+            if index == len(channel):
+                break
+            node = node.children.get(channel[index])
+            index += 1
+
+
 class SubscriptionManager:
     """Zarządzanie subskrypcjami WebSocket"""
     
-    def __init__(self):
+    def __init__(self, resolve_cache_size: int = 10000):
         self.subscriptions: Dict[str, Set[str]] = defaultdict(set)
         self.connection_subscriptions: Dict[str, Set[str]] = defaultdict(set)
-        self.subscription_patterns: Dict[str, Set[str]] = defaultdict(set)
+        self.pattern_index = _PatternTrie()
+        # channel -> resolved subscribers, invalidated on any subscription change
+        self._resolved: Dict[str, frozenset] = {}
+        self.resolve_cache_size = resolve_cache_size
         
     def subscribe(self, connection_id: str, channel: str) -> bool:
         """Dodaje subskrypcję dla połączenia"""
@@ -112,9 +209,10 @@ class SubscriptionManager:
             self.connection_subscriptions[connection_id].add(channel)
             
             # Handle pattern subscriptions
-            if '*' in channel or '?' in channel:
-                self.subscription_patterns[connection_id].add(channel)
+            if self._is_pattern(channel):
+                self.pattern_index.add(channel, connection_id)
             
+            self._resolved.clear()
             logger.info(f"Connection {connection_id} subscribed to {channel}")
             return True
             
@@ -126,18 +224,23 @@ class SubscriptionManager:
         """Usuwa subskrypcję dla połączenia"""
         try:
             # Remove from channel subscribers
-            self.subscriptions[channel].discard(connection_id)
+            subscribers = self.subscriptions.get(channel)
+            if subscribers is not None:
+                subscribers.discard(connection_id)
+                # Clean up empty channels
+                if not subscribers:
+                    del self.subscriptions[channel]
             
             # Remove from connection subscriptions
-            self.connection_subscriptions[connection_id].discard(channel)
+            connection_channels = self.connection_subscriptions.get(connection_id)
+            if connection_channels is not None:
+                connection_channels.discard(channel)
             
             # Remove from pattern subscriptions
-            self.subscription_patterns[connection_id].discard(channel)
-            
-            # Clean up empty channels
-            if not self.subscriptions[channel]:
-                del self.subscriptions[channel]
+            if self._is_pattern(channel):
+                self.pattern_index.remove(channel, connection_id)
             
+            self._resolved.clear()
             logger.info(f"Connection {connection_id} unsubscribed from {channel}")
             return True
             
@@ -151,93 +254,319 @@ class SubscriptionManager:
         for channel in channels:
             self.unsubscribe(connection_id, channel)
         
-        # Clean up pattern subscriptions
-        self.subscription_patterns.pop(connection_id, None)
         self.connection_subscriptions.pop(connection_id, None)
     
-    def get_subscribers(self, channel: str) -> Set[str]:
-        """Pobiera subskrybentów kanału"""
-        subscribers = set(self.subscriptions.get(channel, set()))
+    def get_subscribers(self, channel: str) -> frozenset:
+        """Pobiera subskrybentów kanału (wynik współdzielony - nie modyfikować)"""
+        resolved = self._resolved.get(channel)
+        if resolved is not None:
+            return resolved
         
+        subscribers = set(self.subscriptions.get(channel, ()))
         # Add pattern-based subscribers
-        for connection_id, patterns in self.subscription_patterns.items():
-            for pattern in patterns:
-                if self._match_pattern(channel, pattern):
-                    subscribers.add(connection_id)
+        self.pattern_index.match(channel, subscribers)
         
-        return subscribers
+        resolved = frozenset(subscribers)
+        if len(self._resolved) >= self.resolve_cache_size:
+            self._resolved.clear()
+        self._resolved[channel] = resolved
+        return resolved
     
     def get_connection_subscriptions(self, connection_id: str) -> Set[str]:
         """Pobiera subskrypcje dla połączenia"""
         return self.connection_subscriptions.get(connection_id, set()).copy()
     
-    def _match_pattern(self, channel: str, pattern: str) -> bool:
-        """Sprawdza czy kanał pasuje do wzorca"""
-        # Simple pattern matching (* for any characters, ? for single character)
-        import fnmatch
-        return fnmatch.fnmatch(channel, pattern)
+    @staticmethod
+    def _is_pattern(channel: str) -> bool:
+        return any(char in channel for char in _WILDCARD_CHARS)
 
 class MessageBuffer:
-    """Bufor wiadomości dla połączeń WebSocket"""
+    """
+    Bufor wiadomości dla połączeń WebSocket.
+
+    Wpisy to referencje (czas, wiadomość, zserializowany payload) - przy
+    broadcaście wszystkie połączenia dzielą ten sam obiekt wiadomości i ten
+    sam payload, więc bufor nie kopiuje danych per połączenie.
+    """
     
     def __init__(self, max_size: int = 1000, max_age_seconds: int = 300):
         self.max_size = max_size
         self.max_age_seconds = max_age_seconds
         self.buffers: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_size))
-        self.message_timestamps: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_size))
     
-    def add_message(self, connection_id: str, message: WebSocketMessage):
+    def add_message(self, connection_id: str, message: WebSocketMessage, payload: Optional[str] = None):
         """Dodaje wiadomość do bufora"""
         current_time = time.time()
         
         # Add message to buffer
-        self.buffers[connection_id].append(message)
-        self.message_timestamps[connection_id].append(current_time)
+        self.buffers[connection_id].append((current_time, message, payload))
         
         # Clean old messages
-        self._clean_old_messages(connection_id)
+        self._clean_old_messages(connection_id, current_time)
     
     def get_messages(self, connection_id: str, since_timestamp: Optional[float] = None) -> List[WebSocketMessage]:
         """Pobiera wiadomości z bufora"""
+        return [message for message, _ in self.get_entries(connection_id, since_timestamp)]
+    
+    def get_entries(self, connection_id: str, since_timestamp: Optional[float] = None) -> List[tuple]:
+        """Pobiera pary (wiadomość, payload) - payload gotowy do ponownego wysłania"""
         if connection_id not in self.buffers:
             return []
         
-        messages = list(self.buffers[connection_id])
-        
-        if since_timestamp:
-            messages = [
-                msg for msg in messages 
-                if msg.timestamp > since_timestamp
-            ]
-        
-        return messages
+        return [
+            (message, payload if payload is not None else message.to_json())
+            for _, message, payload in self.buffers[connection_id]
+            if not since_timestamp or message.timestamp > since_timestamp
+        ]
     
     def clear_buffer(self, connection_id: str):
         """Czyści bufor dla połączenia"""
         self.buffers.pop(connection_id, None)
-        self.message_timestamps.pop(connection_id, None)
     
-    def _clean_old_messages(self, connection_id: str):
+    def _clean_old_messages(self, connection_id: str, current_time: float):
         """Usuwa stare wiadomości"""
-        current_time = time.time()
         cutoff_time = current_time - self.max_age_seconds
         
-        timestamps = self.message_timestamps[connection_id]
-        messages = self.buffers[connection_id]
+        entries = self.buffers[connection_id]
         
         # Remove old messages
-        while timestamps and timestamps[0] < cutoff_time:
-            timestamps.popleft()
-            messages.popleft()
+        while entries and entries[0][0] < cutoff_time:
+            entries.popleft()
+
+class ClientStream:
+    """
+    Kolejka wysyłkowa jednego klienta z konflacją i kontrolą back-pressure.
+
+    ``offer`` nigdy nie czeka na sieć: wiadomości z kluczem konflacji
+    (np. ceny per kanał/symbol) nadpisują poprzednią niewysłaną wartość,
+    pozostałe trafiają do ograniczonej kolejki FIFO. Osobne zadanie
+    wysyła kolejkę od razu, a skonflowane wartości najwyżej ``max_rate``
+    razy na sekundę.
+
+    Wolny klient (przepełniona kolejka albo wysyłka dłuższa niż
+    ``slow_send_seconds``) jest najpierw degradowany - konflowane dane
+    dostaje ``degrade_factor`` razy rzadziej - a po ``max_strikes``
+    kolejnych przewinieniach zamykany przez ``on_slow``.
+
+    Z ustawionym ``encoder`` (kodowanie binarne) elementy kolejki to
+    krotki (kind, channel, data, timestamp); wszystko gotowe do wysłania
+    w danym momencie trafia do jednej ramki. Payloady str/bytes idą bez
+    zmian. Krotki, które czekały jeszcze w kolejce po powrocie do JSON,
+    są wysyłane jako tekst JSON.
+    """
+
+    def __init__(
+        self,
+        connection_id: str,
+        send: Callable[[Any], Awaitable[Any]],
+        max_rate: float = 10.0,
+        max_pending: int = 500,
+        slow_send_seconds: float = 2.0,
+        degrade_factor: float = 4.0,
+        max_strikes: int = 3,
+        recover_after: int = 50,
+        on_slow: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.connection_id = connection_id
+        self._send = send
+        self.base_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.interval = self.base_interval
+        self.max_pending = max_pending
+        self.slow_send_seconds = slow_send_seconds
+        self.degrade_factor = degrade_factor
+        self.max_strikes = max_strikes
+        self.recover_after = recover_after
+        self.on_slow = on_slow
+        self.encoder: Optional[Callable[[List[Any]], bytes]] = None
+
+        self._latest: Dict[Any, Any] = {}
+        self._queue: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._healthy_flushes = 0
+        self._send_started: Optional[float] = None
+        self._last_strike = 0.0
+        self.degraded = False
+        self.closed = False
+        self.strikes = 0
+        self.stats = {'sent': 0, 'bytes_sent': 0, 'conflated': 0, 'dropped': 0}
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue) + len(self._latest)
+
+    def start(self) -> 'ClientStream':
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    def offer(self, payload: Any, conflate_key: Any = None) -> bool:
+        """Kolejkuje payload bez blokowania; False gdy strumień jest zamknięty"""
+        if self.closed:
+            return False
+        # A send stuck on the network never completes, so check it from here
+        if self._send_started is not None:
+            now = time.monotonic()
+            if (now - self._send_started > self.slow_send_seconds
+                    and now - self._last_strike > self.slow_send_seconds):
+                self._strike("send stalled")
+                if self.closed:
+                    return False
+        if conflate_key is not None:
+            if conflate_key in self._latest:
+                self.stats['conflated'] += 1
+            self._latest[conflate_key] = payload
+        else:
+            if len(self._queue) >= self.max_pending:
+                self._strike("send queue overflow")
+                if self.closed:
+                    return False
+                self._queue.popleft()
+                self.stats['dropped'] += 1
+            self._queue.append(payload)
+        self._wakeup.set()
+        return True
+
+    def close(self):
+        self.closed = True
+        self._queue.clear()
+        self._latest.clear()
+        self._wakeup.set()
+        task, self._task = self._task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_flush = 0.0
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                await self._drain_queue()
+                if not self._latest or self.closed:
+                    continue
+                # Rate limit conflated data; updates arriving meanwhile overwrite
+                delay = last_flush + self.interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    await self._drain_queue()
+                batch, self._latest = self._latest, {}
+                items = list(batch.values())
+                if self.encoder is not None and self._queue:
+                    items = list(self._queue) + items
+                    self._queue.clear()
+                await self._send_items(items)
+                last_flush = loop.time()
+                self._note_flush()
+        except asyncio.CancelledError:
+            pass
+
+    async def _drain_queue(self):
+        if self.encoder is not None:
+            if self._queue:
+                items = list(self._queue)
+                self._queue.clear()
+                await self._send_items(items)
+            return
+        while self._queue and not self.closed:
+            await self._send_one(self._as_text(self._queue.popleft()))
+    
+    async def _send_items(self, items: List[Any]):
+        batch: List[Any] = []
+        for item in items:
+            if self.encoder is not None and not isinstance(item, (str, bytes)):
+                batch.append(item)
+                continue
+            if batch:
+                await self._send_frame(batch)
+                batch = []
+            if self.closed:
+                return
+            await self._send_one(self._as_text(item))
+        if batch and not self.closed:
+            await self._send_frame(batch)
+    
+    @staticmethod
+    def _as_text(item: Any) -> Any:
+        """Queued binary update -> JSON text (the client switched back to JSON)"""
+        return item if isinstance(item, (str, bytes)) else update_to_json(*item)
+    
+    async def _send_frame(self, batch: List[Any]):
+        encoder = self.encoder
+        if encoder is None:
+            # Switched to JSON while the frame was being collected
+            for item in batch:
+                if self.closed:
+                    return
+                await self._send_one(self._as_text(item))
+            return
+        try:
+            frame = encoder(batch)
+        except Exception as e:
+            logger.error(f"Failed to encode frame for {self.connection_id}: {e}")
+            self.stats['dropped'] += len(batch)
+            return
+        await self._send_one(frame)
+
+    async def _send_one(self, payload: Any):
+        started = self._send_started = time.monotonic()
+        try:
+            await self._send(payload)
+        except Exception as e:
+            logger.debug(f"Send to {self.connection_id} failed: {e}")
+            self._fail(f"send error: {e}")
+            return
+        finally:
+            self._send_started = None
+        self.stats['sent'] += 1
+        self.stats['bytes_sent'] += len(payload)
+        if time.monotonic() - started > self.slow_send_seconds and self._last_strike < started:
+            self._strike("slow send")
+
+    def _note_flush(self):
+        if not self.degraded or self.backlog:
+            return
+        self._healthy_flushes += 1
+        if self._healthy_flushes >= self.recover_after:
+            self.degraded = False
+            self.strikes = 0
+            self.interval = self.base_interval
+            logger.info(f"Client {self.connection_id} recovered, full stream rate restored")
+
+    def _strike(self, reason: str):
+        self._last_strike = time.monotonic()
+        self.strikes += 1
+        self._healthy_flushes = 0
+        if not self.degraded:
+            self.degraded = True
+            self.interval = max(self.interval, 0.05) * self.degrade_factor
+            logger.warning(f"Slow WebSocket client {self.connection_id} ({reason}), "
+                           f"conflated updates every {self.interval:.2f}s")
+        elif self.strikes >= self.max_strikes:
+            self._fail(reason)
+
+    def _fail(self, reason: str):
+        if self.closed:
+            return
+        self.close()
+        logger.warning(f"Dropping WebSocket client {self.connection_id}: {reason}")
+        if self.on_slow is not None:
+            self.on_slow(self.connection_id, reason)
+
 
 class WebSocketServer:
     """Serwer WebSocket dla strumieniowych danych"""
     
-    def __init__(self, host: str = "localhost", port: int = 8765):
+    def __init__(self, host: str = "localhost", port: int = 8765,
+                 stream_max_rate: float = 10.0, stream_max_pending: int = 500):
         self.host = host
         self.port = port
         self.connections: Dict[str, Any] = {}  # WebSocket connections
         self.connection_info: Dict[str, ConnectionInfo] = {}
+        self.streams: Dict[str, ClientStream] = {}  # Per-connection send queues
+        self.stream_max_rate = stream_max_rate
+        self.stream_max_pending = stream_max_pending
         self.subscription_manager = SubscriptionManager()
         self.message_buffer = MessageBuffer()
         self.message_handlers: Dict[str, Callable] = {}
@@ -253,6 +582,7 @@ class WebSocketServer:
             'bytes_sent': 0,
             'bytes_received': 0,
             'errors': 0,
+            'slow_clients_dropped': 0,
             'start_time': None
         }
         
@@ -319,6 +649,7 @@ class WebSocketServer:
             # Store connection
             self.connections[connection_id] = websocket
             self.connection_info[connection_id] = conn_info
+            self.streams[connection_id] = self._open_stream(connection_id, websocket.send)
             
             # Update stats
             self.stats['total_connections'] += 1
@@ -348,24 +679,49 @@ class WebSocketServer:
         finally:
             await self.disconnect_client(connection_id)
     
+    def _open_stream(self, connection_id: str, send: Callable[[Any], Awaitable[Any]]) -> ClientStream:
+        def on_slow(slow_id: str, reason: str):
+            self.stats['slow_clients_dropped'] += 1
+            asyncio.create_task(self.disconnect_client(slow_id))
+        
+        return ClientStream(
+            connection_id,
+            send,
+            max_rate=self.stream_max_rate,
+            max_pending=self.stream_max_pending,
+            on_slow=on_slow,
+        ).start()
+    
     async def disconnect_client(self, connection_id: str):
         """Rozłącza klienta"""
         if connection_id not in self.connections:
             return
         
         try:
+            # Stop queued delivery and broadcasts; the goodbye below goes out directly
+            stream = self.streams.pop(connection_id, None)
+            if stream is not None:
+                stream.close()
+            self.subscription_manager.unsubscribe_all(connection_id)
+            
             # Get connection info
             conn_info = self.connection_info.get(connection_id)
-            if conn_info:
+            if conn_info and conn_info.state != ConnectionState.DISCONNECTING:
+                conn_info.state = ConnectionState.DISCONNECTING
                 logger.info(f"Disconnecting client {connection_id} (user: {conn_info.user_id})")
                 
-                # Send goodbye message
-                await self.send_message(connection_id, WebSocketMessage(
-                    message_type=MessageType.SYSTEM_STATUS,
-                    data={"status": "disconnecting"},
-                    timestamp=time.time(),
-                    message_id=str(uuid.uuid4())
-                ))
+                # Send goodbye message (a stalled client must not hold us up)
+                try:
+                    await asyncio.wait_for(self.send_message(connection_id, WebSocketMessage(
+                        message_type=MessageType.SYSTEM_STATUS,
+                        data={"status": "disconnecting"},
+                        timestamp=time.time(),
+                        message_id=str(uuid.uuid4())
+                    )), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+            elif conn_info:
+                return
             
             # Close WebSocket connection
             websocket = self.connections.get(connection_id)
@@ -390,41 +746,44 @@ class WebSocketServer:
     
     async def send_message(self, connection_id: str, message: WebSocketMessage) -> bool:
         """Wysyła wiadomość do konkretnego połączenia"""
-        if connection_id not in self.connections:
+        return await self._deliver(connection_id, message, None)
+    
+    async def _deliver(self, connection_id: str, message: WebSocketMessage, payload: Optional[str],
+                       conflate_key: Any = None, channel: Optional[str] = None) -> bool:
+        """
+        Wysyła wiadomość, używając gotowego payloadu jeśli middleware go nie zmienił.
+        
+        ``payload`` to wynik ``message.to_json()`` policzony raz na broadcast;
+        middleware zwracające inny obiekt wiadomości wymusza serializację.
+        Klienci binarni dostają wiadomość przez enkoder swojego strumienia.
+        """
+        websocket = self.connections.get(connection_id)
+        if websocket is None:
             logger.warning(f"Attempted to send message to non-existent connection: {connection_id}")
             return False
         
         try:
-            websocket = self.connections[connection_id]
-            
             # Check if message is expired
             if message.expires_at and time.time() > message.expires_at:
                 return False
             
             # Apply middleware
+            original = message
             for middleware in self.middleware:
                 message = await middleware(message, connection_id)
                 if not message:  # Middleware can block message
                     return False
             
             # Send message
-            message_json = message.to_json()
-            await websocket.send(message_json)
-            
-            # Update stats
-            self.stats['messages_sent'] += 1
-            self.stats['bytes_sent'] += len(message_json)
-            
-            # Update connection info
-            if connection_id in self.connection_info:
-                conn_info = self.connection_info[connection_id]
-                conn_info.message_count += 1
-                conn_info.bytes_sent += len(message_json)
-                conn_info.last_activity = datetime.utcnow()
-            
-            # Buffer message for potential resend
-            self.message_buffer.add_message(connection_id, message)
-            
+            if message is not original:
+                payload = None
+            stream = self.streams.get(connection_id)
+            if stream is not None:
+                return self._enqueue(connection_id, stream, message, payload, conflate_key, channel)
+            if payload is None:
+                payload = message.to_json()
+            await websocket.send(payload)
+            self._record_sent(connection_id, message, payload)
             return True
             
         except Exception as e:
@@ -434,31 +793,80 @@ class WebSocketServer:
             await self.disconnect_client(connection_id)
             return False
     
-    async def broadcast_to_channel(self, channel: str, message: WebSocketMessage) -> int:
-        """Wysyła wiadomość do wszystkich subskrybentów kanału"""
+    def _enqueue(self, connection_id: str, stream: ClientStream, message: WebSocketMessage,
+                 payload: Optional[str], conflate_key: Any, channel: Optional[str] = None) -> bool:
+        """Przekazuje payload do kolejki klienta - nie czeka na sieć"""
+        if stream.encoder is not None:
+            # Binary clients: the stream batches and delta-encodes per connection
+            item = (message.message_type.value, channel, message.data, message.timestamp)
+            if not stream.offer(item, conflate_key):
+                return False
+            self._record_sent(connection_id, message, None)
+            return True
+        if payload is None:
+            payload = message.to_json()
+        if not stream.offer(payload, conflate_key):
+            return False
+        self._record_sent(connection_id, message, payload)
+        return True
+    
+    def _record_sent(self, connection_id: str, message: WebSocketMessage, payload: Optional[str]):
+        # Update stats (binary frames are counted by the stream when sent)
+        size = len(payload) if payload is not None else 0
+        self.stats['messages_sent'] += 1
+        self.stats['bytes_sent'] += size
+        
+        # Update connection info
+        conn_info = self.connection_info.get(connection_id)
+        if conn_info is not None:
+            conn_info.message_count += 1
+            conn_info.bytes_sent += size
+            conn_info.last_activity = datetime.utcnow()
+        
+        # Buffer message for potential resend
+        self.message_buffer.add_message(connection_id, message, payload)
+    
+    async def broadcast_to_channel(self, channel: str, message: WebSocketMessage,
+                                   conflate_key: Optional[str] = None) -> int:
+        """
+        Wysyła wiadomość do wszystkich subskrybentów kanału.
+        
+        Z ``conflate_key`` (np. symbol) klient, który nie nadąża, dostaje
+        tylko najnowszą wartość dla pary (kanał, klucz).
+        """
         subscribers = self.subscription_manager.get_subscribers(channel)
-        sent_count = 0
+        if not subscribers:
+            return 0
         
-        # Sort by priority (higher priority first)
-        message_batches = defaultdict(list)
-        for connection_id in subscribers:
-            conn_info = self.connection_info.get(connection_id)
-            if conn_info and conn_info.state == ConnectionState.ACTIVE:
-                priority = message.priority
-                message_batches[priority].append(connection_id)
+        if message.expires_at and time.time() > message.expires_at:
+            return 0
         
-        # Send to highest priority connections first
-        for priority in sorted(message_batches.keys(), reverse=True):
-            connections = message_batches[priority]
-            
-            # Send messages in parallel for this priority level
-            tasks = []
-            for connection_id in connections:
-                task = asyncio.create_task(self.send_message(connection_id, message))
-                tasks.append(task)
-            
-            # Wait for this priority batch to complete
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        targets = [
+            connection_id for connection_id in subscribers
+            if (conn_info := self.connection_info.get(connection_id)) is not None
+            and conn_info.state == ConnectionState.ACTIVE
+        ]
+        if not targets:
+            return 0
+        
+        # Serialize once, every JSON subscriber gets the same payload object
+        # (binary subscribers are encoded by their own stream)
+        needs_json = any(
+            (stream := self.streams.get(connection_id)) is None or stream.encoder is None
+            for connection_id in targets
+        )
+        payload = message.to_json() if needs_json else None
+        key = (channel, conflate_key) if conflate_key is not None else None
+        sent_count = 0
+        pending = []
+        for connection_id in targets:
+            stream = self.streams.get(connection_id)
+            if stream is not None and not self.middleware:
+                sent_count += self._enqueue(connection_id, stream, message, payload, key, channel)
+            else:
+                pending.append(self._deliver(connection_id, message, payload, key, channel))
+        if pending:
+            results = await asyncio.gather(*pending, return_exceptions=True)
             sent_count += sum(1 for result in results if result is True)
         
         logger.debug(f"Broadcasted message to {sent_count}/{len(subscribers)} subscribers of channel '{channel}'")
@@ -499,6 +907,8 @@ class WebSocketServer:
                 await self._handle_authenticate(connection_id, message_data)
             elif message_type == 'heartbeat':
                 await self._handle_heartbeat(connection_id)
+            elif message_type == 'negotiate':
+                await self._handle_negotiate(connection_id, message_data)
             else:
                 # Route to registered handlers
                 if message_type in self.message_handlers:
@@ -591,6 +1001,32 @@ class WebSocketServer:
             message_id=str(uuid.uuid4())
         ))
     
+    async def _handle_negotiate(self, connection_id: str, message_data: Dict[str, Any]):
+        """
+        Negocjacja kodowania: {"type": "negotiate", "encoding": "msgpack"}.
+        
+        Odpowiedź (jeszcze w JSON) zawiera wybrane kodowanie i tabelę
+        schematów; kolejne wiadomości idą już w ramkach binarnych.
+        """
+        encoding = negotiate_encoding(message_data.get('encoding'))
+        await self.send_message(connection_id, WebSocketMessage(
+            message_type=MessageType.SYSTEM_STATUS,
+            data={
+                "action": "negotiate",
+                "encoding": encoding,
+                "schema": schema_descriptor() if encoding == ENCODING_MSGPACK else None
+            },
+            timestamp=time.time(),
+            message_id=str(uuid.uuid4())
+        ))
+        
+        conn_info = self.connection_info.get(connection_id)
+        stream = self.streams.get(connection_id)
+        if conn_info is None or stream is None:
+            return
+        conn_info.encoding = encoding
+        stream.encoder = BinaryFrameEncoder().encode if encoding == ENCODING_MSGPACK else None
+    
     async def _handle_heartbeat(self, connection_id: str):
         """Obsługuje heartbeat"""
         await self.send_message(connection_id, WebSocketMessage(
@@ -667,9 +1103,10 @@ class WebSocketServer:
                     expires_at=time.time() + 30  # Expire after 30 seconds
                 )
                 
+                payload = heartbeat_message.to_json()
                 tasks = []
                 for connection_id in list(self.connections.keys()):
-                    task = asyncio.create_task(self.send_message(connection_id, heartbeat_message))
+                    task = asyncio.create_task(self._deliver(connection_id, heartbeat_message, payload))
                     tasks.append(task)
                 
                 if tasks:
@@ -710,6 +1147,9 @@ class WebSocketServer:
             'bytes_received': self.stats['bytes_received'],
             'errors': self.stats['errors'],
             'uptime': time.time() - self.stats['start_time'] if self.stats['start_time'] else 0,
+            'slow_clients_dropped': self.stats['slow_clients_dropped'],
+            'degraded_clients': sum(1 for stream in self.streams.values() if stream.degraded),
+            'queued_messages': sum(stream.backlog for stream in self.streams.values()),
             'channels': len(self.subscription_manager.subscriptions),
             'total_subscriptions': sum(len(subs) for subs in self.subscription_manager.subscriptions.values())
         }
@@ -758,9 +1198,9 @@ class DataStreamPublisher:
             expires_at=time.time() + 10  # Price data expires quickly
         )
         
-        # Broadcast to price subscribers
-        await self.server.broadcast_to_channel(f"prices.{symbol}", message)
-        await self.server.broadcast_to_channel("prices.all", message)
+        # Broadcast to price subscribers; slow clients get only the latest price
+        await self.server.broadcast_to_channel(f"prices.{symbol}", message, conflate_key=symbol)
+        await self.server.broadcast_to_channel("prices.all", message, conflate_key=symbol)
     
     async def publish_portfolio_change(self, user_id: str, portfolio_data: Dict[str, Any]):
         """Publikuje zmianę portfolio"""